@@ -1,29 +1,19 @@
-import os
-import json
+import sys
+from pathlib import Path
 import requests
-from dotenv import load_dotenv
 from upstash_vector import Index
 from groq import Groq
 
-# Load environment variables
-load_dotenv('../.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import load_food_data
+from ragfood.config import get_settings
 
-# Manual fallback for environment variables
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    try:
-        with open('../.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        pass
+settings = get_settings()
 
 # Constants (updated for Groq)
-JSON_FILE = "../data/food_data.json"
-LLM_MODEL = "llama-3.1-8b-instant"  # Groq's fast model
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+JSON_FILE = settings.resolve_path("data/food_data.json")
+LLM_MODEL = settings.groq_model  # Groq's fast model
+GROQ_API_KEY = settings.groq_api_key
 
 # Initialize Groq client
 if not GROQ_API_KEY:
@@ -38,12 +28,11 @@ except Exception as e:
     exit(1)
 
 # Load data
-with open(JSON_FILE, "r", encoding="utf-8") as f:
-    food_data = json.load(f)
+food_data = load_food_data(JSON_FILE)
 
 # Setup Upstash Vector (replaces ChromaDB setup)
-upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+upstash_url = settings.upstash_url
+upstash_token = settings.upstash_token
 
 if not upstash_url or not upstash_token:
     print("❌ Missing Upstash Vector credentials in .env file")
@@ -80,7 +69,7 @@ if existing_count == 0:
         ))
 
     # Upload in batches
-    batch_size = 50
+    batch_size = settings.upsert_batch_size
     for i in range(0, len(vectors), batch_size):
         batch = vectors[i:i + batch_size]
         index.upsert(vectors=batch)
@@ -95,7 +84,7 @@ def rag_query(question):
         # Step 1: Query the vector DB (Upstash handles embedding automatically)
         results = index.query(
             data=question,  # Upstash auto-embeds this
-            top_k=3,
+            top_k=settings.top_k,
             include_metadata=True
         )
 
@@ -139,8 +128,8 @@ Context:
 Question: {question}
 Answer:"""}
                 ],
-                temperature=0.7,
-                max_completion_tokens=500,
+                temperature=settings.temperature,
+                max_completion_tokens=settings.max_tokens,
                 top_p=1.0,
                 stream=False
             )
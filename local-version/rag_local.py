@@ -1,118 +1,98 @@
+import argparse
 import os
-import json
-import chromadb
-import requests
-
-# Constants for local ChromaDB system
-CHROMA_DIR = "chroma_db"
-COLLECTION_NAME = "foods"
-JSON_FILE = "../data/food_data.json"
-EMBED_MODEL = "mxbai-embed-large"
-LLM_MODEL = "llama3.2"
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.config import get_settings
+from ragfood.embeddings import OllamaEmbedder
+from ragfood.engine import RAGEngine
+from ragfood.llm import OllamaProvider
+
+parser = argparse.ArgumentParser(description="Local RAG system (Ollama)")
+parser.add_argument("--index", choices=["chroma", "ivf"], default="chroma",
+                    help="chroma (default) or an in-process IVF index saved under ANN_DIR, for large catalogs")
+args = parser.parse_args()
+
+# Constants for local ChromaDB system (see ragfood.config for overrides)
+settings = get_settings()
+JSON_FILE = settings.resolve_path("data/food_data.json")
+LLM_MODEL = settings.llm_model
 
 # Load data
-with open(JSON_FILE, "r", encoding="utf-8") as f:
-    food_data = json.load(f)
-
-# Setup ChromaDB
-chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
-collection = chroma_client.get_or_create_collection(name=COLLECTION_NAME)
+food_data = load_food_data(JSON_FILE)
+embedder = OllamaEmbedder(settings)
+
+if settings.projection:
+    from ragfood.catalog import enrich_text
+    from ragfood.projection import create_projected_embedder
+
+    # Reduced-dimension vectors get their own collection/index; the fitted projection is reused across runs
+    tag = f"{settings.projection}{settings.projection_dim}"
+    projection_file = settings.resolve_path(settings.chroma_dir) / f"projection-{tag}.npz"
+    embedder = create_projected_embedder(embedder, [enrich_text(item) for item in food_data], settings, str(projection_file))
+    settings = settings.replace(chroma_collection=f"{settings.chroma_collection}-{tag}", ann_dir=f"{settings.ann_dir}-{tag}")
+    print(f"📐 Projecting embeddings to {settings.projection_dim} dims ({settings.projection})")
+
+if args.index == "ivf":
+    from ragfood.stores.ivf import IVFVectorStore, ivf_store_options
+
+    # Memory-mapped index: opening is near-instant, the catalog is only embedded once
+    ann_dir = settings.resolve_path(settings.ann_dir)
+    if (ann_dir / "manifest.json").exists():
+        store = IVFVectorStore.load(str(ann_dir), embedder=embedder, **ivf_store_options(settings))
+    else:
+        store = IVFVectorStore(embedder=embedder, **ivf_store_options(settings))
+else:
+    from ragfood.stores.chroma import ChromaVectorStore
 
-# Ollama embedding function
-def get_embedding(text):
-    try:
-        response = requests.post("http://localhost:11434/api/embeddings", json={
-            "model": EMBED_MODEL,
-            "prompt": text
-        })
-        response.raise_for_status()
-        result = response.json()
-        
-        if "embedding" not in result:
-            raise ValueError(f"No embedding in response: {result}")
-        
-        embedding = result["embedding"]
-        if not embedding or len(embedding) == 0:
-            raise ValueError("Empty embedding returned")
-            
-        return embedding
-    except Exception as e:
-        print(f"❌ Error getting embedding for text: '{text[:50]}...' Error: {e}")
-        raise
+    # Setup ChromaDB with Ollama embeddings (mxbai-embed-large)
+    store = ChromaVectorStore(settings, embedder=embedder)
 
 # Add only new items
-existing_ids = set(collection.get()['ids'])
-new_items = [item for item in food_data if item['id'] not in existing_ids]
+existing = store.fetch([item["id"] for item in food_data], include_metadata=False)
+new_items = [item for item, record in zip(food_data, existing) if record is None]
 
 if new_items:
-    print(f"🆕 Adding {len(new_items)} new documents to Chroma...")
-    for item in new_items:
-        # Enhance text with region/type
-        enriched_text = item["text"]
-        if "region" in item:
-            enriched_text += f" This food is popular in {item['region']}."
-        if "type" in item:
-            enriched_text += f" It is a type of {item['type']}."
-
-        emb = get_embedding(enriched_text)
-
-        collection.add(
-            documents=[item["text"]],  # Use original text as retrievable context
-            embeddings=[emb],
-            ids=[item["id"]]
-        )
+    print(f"🆕 Adding {len(new_items)} new documents to {args.index}...")
+    # Enriched text (region/type) is embedded, original text is the retrievable context
+    store.upsert(food_records(new_items))
+    if args.index == "ivf":
+        store.save(str(ann_dir))
+        print(f"💾 IVF index saved to {os.path.relpath(ann_dir)}")
 else:
-    print("✅ All documents already in ChromaDB.")
+    print(f"✅ All documents already in {args.index}.")
+
+engine = RAGEngine(store, OllamaProvider(settings, model=LLM_MODEL))
 
 # RAG query
 def rag_query(question):
     try:
-        # Step 1: Embed the user question
-        q_emb = get_embedding(question)
+        # Step 1-2: Embed the user question and query the vector DB
+        sources = engine.retrieve(question)
 
-        # Step 2: Query the vector DB
-        results = collection.query(query_embeddings=[q_emb], n_results=3)
-
-        # Step 3: Extract documents
-        top_docs = results['documents'][0]
-        top_ids = results['ids'][0]
-
-        # Step 4: Show friendly explanation of retrieved documents
+        # Step 3-4: Show friendly explanation of retrieved documents
         print("\n🧠 Retrieving relevant information to reason through your question...\n")
 
-        for i, doc in enumerate(top_docs):
-            print(f"🔹 Source {i + 1} (ID: {top_ids[i]}):")
-            print(f"    \"{doc}\"\n")
+        for i, source in enumerate(sources):
+            print(f"🔹 Source {i + 1} (ID: {source.id}):")
+            print(f"    \"{source.text}\"\n")
 
         print("📚 These seem to be the most relevant pieces of information to answer your question.\n")
 
-        # Step 5: Build prompt from context
-        context = "\n".join(top_docs)
-
-        prompt = f"""Use the following context to answer the question.
-
-Context:
-{context}
-
-Question: {question}
-Answer:"""
-
-        # Step 6: Generate answer with Ollama
-        response = requests.post("http://localhost:11434/api/generate", json={
-            "model": LLM_MODEL,
-            "prompt": prompt,
-            "stream": False
-        })
+        # Step 5-6: Build prompt from context and generate answer with Ollama
+        generation = engine.generate(question, sources)
 
         # Step 7: Return final result
-        return response.json()["response"].strip()
+        return generation.text
     except Exception as e:
         print(f"❌ Error during RAG query: {e}")
         return "Sorry, I encountered an error while processing your question. Please try again."
 
 
 # Interactive loop
-print("\n🧠 Local RAG System (ChromaDB + Ollama) ready. Ask a question (type 'exit' to quit):\n")
+print(f"\n🧠 Local RAG System ({'ChromaDB' if args.index == 'chroma' else 'IVF index'} + Ollama) ready. Ask a question (type 'exit' to quit):\n")
 while True:
     try:
         question = input("You: ")
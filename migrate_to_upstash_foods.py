@@ -12,20 +12,18 @@ Date: November 2025
 """
 
 import json
-import os
 import time
 import requests
 from typing import List, Dict, Any
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from ragfood.catalog import enrich_text, load_food_data
+from ragfood.config import get_settings
 
 class UpstashFoodsMigration:
     def __init__(self):
-        self.base_url = os.getenv('UPSTASH_VECTOR_REST_URL')
-        self.token = os.getenv('UPSTASH_VECTOR_REST_TOKEN')
-        self.foods_namespace = "foods"
+        self.settings = get_settings()
+        self.base_url = self.settings.upstash_url
+        self.token = self.settings.upstash_token
+        self.foods_namespace = self.settings.foods_namespace
         
         if not self.base_url or not self.token:
             raise ValueError("Missing Upstash credentials in .env file")
@@ -66,8 +64,7 @@ class UpstashFoodsMigration:
     def load_food_data(self) -> List[Dict[str, Any]]:
         """Load food data from JSON file"""
         try:
-            with open('foods.json', 'r', encoding='utf-8') as f:
-                foods = json.load(f)
+            foods = load_food_data(self.settings.json_path)
             print(f"📊 Loaded {len(foods)} food items from JSON file")
             return foods
         except Exception as e:
@@ -121,18 +118,8 @@ class UpstashFoodsMigration:
             # Prepare vectors in the format expected by Upstash Vector client
             vectors = []
             for food in foods:
-                # Use same text enrichment as current RAG system
-                enriched_text = food.get("text", "")
-                if food.get("region"):
-                    enriched_text += f" This food is popular in {food['region']}."
-                if food.get("type"):
-                    enriched_text += f" It is a type of {food['type']}."
-                
-                # Add more context from extended metadata
-                if food.get("origin"):
-                    enriched_text += f" Origin: {food['origin']}."
-                if food.get("cultural_significance"):
-                    enriched_text += f" Cultural significance: {food['cultural_significance']}"
+                # Use same text enrichment as current RAG system, plus origin and cultural significance
+                enriched_text = enrich_text(food, extended=True)
                 
                 # Create vector tuple: (id, text_data, metadata)
                 vector_tuple = (
@@ -155,7 +142,7 @@ class UpstashFoodsMigration:
                 vectors.append(vector_tuple)
             
             # Process in batches of 50 to avoid payload limits
-            batch_size = 50
+            batch_size = self.settings.upsert_batch_size
             total_batches = (len(vectors) + batch_size - 1) // batch_size
             
             for i in range(0, len(vectors), batch_size):
@@ -10,32 +10,18 @@ Author: Jasha9
 Date: November 2025
 """
 
-import os
-import json
-from dotenv import load_dotenv
+from ragfood.catalog import load_food_data
+from ragfood.config import get_settings
 from upstash_vector import Index
 from groq import Groq
 
-# Load environment variables
-load_dotenv('.env')
-
-# Manual fallback for environment variables
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        pass
+settings = get_settings()
 
 # Constants
-JSON_FILE = "foods.json"
-LLM_MODEL = "llama-3.1-8b-instant"  # Groq's fast model
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-FOODS_NAMESPACE = "foods"  # Dedicated namespace for food data
+JSON_FILE = settings.json_path
+LLM_MODEL = settings.groq_model  # Groq's fast model
+GROQ_API_KEY = settings.groq_api_key
+FOODS_NAMESPACE = settings.foods_namespace  # Dedicated namespace for food data
 
 # Initialize Groq client
 if not GROQ_API_KEY:
@@ -50,8 +36,8 @@ except Exception as e:
     exit(1)
 
 # Setup Upstash Vector
-upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+upstash_url = settings.upstash_url
+upstash_token = settings.upstash_token
 
 if not upstash_url or not upstash_token:
     print("❌ Missing Upstash Vector credentials in .env file")
@@ -77,8 +63,7 @@ def check_foods_data():
 # Load local data for fallback (optional)
 def load_local_food_data():
     try:
-        with open(JSON_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_food_data(JSON_FILE)
     except:
         return []
 
@@ -107,7 +92,7 @@ def rag_query(question):
         results = index.query(
             data=question,  # Upstash auto-embeds this
             namespace=FOODS_NAMESPACE,  # Use dedicated foods namespace
-            top_k=3,
+            top_k=settings.top_k,
             include_metadata=True
         )
 
@@ -152,8 +137,8 @@ Context:
 Question: {question}
 Answer:"""}
                 ],
-                temperature=0.7,
-                max_completion_tokens=500,
+                temperature=settings.temperature,
+                max_completion_tokens=settings.max_tokens,
                 top_p=1.0,
                 stream=False
             )
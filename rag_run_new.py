@@ -1,33 +1,18 @@
-import os
-import json
 import sys
 from typing import Dict, List
 import requests
-from dotenv import load_dotenv
+from ragfood.catalog import enrich_text, load_food_data
+from ragfood.config import get_settings
 from upstash_vector import Index
 
-from rag_run_upstash import MAX_RESULTS
-
-# Load environment variables
-load_dotenv('.env')
-
-# Manual fallback for environment variables
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        pass
+settings = get_settings()
 
 # Constants (keeping original variable names for compatibility)
-JSON_FILE = "foods.json"
-LLM_MODEL = "llama3.2"
-UPSTASH_URL = os.getenv("UPSTASH_VECTOR_REST_URL")
-UPSTASH_TOKEN = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+JSON_FILE = settings.json_path
+LLM_MODEL = settings.llm_model
+UPSTASH_URL = settings.upstash_url
+UPSTASH_TOKEN = settings.upstash_token
+MAX_RESULTS = settings.top_k
 
 class RAGSystem:
     """RAG System using Upstash Vector for semantic search."""
@@ -73,8 +58,7 @@ class RAGSystem:
     def load_food_data(self):
         """Load food data from JSON file."""
         try:
-            with open(JSON_FILE, "r", encoding="utf-8") as f:
-                self.food_data = json.load(f)
+            self.food_data = load_food_data(JSON_FILE)
             print(f"📋 Loaded {len(self.food_data)} food items")
         except Exception as e:
             print(f"❌ Failed to load food data: {e}")
@@ -90,11 +74,7 @@ class RAGSystem:
             vectors = []
             for item in self.food_data:
                 # Create enriched text for better embeddings
-                enriched_text = item["text"]
-                if "region" in item:
-                    enriched_text += f" This food is popular in {item['region']}."
-                if "type" in item:
-                    enriched_text += f" It is a type of {item['type']}."
+                enriched_text = enrich_text(item)
                 
                 vectors.append((
                     item["id"],
@@ -109,7 +89,7 @@ class RAGSystem:
             print(f"📤 Upserting {len(vectors)} food items...")
             
             # Batch upsert
-            batch_size = 50
+            batch_size = settings.upsert_batch_size
             for i in range(0, len(vectors), batch_size):
                 batch = vectors[i:i + batch_size]
                 self.index.upsert(vectors=batch)
@@ -0,0 +1,19 @@
+"""
+RAG Food Assistant core package
+===============================
+
+Shared building blocks used by the interactive scripts, migration tools,
+tests and benchmarks.
+"""
+
+from ragfood.config import PROJECT_ROOT, Settings, get_settings, load_settings, reload_settings
+
+__version__ = "2.5"
+
+__all__ = [
+    "PROJECT_ROOT",
+    "Settings",
+    "get_settings",
+    "load_settings",
+    "reload_settings",
+]
@@ -0,0 +1,389 @@
+"""
+Approximate Nearest-Neighbour Index
+===================================
+
+IVF-Flat (inverted file) index over unit vectors, in NumPy:
+
+- **build**: spherical k-means on a sample picks ``nlist`` centroids; every
+  vector goes to its nearest centroid's list, and the vectors are stored
+  reordered so each list is one contiguous slice
+- **search**: score the query against the centroids, scan only the
+  ``nprobe`` best lists exactly and return the top ``k`` of those
+
+``nprobe`` trades recall for speed at query time (``nprobe == nlist`` is
+exact search). ``nlist`` is fixed at build time. A good default is
+``4 * sqrt(n)``, with at least ~39 vectors per list.
+
+``IVFPQIndex`` drops the vectors altogether. Each vector's residual from
+its list centroid is split into ``m`` sub-vectors, and each sub-vector is
+replaced by the id of its nearest of 256 trained centroids. That takes
+``m`` bytes per vector, against ``4 * dim`` for float32. A query fills one
+``m x 256`` table of sub-vector dot products (asymmetric distance
+computation), and scoring a list is then one gather-and-sum over its
+codes. PQ scores are coarse; when the full vectors can stay on disk,
+``refine`` rescores a few times ``k`` candidates exactly from a
+memory-mapped file.
+
+Indexes are saved as plain ``.npy`` files plus a small JSON header, and
+``IVFIndex.load(path, mmap=True)`` maps them instead of reading them, so
+opening a million-vector index is near-instant and pages load on demand.
+"""
+
+import json
+import math
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ragfood.stores.memory import normalize_rows, top_k_indices
+
+SCHEMA = "ragfood-ivf/1"
+PQ_SCHEMA = "ragfood-ivfpq/1"
+
+# Training sample per centroid; more only slows k-means down
+SAMPLE_PER_LIST = 256
+ASSIGN_BATCH = 16384
+# Centroids per PQ sub-quantizer (one uint8 code each)
+PQ_CODES = 256
+
+
+def default_nlist(count: int) -> int:
+    """``4 * sqrt(n)`` lists, capped so each keeps ~39 vectors on average."""
+    return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, batch: int = ASSIGN_BATCH) -> np.ndarray:
+    """Index of the most similar centroid for every row (batched to bound memory)."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch):
+        labels[start:start + batch] = np.argmax(vectors[start:start + batch] @ centroids.T, axis=1)
+    return labels
+
+
+def _cluster_sums(sample: np.ndarray, labels: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``(counts, non-empty cluster ids, member sums of those clusters)``."""
+    order = np.argsort(labels, kind="stable")
+    counts = np.bincount(labels, minlength=k)
+    nonempty = np.flatnonzero(counts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+    return counts, nonempty, np.add.reduceat(sample[order], starts, axis=0)
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """``k`` unit-norm centroids maximizing cosine similarity to their members.
+
+    Trains on at most ``SAMPLE_PER_LIST * k`` rows. Empty clusters are
+    re-seeded from random sample points.
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > SAMPLE_PER_LIST * k:
+        sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), SAMPLE_PER_LIST * k, replace=False))], dtype=np.float32)
+    else:
+        sample = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(sample))
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        counts, nonempty, sums = _cluster_sums(sample, labels, k)
+        centroids[nonempty] = sums
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        centroids = normalize_rows(centroids)
+    return centroids
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """``k`` Euclidean k-means centroids of ``vectors`` (used for PQ codebooks)."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > SAMPLE_PER_LIST * k:
+        sample = np.asarray(vectors[rng.choice(len(vectors), SAMPLE_PER_LIST * k, replace=False)], dtype=np.float32)
+    else:
+        sample = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(sample))
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest(sample, centroids)
+        counts, nonempty, sums = _cluster_sums(sample, labels, k)
+        centroids[nonempty] = sums / counts[nonempty, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+    return centroids
+
+
+def nearest(vectors: np.ndarray, centroids: np.ndarray, batch: int = 1024) -> np.ndarray:
+    """Index of the closest centroid (Euclidean) for every row.
+
+    ``|x - c|^2`` ranks like ``|c|^2 - 2 x·c``; small batches keep that
+    distance block in cache (PQ sub-vectors make the product itself cheap).
+    """
+    norms = (centroids * centroids).sum(axis=1)
+    scaled = -2 * centroids.T
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch):
+        distances = vectors[start:start + batch] @ scaled
+        distances += norms
+        labels[start:start + batch] = distances.argmin(axis=1)
+    return labels
+
+
+class IVFIndex:
+    """Inverted lists over ``vectors`` (rows already grouped by list).
+
+    ``offsets[i]:offsets[i + 1]`` are the rows of list ``i``. Search
+    returns row numbers into ``vectors``; ``build`` also returns the
+    permutation that maps those rows back to the input order.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, vectors: np.ndarray, nprobe: int = 8):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.vectors = vectors
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> Tuple["IVFIndex", np.ndarray]:
+        """Train on ``vectors`` (unit rows) and return ``(index, order)``.
+
+        ``index.vectors == vectors[order]``.
+        """
+        if len(vectors) == 0:
+            raise ValueError("Cannot build an IVF index over no vectors")
+        nlist = nlist or default_nlist(len(vectors))
+        centroids = spherical_kmeans(vectors, nlist, iterations, seed)
+        labels = assign(vectors, centroids)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=offsets[1:])
+        return cls(centroids, offsets, np.ascontiguousarray(vectors[order]), nprobe), order
+
+    def probe(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """The ``nprobe`` lists whose centroids are most similar to ``query``."""
+        return top_k_indices(self.centroids @ query, min(nprobe or self.nprobe, self.nlist))
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows in the probed lists and their exact cosine to ``query``."""
+        spans = [(int(self.offsets[i]), int(self.offsets[i + 1])) for i in self.probe(query, nprobe)]
+        spans = [(a, b) for a, b in spans if b > a]
+        if not spans:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows = np.concatenate([np.arange(a, b) for a, b in spans])
+        scores = np.concatenate([self.vectors[a:b] @ query for a, b in spans])
+        return rows, scores
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top ``k`` ``(rows, cosines)`` among the probed lists, best first."""
+        rows, scores = self.candidates(query, nprobe)
+        top = top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+    # -- persistence -------------------------------------------------------
+
+    def header(self) -> Dict[str, Any]:
+        return {"schema": SCHEMA, "count": len(self), "dimension": int(self.centroids.shape[1]),
+                "nlist": self.nlist, "nprobe": self.nprobe}
+
+    def save(self, directory: str, vectors: bool = True) -> str:
+        """Write ``centroids.npy``, ``offsets.npy``, ``vectors.npy`` and ``ivf.json``.
+
+        ``vectors=False`` skips the vectors when the caller stores them itself.
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+        np.save(os.path.join(directory, "offsets.npy"), self.offsets)
+        if vectors:
+            np.save(os.path.join(directory, "vectors.npy"), np.asarray(self.vectors, dtype=np.float32))
+        with open(os.path.join(directory, "ivf.json"), "w", encoding="utf-8") as f:
+            json.dump(self.header(), f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, vectors: Optional[np.ndarray] = None) -> "IVFIndex":
+        """Open a saved index; ``mmap`` maps the arrays copy-on-write instead of reading them."""
+        with open(os.path.join(directory, "ivf.json"), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("schema") != SCHEMA:
+            raise ValueError(f"{directory} is not an IVF index (schema {header.get('schema')!r})")
+        mode = "c" if mmap else None
+        if vectors is None:
+            vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mode)
+        return cls(
+            np.load(os.path.join(directory, "centroids.npy")),
+            np.load(os.path.join(directory, "offsets.npy")),
+            vectors,
+            header.get("nprobe", 8),
+        )
+
+
+class IVFPQIndex:
+    """IVF lists of product-quantized residuals; no vectors are kept.
+
+    ``codes[r]`` (``m`` bytes) encodes row ``r`` of the list-ordered data.
+    ``ids[r]`` is that row's position in the vectors the index was built
+    from. Scores approximate the cosine: ``q·centroid + Σ table[j, code_j]``.
+
+    With ``vectors`` (the full-precision rows in build order, typically
+    memory-mapped) and ``refine > 0``, search rescores the best
+    ``refine * k`` PQ candidates exactly and reads only those rows.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, codebooks: np.ndarray, codes: np.ndarray,
+                 ids: np.ndarray, nprobe: int = 8, vectors: Optional[np.ndarray] = None, refine: int = 0):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.codebooks = codebooks
+        self.codes = codes
+        self.ids = ids
+        self.nprobe = nprobe
+        self.vectors = vectors
+        self.refine = refine
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def m(self) -> int:
+        return len(self.codebooks)
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """Codes plus id per vector (centroids and codebooks are a fixed cost)."""
+        return self.m + self.ids.dtype.itemsize
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        m: int = 16,
+        nprobe: int = 8,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IVFPQIndex":
+        """Train the coarse quantizer and ``m`` sub-quantizers on ``vectors``, then encode them."""
+        if len(vectors) == 0:
+            raise ValueError("Cannot build an IVF-PQ index over no vectors")
+        dimension = vectors.shape[1]
+        if dimension % m:
+            raise ValueError(f"PQ sub-quantizers must divide the dimension: {dimension} % {m} != 0")
+        nlist = nlist or default_nlist(len(vectors))
+        centroids = spherical_kmeans(vectors, nlist, iterations, seed)
+        labels = assign(vectors, centroids)
+        sub = dimension // m
+
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(len(vectors), min(len(vectors), SAMPLE_PER_LIST * PQ_CODES), replace=False))
+        residuals = np.asarray(vectors[sample], dtype=np.float32) - centroids[labels[sample]]
+        codebooks = np.stack([
+            kmeans(residuals[:, j * sub:(j + 1) * sub], PQ_CODES, iterations, seed + j) for j in range(m)
+        ])
+        if codebooks.shape[1] < PQ_CODES:
+            codebooks = np.concatenate([codebooks, np.repeat(codebooks[:, :1], PQ_CODES - codebooks.shape[1], axis=1)], axis=1)
+
+        order = np.argsort(labels, kind="stable")
+        codes = np.empty((len(vectors), m), dtype=np.uint8)
+        for start in range(0, len(vectors), ASSIGN_BATCH):
+            rows = order[start:start + ASSIGN_BATCH]
+            residual = np.asarray(vectors[rows], dtype=np.float32) - centroids[labels[rows]]
+            for j in range(m):
+                codes[start:start + len(rows), j] = nearest(residual[:, j * sub:(j + 1) * sub], codebooks[j])
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=offsets[1:])
+        ids = order.astype(np.int32 if len(vectors) < 2 ** 31 else np.int64)
+        return cls(centroids, offsets, codebooks, codes, ids, nprobe)
+
+    def table(self, query: np.ndarray) -> np.ndarray:
+        """``m x 256`` dot products of each query sub-vector with its codebook."""
+        sub = self.codebooks.shape[2]
+        return np.einsum("jkd,jd->jk", self.codebooks, query.reshape(self.m, sub))
+
+    def probe(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        return top_k_indices(self.centroids @ query, min(nprobe or self.nprobe, self.nlist))
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None,
+               refine: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top ``k`` ``(ids, cosines)`` among the probed lists, best first.
+
+        Cosines are PQ estimates unless the candidates were refined.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        refine = self.refine if refine is None else refine
+        if refine and self.vectors is not None:
+            ids, _ = self.search(query, k * refine, nprobe, refine=0)
+            ids = np.sort(ids)
+            exact = self.vectors[ids] @ query
+            top = top_k_indices(exact, k)
+            return ids[top], exact[top]
+        flat = self.table(query).ravel()
+        shift = np.arange(self.m) * PQ_CODES
+        rows, scores = [], []
+        for i in self.probe(query, nprobe):
+            a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+            if b > a:
+                rows.append(np.arange(a, b))
+                scores.append(float(self.centroids[i] @ query) + flat[self.codes[a:b] + shift].sum(axis=1))
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        top = top_k_indices(scores, k)
+        return self.ids[rows[top]].astype(np.int64), scores[top]
+
+    def decode(self, rows: np.ndarray) -> np.ndarray:
+        """Reconstructed vectors for list-ordered ``rows`` (centroid + decoded residual)."""
+        lists = np.searchsorted(self.offsets, rows, side="right") - 1
+        parts = [self.codebooks[j][self.codes[rows, j]] for j in range(self.m)]
+        return self.centroids[lists] + np.concatenate(parts, axis=1)
+
+    # -- persistence -------------------------------------------------------
+
+    def header(self) -> Dict[str, Any]:
+        return {"schema": PQ_SCHEMA, "count": len(self), "dimension": int(self.centroids.shape[1]),
+                "nlist": self.nlist, "m": self.m, "nprobe": self.nprobe}
+
+    def save(self, directory: str) -> str:
+        """Write centroids, offsets, codebooks, codes and ids as ``.npy`` plus ``ivfpq.json``."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ("centroids", "offsets", "codebooks", "codes", "ids"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "ivfpq.json"), "w", encoding="utf-8") as f:
+            json.dump(self.header(), f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, vectors: Optional[np.ndarray] = None, refine: int = 0) -> "IVFPQIndex":
+        """Open a saved index; ``mmap`` maps the codes and ids instead of reading them."""
+        with open(os.path.join(directory, "ivfpq.json"), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("schema") != PQ_SCHEMA:
+            raise ValueError(f"{directory} is not an IVF-PQ index (schema {header.get('schema')!r})")
+        mode = "c" if mmap else None
+        return cls(
+            np.load(os.path.join(directory, "centroids.npy")),
+            np.load(os.path.join(directory, "offsets.npy")),
+            np.load(os.path.join(directory, "codebooks.npy")),
+            np.load(os.path.join(directory, "codes.npy"), mmap_mode=mode),
+            np.load(os.path.join(directory, "ids.npy"), mmap_mode=mode),
+            header.get("nprobe", 8),
+            vectors,
+            refine,
+        )
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Approximate Index Benchmark
+===========================
+
+Sweeps the IVF and IVF-PQ indexes (``ragfood.ann``) over a vector set and
+reports, per setting, recall@k against exact search next to queries/sec
+and per-query latency:
+
+- ``nlist`` (build): number of inverted lists
+- ``m`` (build, ``ivfpq``): PQ sub-quantizers, i.e. bytes per code
+- ``nprobe`` (search): lists scanned per query
+- ``refine`` (search, ``ivfpq``): rescore ``refine * k`` PQ candidates
+  against the full vectors, memory-mapped from disk
+
+Each build also reports bytes/vector and build, save and mmap-load time.
+Exact brute-force search over the same vectors is the baseline row.
+Vectors are seeded clustered synthetic unit vectors, a scaled-up
+``foods.json`` (``--data catalog``: blended, jittered hashed catalog
+embeddings), or an ``.npy`` matrix of your own embeddings (``--vectors``).
+Queries are perturbed copies of random corpus rows, so they land where
+data is.
+
+Usage::
+
+    python -m ragfood.ann_bench --n 1000000 --dim 384 --nprobe 1,4,8,16,32
+    python -m ragfood.ann_bench --index ivfpq --data catalog --n 1000000 --m 16,48 --refine 0,10
+    python -m ragfood.ann_bench --vectors embeddings.npy --nlist 1024,4096 --output ann.json
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ragfood.ann import IVFIndex, IVFPQIndex, default_nlist
+from ragfood.benchmark import environment, ns_to_ms, write_report
+from ragfood.histogram import LatencyHistogram
+from ragfood.stores.memory import normalize_rows, top_k_indices
+
+SCHEMA = "ragfood-ann/1"
+INDEXES = ("ivf", "ivfpq")
+DATA_SOURCES = ("synthetic", "catalog")
+DEFAULT_NPROBES = (1, 2, 4, 8, 16, 32, 64)
+GROUND_TRUTH_BATCH = 256
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 0, spread: float = 0.35, seed: int = 42) -> np.ndarray:
+    """``n`` unit rows scattered around ``clusters`` random centres (0 = ``sqrt(n)``)."""
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(1, int(np.sqrt(n)))
+    centres = normalize_rows(rng.standard_normal((clusters, dim), dtype=np.float32))
+    vectors = np.empty((n, dim), dtype=np.float32)
+    step = 65536
+    for start in range(0, n, step):
+        count = min(step, n - start)
+        noise = rng.standard_normal((count, dim), dtype=np.float32) * (spread / np.sqrt(dim))
+        vectors[start:start + count] = centres[rng.integers(0, clusters, count)] + noise
+    return normalize_rows(vectors)
+
+
+def catalog_vectors(n: int, dim: int = 384, blend: float = 0.3, noise: float = 0.35, seed: int = 42,
+                    food_data: Optional[Sequence[Dict[str, Any]]] = None) -> np.ndarray:
+    """``n`` unit rows shaped like a scaled-up ``foods.json``.
+
+    Each row is a catalog item's hashed embedding, blended with a second
+    random item (a fusion dish) and jittered, so the set keeps the
+    catalog's topical clusters at any size.
+    """
+    from ragfood.catalog import enrich_text, load_food_data
+    from ragfood.embeddings import HashingEmbedder
+
+    food_data = food_data or load_food_data()
+    base = HashingEmbedder(dim).embed([enrich_text(item) for item in food_data])
+    rng = np.random.default_rng(seed)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    step = 65536
+    for start in range(0, n, step):
+        count = min(step, n - start)
+        weights = rng.uniform(0, blend, (count, 1)).astype(np.float32)
+        mixed = base[rng.integers(0, len(base), count)] * (1 - weights) + base[rng.integers(0, len(base), count)] * weights
+        vectors[start:start + count] = mixed + rng.standard_normal((count, dim), dtype=np.float32) * (noise / np.sqrt(dim))
+    return normalize_rows(vectors)
+
+
+def sample_queries(vectors: np.ndarray, count: int, noise: float = 0.1, seed: int = 7) -> np.ndarray:
+    """Perturbed copies of ``count`` random rows of ``vectors``."""
+    rng = np.random.default_rng(seed)
+    picked = np.asarray(vectors[rng.choice(len(vectors), min(count, len(vectors)), replace=False)])
+    jitter = rng.standard_normal(picked.shape, dtype=np.float32) * (noise / np.sqrt(vectors.shape[1]))
+    return normalize_rows(picked + jitter)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, batch: int = GROUND_TRUTH_BATCH) -> np.ndarray:
+    """Row numbers of the exact top ``k`` per query (batched matrix product)."""
+    truth = np.empty((len(queries), min(k, len(vectors))), dtype=np.int64)
+    for start in range(0, len(queries), batch):
+        scores = queries[start:start + batch] @ vectors.T
+        for i, row in enumerate(scores):
+            truth[start + i] = top_k_indices(row, k)
+    return truth
+
+
+def recall(found: Sequence[np.ndarray], truth: np.ndarray) -> float:
+    """Mean fraction of each query's exact top ``k`` that was found."""
+    hits = [len(np.intersect1d(f, t, assume_unique=True)) / len(t) for f, t in zip(found, truth)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+@dataclass
+class SweepPoint:
+    """One (nlist, nprobe, refine) setting; ``nlist`` 0 marks the exact baseline."""
+
+    nlist: int
+    nprobe: int
+    recall: float
+    elapsed_seconds: float
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    candidates: float = 0.0
+    refine: int = 0
+
+    @property
+    def qps(self) -> float:
+        return self.latency.count / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "refine": self.refine,
+            "recall": self.recall,
+            "qps": self.qps,
+            "candidates_per_query": self.candidates,
+            "latency_ms": {
+                "mean": ns_to_ms(self.latency.mean),
+                "p50": ns_to_ms(self.latency.percentile(50)),
+                "p99": ns_to_ms(self.latency.percentile(99)),
+            },
+        }
+
+
+def time_searches(search, queries: np.ndarray) -> tuple:
+    """Run ``search(q)`` for every query; returns ``(results, histogram, seconds)``."""
+    latency = LatencyHistogram()
+    results = []
+    wall = time.perf_counter_ns()
+    for q in queries:
+        start = time.perf_counter_ns()
+        results.append(search(q))
+        latency.record(time.perf_counter_ns() - start)
+    return results, latency, (time.perf_counter_ns() - wall) / 1e9
+
+
+def exact_baseline(vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int) -> SweepPoint:
+    found, latency, seconds = time_searches(lambda q: top_k_indices(vectors @ q, k), queries)
+    return SweepPoint(0, 0, recall(found, truth), seconds, latency, float(len(vectors)))
+
+
+def _build(kind: str, vectors: np.ndarray, nlist: int, m: Optional[int], iterations: int, seed: int, path: str,
+           refine: bool) -> Tuple[Any, Optional[np.ndarray], Dict[str, float]]:
+    """Build, save and mmap-reload one index; returns ``(index, order, seconds)``.
+
+    IVF search returns list-ordered rows, mapped back through ``order``;
+    IVF-PQ returns input ids itself (``order`` is None).
+    """
+    seconds = {}
+    start = time.perf_counter()
+    if kind == "ivf":
+        built, order = IVFIndex.build(vectors, nlist, iterations=iterations, seed=seed)
+    else:
+        built, order = IVFPQIndex.build(vectors, nlist, m, iterations=iterations, seed=seed), None
+    seconds["build_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    built.save(path)
+    if refine:
+        np.save(f"{path}/full.npy", vectors)
+    seconds["save_seconds"] = time.perf_counter() - start
+    del built
+    start = time.perf_counter()
+    if kind == "ivf":
+        index = IVFIndex.load(path, mmap=True)
+    else:
+        index = IVFPQIndex.load(path, mmap=True, vectors=np.load(f"{path}/full.npy", mmap_mode="r") if refine else None)
+    seconds["load_seconds"] = time.perf_counter() - start
+    return index, order, seconds
+
+
+def sweep(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    nlists: Sequence[int],
+    nprobes: Sequence[int] = DEFAULT_NPROBES,
+    k: int = 10,
+    iterations: int = 10,
+    seed: int = 0,
+    directory: Optional[str] = None,
+    kind: str = "ivf",
+    ms: Sequence[int] = (16,),
+    refines: Sequence[int] = (0,),
+) -> List[Dict[str, Any]]:
+    """Build one index per ``nlist`` (and PQ ``m``) and search it at every ``nprobe``.
+
+    Each build is saved under ``directory`` and searched through a
+    memory-mapped reload, which is how the local store serves it.
+    ``refines`` only applies to ``ivfpq``: each value > 0 rescores
+    ``refine * k`` candidates against the full vectors.
+    """
+    if kind not in INDEXES:
+        raise ValueError(f"Unknown index: {kind!r} (expected one of {INDEXES})")
+    dimension = vectors.shape[1]
+    builds = []
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        for nlist in nlists:
+            for m in (ms if kind == "ivfpq" else [None]):
+                path = f"{scratch}/{kind}-{nlist}-{m}"
+                depths = refines if kind == "ivfpq" else [0]
+                index, order, seconds = _build(kind, vectors, nlist, m, iterations, seed, path, any(depths))
+                sizes = np.diff(index.offsets)
+                points = []
+                for nprobe in nprobes:
+                    if nprobe > index.nlist:
+                        continue
+                    for refine in depths:
+                        if kind == "ivf":
+                            search = lambda q: order[index.search(q, k, nprobe)[0]]  # noqa: E731
+                        else:
+                            search = lambda q: index.search(q, k, nprobe, refine)[0]  # noqa: E731
+                        found, latency, elapsed = time_searches(search, queries)
+                        candidates = float(np.mean([sizes[index.probe(q, nprobe)].sum() for q in queries]))
+                        points.append(SweepPoint(index.nlist, nprobe, recall(found, truth), elapsed, latency, candidates, refine))
+                builds.append({
+                    "index": kind,
+                    "nlist": index.nlist,
+                    "m": m,
+                    "bytes_per_vector": index.bytes_per_vector if kind == "ivfpq" else 4 * dimension,
+                    **seconds,
+                    "list_size": {"min": int(sizes.min()), "max": int(sizes.max()), "mean": float(sizes.mean())},
+                    "points": [point.to_dict() for point in points],
+                })
+                del index
+    return builds
+
+
+def format_sweep(baseline: SweepPoint, builds: Sequence[Dict[str, Any]], k: int, dimension: int) -> str:
+    base = baseline.to_dict()
+    lines = [
+        f"{'nlist':>7} {'nprobe':>7} {'refine':>7} {f'recall@{k}':>10} {'q/s':>10} {'speed-up':>9} {'p50 ms':>9} {'scanned':>10}",
+        f"{'exact':>7} {'-':>7} {'-':>7} {base['recall']:>10.4f} {base['qps']:>10.1f} {1.0:>8.1f}x "
+        f"{base['latency_ms']['p50']:>9.3f} {base['candidates_per_query']:>10.0f}   ({4 * dimension} B/vector)",
+    ]
+    for build in builds:
+        name = f"{build['index']} nlist {build['nlist']}" + (f" m {build['m']}" if build["m"] else "")
+        lines.append(
+            f"   ── {name}: {build['bytes_per_vector']} B/vector, built in {build['build_seconds']:.2f} s, "
+            f"saved in {build['save_seconds']:.2f} s, mmap-loaded in {build['load_seconds'] * 1000:.1f} ms; "
+            f"lists {build['list_size']['min']}–{build['list_size']['max']}"
+        )
+        for point in build["points"]:
+            speedup = point["qps"] / base["qps"] if base["qps"] else 0.0
+            lines.append(
+                f"{point['nlist']:>7} {point['nprobe']:>7} {point['refine'] or '-':>7} {point['recall']:>10.4f} "
+                f"{point['qps']:>10.1f} {speedup:>8.1f}x {point['latency_ms']['p50']:>9.3f} {point['candidates_per_query']:>10.0f}"
+            )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Sweep IVF / IVF-PQ parameters: recall@k against exact search, QPS and bytes/vector")
+    parser.add_argument("--index", action="append", choices=INDEXES, help="Index to sweep (repeatable, default ivf)")
+    parser.add_argument("--data", choices=DATA_SOURCES, default="synthetic", help="Random clusters, or a scaled-up catalog")
+    parser.add_argument("--vectors", metavar="NPY", help="Benchmark these embeddings (rows are normalized) instead of generated ones")
+    parser.add_argument("--n", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic dimension")
+    parser.add_argument("--clusters", type=int, default=0, help="Synthetic cluster count (0 = sqrt(n))")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=_int_list, help="Comma-separated list counts (default 4*sqrt(n))")
+    parser.add_argument("--nprobe", type=_int_list, default=list(DEFAULT_NPROBES), help="Comma-separated lists-per-query values")
+    parser.add_argument("--m", type=_int_list, default=[16], help="ivfpq: comma-separated sub-quantizer counts (bytes per code)")
+    parser.add_argument("--refine", type=_int_list, default=[0], help="ivfpq: comma-separated exact-rescoring depths (0 = PQ scores only)")
+    parser.add_argument("--iterations", type=int, default=10, help="k-means iterations")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dir", metavar="DIR", help="Where indexes are saved while sweeping (default: system temp)")
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.vectors:
+        vectors = normalize_rows(np.load(args.vectors).astype(np.float32, copy=False))
+        print(f"📂 {len(vectors):,} × {vectors.shape[1]} vectors from {args.vectors}")
+    else:
+        start = time.perf_counter()
+        if args.data == "catalog":
+            vectors = catalog_vectors(args.n, args.dim, seed=args.seed)
+        else:
+            vectors = synthetic_vectors(args.n, args.dim, args.clusters, seed=args.seed)
+        print(f"🎲 {args.n:,} × {args.dim} {args.data} vectors in {time.perf_counter() - start:.1f} s")
+    queries = sample_queries(vectors, args.queries, seed=args.seed + 1)
+    start = time.perf_counter()
+    truth = exact_top_k(vectors, queries, args.k)
+    print(f"🎯 Exact top-{args.k} for {len(queries)} queries in {time.perf_counter() - start:.1f} s")
+
+    baseline = exact_baseline(vectors, queries, truth, args.k)
+    nlists = args.nlist or [default_nlist(len(vectors))]
+    builds = []
+    for kind in args.index or ["ivf"]:
+        print(f"🏗️  Building {kind} indexes: nlist {', '.join(map(str, nlists))}" + (f", m {', '.join(map(str, args.m))}" if kind == "ivfpq" else ""))
+        builds += sweep(vectors, queries, truth, nlists, args.nprobe, args.k, args.iterations, args.seed, args.dir,
+                        kind, args.m, args.refine)
+    print()
+    print(format_sweep(baseline, builds, args.k, vectors.shape[1]))
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment(),
+            "data": {"source": args.vectors or args.data, "count": len(vectors), "dimension": int(vectors.shape[1]),
+                     "queries": len(queries), "k": args.k, "seed": args.seed},
+            "exact": baseline.to_dict(),
+            "builds": builds,
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
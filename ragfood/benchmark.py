@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+=================
+
+Measures real end-to-end latency of a ``RAGEngine`` configuration: warm-up
+queries first, then repeated trials over the query set, each stage timed
+with ``time.perf_counter_ns``. Every stage gets an HDR-style histogram and
+p50/p90/p99 with confidence intervals; results are written as sorted,
+indented JSON so runs can be diffed between releases.
+
+    python -m ragfood.benchmark --config memory+stub --trials 5
+    python -m ragfood.benchmark --standins --config upstash+groq --output bench.json
+    python -m ragfood.benchmark --config chroma+ollama --config upstash+groq --stream
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ragfood import __version__
+from ragfood.config import PROJECT_ROOT, Settings, get_settings
+from ragfood.engine import RAGEngine, build_context, build_messages
+from ragfood.histogram import LatencyHistogram
+from ragfood.llm import PROVIDERS, Generation, Usage, create_llm_provider
+from ragfood.profiling import PROFILE_FORMATS, PROFILE_MODES, ProfileRecorder, sibling_path
+from ragfood.stats import bootstrap_interval, summarize
+from ragfood.stores import BACKENDS, VectorStore, create_vector_store
+
+SCHEMA = "ragfood-benchmark/1"
+
+# Pipeline stages timed for every query; ``first_token`` only when streaming
+STAGES = ("retrieval", "context", "generation", "first_token", "total")
+
+DEFAULT_QUERIES = [
+    "healthy Mediterranean breakfast options",
+    "spicy Asian vegetarian dishes with tofu",
+    "traditional Italian comfort foods",
+    "gluten-free high-protein meals",
+    "fermented foods with probiotics",
+    "Middle Eastern street food",
+    "antioxidant-rich superfood smoothies",
+    "Japanese cooking techniques for vegetables",
+]
+
+
+def ns_to_ms(value: float) -> float:
+    return round(value / 1e6, 4)
+
+
+@dataclass
+class QueryTiming:
+    """Stage durations (nanoseconds) and the generation for one query."""
+
+    question: str
+    stages: Dict[str, int] = field(default_factory=dict)
+    generation: Optional[Generation] = None
+    hits: int = 0
+
+
+def time_query(engine: RAGEngine, question: str, top_k: Optional[int] = None, stream: bool = False) -> QueryTiming:
+    """Run one RAG query, timing each stage with ``perf_counter_ns``."""
+    timing = QueryTiming(question)
+    clock = time.perf_counter_ns
+    start = clock()
+    sources = engine.retrieve(question, top_k=top_k)
+    retrieved = clock()
+    messages = build_messages(question, build_context(sources))
+    assembled = clock()
+    if stream:
+        generation_stream = engine.llm.stream(messages)
+        first_token = None
+        for _ in generation_stream:
+            if first_token is None:
+                first_token = clock()
+        generation = generation_stream.generation
+    else:
+        generation = engine.llm.generate(messages)
+    done = clock()
+
+    timing.stages = {
+        "retrieval": retrieved - start,
+        "context": assembled - retrieved,
+        "generation": done - assembled,
+        "total": done - start,
+    }
+    if stream and first_token is not None:
+        timing.stages["first_token"] = first_token - assembled
+    timing.generation = generation
+    timing.hits = len(sources)
+    return timing
+
+
+class BenchmarkRun:
+    """Accumulated timings for one backend configuration."""
+
+    def __init__(self, name: str, config: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.config = config or {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.samples: Dict[str, List[int]] = {}
+        self.by_query: Dict[str, Dict[str, List[int]]] = {}
+        self.query_usage: Dict[str, Usage] = {}
+        self.trial_seconds: List[float] = []
+        self.trial_queries: List[int] = []
+        self.errors: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, timing: QueryTiming) -> None:
+        for stage, value in timing.stages.items():
+            self.histograms.setdefault(stage, LatencyHistogram()).record(value)
+            self.samples.setdefault(stage, []).append(value)
+            self.by_query.setdefault(timing.question, {}).setdefault(stage, []).append(value)
+        if timing.generation is not None:
+            self.query_usage[timing.question] = timing.generation.usage
+            self.prompt_tokens += timing.generation.usage.prompt_tokens
+            self.completion_tokens += timing.generation.usage.completion_tokens
+
+    def record_error(self, error: Exception) -> None:
+        key = type(error).__name__
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    @property
+    def completed(self) -> int:
+        return len(self.samples.get("total", []))
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def query_medians(self, question: str) -> Dict[str, float]:
+        """Median seconds per stage for one question across trials."""
+        stages = self.by_query.get(question, {})
+        return {stage: statistics.median(values) / 1e9 for stage, values in stages.items()}
+
+    def throughput(self) -> List[float]:
+        """Completed queries per second in each trial."""
+        return [q / s for q, s in zip(self.trial_queries, self.trial_seconds) if s > 0]
+
+    def stage_summary(self, stage: str, confidence: float = 0.95) -> Dict[str, Any]:
+        summary = summarize([v / 1e6 for v in self.samples.get(stage, [])], confidence=confidence)
+        return {
+            key: ({k: round(v, 4) for k, v in value.items()} if isinstance(value, dict) else
+                  round(value, 4) if isinstance(value, float) else value)
+            for key, value in summary.items()
+        }
+
+    def summary(self, confidence: float = 0.95) -> Dict[str, Any]:
+        """Per-stage latency summaries in milliseconds plus throughput."""
+        throughput = self.throughput()
+        low, high = bootstrap_interval(throughput, confidence=confidence)
+        attempted = self.completed + self.error_count
+        return {
+            "queries": self.completed,
+            "errors": self.error_count,
+            "error_rate": round(self.error_count / attempted, 4) if attempted else 0.0,
+            "throughput_qps": {
+                "value": round(statistics.fmean(throughput), 4) if throughput else 0.0,
+                "ci_low": round(low, 4),
+                "ci_high": round(high, 4),
+            },
+            "stages_ms": {stage: self.stage_summary(stage, confidence) for stage in STAGES if stage in self.samples},
+        }
+
+    def to_dict(self, confidence: float = 0.95, include_samples: bool = True) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "config": self.config,
+            "summary": self.summary(confidence),
+            "trials": [
+                {"queries": q, "seconds": round(s, 6)} for q, s in zip(self.trial_queries, self.trial_seconds)
+            ],
+            "errors": dict(self.errors),
+            "usage": {"prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens},
+            "by_query_median_ms": {
+                question: {stage: ns_to_ms(statistics.median(values)) for stage, values in stages.items()}
+                for question, stages in self.by_query.items()
+            },
+            "histograms": {stage: h.to_dict() for stage, h in self.histograms.items()},
+        }
+        if include_samples:
+            data["samples_ns"] = self.samples
+        return data
+
+
+def run_benchmark(
+    engine: RAGEngine,
+    queries: Sequence[str],
+    name: str = "benchmark",
+    warmup: int = 3,
+    trials: int = 5,
+    top_k: Optional[int] = None,
+    stream: bool = False,
+    config: Optional[Dict[str, Any]] = None,
+    progress: bool = False,
+    profiler: Optional[ProfileRecorder] = None,
+) -> BenchmarkRun:
+    """Warm up, then run every query ``trials`` times and collect timings.
+
+    Warm-up queries are discarded. Failed queries are counted per exception
+    type and excluded from the latency statistics. With ``profiler`` every
+    measured query is also CPU-profiled (timings then include its overhead).
+    """
+    run = BenchmarkRun(name, {
+        "warmup": warmup, "trials": trials, "top_k": top_k, "stream": stream,
+        "profile": profiler.mode if profiler else None, **(config or {}),
+    })
+    for i in range(warmup):
+        try:
+            time_query(engine, queries[i % len(queries)], top_k=top_k, stream=stream)
+        except Exception:
+            pass
+    for trial in range(trials):
+        completed = 0
+        trial_start = time.perf_counter_ns()
+        for question in queries:
+            try:
+                with profiler.profile(name) if profiler else nullcontext():
+                    timing = time_query(engine, question, top_k=top_k, stream=stream)
+                run.record(timing)
+                completed += 1
+            except Exception as e:
+                run.record_error(e)
+        run.trial_seconds.append((time.perf_counter_ns() - trial_start) / 1e9)
+        run.trial_queries.append(completed)
+        if progress:
+            print(f"   {name}: trial {trial + 1}/{trials} - {completed}/{len(queries)} ok in {run.trial_seconds[-1]:.3f}s")
+    return run
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """Where and on what the benchmark ran."""
+    return {
+        "ragfood_version": __version__,
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def build_report(runs: Sequence[BenchmarkRun], confidence: float = 0.95, include_samples: bool = True) -> Dict[str, Any]:
+    return {
+        "schema": SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "confidence": confidence,
+        "environment": environment(),
+        "runs": [run.to_dict(confidence, include_samples) for run in runs],
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    """Write ``report`` as stable, diff-friendly JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_summary(run: BenchmarkRun, confidence: float = 0.95) -> str:
+    """Human-readable table of one run's stage percentiles."""
+    summary = run.summary(confidence)
+    tput = summary["throughput_qps"]
+    lines = [
+        f"📊 {run.name}: {summary['queries']} queries, {summary['errors']} errors, "
+        f"{tput['value']:.2f} q/s [{tput['ci_low']:.2f}, {tput['ci_high']:.2f}]",
+        f"   {'stage':<12} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9}   p99 {confidence:.0%} CI (ms)",
+    ]
+    for stage, stats in summary["stages_ms"].items():
+        lines.append(
+            f"   {stage:<12} {stats['mean']:>9.3f} {stats['p50']['value']:>9.3f} {stats['p90']['value']:>9.3f} "
+            f"{stats['p99']['value']:>9.3f}   [{stats['p99']['ci_low']:.3f}, {stats['p99']['ci_high']:.3f}]"
+        )
+    return "\n".join(lines)
+
+
+# -- configurations --------------------------------------------------------
+
+def parse_config(spec: str) -> Tuple[str, str]:
+    """Split ``store+llm`` (e.g. ``upstash+groq``) and validate both names."""
+    store, _, llm = spec.partition("+")
+    llm = llm or "stub"
+    if store not in BACKENDS:
+        raise ValueError(f"Unknown vector store backend: {store!r} (expected one of {BACKENDS})")
+    if llm not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {llm!r} (expected one of {PROVIDERS})")
+    return store, llm
+
+
+def build_store(store_backend: str, settings: Optional[Settings] = None, food_data: Optional[List[Dict[str, Any]]] = None) -> VectorStore:
+    """Vector store for ``store_backend``; in-process stores are loaded from the catalog.
+
+    With ``PROJECTION`` set, in-process stores embed through the projection
+    (PCA is fitted on the catalog).
+    """
+    settings = settings or get_settings()
+    if store_backend not in ("memory", "ivf", "quantized"):
+        return create_vector_store(store_backend, settings)
+
+    from ragfood.catalog import enrich_text, food_records, load_food_data
+    from ragfood.embeddings import HashingEmbedder
+    from ragfood.projection import create_projected_embedder
+
+    food_data = food_data if food_data is not None else load_food_data()
+    embedder = create_projected_embedder(HashingEmbedder(), [enrich_text(item) for item in food_data], settings)
+    store = create_vector_store(store_backend, settings, embedder=embedder)
+    store.upsert(food_records(food_data))
+    return store
+
+
+def build_engine(
+    store_backend: str,
+    llm_backend: str,
+    settings: Optional[Settings] = None,
+    food_data: Optional[List[Dict[str, Any]]] = None,
+    **engine_kwargs: Any,
+) -> RAGEngine:
+    """Engine for one configuration; the in-memory store is loaded from the catalog."""
+    settings = settings or get_settings()
+    store = build_store(store_backend, settings, food_data)
+    return RAGEngine(store, create_llm_provider(llm_backend, settings), settings, **engine_kwargs)
+
+
+class StandIns:
+    """Context manager starting Upstash/Groq stand-ins loaded with the catalog.
+
+    Yields settings pointing the ``upstash`` and ``groq`` backends at them.
+    """
+
+    def __init__(self, settings: Settings, food_data: List[Dict[str, Any]], vector_latency: str = "0", llm_ttft: str = "0", token_latency: str = "0", seed: int = 42):
+        from ragfood.catalog import food_records
+        from ragfood.standins import GroqStandIn, LatencyModel, UpstashStandIn
+
+        self.upstash = UpstashStandIn(token="standin-token", latency=LatencyModel.parse(vector_latency, seed=seed))
+        self.upstash.store.upsert(food_records(food_data))
+        self.groq = GroqStandIn(
+            token="standin-token",
+            latency=LatencyModel.parse(llm_ttft, seed=seed + 1),
+            token_latency=LatencyModel.parse(token_latency, seed=seed + 2),
+        )
+        self.settings = settings
+
+    def __enter__(self) -> Settings:
+        self.upstash.start()
+        self.groq.start()
+        return self.settings.replace(
+            upstash_url=self.upstash.url,
+            upstash_token="standin-token",
+            groq_api_key="standin-token",
+            groq_base_url=self.groq.url,
+        )
+
+    def __exit__(self, *exc: Any) -> None:
+        self.upstash.stop()
+        self.groq.stop()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Statistical latency benchmark for RAG backend configurations")
+    parser.add_argument("--config", action="append", metavar="STORE+LLM",
+                        help=f"Configuration to benchmark (repeatable). Stores: {', '.join(BACKENDS)}; LLMs: {', '.join(PROVIDERS)}. Default memory+stub")
+    parser.add_argument("--queries", metavar="FILE", help="Text file with one query per line (default: built-in set)")
+    parser.add_argument("--warmup", type=int, default=3, help="Discarded warm-up queries per configuration")
+    parser.add_argument("--trials", type=int, default=5, help="Passes over the query set per configuration")
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--stream", action="store_true", help="Stream generations and record time to first token")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    parser.add_argument("--no-samples", action="store_true", help="Omit raw samples from the JSON report")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="CPU-profile the measured queries; the aggregate is written next to --output")
+    parser.add_argument("--profile-format", choices=PROFILE_FORMATS, default="collapsed")
+    parser.add_argument("--baseline", metavar="JSON", help="Fail (exit 1) if this run regresses against a baseline report")
+    parser.add_argument("--standins", action="store_true", help="Run upstash/groq configurations against local stand-ins")
+    parser.add_argument("--vector-latency", default="0", help="Stand-in Upstash latency spec")
+    parser.add_argument("--llm-ttft", default="0", help="Stand-in Groq time-to-first-token spec")
+    parser.add_argument("--llm-token-latency", default="0", help="Stand-in Groq per-token latency spec")
+    return parser
+
+
+def read_queries(path: Optional[str]) -> List[str]:
+    if not path:
+        return list(DEFAULT_QUERIES)
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def run_configurations(args: argparse.Namespace, settings: Settings, food_data: List[Dict[str, Any]]) -> List[BenchmarkRun]:
+    queries = read_queries(args.queries)
+    runs = []
+    for spec in args.config or ["memory+stub"]:
+        store_backend, llm_backend = parse_config(spec)
+        print(f"\n⚡ Benchmarking {store_backend}+{llm_backend} ({args.warmup} warm-up, {args.trials} trials x {len(queries)} queries)")
+        engine = build_engine(store_backend, llm_backend, settings, food_data)
+        name = f"{store_backend}+{llm_backend}"
+        profiler = ProfileRecorder(args.profile, format=args.profile_format, per_request=False) if args.profile else None
+        try:
+            run = run_benchmark(
+                engine, queries, name=name, warmup=args.warmup, trials=args.trials,
+                top_k=args.top_k, stream=args.stream, progress=True, profiler=profiler,
+                config={"store": store_backend, "llm": llm_backend, "model": engine.llm.model, "standins": args.standins},
+            )
+        finally:
+            engine.store.close()
+        print(format_summary(run, args.confidence))
+        if profiler is not None:
+            path = profiler.write_aggregate(sibling_path(args.output or "benchmark.json", f"{name}.profile", profiler.extension))
+            print(f"🔥 Profile ({profiler.aggregate.requests} queries): {path}")
+            if not profiler.aggregate.total:
+                print("   (no samples: queries are shorter than the sampling interval, try --profile trace)")
+        runs.append(run)
+    return runs
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    from ragfood.catalog import load_food_data
+
+    food_data = load_food_data()
+    if args.standins:
+        with StandIns(settings, food_data, args.vector_latency, args.llm_ttft, args.llm_token_latency) as standin_settings:
+            runs = run_configurations(args, standin_settings, food_data)
+    else:
+        runs = run_configurations(args, settings, food_data)
+
+    report = build_report(runs, args.confidence, include_samples=not args.no_samples)
+    if args.output:
+        write_report(report, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    if args.baseline:
+        from ragfood.regression import compare_reports, format_table, regressed
+
+        checks = compare_reports(load_report(args.baseline), build_report(runs, args.confidence))
+        print(f"\n📐 Against baseline {args.baseline}:\n{format_table(checks)}")
+        if regressed(checks):
+            print("\n❌ Performance regression")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Record / Replay Cassettes
+=========================
+
+Wrappers that record every vector-store and LLM request/response pair into
+a JSONL cassette keyed by a hash of the request, and play them back later
+without network access or API keys:
+
+- ``record``: always call the live backend and append the interaction
+- ``replay``: answer only from the cassette; a miss raises ``CassetteMiss``
+- ``auto``:   replay hits, record misses (e.g. after a prompt change only
+  the changed LLM calls go live)
+
+The key covers the backend, model, prompt and parameters, so any change to
+what would be sent produces a new entry rather than a stale answer.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ragfood.config import Settings
+from ragfood.llm import LLMProvider, Messages, Usage
+from ragfood.stores.base import DEFAULT_NAMESPACE, QueryResult, StoreInfo, VectorRecord, VectorStore
+
+MODES = ("record", "replay", "auto")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """Stable SHA-256 of a request (canonical JSON, sorted keys)."""
+    canonical = json.dumps({"kind": kind, "request": request}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """JSONL file of recorded interactions, loaded into memory by key."""
+
+    def __init__(self, path: str, mode: str = "auto"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r} (expected one of {MODES})")
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.recorded = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def call(self, kind: str, request: Dict[str, Any], live: Optional[Callable[[], Any]]) -> Any:
+        """Return the recorded response for ``request`` or record ``live()``."""
+        key = request_key(kind, request)
+        if self.mode != "record":
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                return entry["response"]
+            if self.mode == "replay" or live is None:
+                raise CassetteMiss(f"No recorded {kind} response for request {key[:12]} in {self.path}")
+        start = time.perf_counter()
+        response = live()
+        entry = {
+            "key": key,
+            "kind": kind,
+            "request": request,
+            "response": response,
+            "elapsed": time.perf_counter() - start,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._entries[key] = entry
+            self.recorded += 1
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return response
+
+
+def _result_to_dict(result: QueryResult) -> Dict[str, Any]:
+    data = dataclasses.asdict(result)
+    if result.vector is not None:
+        data["vector"] = [float(v) for v in result.vector]
+    return data
+
+
+def _record_to_dict(record: Optional[VectorRecord]) -> Optional[Dict[str, Any]]:
+    if record is None:
+        return None
+    data = dataclasses.asdict(record)
+    if record.vector is not None:
+        data["vector"] = [float(v) for v in record.vector]
+    return data
+
+
+class CassetteVectorStore(VectorStore):
+    """Records or replays ``query``, ``fetch`` and ``info`` of another store.
+
+    ``inner`` may be None in replay mode, so no credentials are needed.
+    Writes always go to the live store and are never replayed.
+    """
+
+    def __init__(self, inner: Optional[VectorStore], cassette: Cassette, backend: Optional[str] = None):
+        self.inner = inner
+        self.cassette = cassette
+        self.backend = backend or (inner.backend if inner is not None else "unknown")
+
+    def _live(self, method: str) -> Optional[Callable[..., Any]]:
+        return getattr(self.inner, method) if self.inner is not None else None
+
+    def _require_inner(self, operation: str) -> VectorStore:
+        if self.inner is None:
+            raise RuntimeError(f"Cannot {operation} on a replay-only {self.backend} store")
+        return self.inner
+
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        return self._require_inner("upsert").upsert(records, namespace=namespace)
+
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        return self._require_inner("delete").delete(ids, namespace=namespace)
+
+    def fetch(
+        self,
+        ids: Sequence[str],
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[Optional[VectorRecord]]:
+        request = {
+            "backend": self.backend, "ids": list(ids), "include_vectors": include_vectors,
+            "include_metadata": include_metadata, "namespace": namespace,
+        }
+        fetch = self._live("fetch")
+        live = (lambda: [_record_to_dict(r) for r in fetch(ids, include_vectors, include_metadata, namespace)]) if fetch else None
+        return [VectorRecord(**r) if r is not None else None for r in self.cassette.call("store.fetch", request, live)]
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        request = {
+            "backend": self.backend, "text": text, "vector": [float(v) for v in vector] if vector is not None else None,
+            "top_k": top_k, "include_metadata": include_metadata, "include_vectors": include_vectors,
+            "filter": filter, "namespace": namespace,
+        }
+        query = self._live("query")
+        live = None
+        if query is not None:
+            live = lambda: [_result_to_dict(r) for r in query(text, vector, top_k, include_metadata, include_vectors, filter, namespace)]
+        return [QueryResult(**r) for r in self.cassette.call("store.query", request, live)]
+
+    def info(self) -> StoreInfo:
+        info = self._live("info")
+        live = (lambda: dataclasses.asdict(info())) if info else None
+        return StoreInfo(**self.cassette.call("store.info", {"backend": self.backend}, live))
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+
+class CassetteProvider(LLMProvider):
+    """Records or replays completions of another provider.
+
+    Streaming replays the recorded completion as a single delta.
+    """
+
+    def __init__(self, inner: Optional[LLMProvider], cassette: Cassette, settings: Optional[Settings] = None,
+                 name: Optional[str] = None, model: Optional[str] = None):
+        super().__init__(settings or (inner.settings if inner is not None else None), model or (inner.model if inner else None))
+        self.inner = inner
+        self.cassette = cassette
+        self.name = name or (inner.name if inner is not None else "unknown")
+
+    def _complete(self, messages: Messages, params: Dict[str, Any]) -> Tuple[str, Optional[Usage], Optional[str]]:
+        request = {"provider": self.name, "messages": messages, "params": params}
+        live = None
+        if self.inner is not None:
+            def live() -> Dict[str, Any]:
+                text, usage, finish_reason = self.inner._complete(messages, params)
+                return {"text": text, "usage": dataclasses.asdict(usage) if usage else None, "finish_reason": finish_reason}
+        response = self.cassette.call("llm.complete", request, live)
+        usage = Usage(**response["usage"]) if response["usage"] else None
+        return response["text"], usage, response["finish_reason"]
+
+    def _stream(self, messages: Messages, params: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Usage], Optional[str]]]:
+        yield self._complete(messages, params)
@@ -0,0 +1,279 @@
+"""
+Food Catalog Helpers
+====================
+
+Loading and enrichment logic shared by every ingestion path, so the text
+that gets embedded is identical whichever vector store receives it.
+
+Loaded items are ``FoodItem`` records rather than dicts. Each is a
+``__slots__`` object, so it has no per-item hash table. ``region``,
+``type`` and ``category`` are interned, so each distinct value is stored
+once. ``dietary`` and ``allergens`` are tuples of integer codes into a
+process-wide ``TagVocabulary``, and equal tag lists share one tuple. A
+``FoodItem`` is also a read-only ``Mapping`` that reads like the JSON
+dict it came from, so ``item["region"]``, ``item.get(...)`` and
+``dict(item)`` still work. ``python -m ragfood.catalog_bench`` compares
+its size and speed with plain dicts.
+"""
+
+import json
+import sys
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ragfood.config import get_settings
+from ragfood.stores.base import VectorRecord
+
+
+class TagVocabulary:
+    """Process-wide integer codes for one tag field (``dietary``, ``allergens``).
+
+    Codes are assigned in first-seen order and are only meaningful inside
+    this process, so ``FoodItem`` pickles as its plain fields.
+    """
+
+    def __init__(self):
+        self.tags: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._lists: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+
+    def code(self, tag: str) -> int:
+        code = self._codes.get(tag)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(tag)
+                if code is None:
+                    code = self._codes[tag] = len(self.tags)
+                    self.tags.append(sys.intern(tag))
+        return code
+
+    def encode(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Codes for ``tags`` in order; equal lists return the same tuple."""
+        codes = tuple(self.code(tag) for tag in tags)
+        return self._lists.setdefault(codes, codes)
+
+    def decode(self, codes: Iterable[int]) -> List[str]:
+        return [self.tags[code] for code in codes]
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+DIETARY = TagVocabulary()
+ALLERGENS = TagVocabulary()
+
+FIELDS = (
+    "id", "text", "region", "type", "category", "origin", "ingredients",
+    "preparation", "nutrition", "cultural_significance", "dietary", "allergens",
+)
+_INTERNED = ("region", "type", "category")
+_TAGS = {"dietary": ("dietary_codes", DIETARY), "allergens": ("allergen_codes", ALLERGENS)}
+_PLAIN = frozenset(FIELDS) - set(_TAGS)
+_MISSING = object()
+
+
+class FoodItem(Mapping):
+    """One catalog item in a compact, read-only record.
+
+    Fields an item lacks are ``None`` and are left out of the mapping view.
+    Keys outside ``FIELDS``, and tag fields that are not lists, are kept as
+    given in a small ``extra`` dict.
+    """
+
+    __slots__ = (
+        "id", "text", "region", "type", "category", "origin", "ingredients",
+        "preparation", "nutrition", "cultural_significance", "dietary_codes", "allergen_codes", "_extra",
+    )
+
+    def __init__(
+        self,
+        id: Any,
+        text: Optional[str] = None,
+        region: Optional[str] = None,
+        type: Optional[str] = None,
+        category: Optional[str] = None,
+        origin: Optional[str] = None,
+        ingredients: Optional[Iterable[str]] = None,
+        preparation: Optional[str] = None,
+        nutrition: Optional[str] = None,
+        cultural_significance: Optional[str] = None,
+        dietary: Optional[Iterable[str]] = None,
+        allergens: Optional[Iterable[str]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.text = text
+        self.region = sys.intern(region) if isinstance(region, str) else region
+        self.type = sys.intern(type) if isinstance(type, str) else type
+        self.category = sys.intern(category) if isinstance(category, str) else category
+        self.origin = origin
+        self.ingredients = tuple(sys.intern(i) if isinstance(i, str) else i for i in ingredients) if ingredients is not None else None
+        self.preparation = preparation
+        self.nutrition = nutrition
+        self.cultural_significance = cultural_significance
+        self.dietary_codes = DIETARY.encode(dietary) if dietary is not None else None
+        self.allergen_codes = ALLERGENS.encode(allergens) if allergens is not None else None
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "FoodItem":
+        """The record for one JSON item."""
+        fields: Dict[str, Any] = {}
+        extra: Dict[str, Any] = {}
+        for key, value in item.items():
+            if key in _INTERNED and value is not None and not isinstance(value, str):
+                extra[key] = value
+            elif key in _TAGS or key == "ingredients":
+                (fields if isinstance(value, (list, tuple)) else extra)[key] = value
+            elif key in _PLAIN:
+                fields[key] = value
+            else:
+                extra[key] = value
+        return cls(**fields, extra=extra)
+
+    @property
+    def dietary(self) -> Tuple[str, ...]:
+        return tuple(DIETARY.decode(self.dietary_codes)) if self.dietary_codes is not None else ()
+
+    @property
+    def allergens(self) -> Tuple[str, ...]:
+        return tuple(ALLERGENS.decode(self.allergen_codes)) if self.allergen_codes is not None else ()
+
+    def has_dietary(self, tag: str) -> bool:
+        return self.dietary_codes is not None and DIETARY._codes.get(tag) in self.dietary_codes
+
+    def has_allergen(self, tag: str) -> bool:
+        return self.allergen_codes is not None and ALLERGENS._codes.get(tag) in self.allergen_codes
+
+    # -- mapping view ----------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Overrides Mapping.get, which would go through a raised KeyError for every absent field
+        if key in _PLAIN:
+            value = getattr(self, key)
+            if value is not None:
+                return list(value) if key == "ingredients" else value
+        elif key in _TAGS:
+            attribute, vocabulary = _TAGS[key]
+            codes = getattr(self, attribute)
+            if codes is not None:
+                return vocabulary.decode(codes)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        if key in _TAGS:
+            if getattr(self, _TAGS[key][0]) is not None:
+                return True
+        elif key in _PLAIN and getattr(self, key) is not None:
+            return True
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if key in self:
+                yield key
+        if self._extra is not None:
+            yield from (key for key in self._extra if key not in _PLAIN and key not in _TAGS)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        # Tag codes are per-process, so pickles carry the decoded fields
+        return FoodItem.from_dict, (dict(self),)
+
+    def __repr__(self) -> str:
+        return f"FoodItem({dict(self)!r})"
+
+
+def as_food_item(item: Dict[str, Any]) -> FoodItem:
+    """``item`` itself if it is already a ``FoodItem``, else its record."""
+    return item if isinstance(item, FoodItem) else FoodItem.from_dict(item)
+
+
+def food_items(items: Iterable[Dict[str, Any]]) -> List[FoodItem]:
+    return [as_food_item(item) for item in items]
+
+
+def load_food_data(path: Optional[Union[str, Path]] = None) -> Sequence[FoodItem]:
+    """Load the food catalog (defaults to the configured ``JSON_FILE``).
+
+    JSON items come back as ``FoodItem`` records. A compiled ``.corpus``
+    file (see ``ragfood.corpus``) is memory-mapped instead of parsed and is
+    already stored column-wise; its items read like the JSON dicts.
+
+    With ``VALIDATE_CATALOG`` set, a JSON catalog is checked first (see
+    ``ragfood.validate``) and ``CatalogValidationError`` is raised if it
+    is invalid.
+    """
+    settings = get_settings()
+    json_path = settings.json_path if path is None else settings.resolve_path(str(path))
+    if json_path.suffix == ".corpus":
+        from ragfood.corpus import Corpus
+
+        return Corpus.open(json_path)
+    if settings.validate_catalog:
+        from ragfood.validate import check_catalog
+
+        check_catalog(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        return food_items(json.load(f))
+
+
+def enrich_text(item: Dict[str, Any], extended: bool = False) -> str:
+    """Append region/type sentences to the description for better embeddings.
+
+    ``extended`` also appends origin and cultural significance, matching the
+    text used by ``migrate_to_upstash_foods.py`` for the foods namespace.
+    """
+    item = as_food_item(item)
+    enriched_text = item.text or ""
+    if item.region:
+        enriched_text += f" This food is popular in {item.region}."
+    if item.type:
+        enriched_text += f" It is a type of {item.type}."
+    if extended:
+        if item.origin:
+            enriched_text += f" Origin: {item.origin}."
+        if item.cultural_significance:
+            enriched_text += f" Cultural significance: {item.cultural_significance}"
+    return enriched_text
+
+
+def food_metadata(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata stored alongside each vector."""
+    item = as_food_item(item)
+    return {
+        "region": item.region if item.region is not None else "unknown",
+        "type": item.type if item.type is not None else "general",
+        "original_text": item.text if item.text is not None else "",
+        "cultural_significance": item.cultural_significance if item.cultural_significance is not None else "",
+        "dietary": DIETARY.decode(item.dietary_codes) if item.dietary_codes is not None else [],
+        "allergens": ALLERGENS.decode(item.allergen_codes) if item.allergen_codes is not None else [],
+    }
+
+
+def food_records(
+    food_data: Iterable[Dict[str, Any]],
+    id_prefix: str = "",
+    extended: bool = False,
+) -> Iterator[VectorRecord]:
+    """Yield one text ``VectorRecord`` per food item, lazily."""
+    for item in food_data:
+        item = as_food_item(item)
+        yield VectorRecord(
+            id=f"{id_prefix}{item.id}",
+            data=enrich_text(item, extended=extended),
+            metadata=food_metadata(item),
+        )
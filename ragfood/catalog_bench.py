@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Catalog Record Benchmark
+========================
+
+Compares the in-memory cost of catalog items held as plain JSON dicts,
+as ``FoodItem`` records (``ragfood.catalog``) and as a compiled corpus
+(``ragfood.corpus``). The catalog is parsed ``--copies`` times so every
+copy has its own strings, as a larger catalog would. Each model reports:
+
+- bytes per item: the heap it keeps, measured with ``tracemalloc`` (for
+  the corpus, the size of the mapped file)
+- nanoseconds per item to read ``region``, ``type`` and ``dietary``
+  through ``.get``, and (for ``FoodItem``) as attributes
+- nanoseconds per item for a dietary filter, and for building the
+  ``VectorRecord`` that ingestion embeds
+
+``food_records`` converts dicts and corpus items to ``FoodItem`` as it
+goes, so their ``records`` time includes that conversion.
+
+Usage::
+
+    python -m ragfood.catalog_bench
+    python -m ragfood.catalog_bench --copies 1000 --output catalog.json
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ragfood.benchmark import environment, write_report
+from ragfood.catalog import FoodItem, food_records
+from ragfood.config import get_settings
+from ragfood.corpus import Corpus, compile_items
+
+SCHEMA = "ragfood-catalog-bench/1"
+MODELS = ("dict", "fooditem", "corpus")
+
+
+def parse_copies(text: str, copies: int) -> List[Dict[str, Any]]:
+    """Parse the catalog ``copies`` times; copies after the first get ``<id>-<n>`` ids."""
+    items = []
+    for copy in range(copies):
+        for item in json.loads(text):
+            if copy:
+                item["id"] = f"{item['id']}-{copy}"
+            items.append(item)
+    return items
+
+
+def retained_bytes(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """What ``build()`` returns, and the traced heap it keeps alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def ns_per_item(loop: Callable[[], Any], count: int, repeat: int) -> float:
+    """Best-of-``repeat`` time of ``loop()`` divided by ``count``."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        loop()
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best / count, 1)
+
+
+def _get_fields(items) -> None:
+    for item in items:
+        item.get("region")
+        item.get("type")
+        item.get("dietary")
+
+
+def _attr_fields(items) -> None:
+    for item in items:
+        item.region
+        item.type
+        item.dietary_codes
+
+
+def _filter_dict(items) -> int:
+    return sum(1 for item in items if "vegan" in item.get("dietary", ()))
+
+
+def _filter_fooditem(items) -> int:
+    return sum(1 for item in items if item.has_dietary("vegan"))
+
+
+def _records(items) -> None:
+    for _ in food_records(items):
+        pass
+
+
+def measure_model(model: str, text: str, copies: int, repeat: int) -> Dict[str, Any]:
+    """Size and access timings for one record model."""
+    start = time.perf_counter()
+    if model == "dict":
+        items, size = retained_bytes(lambda: parse_copies(text, copies))
+    elif model == "fooditem":
+        items, size = retained_bytes(lambda: [FoodItem.from_dict(item) for item in parse_copies(text, copies)])
+    elif model == "corpus":
+        data = compile_items(parse_copies(text, copies))
+        items, size = Corpus(data), len(data)
+    else:
+        raise ValueError(f"Unknown model: {model!r} (expected one of {MODELS})")
+    build = time.perf_counter() - start
+
+    count = len(items)
+    return {
+        "model": model,
+        "items": count,
+        "bytes_per_item": round(size / count, 1),
+        "build_ms": round(build * 1000, 2),
+        "get_ns": ns_per_item(lambda: _get_fields(items), count, repeat),
+        "attr_ns": ns_per_item(lambda: _attr_fields(items), count, repeat) if model == "fooditem" else None,
+        "filter_ns": ns_per_item(lambda: (_filter_fooditem if model == "fooditem" else _filter_dict)(items), count, repeat),
+        "records_ns": ns_per_item(lambda: _records(items), count, max(1, repeat // 2)),
+    }
+
+
+def run_catalog_benchmark(text: str, copies: int, models: Sequence[str] = MODELS, repeat: int = 5) -> List[Dict[str, Any]]:
+    return [measure_model(model, text, copies, repeat) for model in models]
+
+
+def format_rows(rows: Sequence[Dict[str, Any]]) -> str:
+    base = next((row for row in rows if row["model"] == "dict"), rows[0])
+    lines = [f"{'model':>9} {'items':>8} {'B/item':>9} {'vs dict':>8} {'get ns':>8} {'attr ns':>8} {'filter ns':>10} {'records ns':>11}"]
+    for row in rows:
+        attr = f"{row['attr_ns']:>8.1f}" if row["attr_ns"] is not None else f"{'-':>8}"
+        lines.append(
+            f"{row['model']:>9} {row['items']:>8,} {row['bytes_per_item']:>9.1f} "
+            f"{row['bytes_per_item'] / base['bytes_per_item']:>7.2f}x {row['get_ns']:>8.1f} {attr} "
+            f"{row['filter_ns']:>10.1f} {row['records_ns']:>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bytes per item and access speed of dict, FoodItem and corpus catalog records")
+    parser.add_argument("--source", metavar="JSON", help="Catalog to measure (default JSON_FILE)")
+    parser.add_argument("--copies", type=int, default=200, help="Times the catalog is parsed into the measured set")
+    parser.add_argument("--model", action="append", choices=MODELS, help="Record model to test (repeatable, default all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per loop; the best is kept")
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    source = settings.json_path if args.source is None else settings.resolve_path(args.source)
+    try:
+        with open(source, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📂 {source} × {args.copies} copies")
+    rows = run_catalog_benchmark(text, args.copies, args.model or MODELS, args.repeat)
+    print()
+    print(format_rows(rows))
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment(),
+            "data": {"source": str(source), "copies": args.copies, "repeat": args.repeat},
+            "runs": rows,
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
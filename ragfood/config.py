@@ -0,0 +1,206 @@
+"""
+Unified Configuration Loader
+============================
+
+Single source of truth for credentials, model names and performance knobs.
+The ``.env`` file at the project root is parsed once, real environment
+variables take precedence over it, and the resulting ``Settings`` object is
+memoized for the lifetime of the process.
+
+Usage:
+    from ragfood.config import get_settings
+
+    settings = get_settings()
+    index = Index(url=settings.upstash_url, token=settings.upstash_token)
+
+Author: Jasha9
+Date: November 2025
+"""
+
+import os
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ENV_FILE = PROJECT_ROOT / ".env"
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off", ""}
+
+
+def _env(name: str, default: Any) -> Any:
+    """Declare a settings field backed by the environment variable ``name``."""
+    return field(default=default, metadata={"env": name})
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed, immutable application settings.
+
+    Every field maps to one environment variable (see the field metadata).
+    Use ``settings.replace(top_k=5)`` to derive a tuned copy in code.
+    """
+
+    # Credentials and endpoints
+    upstash_url: Optional[str] = _env("UPSTASH_VECTOR_REST_URL", None)
+    upstash_token: Optional[str] = _env("UPSTASH_VECTOR_REST_TOKEN", None)
+    upstash_readonly_token: Optional[str] = _env("UPSTASH_VECTOR_REST_READONLY_TOKEN", None)
+    groq_api_key: Optional[str] = _env("GROQ_API_KEY", None)
+    groq_base_url: Optional[str] = _env("GROQ_BASE_URL", None)
+    ollama_host: str = _env("OLLAMA_HOST", "http://localhost:11434")
+
+    # Data locations
+    json_file: str = _env("JSON_FILE", "foods.json")
+    foods_namespace: str = _env("FOODS_NAMESPACE", "foods")
+    chroma_dir: str = _env("CHROMA_DIR", "chroma_db")
+    chroma_collection: str = _env("CHROMA_COLLECTION", "foods")
+    ann_dir: str = _env("ANN_DIR", "ann_index")
+    snapshot_dir: str = _env("SNAPSHOT_DIR", "snapshots")
+    validate_catalog: bool = _env("VALIDATE_CATALOG", False)
+
+    # Model names
+    groq_model: str = _env("GROQ_MODEL", "llama-3.1-8b-instant")
+    llm_model: str = _env("LLM_MODEL", "llama3.2")
+    embed_model: str = _env("EMBED_MODEL", "mxbai-embed-large")
+
+    # Generation parameters
+    temperature: float = _env("RESPONSE_TEMPERATURE", 0.7)
+    max_tokens: int = _env("MAX_TOKENS", 500)
+
+    # Performance knobs
+    top_k: int = _env("MAX_RESULTS", 3)
+    upsert_batch_size: int = _env("UPSERT_BATCH_SIZE", 50)
+    query_batch_size: int = _env("QUERY_BATCH_SIZE", 16)
+    max_concurrency: int = _env("MAX_CONCURRENCY", 8)
+    request_timeout: float = _env("REQUEST_TIMEOUT", 10.0)
+    llm_timeout: float = _env("LLM_TIMEOUT", 30.0)
+    embedding_cache_size: int = _env("EMBEDDING_CACHE_SIZE", 1024)
+    response_cache_size: int = _env("RESPONSE_CACHE_SIZE", 256)
+    min_score: float = _env("MIN_SCORE", 0.0)
+
+    # Local approximate index (IVF): 0 lists = 4*sqrt(n)
+    ann_nlist: int = _env("ANN_NLIST", 0)
+    ann_nprobe: int = _env("ANN_NPROBE", 8)
+    ann_iterations: int = _env("ANN_ITERATIONS", 10)
+    ann_min_items: int = _env("ANN_MIN_ITEMS", 1024)
+
+    # Quantized in-process store: float16 | int8 codes, rescore = candidates per result
+    quant_precision: str = _env("QUANT_PRECISION", "int8")
+    quant_rescore: int = _env("QUANT_RESCORE", 4)
+    quant_dir: str = _env("QUANT_DIR", "")
+
+    # Federated search across namespaces (ragfood.federated); "default" names the default namespace
+    federated_namespaces: str = _env("FEDERATED_NAMESPACES", "")
+    federated_merge: str = _env("FEDERATED_MERGE", "score")
+    federated_normalize: str = _env("FEDERATED_NORMALIZE", "minmax")
+    federated_deadline: float = _env("FEDERATED_DEADLINE", 0.0)
+
+    # Projection of local embeddings before storage/search: "" | pca | prefix
+    projection: str = _env("PROJECTION", "")
+    projection_dim: int = _env("PROJECTION_DIM", 256)
+
+    # Observability
+    trace_file: str = _env("TRACE_FILE", "")
+    trace_format: str = _env("TRACE_FORMAT", "jsonl")
+    profile_mode: str = _env("PROFILE", "")
+    profile_dir: str = _env("PROFILE_DIR", "profiles")
+    profile_format: str = _env("PROFILE_FORMAT", "collapsed")
+    profile_interval: float = _env("PROFILE_INTERVAL", 0.001)
+    usage_ledger: str = _env("USAGE_LEDGER", "")
+
+    def replace(self, **changes: Any) -> "Settings":
+        """Return a copy of these settings with ``changes`` applied."""
+        return replace(self, **changes)
+
+    def resolve_path(self, path: str) -> Path:
+        """Resolve a data path relative to the project root, not the CWD."""
+        candidate = Path(path)
+        return candidate if candidate.is_absolute() else PROJECT_ROOT / candidate
+
+    @property
+    def json_path(self) -> Path:
+        """Absolute path of the configured food catalog."""
+        return self.resolve_path(self.json_file)
+
+    def to_dict(self, redact: bool = True) -> Dict[str, Any]:
+        """Return settings as a dict, hiding secrets unless ``redact`` is False."""
+        values = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if redact and value and ("token" in f.name or "api_key" in f.name):
+                value = "***"
+            values[f.name] = value
+        return values
+
+
+def parse_env_file(path: Path) -> Dict[str, str]:
+    """Parse a ``KEY=value`` file, ignoring blanks, comments and quotes."""
+    values: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                if line.startswith("export "):
+                    line = line[len("export "):]
+                key, value = line.split("=", 1)
+                values[key.strip()] = value.strip().strip('"').strip("'")
+    except FileNotFoundError:
+        pass
+    return values
+
+
+def _coerce(raw: str, default: Any, name: str) -> Any:
+    """Convert a raw string to the type of the field default."""
+    if isinstance(default, bool):
+        lowered = raw.strip().lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean for {name}: {raw!r}")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def load_settings(env_file: Optional[Path] = None, environ: Optional[Dict[str, str]] = None) -> Settings:
+    """Build ``Settings`` from an env file overlaid with real environment variables.
+
+    Values from the file are also exported to ``os.environ`` (without
+    overriding existing variables) so SDKs that read the environment
+    directly keep working, matching ``load_dotenv`` behaviour.
+    """
+    if env_file is None:
+        env_file = Path(os.environ.get("RAGFOOD_ENV_FILE", DEFAULT_ENV_FILE))
+    file_values = parse_env_file(Path(env_file))
+
+    if environ is None:
+        for key, value in file_values.items():
+            os.environ.setdefault(key, value)
+        environ = dict(os.environ)
+
+    merged = {**file_values, **environ}
+    kwargs = {}
+    for f in fields(Settings):
+        env_name = f.metadata["env"]
+        if env_name in merged:
+            kwargs[f.name] = _coerce(merged[env_name], f.default, env_name)
+    return Settings(**kwargs)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsing the env file on first use."""
+    return load_settings()
+
+
+def reload_settings() -> Settings:
+    """Discard the memoized settings and parse the environment again."""
+    get_settings.cache_clear()
+    return get_settings()
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Compiled Corpus Format
+======================
+
+A binary, memory-mappable form of the food catalog JSON. Opening one maps
+the file and reads a small header, and nothing is parsed per item. Items
+are decoded only when they are accessed, so startup time and memory no
+longer grow with JSON parse time.
+
+Layout (``.corpus``, little-endian)::
+
+    b"RFCORPUS" | uint32 version | uint32 header length | header JSON | body
+
+The header holds the schema, item count, field descriptors, each
+categorical field's dictionary, the SHA-256 of the source JSON and of the
+body. The body holds 8-byte aligned arrays, read as zero-copy NumPy views:
+
+- every field: ``present`` (uint8 per item), so a missing key stays missing
+- ``string`` fields (id, text, origin, ...): ``(start, end)`` spans into
+  one shared UTF-8 heap
+- ``category`` fields (region, type, category): dictionary codes
+- ``category_list`` fields (dietary, allergens, ingredients): CSR offsets
+  plus dictionary codes
+
+Spans and offsets are uint32, or uint64 once the heap or a list field's
+code count no longer fits (``offset_dtype`` in the field descriptor).
+
+``CorpusWriter`` builds a corpus from items streamed in blocks, spilling
+columns to temporary files, so catalogs of millions of items compile in
+flat memory; ``compile_items`` is a thin wrapper around it.
+
+``Corpus`` is a read-only sequence of item dicts, equal to the JSON it was
+compiled from. ``load_food_data`` opens it whenever ``JSON_FILE`` (or the
+given path) ends in ``.corpus``.
+
+Usage::
+
+    python -m ragfood.corpus data/food_data.json foods.json      # -> data/food_data.corpus, foods.corpus
+    python -m ragfood.corpus data/food_data.json --bench         # JSON parse vs corpus open
+    python -m ragfood.corpus --verify data/food_data.corpus
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections.abc import Sequence as SequenceABC
+from itertools import chain, islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SCHEMA = "ragfood-corpus/1"
+MAGIC = b"RFCORPUS"
+VERSION = 1
+SUFFIX = ".corpus"
+KINDS = ("string", "category", "category_list")
+
+# Scalar fields whose few distinct values repeat across items
+CATEGORICAL = frozenset({"region", "type", "category"})
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 8
+_U4_MAX = 0xFFFFFFFF
+
+# Items per block while writing (memory is bounded by one block's columns)
+WRITE_BLOCK = 65536
+
+
+def field_kind(name: str, values: Sequence[Any]) -> str:
+    """Storage kind for a field from its name and values."""
+    if all(isinstance(v, list) for v in values):
+        if not all(isinstance(x, str) for v in values for x in v):
+            raise ValueError(f"List field {name!r} must hold strings")
+        return "category_list"
+    if not all(isinstance(v, str) for v in values):
+        raise ValueError(f"Field {name!r} must hold strings or lists of strings")
+    return "category" if name in CATEGORICAL else "string"
+
+
+def _code_dtype(size: int) -> np.dtype:
+    return np.dtype("<u2") if size <= 0xFFFF else np.dtype("<u4")
+
+
+def _offset_dtype(limit: int) -> np.dtype:
+    return np.dtype("<u4") if limit <= _U4_MAX else np.dtype("<u8")
+
+
+class _Column:
+    """Spill files and dictionary of one field while a corpus is being written."""
+
+    def __init__(self, name: str, kind: str, directory: str, index: int):
+        self.name = name
+        self.kind = kind
+        self.lookup: Dict[str, int] = {}  # value -> first-seen code + 1 (0 = absent)
+        self.length = 0  # category_list: codes so far
+        self.files: Dict[str, Any] = {}
+        parts = {"string": ("present", "spans"), "category": ("present", "codes")}.get(kind, ("present", "offsets", "codes"))
+        for part in parts:
+            self.files[part] = open(os.path.join(directory, f"{index}.{part}"), "w+b")
+
+    def absent(self, rows: int) -> None:
+        """Append ``rows`` rows without this field."""
+        for start in range(0, rows, WRITE_BLOCK):
+            n = min(WRITE_BLOCK, rows - start)
+            self.files["present"].write(bytes(n))
+            if self.kind == "string":
+                self.files["spans"].write(bytes(16 * n))
+            elif self.kind == "category":
+                self.files["codes"].write(bytes(4 * n))
+            else:
+                self.files["offsets"].write(np.full(n, self.length, dtype="<u8").tobytes())
+
+    def dictionary(self) -> Tuple[List[str], np.ndarray]:
+        """Sorted dictionary, and the map from spilled codes to its codes."""
+        dictionary = sorted(self.lookup)
+        remap = np.zeros(len(dictionary) + 1, dtype="<u4")
+        for code, value in enumerate(dictionary):
+            remap[self.lookup[value]] = code
+        return dictionary, remap
+
+
+class CorpusWriter:
+    """Builds a compiled corpus from items streamed in blocks.
+
+    Each block's columns are appended to spill files under a temporary
+    directory (``spill_dir``), so memory holds one block plus the
+    categorical dictionaries however many items are added. ``write``
+    assembles the corpus from the spill files.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None):
+        self._directory = tempfile.TemporaryDirectory(prefix="corpus-", dir=spill_dir)
+        self._columns: Dict[str, _Column] = {}
+        self._heap = open(os.path.join(self._directory.name, "heap"), "w+b")
+        self._heap_size = 0
+        self.count = 0
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for column in self._columns.values():
+            for f in column.files.values():
+                f.close()
+        self._heap.close()
+        self._directory.cleanup()
+
+    def add(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Append ``items``; return how many were added."""
+        added = 0
+        iterator = iter(items)
+        while True:
+            block = list(islice(iterator, WRITE_BLOCK))
+            if not block:
+                return added
+            self._add_block(block)
+            added += len(block)
+
+    def _add_block(self, items: List[Dict[str, Any]]) -> None:
+        names: List[str] = []
+        for item in items:
+            names.extend(key for key in item if key not in self._columns and key not in names)
+        for name in self._columns:
+            self._append(self._columns[name], items)
+        for name in names:
+            values = [item[name] for item in items if name in item]
+            column = self._columns[name] = _Column(name, field_kind(name, values), self._directory.name, len(self._columns))
+            column.absent(self.count)
+            self._append(column, items)
+        self.count += len(items)
+
+    def _append(self, column: _Column, items: List[Dict[str, Any]]) -> None:
+        name = column.name
+        present = np.fromiter((name in item for item in items), dtype=np.uint8, count=len(items))
+        values = [item[name] for item in items if name in item]
+        if values and field_kind(name, values) != column.kind:
+            raise ValueError(f"Field {name!r} must hold strings or lists of strings")
+        column.files["present"].write(present.tobytes())
+        rows = present.astype(bool)
+        if column.kind == "string":
+            encoded = [value.encode("utf-8") for value in values]
+            lengths = np.fromiter(map(len, encoded), dtype=np.uint64, count=len(encoded))
+            ends = np.uint64(self._heap_size) + np.cumsum(lengths, dtype=np.uint64)
+            spans = np.zeros((len(items), 2), dtype="<u8")
+            spans[rows, 0] = ends - lengths
+            spans[rows, 1] = ends
+            self._heap.write(b"".join(encoded))
+            self._heap_size += int(lengths.sum())
+            column.files["spans"].write(spans.tobytes())
+            return
+        lookup = column.lookup
+        if column.kind == "category":
+            codes = np.zeros(len(items), dtype="<u4")
+            codes[rows] = [lookup.setdefault(value, len(lookup) + 1) for value in values]
+            column.files["codes"].write(codes.tobytes())
+            return
+        lengths = np.zeros(len(items), dtype="<u8")
+        lengths[rows] = [len(value) for value in values]
+        codes = np.array([lookup.setdefault(v, len(lookup) + 1) for value in values for v in value], dtype="<u4")
+        column.files["offsets"].write((column.length + np.cumsum(lengths, dtype=np.uint64)).astype("<u8").tobytes())
+        column.files["codes"].write(codes.tobytes())
+        column.length += len(codes)
+
+    def write(self, f: BinaryIO, source_sha256: Optional[str] = None) -> None:
+        """Write the corpus of every item added so far to the seekable file ``f``."""
+        pieces: List[Tuple[int, Callable[[], Iterator[bytes]]]] = []
+        size = 0
+
+        def put(nbytes: int, chunks: Callable[[], Iterator[bytes]]) -> int:
+            nonlocal size
+            size += -size % _ALIGN
+            offset = size
+            pieces.append((offset, chunks))
+            size += nbytes
+            return offset
+
+        count = self.count
+        span_dtype = _offset_dtype(self._heap_size)
+        descriptors = []
+        for column in self._columns.values():
+            for spill in column.files.values():
+                spill.flush()
+            descriptor: Dict[str, Any] = {"name": column.name, "kind": column.kind,
+                                          "present": put(count, _spilled(column.files["present"], "u1"))}
+            if column.kind == "string":
+                descriptor["spans"] = put(2 * count * span_dtype.itemsize, _spilled(column.files["spans"], "<u8", span_dtype))
+                descriptor["offset_dtype"] = span_dtype.str
+            else:
+                dictionary, remap = column.dictionary()
+                dtype = _code_dtype(len(dictionary))
+                length = column.length if column.kind == "category_list" else count
+                if column.kind == "category_list":
+                    offset_dtype = _offset_dtype(column.length)
+                    zero = np.zeros(1, dtype=offset_dtype).tobytes()
+                    offsets = _spilled(column.files["offsets"], "<u8", offset_dtype)
+                    descriptor["offsets"] = put((count + 1) * offset_dtype.itemsize, lambda o=offsets, z=zero: chain([z], o()))
+                    descriptor["offset_dtype"] = offset_dtype.str
+                descriptor["codes"] = put(length * dtype.itemsize, _spilled(column.files["codes"], "<u4", dtype, remap))
+                if column.kind == "category_list":
+                    descriptor["length"] = column.length
+                descriptor["dtype"] = dtype.str
+                descriptor["dictionary"] = dictionary
+            descriptors.append(descriptor)
+        self._heap.flush()
+        heap_offset = put(self._heap_size, _spilled(self._heap, "u1"))
+
+        placeholder = "0" * 64
+        header = {
+            "schema": SCHEMA,
+            "count": count,
+            "fields": descriptors,
+            "heap": {"offset": heap_offset, "bytes": self._heap_size},
+            "source_sha256": source_sha256,
+            "content_sha256": placeholder,
+        }
+        encoded = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        encoded += b" " * (-(len(encoded) + _PREAMBLE.size) % _ALIGN)
+        start = f.tell()
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(encoded)) + encoded)
+
+        # The body is hashed as it streams out; the hash then replaces the placeholder
+        digest, written = hashlib.sha256(), 0
+        for offset, chunks in pieces:
+            for chunk in chain([bytes(offset - written)], chunks()):
+                digest.update(chunk)
+                f.write(chunk)
+                written += len(chunk)
+        padding = bytes(size - written)
+        digest.update(padding)
+        f.write(padding)
+        end = f.tell()
+        f.seek(start + _PREAMBLE.size + encoded.rindex(f'"content_sha256":"{placeholder}"'.encode()) + len('"content_sha256":"'))
+        f.write(digest.hexdigest().encode("ascii"))
+        f.seek(end)
+
+
+def _spilled(spill: BinaryIO, dtype: str, out: Optional[np.dtype] = None, remap: Optional[np.ndarray] = None) -> Callable[[], Iterator[bytes]]:
+    """Chunks of a spill file, converted to ``out`` (through ``remap``) on the way."""
+    itemsize = np.dtype(dtype).itemsize
+
+    def chunks() -> Iterator[bytes]:
+        spill.seek(0)
+        while True:
+            raw = spill.read(WRITE_BLOCK * 16 * itemsize)
+            if not raw:
+                return
+            if out is None:
+                yield raw
+                continue
+            array = np.frombuffer(raw, dtype=dtype)
+            yield (remap[array] if remap is not None else array).astype(out).tobytes()
+
+    return chunks
+
+
+def compile_items(items: Iterable[Dict[str, Any]], source_sha256: Optional[str] = None) -> bytes:
+    """Encode catalog items into the compiled corpus format."""
+    buffer = io.BytesIO()
+    with CorpusWriter() as writer:
+        writer.add(items)
+        writer.write(buffer, source_sha256)
+    return buffer.getvalue()
+
+
+def compile_corpus(source: str, output: Optional[str] = None) -> str:
+    """Compile the catalog JSON at ``source``; return the written path."""
+    with open(source, "rb") as f:
+        raw = f.read()
+    output = output or os.path.splitext(source)[0] + SUFFIX
+    compiled = compile_items(json.loads(raw), hashlib.sha256(raw).hexdigest())
+    with open(output, "wb") as f:
+        f.write(compiled)
+    return output
+
+
+class Corpus(SequenceABC):
+    """Read-only, memory-mapped view of a compiled corpus.
+
+    Indexing returns item dicts decoded on demand; ``column`` and
+    ``codes`` expose whole fields without building any dicts.
+    """
+
+    def __init__(self, buffer: Any, path: Optional[str] = None):
+        self.path = path
+        self._buffer = np.frombuffer(buffer, dtype=np.uint8)
+        magic, version, length = _PREAMBLE.unpack_from(self._buffer[: _PREAMBLE.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path or 'buffer'} is not a compiled corpus")
+        if version != VERSION:
+            raise ValueError(f"Unsupported corpus version {version} in {path or 'buffer'}")
+        start = _PREAMBLE.size + length
+        self.header = json.loads(self._buffer[_PREAMBLE.size:start].tobytes())
+        self._body = self._buffer[start:]
+        self.count = self.header["count"]
+        self.fields = {descriptor["name"]: descriptor for descriptor in self.header["fields"]}
+        self._present = {name: self._array(d["present"], "u1", self.count).view(bool) for name, d in self.fields.items()}
+        self._spans = {
+            name: self._array(d["spans"], d.get("offset_dtype", "<u4"), 2 * self.count).reshape(self.count, 2)
+            for name, d in self.fields.items() if d["kind"] == "string"
+        }
+        self._codes = {
+            name: self._array(d["codes"], d["dtype"], d.get("length", self.count))
+            for name, d in self.fields.items() if d["kind"] != "string"
+        }
+        self._offsets = {
+            name: self._array(d["offsets"], d.get("offset_dtype", "<u4"), self.count + 1)
+            for name, d in self.fields.items() if d["kind"] == "category_list"
+        }
+        heap = self.header["heap"]
+        self._heap = self._body[heap["offset"]: heap["offset"] + heap["bytes"]]
+
+    @classmethod
+    def open(cls, path: Union[str, os.PathLike]) -> "Corpus":
+        """Map the file at ``path``; only the header is read."""
+        path = os.fspath(path)
+        return cls(np.memmap(path, dtype=np.uint8, mode="r"), path)
+
+    def _array(self, offset: int, dtype: str, count: int) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        return self._body[offset: offset + count * dtype.itemsize].view(dtype)
+
+    def verify(self) -> bool:
+        """True if the body still matches the header's content hash."""
+        return hashlib.sha256(self._body.tobytes()).hexdigest() == self.header["content_sha256"]
+
+    def is_current(self, source: Union[str, os.PathLike]) -> bool:
+        """True if this corpus was compiled from the current contents of ``source``."""
+        with open(source, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest() == self.header["source_sha256"]
+
+    # -- whole columns ---------------------------------------------------
+
+    def codes(self, name: str) -> Tuple[np.ndarray, List[str]]:
+        """Dictionary codes and dictionary of a categorical field.
+
+        ``category_list`` fields return their flat codes; slice them with
+        ``offsets(name)``.
+        """
+        if name not in self._codes:
+            raise ValueError(f"Field {name!r} is not categorical")
+        return self._codes[name], self.fields[name]["dictionary"]
+
+    def offsets(self, name: str) -> np.ndarray:
+        """CSR offsets (``count + 1``) of a ``category_list`` field."""
+        return self._offsets[name]
+
+    def present(self, name: str) -> np.ndarray:
+        return self._present[name]
+
+    def column(self, name: str) -> List[Any]:
+        """Decoded values of one field (None where an item lacks it)."""
+        return [self.value(row, name) for row in range(self.count)]
+
+    # -- items -----------------------------------------------------------
+
+    def value(self, row: int, name: str) -> Any:
+        if not self._present[name][row]:
+            return None
+        if name in self._spans:
+            start, end = self._spans[name][row]
+            return self._heap[start:end].tobytes().decode("utf-8")
+        codes, dictionary = self._codes[name], self.fields[name]["dictionary"]
+        if name not in self._offsets:
+            return dictionary[codes[row]]
+        offsets = self._offsets[name]
+        return [dictionary[code] for code in codes[offsets[row]: offsets[row + 1]].tolist()]
+
+    def item(self, row: int) -> Dict[str, Any]:
+        return {name: self.value(row, name) for name in self.fields if self._present[name][row]}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self.item(row) for row in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("corpus index out of range")
+        return self.item(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self.count):
+            yield self.item(row)
+
+
+def _bench(source: str, compiled: str, repeat: int = 20) -> Dict[str, float]:
+    """Median seconds to parse the JSON, open the corpus, and decode every item."""
+    def median(run: Any) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        return sorted(times)[len(times) // 2]
+
+    def parse() -> None:
+        with open(source, "rb") as f:
+            json.loads(f.read())
+
+    return {
+        "json_parse": median(parse),
+        "corpus_open": median(lambda: Corpus.open(compiled)),
+        "corpus_decode_all": median(lambda: list(Corpus.open(compiled))),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compile catalog JSON into the memory-mappable corpus format")
+    parser.add_argument("sources", nargs="*", help="Catalog JSON files to compile (next to the source unless --output)")
+    parser.add_argument("--output", help="Output path (single source only)")
+    parser.add_argument("--verify", metavar="CORPUS", action="append", default=[], help="Check a compiled corpus's content hash")
+    parser.add_argument("--bench", action="store_true", help="Time JSON parsing against opening the compiled corpus")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.output and len(args.sources) != 1:
+        print("❌ --output needs exactly one source")
+        return 1
+    status = 0
+    for source in args.sources:
+        output = compile_corpus(source, args.output)
+        corpus = Corpus.open(output)
+        print(f"🏗️ {source} ({os.path.getsize(source):,} B) → {output} ({os.path.getsize(output):,} B, "
+              f"{len(corpus)} items, {sum(d['kind'] != 'string' for d in corpus.fields.values())} dictionary-encoded fields)")
+        if args.bench:
+            timings = _bench(source, output)
+            print(f"   JSON parse {timings['json_parse'] * 1e3:.3f} ms | corpus open {timings['corpus_open'] * 1e3:.3f} ms | "
+                  f"open + decode all {timings['corpus_decode_all'] * 1e3:.3f} ms")
+    for path in args.verify:
+        try:
+            ok = Corpus.open(path).verify()
+        except (OSError, ValueError) as e:
+            print(f"❌ {path}: {e}")
+            status = 1
+            continue
+        print(f"{'✅' if ok else '❌'} {path}: content hash {'matches' if ok else 'does not match'}")
+        status = status or (0 if ok else 1)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Embedding Providers
+===================
+
+Text-to-vector encoders for backends that do not embed server-side
+(ChromaDB and the in-memory store). Upstash Vector embeds raw text itself,
+so it does not need one of these.
+
+- ``OllamaEmbedder``: mxbai-embed-large via the local Ollama API
+- ``HashingEmbedder``: deterministic, dependency-free feature hashing for
+  offline tests and benchmarks
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.config import Settings, get_settings
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class Embedder:
+    """Base class: subclasses implement ``_embed_batch``."""
+
+    dimension: int = 0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` into an ``(n, dimension)`` float32 matrix."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.asarray(self._embed_batch(list(texts)), dtype=np.float32)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text into a 1-D float32 vector."""
+        return self.embed([text])[0]
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic bag-of-words embedder using signed feature hashing.
+
+    Unigrams and bigrams are hashed into ``dimension`` buckets and the
+    result is L2-normalized, so lexically similar texts get high cosine
+    similarity. Identical across processes and platforms.
+    """
+
+    def __init__(self, dimension: int = 1024):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimension
+                sign = 1.0 if digest[4] & 1 else -1.0
+                matrix[row, bucket] += sign
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class OllamaEmbedder(Embedder):
+    """Embeds text with a local Ollama model, caching recent results."""
+
+    def __init__(self, settings: Optional[Settings] = None, dimension: int = 1024):
+        self.settings = settings or get_settings()
+        self.dimension = dimension
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def _request(self, text: str) -> np.ndarray:
+        import requests
+
+        response = requests.post(
+            f"{self.settings.ollama_host}/api/embeddings",
+            json={"model": self.settings.embed_model, "prompt": text},
+            timeout=self.settings.request_timeout,
+        )
+        response.raise_for_status()
+        result = response.json()
+        if not result.get("embedding"):
+            raise ValueError(f"No embedding in response: {result}")
+        vector = np.asarray(result["embedding"], dtype=np.float32)
+        self.dimension = vector.shape[0]
+        return vector
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        rows = []
+        for text in texts:
+            vector = self._cache.get(text)
+            if vector is None:
+                vector = self._request(text)
+                self._cache[text] = vector
+                if len(self._cache) > self.settings.embedding_cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(text)
+            rows.append(vector)
+        return np.vstack(rows)
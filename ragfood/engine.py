@@ -0,0 +1,277 @@
+"""
+RAG Query Engine
+================
+
+Retrieval + generation pipeline shared by the interactive scripts, tests
+and benchmarks. Any ``VectorStore`` can be paired with any ``LLMProvider``.
+
+``RAGEngine.query`` runs the stages normalize -> cache lookup -> retrieval
+-> filter -> rerank -> context assembly -> LLM (first token, completion),
+each traced as a span when ``TRACE_FILE`` is set (see ``ragfood.tracing``).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from ragfood.config import Settings, get_settings
+from ragfood.ledger import UsageLedger, create_usage_ledger
+from ragfood.llm import Generation, LLMProvider, Messages
+from ragfood.stores.base import DEFAULT_NAMESPACE, QueryResult, VectorStore
+from ragfood.profiling import ProfileRecorder, create_profile_recorder
+from ragfood.tracing import create_tracer
+
+Reranker = Callable[[str, List[QueryResult]], List[QueryResult]]
+
+SYSTEM_PROMPT = (
+    "You are a helpful food expert. Use the provided context to answer questions about food "
+    "accurately and concisely. Keep your responses informative but not too long."
+)
+
+NO_CONTEXT_ANSWER = "I couldn't find relevant information to answer your question."
+
+
+def normalize_question(question: str) -> str:
+    """Trim and collapse whitespace so trivially different inputs share a cache entry."""
+    return " ".join(question.split())
+
+
+def build_context(sources: List[QueryResult]) -> str:
+    """Join retrieved descriptions into the prompt context."""
+    return "\n".join(source.text for source in sources if source.text)
+
+
+def build_messages(question: str, context: str, system_prompt: str = SYSTEM_PROMPT) -> Messages:
+    """Chat messages for the standard context + question prompt."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"""Use the following context to answer the question.
+
+Context:
+{context}
+
+Question: {question}
+Answer:"""},
+    ]
+
+
+@dataclass
+class RAGResponse:
+    """Answer plus everything that produced it."""
+
+    question: str
+    answer: str
+    sources: List[QueryResult] = field(default_factory=list)
+    generation: Optional[Generation] = None
+    error: Optional[str] = None
+    profile: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "question": self.question,
+            "answer": self.answer,
+            "sources": [
+                {"id": s.id, "score": s.score, **({"namespace": s.namespace} if s.namespace is not None else {})}
+                for s in self.sources
+            ],
+            "generation": self.generation.to_dict() if self.generation else None,
+            "error": self.error,
+            **({"profile": self.profile} if self.profile else {}),
+        }
+
+
+class RAGEngine:
+    """Retrieve from a vector store, then answer with an LLM provider.
+
+    ``cache_size`` bounds the LRU response cache (defaults to
+    ``RESPONSE_CACHE_SIZE``; 0 disables it). ``reranker`` reorders filtered
+    sources (default: by score). ``stream`` generates via the provider's
+    streaming API so time to first token is measured, not estimated.
+    ``profiler`` (default: from ``PROFILE``) records a CPU profile per query
+    and ``ledger`` (default: from ``USAGE_LEDGER``) its tokens and cost.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        llm: LLMProvider,
+        settings: Optional[Settings] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        tracer: Any = None,
+        cache_size: Optional[int] = None,
+        reranker: Optional[Reranker] = None,
+        stream: bool = False,
+        profiler: Optional[ProfileRecorder] = None,
+        ledger: Optional[UsageLedger] = None,
+    ):
+        self.store = store
+        self.llm = llm
+        self.settings = settings or get_settings()
+        self.namespace = namespace
+        self.tracer = tracer if tracer is not None else create_tracer(self.settings)
+        self.cache_size = self.settings.response_cache_size if cache_size is None else cache_size
+        self.reranker = reranker
+        self.stream = stream
+        self.profiler = profiler if profiler is not None else create_profile_recorder(self.settings)
+        self.ledger = ledger if ledger is not None else create_usage_ledger(self.settings)
+        self._cache: "OrderedDict[Hashable, RAGResponse]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def retrieve(self, question: str, top_k: Optional[int] = None, filter: Optional[Dict[str, Any]] = None) -> List[QueryResult]:
+        """Return the most relevant catalog entries for ``question``."""
+        return self.store.query(
+            text=question,
+            top_k=top_k or self.settings.top_k,
+            filter=filter,
+            namespace=self.namespace,
+        )
+
+    def filter_sources(self, sources: List[QueryResult]) -> List[QueryResult]:
+        """Drop duplicates, empty texts and hits scoring below ``MIN_SCORE``."""
+        seen = set()
+        kept = []
+        for source in sources:
+            key = (source.namespace, source.id)
+            if key in seen or not source.text or source.score < self.settings.min_score:
+                continue
+            seen.add(key)
+            kept.append(source)
+        return kept
+
+    def rerank(self, question: str, sources: List[QueryResult]) -> List[QueryResult]:
+        """Order sources for the prompt, best first."""
+        if self.reranker is not None:
+            return self.reranker(question, sources)
+        return sorted(sources, key=lambda source: source.score, reverse=True)
+
+    def generate(self, question: str, sources: List[QueryResult]) -> Generation:
+        """Answer ``question`` grounded in ``sources``."""
+        return self.llm.generate(build_messages(question, build_context(sources)))
+
+    def _generate_traced(self, messages: Messages) -> Generation:
+        """Generate, recording ``llm.first_token`` and ``llm.completion`` spans."""
+        start_ns = time.time_ns()
+        if self.stream:
+            stream = self.llm.stream(messages)
+            first_token_ns = None
+            for _ in stream:
+                if first_token_ns is None:
+                    first_token_ns = time.time_ns()
+            generation = stream.generation
+        else:
+            generation = self.llm.generate(messages)
+            first_token_ns = start_ns + int((generation.time_to_first_token or 0.0) * 1e9)
+        end_ns = time.time_ns()
+        if first_token_ns is not None:
+            self.tracer.record("llm.first_token", start_ns, first_token_ns, streamed=self.stream, model=generation.model)
+        self.tracer.record(
+            "llm.completion", start_ns, end_ns,
+            model=generation.model,
+            provider=generation.provider,
+            prompt_tokens=generation.usage.prompt_tokens,
+            completion_tokens=generation.usage.completion_tokens,
+            finish_reason=generation.finish_reason,
+        )
+        return generation
+
+    def _cache_key(self, question: str, top_k: int, filter: Optional[Dict[str, Any]]) -> Hashable:
+        return question.lower(), top_k, self.namespace, repr(sorted(filter.items())) if filter else None
+
+    def _cache_get(self, key: Hashable) -> Optional["RAGResponse"]:
+        if not self.cache_size:
+            return None
+        with self._cache_lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+            return response
+
+    def _cache_put(self, key: Hashable, response: "RAGResponse") -> None:
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def query(
+        self,
+        question: str,
+        top_k: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        profile: Optional[bool] = None,
+        category: Optional[str] = None,
+    ) -> RAGResponse:
+        """Full RAG query; falls back to the top source if generation fails.
+
+        ``profile`` forces CPU profiling of this request on or off; by
+        default requests are profiled when the engine has a ``profiler``.
+        Without one, ``profile=True`` profiles just this request.
+        ``category`` labels the request in the usage ledger.
+        """
+        start = time.perf_counter()
+        if profile is None:
+            profile = self.profiler is not None
+        if not profile:
+            response = self._query(question, top_k, filter)
+        else:
+            profiler = self.profiler
+            if profiler is None:
+                profiler = create_profile_recorder(self.settings, mode=self.settings.profile_mode or "trace")
+            with profiler.profile("rag.query") as request_profile:
+                response = self._query(question, top_k, filter)
+            if request_profile.path:
+                response = replace(response, profile=request_profile.path)
+        if self.ledger is not None:
+            self.ledger.record(response, time.perf_counter() - start, category, self.llm.model)
+        return response
+
+    def _query(self, question: str, top_k: Optional[int], filter: Optional[Dict[str, Any]]) -> RAGResponse:
+        tracer = self.tracer
+        top_k = top_k or self.settings.top_k
+        with tracer.span("rag.query", top_k=top_k, namespace=self.namespace) as root:
+            with tracer.span("normalize"):
+                normalized = normalize_question(question)
+            key = self._cache_key(normalized, top_k, filter)
+            with tracer.span("cache.lookup") as span:
+                cached = self._cache_get(key)
+                span.set(cache_hit=cached is not None)
+            root.set(cache_hit=cached is not None)
+            if cached is not None:
+                generation = replace(cached.generation, cached=True) if cached.generation else None
+                return replace(cached, question=question, generation=generation)
+
+            with tracer.span("retrieval", top_k=top_k, filtered=bool(filter)) as span:
+                sources = self.retrieve(normalized, top_k=top_k, filter=filter)
+                span.set(hits=len(sources))
+            with tracer.span("filter", min_score=self.settings.min_score) as span:
+                sources = self.filter_sources(sources)
+                span.set(kept=len(sources))
+            with tracer.span("rerank") as span:
+                sources = self.rerank(normalized, sources)
+                span.set(top_score=sources[0].score if sources else None)
+            with tracer.span("context.assembly") as span:
+                messages = build_messages(normalized, build_context(sources))
+                span.set(sources=len(sources), context_chars=len(messages[-1]["content"]))
+            root.set(hits=len(sources))
+
+            try:
+                generation = self._generate_traced(messages)
+            except Exception as e:
+                if sources:
+                    answer = f"Based on the available information: {sources[0].text[:200]}..."
+                else:
+                    answer = NO_CONTEXT_ANSWER
+                root.set(fallback=True, error=f"{type(e).__name__}: {e}")
+                return RAGResponse(question, answer, sources, error=f"{type(e).__name__}: {e}")
+            root.set(prompt_tokens=generation.usage.prompt_tokens, completion_tokens=generation.usage.completion_tokens)
+            response = RAGResponse(question, generation.text, sources, generation)
+            self._cache_put(key, response)
+            return response
@@ -0,0 +1,255 @@
+"""
+RAG Evaluation Runner
+=====================
+
+Runs the categorised test queries (``ragfood.workload.TEST_QUERIES``) over
+a bounded thread pool, scores every answer against the test's expected
+regions, types, dietary filters and nutrients, and summarises accuracy and
+response time by category.
+
+Pair it with ``ragfood.cassette`` to record the Upstash and Groq calls once
+and replay them offline, so changing the scoring costs no API calls.
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ragfood.cassette import Cassette, CassetteMiss, CassetteProvider, CassetteVectorStore
+from ragfood.config import Settings, get_settings
+from ragfood.ledger import UsageEntry, UsageLedger
+from ragfood.llm import LLMProvider, create_llm_provider
+from ragfood.profiling import ProfileRecorder
+from ragfood.stores import VectorStore, create_vector_store
+
+EVAL_SYSTEM_PROMPT = (
+    "You are a knowledgeable food expert. Use the provided context to give detailed, accurate answers about food, "
+    "cuisine, nutrition, and cooking. Include cultural insights when relevant."
+)
+SUCCESS_THRESHOLD = 0.6
+
+Executor = Callable[[str], Tuple[str, float, Dict[str, Any]]]
+Scorer = Callable[[Dict[str, Any], str, Dict[str, Any]], float]
+
+
+def build_eval_messages(query: str, contexts: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    context_text = "\n\n".join(
+        f"Food: {ctx['text']}\nRegion: {ctx['region']}\nType: {ctx['type']}\n"
+        f"Cultural Significance: {ctx['cultural_significance']}\n"
+        f"Dietary Info: {', '.join(ctx['dietary'])}\n"
+        f"Allergens: {', '.join(ctx['allergens'])}"
+        for ctx in contexts
+    )
+    return [
+        {"role": "system", "content": EVAL_SYSTEM_PROMPT},
+        {"role": "user", "content": f"""Based on this context, answer the question: "{query}"
+
+Context:
+{context_text}
+
+Provide a comprehensive answer that includes relevant details about the food, its cultural background, nutritional aspects, and preparation methods when applicable."""},
+    ]
+
+
+def rag_executor(store: VectorStore, llm: LLMProvider, top_k: int = 3, temperature: float = 0.7, max_tokens: int = 500) -> Executor:
+    """Executor answering one query as ``(response, total_time, metadata)``."""
+
+    def execute(query: str) -> Tuple[str, float, Dict[str, Any]]:
+        start_time = time.perf_counter()
+        try:
+            search_start = time.perf_counter()
+            results = store.query(text=query, top_k=top_k, include_metadata=True)
+            search_time = time.perf_counter() - search_start
+
+            contexts = [{
+                "text": r.text,
+                "region": r.metadata.get("region", "unknown"),
+                "type": r.metadata.get("type", "general"),
+                "score": r.score,
+                "cultural_significance": r.metadata.get("cultural_significance", ""),
+                "dietary": r.metadata.get("dietary", []),
+                "allergens": r.metadata.get("allergens", []),
+            } for r in results]
+
+            if not contexts:
+                metadata = {
+                    "contexts_found": 0, "search_time": search_time, "llm_time": 0,
+                    "total_tokens": 0, "input_tokens": 0, "output_tokens": 0, "top_similarity_scores": [],
+                }
+                return "I couldn't find relevant information about that query.", time.perf_counter() - start_time, metadata
+
+            generation = llm.generate(build_eval_messages(query, contexts), temperature=temperature, max_tokens=max_tokens)
+            metadata = {
+                "model": generation.model,
+                "contexts_found": len(contexts),
+                "search_time": search_time,
+                "llm_time": generation.latency,
+                "total_tokens": generation.usage.total_tokens,
+                "input_tokens": generation.usage.prompt_tokens,
+                "output_tokens": generation.usage.completion_tokens,
+                "top_similarity_scores": [ctx["score"] for ctx in contexts[:3]],
+            }
+            return generation.text, time.perf_counter() - start_time, metadata
+        except CassetteMiss:
+            raise
+        except Exception as e:
+            return f"Error: {e}", time.perf_counter() - start_time, {"error": str(e)}
+
+    return execute
+
+
+def _fraction_mentioned(expected: Sequence[str], response_lower: str) -> float:
+    return sum(1 for term in expected if term.lower() in response_lower) / len(expected)
+
+
+def score_response(test: Dict[str, Any], response: str, metadata: Dict[str, Any]) -> float:
+    """Keyword accuracy in [0, 1]: weighted share of expected terms mentioned."""
+    response_lower = response.lower()
+    score = 0.0
+    for key, weight in (("expected_regions", 0.3), ("expected_types", 0.2), ("dietary_filters", 0.2), ("nutritional_focus", 0.2)):
+        if test.get(key):
+            score += weight * _fraction_mentioned(test[key], response_lower)
+    # Base quality score (response length and coherence)
+    if len(response) > 100 and "error" not in response_lower:
+        score += 0.1
+    return min(score, 1.0)
+
+
+class EvalRunner:
+    """Fan test cases out over at most ``workers`` threads; results keep input order."""
+
+    def __init__(self, execute: Executor, score: Scorer = score_response, workers: int = 8, threshold: float = SUCCESS_THRESHOLD,
+                 profiler: Optional[ProfileRecorder] = None, ledger: Optional[UsageLedger] = None):
+        self.execute = execute
+        self.score = score
+        self.workers = max(1, workers)
+        self.threshold = threshold
+        self.profiler = profiler
+        self.ledger = ledger
+        self._print_lock = threading.Lock()
+
+    def run_case(self, number: int, test: Dict[str, Any]) -> Dict[str, Any]:
+        profile_path = None
+        if self.profiler is None:
+            response, response_time, metadata = self.execute(test["query"])
+        else:
+            with self.profiler.profile(f"test {number}: {test['category']}") as profile:
+                response, response_time, metadata = self.execute(test["query"])
+            profile_path = profile.path
+        if self.ledger is not None:
+            self.ledger.append(UsageEntry.create(
+                metadata.get("model", "-"), metadata.get("input_tokens", 0), metadata.get("output_tokens", 0),
+                response_time, test["category"], error="error" in metadata,
+            ))
+        return {
+            "test_number": number,
+            "category": test["category"],
+            "query": test["query"],
+            "response": response,
+            "response_time": response_time,
+            "metadata": metadata,
+            "accuracy_score": self.score(test, response, metadata),
+            "timestamp": datetime.now().isoformat(),
+            **({"profile": profile_path} if profile_path else {}),
+        }
+
+    def _report(self, total: int, result: Dict[str, Any]) -> None:
+        metadata = result["metadata"]
+        lines = [
+            f"\n🧪 Test {result['test_number']}/{total}: {result['category']}",
+            f"Query: '{result['query']}'",
+            f"✅ Response Time: {result['response_time']:.2f}s",
+            f"📊 Accuracy Score: {result['accuracy_score']:.1%}",
+            f"🔍 Contexts Found: {metadata.get('contexts_found', 0)}",
+        ]
+        if metadata.get("top_similarity_scores"):
+            lines.append(f"📈 Top Similarity: {max(metadata['top_similarity_scores']):.3f}")
+        with self._print_lock:
+            print("\n".join(lines))
+
+    def run(self, tests: Sequence[Dict[str, Any]], progress: bool = True) -> Dict[str, Any]:
+        """Run every case and return the summary used by the test report."""
+        wall_start = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tests)
+        failures = 0
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(tests) or 1)) as pool:
+            futures = {pool.submit(self.run_case, i, test): i for i, test in enumerate(tests, 1)}
+            for future in as_completed(futures):
+                number = futures[future]
+                try:
+                    results[number - 1] = future.result()
+                except Exception as e:
+                    failures += 1
+                    if progress:
+                        with self._print_lock:
+                            print(f"❌ Test {number} failed: {e}")
+                    continue
+                if progress:
+                    self._report(len(tests), results[number - 1])
+        summary = self.summarize([r for r in results if r is not None], len(tests))
+        summary["failed_tests"] += failures
+        summary["workers"] = self.workers
+        summary["wall_time"] = time.perf_counter() - wall_start
+        return summary
+
+    def summarize(self, detailed: List[Dict[str, Any]], total: int) -> Dict[str, Any]:
+        times = [r["response_time"] for r in detailed]
+        scores = [r["accuracy_score"] for r in detailed]
+        successful = sum(1 for s in scores if s >= self.threshold)
+        summary: Dict[str, Any] = {
+            "total_tests": total,
+            "successful_tests": successful,
+            "failed_tests": len(scores) - successful,
+            "average_response_time": 0,
+            "performance_data": times,
+            "accuracy_scores": scores,
+            "category_performance": {},
+            "detailed_results": detailed,
+        }
+        for r in detailed:
+            data = summary["category_performance"].setdefault(r["category"], {"tests": 0, "total_time": 0, "total_accuracy": 0})
+            data["tests"] += 1
+            data["total_time"] += r["response_time"]
+            data["total_accuracy"] += r["accuracy_score"]
+        for data in summary["category_performance"].values():
+            data["avg_time"] = data["total_time"] / data["tests"]
+            data["avg_accuracy"] = data["total_accuracy"] / data["tests"]
+        if times:
+            summary.update(
+                average_response_time=statistics.mean(times),
+                median_response_time=statistics.median(times),
+                min_response_time=min(times),
+                max_response_time=max(times),
+            )
+        if scores:
+            summary.update(average_accuracy=statistics.mean(scores), median_accuracy=statistics.median(scores))
+        return summary
+
+
+def open_backends(
+    store_backend: str = "upstash",
+    llm_backend: str = "groq",
+    settings: Optional[Settings] = None,
+    cassette: Optional[Cassette] = None,
+) -> Tuple[VectorStore, LLMProvider]:
+    """Store and provider, wrapped in ``cassette`` when given.
+
+    In replay mode the live backends are not created, so no credentials or
+    network are needed.
+    """
+    settings = settings or get_settings()
+    if cassette is None:
+        return create_vector_store(store_backend, settings), create_llm_provider(llm_backend, settings)
+    if cassette.mode == "replay":
+        model = {"ollama": settings.llm_model, "stub": "stub-echo"}.get(llm_backend, settings.groq_model)
+        return (
+            CassetteVectorStore(None, cassette, backend=store_backend),
+            CassetteProvider(None, cassette, settings, name=llm_backend, model=model),
+        )
+    return (
+        CassetteVectorStore(create_vector_store(store_backend, settings), cassette),
+        CassetteProvider(create_llm_provider(llm_backend, settings), cassette),
+    )
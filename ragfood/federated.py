@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Federated Namespace Search
+==========================
+
+Fans one query out to several namespaces at once and merges the hits, so
+food data in ``foods`` and application data in the default namespace can
+be searched together. Namespaces are queried concurrently on a shared
+thread pool, so a federated query takes as long as the slowest namespace,
+not the sum of all of them.
+
+Scores from different namespaces are not directly comparable: each
+namespace has its own score distribution. They are first normalized per
+namespace (``normalize``), then merged (``merge``):
+
+- normalize ``minmax`` (default): rescale each namespace's hits to [0, 1];
+  ``zscore``: standard scores; ``none``: raw store scores
+- merge ``score`` (default): sort all hits by ``weight × normalized score``;
+  ``rrf``: reciprocal-rank fusion, ``weight / (60 + rank)``;
+  ``round_robin``: interleave namespaces in the order given
+
+With a ``deadline`` (seconds), namespaces that have not answered in time
+are left out of the merge and reported as timed out. Requests still
+queued at the deadline are cancelled; running ones finish in the
+background, because running threads cannot be cancelled. Until such a
+straggler finishes, its namespace is reported as timed out straight away
+rather than handed another request, so a slow namespace holds at most
+one pool worker and never starves the healthy ones. A namespace that
+fails is reported with its error; the others still answer.
+
+``FederatedVectorStore`` is a ``VectorStore``, so ``RAGEngine`` uses it
+unchanged. Every merged hit carries its ``namespace``. Writes and fetches
+go to the wrapped store's named namespace.
+
+Usage::
+
+    python -m ragfood.federated "spicy vegetarian dishes" --namespaces foods,default --deadline 0.5
+    python -m ragfood.federated "spicy curry" --standins --vector-latency 0.05 --namespaces a,b,c,d
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ragfood.config import Settings, get_settings
+from ragfood.stores.base import DEFAULT_NAMESPACE, QueryResult, StoreInfo, VectorQuery, VectorRecord, VectorStore
+
+MERGES = ("score", "rrf", "round_robin")
+NORMALIZERS = ("none", "minmax", "zscore")
+
+# Rank offset of reciprocal-rank fusion (the usual constant from the RRF paper)
+RRF_K = 60
+
+# How the default namespace is written in FEDERATED_NAMESPACES / --namespaces
+DEFAULT_ALIAS = "default"
+
+
+def parse_namespaces(value: str) -> List[str]:
+    """``foods,default`` → ``["foods", ""]``."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    return [DEFAULT_NAMESPACE if name == DEFAULT_ALIAS else name for name in names]
+
+
+def normalize_scores(scores: Sequence[float], method: str = "minmax") -> List[float]:
+    """Scores of one namespace's hits, made comparable across namespaces."""
+    if method not in NORMALIZERS:
+        raise ValueError(f"Unknown normalization: {method!r} (expected one of {NORMALIZERS})")
+    scores = list(scores)
+    if method == "none" or not scores:
+        return scores
+    if method == "minmax":
+        low, high = min(scores), max(scores)
+        return [(s - low) / (high - low) if high > low else 1.0 for s in scores]
+    mean = sum(scores) / len(scores)
+    std = math.sqrt(sum((s - mean) ** 2 for s in scores) / len(scores))
+    return [(s - mean) / std if std else 0.0 for s in scores]
+
+
+def merge_results(
+    hits: Dict[str, List[QueryResult]],
+    top_k: int,
+    merge: str = "score",
+    normalize: str = "minmax",
+    weights: Optional[Dict[str, float]] = None,
+) -> List[QueryResult]:
+    """Merge per-namespace hits (best first) into one ranked list.
+
+    Returned results carry their ``namespace``, and ``score`` is the merged
+    score the list is ordered by.
+    """
+    if merge not in MERGES:
+        raise ValueError(f"Unknown merge policy: {merge!r} (expected one of {MERGES})")
+    weights = weights or {}
+    ranked = []
+    for order, (namespace, results) in enumerate(hits.items()):
+        weight = weights.get(namespace, 1.0)
+        for rank, (result, score) in enumerate(zip(results, normalize_scores([r.score for r in results], normalize))):
+            if merge == "score":
+                key = (weight * score, -order)
+            elif merge == "rrf":
+                key = (weight / (RRF_K + rank + 1), score)
+            else:
+                key = (-rank, -order)
+            ranked.append((key, replace(result, score=float(key[0]) if merge != "round_robin" else score, namespace=namespace)))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [result for _, result in ranked[:top_k]]
+
+
+@dataclass
+class NamespaceOutcome:
+    """How one namespace answered a federated query."""
+
+    namespace: str
+    hits: int = 0
+    seconds: Optional[float] = None
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "seconds": self.seconds,
+            "timed_out": self.timed_out,
+            "error": self.error,
+        }
+
+
+@dataclass
+class FederatedResult:
+    """Merged hits plus per-namespace timings."""
+
+    results: List[QueryResult]
+    outcomes: List[NamespaceOutcome] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return all(not o.timed_out and o.error is None for o in self.outcomes)
+
+
+class FederatedVectorStore(VectorStore):
+    """Queries ``namespaces`` of ``store`` concurrently and merges the hits.
+
+    ``weights`` scales a namespace's merged scores (``score`` and ``rrf``).
+    ``max_workers`` defaults to ``MAX_CONCURRENCY``; ``deadline`` (seconds,
+    None = wait for all) bounds each federated query.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        namespaces: Sequence[str],
+        merge: str = "score",
+        normalize: str = "minmax",
+        weights: Optional[Dict[str, float]] = None,
+        deadline: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        settings: Optional[Settings] = None,
+    ):
+        if not namespaces:
+            raise ValueError("Federated search needs at least one namespace")
+        if merge not in MERGES:
+            raise ValueError(f"Unknown merge policy: {merge!r} (expected one of {MERGES})")
+        if normalize not in NORMALIZERS:
+            raise ValueError(f"Unknown normalization: {normalize!r} (expected one of {NORMALIZERS})")
+        self.settings = settings or get_settings()
+        self.store = store
+        self.backend = f"federated:{store.backend}"
+        self.namespaces = list(namespaces)
+        self.merge = merge
+        self.normalize = normalize
+        self.weights = dict(weights or {})
+        self.deadline = deadline
+        # One worker per namespace at least, so stragglers alone can never fill the pool
+        self.max_workers = max(max_workers or self.settings.max_concurrency, len(self.namespaces))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # Requests still running after their deadline, by namespace
+        self._stragglers: Dict[str, Future] = {}
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        # Long-lived, so a straggler past the deadline never blocks the caller on pool shutdown
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="federated")
+            return self._pool
+
+    def _fan_out(self, call: Any, deadline: Optional[float]) -> Tuple[Dict[str, Any], List[NamespaceOutcome]]:
+        """Run ``call(namespace)`` for every namespace; answers by namespace, plus outcomes."""
+        started: Dict[str, float] = {}
+        finished: Dict[str, float] = {}
+
+        def timed(namespace: str) -> Any:
+            started[namespace] = time.perf_counter()
+            try:
+                return call(namespace)
+            finally:
+                finished[namespace] = time.perf_counter()
+
+        with self._pool_lock:
+            busy = {ns for ns, future in self._stragglers.items() if not future.done()}
+            self._stragglers = {ns: self._stragglers[ns] for ns in busy}
+        futures = {namespace: self.pool.submit(timed, namespace) for namespace in self.namespaces if namespace not in busy}
+        wait(futures.values(), timeout=deadline)
+        answers, outcomes = {}, []
+        for namespace in self.namespaces:
+            outcome = NamespaceOutcome(namespace)
+            future = futures.get(namespace)
+            if future is None:
+                outcome.timed_out = True  # still busy with an earlier request
+            elif not future.done():
+                outcome.timed_out = True
+                if not future.cancel():
+                    with self._pool_lock:
+                        self._stragglers[namespace] = future
+            elif future.exception() is not None:
+                error = future.exception()
+                outcome.error = f"{type(error).__name__}: {error}"
+            else:
+                answers[namespace] = future.result()
+            if future is not None and namespace in finished:
+                outcome.seconds = finished[namespace] - started[namespace]
+            outcomes.append(outcome)
+        return answers, outcomes
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+    ) -> FederatedResult:
+        """Federated query with per-namespace outcomes; ``deadline`` overrides the store's."""
+        start = time.perf_counter()
+        answers, outcomes = self._fan_out(
+            lambda namespace: self.store.query(
+                text=text,
+                vector=vector,
+                top_k=top_k,
+                include_metadata=include_metadata,
+                include_vectors=include_vectors,
+                filter=filter,
+                namespace=namespace,
+            ),
+            self.deadline if deadline is None else deadline,
+        )
+        hits = {ns: answers[ns] for ns in self.namespaces if ns in answers}
+        for outcome in outcomes:
+            outcome.hits = len(hits.get(outcome.namespace, []))
+        merged = merge_results(hits, top_k, self.merge, self.normalize, self.weights)
+        return FederatedResult(merged, outcomes, time.perf_counter() - start)
+
+    # -- VectorStore API -------------------------------------------------
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        """Merged hits across all namespaces; ``namespace`` is ignored."""
+        return self.search(text, vector, top_k, include_metadata, include_vectors, filter).results
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        """One batched call per namespace, all namespaces concurrently."""
+        answers, _ = self._fan_out(
+            lambda ns: self.store.query_many(queries, include_metadata=include_metadata, include_vectors=include_vectors, namespace=ns),
+            self.deadline,
+        )
+        return [
+            merge_results(
+                {ns: answers[ns][i] for ns in self.namespaces if ns in answers},
+                q.top_k, self.merge, self.normalize, self.weights,
+            )
+            for i, q in enumerate(queries)
+        ]
+
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        return self.store.upsert(records, namespace)
+
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        return self.store.delete(ids, namespace)
+
+    def fetch(
+        self,
+        ids: Sequence[str],
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[Optional[VectorRecord]]:
+        return self.store.fetch(ids, include_vectors, include_metadata, namespace)
+
+    def info(self) -> StoreInfo:
+        info = self.store.info()
+        namespaces = {ns: info.namespaces.get(ns, 0) for ns in self.namespaces}
+        return replace(info, vector_count=sum(namespaces.values()), backend=self.backend, namespaces=namespaces)
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            self._stragglers.clear()
+        self.store.close()
+
+
+def create_federated_store(store: VectorStore, settings: Optional[Settings] = None, **overrides: Any) -> FederatedVectorStore:
+    """``FederatedVectorStore`` over ``store`` configured by the ``FEDERATED_*`` settings."""
+    settings = settings or get_settings()
+    options: Dict[str, Any] = {
+        "namespaces": parse_namespaces(settings.federated_namespaces) or [settings.foods_namespace, DEFAULT_NAMESPACE],
+        "merge": settings.federated_merge,
+        "normalize": settings.federated_normalize,
+        "deadline": settings.federated_deadline or None,
+        "settings": settings,
+    }
+    options.update(overrides)
+    return FederatedVectorStore(store, **options)
+
+
+def _weights(value: str) -> Dict[str, float]:
+    weights = {}
+    for pair in filter(None, value.split(",")):
+        name, _, weight = pair.partition("=")
+        weights[parse_namespaces(name)[0] if name.strip() else DEFAULT_NAMESPACE] = float(weight)
+    return weights
+
+
+def build_parser() -> argparse.ArgumentParser:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Query several namespaces concurrently and merge the hits")
+    parser.add_argument("question")
+    parser.add_argument("--store", default="upstash", help="Vector store backend")
+    parser.add_argument("--namespaces", default=settings.federated_namespaces or f"{settings.foods_namespace},{DEFAULT_ALIAS}",
+                        help=f"Comma-separated namespaces ({DEFAULT_ALIAS!r} = the default namespace)")
+    parser.add_argument("--merge", choices=MERGES, default=settings.federated_merge)
+    parser.add_argument("--normalize", choices=NORMALIZERS, default=settings.federated_normalize)
+    parser.add_argument("--weights", type=_weights, default={}, help="Per-namespace weights, e.g. foods=2,default=0.5")
+    parser.add_argument("--deadline", type=float, default=settings.federated_deadline or None, help="Seconds to wait for namespaces")
+    parser.add_argument("--top-k", type=int, default=settings.top_k)
+    parser.add_argument("--standins", action="store_true", help="Query a local Upstash stand-in with the catalog split across the namespaces")
+    parser.add_argument("--vector-latency", default="0", help="Stand-in latency per request (e.g. lognormal:median=0.05,sigma=0.3)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from ragfood.stores import create_vector_store
+
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    namespaces = parse_namespaces(args.namespaces)
+    standin = None
+    if args.standins:
+        from ragfood.catalog import food_records, load_food_data
+        from ragfood.standins import LatencyModel, UpstashStandIn
+
+        standin = UpstashStandIn(token="standin-token", latency=LatencyModel.parse(args.vector_latency, seed=42))
+        for i, record in enumerate(food_records(load_food_data())):
+            standin.store.upsert([record], namespace=namespaces[i % len(namespaces)])
+        standin.start()
+        settings = settings.replace(upstash_url=standin.url, upstash_token="standin-token")
+
+    try:
+        store = FederatedVectorStore(create_vector_store(args.store, settings), namespaces, args.merge,
+                                     args.normalize, args.weights, args.deadline, settings=settings)
+        result = store.search(args.question, top_k=args.top_k)
+        store.close()
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    print(f"🔎 {args.question!r} across {len(namespaces)} namespaces ({args.merge}, {args.normalize})")
+    for outcome in result.outcomes:
+        status = "⏱️ timed out" if outcome.timed_out else f"❌ {outcome.error}" if outcome.error else f"{outcome.hits} hits"
+        seconds = f"{outcome.seconds * 1000:8.1f} ms" if outcome.seconds is not None else f"{'—':>11}"
+        print(f"   {outcome.namespace or DEFAULT_ALIAS:<16} {seconds}  {status}")
+    slowest = max((o.seconds or 0.0 for o in result.outcomes), default=0.0)
+    total = sum(o.seconds or 0.0 for o in result.outcomes)
+    print(f"   {'federated':<16} {result.seconds * 1000:8.1f} ms  (slowest {slowest * 1000:.1f} ms, sum {total * 1000:.1f} ms)")
+    print()
+    for rank, hit in enumerate(result.results, 1):
+        print(f"{rank:>2}. [{hit.namespace or DEFAULT_ALIAS}] {hit.score:.4f}  {hit.text[:80]}")
+    return 0 if result.complete else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Latency Histograms
+==================
+
+HDR-style log-linear histogram for integer latencies (nanoseconds). Values
+are bucketed with a fixed number of significant decimal digits, so a
+histogram covering nanoseconds to hours stays a few kilobytes, merges by
+adding counts, and serializes to a sparse JSON-friendly dict.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class LatencyHistogram:
+    """Counts of non-negative integer values in log-linear buckets.
+
+    With ``significant_figures=3`` every recorded value is reported with a
+    relative error below 0.1%. ``min``, ``max`` and the mean are exact.
+    """
+
+    def __init__(self, significant_figures: int = 3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.significant_figures = significant_figures
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self._sub_count = 1 << self._sub_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    # -- bucketing -------------------------------------------------------
+
+    def _index(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self._sub_bits)
+        return (shift << self._sub_bits) + (value >> shift)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        shift, mantissa = index >> self._sub_bits, index & (self._sub_count - 1)
+        low = mantissa << shift
+        return low, low + (1 << shift) - 1
+
+    # -- recording -------------------------------------------------------
+
+    def record(self, value: int, count: int = 1) -> None:
+        """Add ``count`` occurrences of ``value`` (rounded to an int >= 0)."""
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_many(self, values: Iterable[int]) -> None:
+        for value in values:
+            self.record(value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add ``other``'s counts into this histogram and return self."""
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    # -- queries ---------------------------------------------------------
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> int:
+        """Value at quantile ``q`` (0-100), as the bucket's upper bound."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * min(max(q, 0.0), 100.0) / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._bounds(index)[1], self.max)
+        return self.max
+
+    def percentiles(self, quantiles: Iterable[float] = (50, 90, 99)) -> Dict[str, int]:
+        return {f"p{q:g}": self.percentile(q) for q in quantiles}
+
+    def buckets(self) -> List[Tuple[int, int, int]]:
+        """Non-empty ``(low, high, count)`` buckets in value order."""
+        return [(*self._bounds(index), self.counts[index]) for index in sorted(self.counts)]
+
+    # -- serialization ---------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "significant_figures": self.significant_figures,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": [[index, self.counts[index]] for index in sorted(self.counts)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data.get("significant_figures", 3))
+        histogram.counts = {int(index): int(count) for index, count in data.get("counts", [])}
+        histogram.count = int(data.get("count", sum(histogram.counts.values())))
+        histogram.total = int(data.get("total", 0))
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Usage Ledger
+============
+
+Append-only record of what every RAG request cost: model, prompt and
+completion tokens, whether the answer came from the response cache,
+latency and estimated USD cost (``ragfood.llm.estimate_cost``).
+
+The on-disk format is one tab-separated line per request under a
+versioned header, so a ledger is small, greppable and safe to append to
+from several threads::
+
+    #ragfood-ledger/1	ts	model	category	prompt_tokens	completion_tokens	cached	latency_ms	cost_usd	error
+    1760800000.125	llama-3.1-8b-instant	nutrition	412	96	0	612.402	2.828e-05	0
+
+Set ``USAGE_LEDGER=usage.tsv`` and ``RAGEngine`` records every query.
+Aggregate with::
+
+    python -m ragfood.ledger usage.tsv --by hour,model
+    python -m ragfood.ledger usage.tsv --by category --since 2025-10-01 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ragfood.config import Settings, get_settings
+from ragfood.llm import estimate_cost
+from ragfood.stats import quantile
+
+HEADER = "#ragfood-ledger/1"
+FIELDS = ("ts", "model", "category", "prompt_tokens", "completion_tokens", "cached", "latency_ms", "cost_usd", "error")
+GROUP_KEYS = ("hour", "day", "model", "category")
+UNCATEGORIZED = "uncategorized"
+
+
+def _clean(value: str) -> str:
+    return " ".join(value.split()) or "-"
+
+
+@dataclass
+class UsageEntry:
+    """One request. Cached entries keep the original token counts but cost nothing."""
+
+    ts: float
+    model: str
+    category: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached: bool
+    latency_ms: float
+    cost_usd: float
+    error: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def key(self, field: str) -> str:
+        if field == "hour":
+            return datetime.fromtimestamp(self.ts, timezone.utc).strftime("%Y-%m-%dT%H:00Z")
+        if field == "day":
+            return datetime.fromtimestamp(self.ts, timezone.utc).strftime("%Y-%m-%d")
+        if field in ("model", "category"):
+            return getattr(self, field)
+        raise ValueError(f"Unknown group key: {field!r} (expected one of {GROUP_KEYS})")
+
+    def to_line(self) -> str:
+        return "\t".join((
+            f"{self.ts:.3f}",
+            _clean(self.model),
+            _clean(self.category),
+            str(self.prompt_tokens),
+            str(self.completion_tokens),
+            "1" if self.cached else "0",
+            f"{self.latency_ms:.3f}",
+            f"{self.cost_usd:.6g}",
+            "1" if self.error else "0",
+        )) + "\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> "UsageEntry":
+        ts, model, category, prompt, completion, cached, latency, cost, error = line.rstrip("\n").split("\t")
+        return cls(float(ts), model, category, int(prompt), int(completion), cached == "1", float(latency), float(cost), error == "1")
+
+    @classmethod
+    def create(cls, model: str, prompt_tokens: int, completion_tokens: int, latency: float,
+               category: Optional[str] = None, cached: bool = False, error: bool = False,
+               ts: Optional[float] = None) -> "UsageEntry":
+        """Entry stamped now with its cost estimated; ``latency`` in seconds."""
+        return cls(
+            ts=datetime.now(timezone.utc).timestamp() if ts is None else ts,
+            model=model,
+            category=category or UNCATEGORIZED,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached=cached,
+            latency_ms=latency * 1000,
+            cost_usd=0.0 if cached else estimate_cost(model, prompt_tokens, completion_tokens),
+            error=error,
+        )
+
+    @classmethod
+    def from_response(cls, response: Any, latency: float, category: Optional[str] = None, model: str = "-") -> "UsageEntry":
+        """Entry for a ``RAGResponse``; ``model`` is used when nothing was generated."""
+        generation = response.generation
+        if generation is None:
+            return cls.create(model, 0, 0, latency, category, error=bool(response.error))
+        return cls.create(
+            generation.model, generation.usage.prompt_tokens, generation.usage.completion_tokens, latency,
+            category, cached=generation.cached, error=bool(response.error),
+        )
+
+
+class UsageLedger:
+    """Appends entries to a ledger file; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, entry: UsageEntry) -> None:
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if f.tell() == 0:
+                    f.write("\t".join((HEADER,) + FIELDS) + "\n")
+                f.write(entry.to_line())
+
+    def record(self, response: Any, latency: float, category: Optional[str] = None, model: str = "-") -> UsageEntry:
+        entry = UsageEntry.from_response(response, latency, category, model)
+        self.append(entry)
+        return entry
+
+    def __iter__(self) -> Iterator[UsageEntry]:
+        return read_ledger(self.path)
+
+
+def read_ledger(path: str) -> Iterator[UsageEntry]:
+    """Entries in file order; header and comment lines are skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            try:
+                yield UsageEntry.from_line(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: malformed ledger line ({e})") from None
+
+
+def create_usage_ledger(settings: Optional[Settings] = None, path: Optional[str] = None) -> Optional[UsageLedger]:
+    """Ledger at ``USAGE_LEDGER`` (or ``path``); None if unset."""
+    settings = settings or get_settings()
+    path = path or settings.usage_ledger
+    return UsageLedger(str(settings.resolve_path(path))) if path else None
+
+
+# -- aggregation -----------------------------------------------------------
+
+def aggregate(entries: Iterable[UsageEntry], by: Sequence[str] = ("model",)) -> List[Dict[str, Any]]:
+    """One row per distinct ``by`` key, sorted by key.
+
+    ``prompt_tokens``/``completion_tokens`` count tokens actually spent;
+    ``cached_tokens`` are those the response cache avoided.
+    """
+    for field in by:
+        if field not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key: {field!r} (expected one of {GROUP_KEYS})")
+    groups: Dict[Tuple[str, ...], List[UsageEntry]] = {}
+    for entry in entries:
+        groups.setdefault(tuple(entry.key(field) for field in by), []).append(entry)
+
+    rows = []
+    for key in sorted(groups):
+        group = groups[key]
+        spent = [e for e in group if not e.cached]
+        latencies = sorted(e.latency_ms for e in group)
+        rows.append({
+            **dict(zip(by, key)),
+            "requests": len(group),
+            "cached": len(group) - len(spent),
+            "errors": sum(1 for e in group if e.error),
+            "prompt_tokens": sum(e.prompt_tokens for e in spent),
+            "completion_tokens": sum(e.completion_tokens for e in spent),
+            "cached_tokens": sum(e.total_tokens for e in group if e.cached),
+            "cost_usd": sum(e.cost_usd for e in group),
+            "latency_ms_p50": quantile(latencies, 0.5),
+            "latency_ms_p95": quantile(latencies, 0.95),
+        })
+    return rows
+
+
+def totals(rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    summed = ("requests", "cached", "errors", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd")
+    return {name: sum(row[name] for row in rows) for name in summed}
+
+
+def format_table(rows: Sequence[Dict[str, Any]], by: Sequence[str]) -> str:
+    header = list(by) + ["requests", "cached", "errors", "prompt tok", "completion tok", "cached tok", "cost USD", "p50 ms", "p95 ms"]
+    lines = [[
+        *(str(row[field]) for field in by),
+        str(row["requests"]),
+        str(row["cached"]),
+        str(row["errors"]),
+        str(row["prompt_tokens"]),
+        str(row["completion_tokens"]),
+        str(row["cached_tokens"]),
+        f"{row['cost_usd']:.6f}",
+        f"{row['latency_ms_p50']:.1f}",
+        f"{row['latency_ms_p95']:.1f}",
+    ] for row in rows]
+    total = totals(rows)
+    lines.append([
+        "total", *([""] * (len(by) - 1)),
+        str(total["requests"]), str(total["cached"]), str(total["errors"]),
+        str(total["prompt_tokens"]), str(total["completion_tokens"]), str(total["cached_tokens"]),
+        f"{total['cost_usd']:.6f}", "", "",
+    ])
+    widths = [max(len(row[i]) for row in lines + [header]) for i in range(len(header))]
+    out = ["  ".join(cell.ljust(width) for cell, width in zip(header, widths))]
+    out.append("  ".join("-" * width for width in widths))
+    out.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in lines)
+    return "\n".join(out)
+
+
+def _parse_time(value: str) -> float:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Aggregate a usage ledger by hour, day, model and/or category")
+    parser.add_argument("ledger", nargs="?", help="Ledger file (default USAGE_LEDGER)")
+    parser.add_argument("--by", default="model", help=f"Comma-separated group keys from {', '.join(GROUP_KEYS)}")
+    parser.add_argument("--since", metavar="ISO", help="Only entries at or after this time (UTC unless offset given)")
+    parser.add_argument("--until", metavar="ISO", help="Only entries before this time")
+    parser.add_argument("--model", help="Only this model")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON instead of a table")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    path = args.ledger or (str(settings.resolve_path(settings.usage_ledger)) if settings.usage_ledger else None)
+    if not path:
+        print("❌ No ledger given and USAGE_LEDGER is not set")
+        return 2
+    if not os.path.exists(path):
+        print(f"❌ Ledger not found: {path}")
+        return 2
+    by = [field.strip() for field in args.by.split(",") if field.strip()]
+    since = _parse_time(args.since) if args.since else None
+    until = _parse_time(args.until) if args.until else None
+    entries = (
+        e for e in read_ledger(path)
+        if (since is None or e.ts >= since) and (until is None or e.ts < until) and (args.model is None or e.model == args.model)
+    )
+    rows = aggregate(entries, by)
+    if args.json:
+        print(json.dumps({"by": by, "rows": rows, "totals": totals(rows)}, indent=2))
+    else:
+        print(format_table(rows, by))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""
+LLM Providers
+=============
+
+One interface for every generation backend the project has used:
+
+- ``GroqProvider``: Groq Cloud chat completions (current production path)
+- ``OllamaProvider``: local Ollama ``/api/generate`` (original local version)
+- ``StubProvider``: deterministic offline answers for tests and load runs
+
+Each provider offers sync, async, streaming and batch generation and
+returns the same ``Generation`` record with token usage and timings.
+"""
+
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ragfood.config import Settings, get_settings
+
+Messages = List[Dict[str, str]]
+
+
+@dataclass
+class Usage:
+    """Token counts reported by (or estimated for) one generation."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class Generation:
+    """Uniform result of a generation call, including timings in seconds."""
+
+    text: str
+    model: str
+    provider: str
+    usage: Usage = field(default_factory=Usage)
+    latency: float = 0.0
+    time_to_first_token: Optional[float] = None
+    finish_reason: Optional[str] = None
+    cached: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "model": self.model,
+            "provider": self.provider,
+            "prompt_tokens": self.usage.prompt_tokens,
+            "completion_tokens": self.usage.completion_tokens,
+            "latency": self.latency,
+            "time_to_first_token": self.time_to_first_token,
+            "finish_reason": self.finish_reason,
+            "cached": self.cached,
+        }
+
+
+# Groq on-demand pricing, USD per 1M (prompt, completion) tokens
+TOKEN_PRICES_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of one call; models without a price (local, stub) are free."""
+    prices = TOKEN_PRICES_PER_MILLION.get(model)
+    if prices is None:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when a backend reports none."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def render_prompt(messages: Messages) -> str:
+    """Flatten chat messages into a single prompt for completion-style APIs."""
+    return "\n\n".join(m["content"] for m in messages if m.get("content"))
+
+
+class GenerationStream:
+    """Iterator over text deltas; ``generation`` is populated once exhausted."""
+
+    def __init__(self, provider: "LLMProvider", messages: Messages, params: Dict[str, Any]):
+        self._provider = provider
+        self._messages = messages
+        self._params = params
+        self.generation: Optional[Generation] = None
+
+    def __iter__(self) -> Iterator[str]:
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        parts: List[str] = []
+        usage: Optional[Usage] = None
+        finish_reason: Optional[str] = None
+        for delta, chunk_usage, chunk_finish in self._provider._stream(self._messages, self._params):
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(delta)
+                yield delta
+            if chunk_usage is not None:
+                usage = chunk_usage
+            if chunk_finish:
+                finish_reason = chunk_finish
+        text = "".join(parts).strip()
+        if usage is None:
+            usage = Usage(estimate_tokens(render_prompt(self._messages)), estimate_tokens(text))
+        self.generation = Generation(
+            text=text,
+            model=self._params["model"],
+            provider=self._provider.name,
+            usage=usage,
+            latency=time.perf_counter() - start,
+            time_to_first_token=first_token,
+            finish_reason=finish_reason,
+        )
+
+    def collect(self) -> Generation:
+        """Consume the stream and return the final ``Generation``."""
+        for _ in self:
+            pass
+        return self.generation
+
+
+class LLMProvider:
+    """Base class; subclasses implement ``_complete`` and ``_stream``."""
+
+    name = "base"
+
+    def __init__(self, settings: Optional[Settings] = None, model: Optional[str] = None):
+        self.settings = settings or get_settings()
+        self.model = model or self.default_model()
+
+    def default_model(self) -> str:
+        return self.settings.groq_model
+
+    def _params(self, temperature: Optional[float], max_tokens: Optional[int]) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "temperature": self.settings.temperature if temperature is None else temperature,
+            "max_tokens": self.settings.max_tokens if max_tokens is None else max_tokens,
+        }
+
+    def _complete(self, messages: Messages, params: Dict[str, Any]) -> Tuple[str, Optional[Usage], Optional[str]]:
+        """Return ``(text, usage, finish_reason)`` for a non-streaming call."""
+        raise NotImplementedError
+
+    def _stream(self, messages: Messages, params: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Usage], Optional[str]]]:
+        """Yield ``(delta, usage, finish_reason)``; default wraps ``_complete``."""
+        yield self._complete(messages, params)
+
+    def generate(self, messages: Messages, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> Generation:
+        """Generate a full response synchronously."""
+        params = self._params(temperature, max_tokens)
+        start = time.perf_counter()
+        text, usage, finish_reason = self._complete(messages, params)
+        latency = time.perf_counter() - start
+        if usage is None:
+            usage = Usage(estimate_tokens(render_prompt(messages)), estimate_tokens(text))
+        return Generation(
+            text=text.strip(),
+            model=params["model"],
+            provider=self.name,
+            usage=usage,
+            latency=latency,
+            time_to_first_token=latency,
+            finish_reason=finish_reason,
+        )
+
+    async def agenerate(self, messages: Messages, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> Generation:
+        """Async wrapper running ``generate`` on the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.generate(messages, temperature, max_tokens))
+
+    def stream(self, messages: Messages, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> GenerationStream:
+        """Stream text deltas; read ``stream.generation`` after iterating."""
+        return GenerationStream(self, messages, self._params(temperature, max_tokens))
+
+    def generate_batch(
+        self,
+        batch: Sequence[Messages],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Generation]:
+        """Generate for many prompts concurrently, preserving input order."""
+        workers = max(1, min(max_concurrency or self.settings.max_concurrency, len(batch) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda m: self.generate(m, temperature, max_tokens), batch))
+
+
+class GroqProvider(LLMProvider):
+    """Groq Cloud chat completions (``llama-3.1-8b-instant`` by default)."""
+
+    name = "groq"
+
+    def __init__(self, settings: Optional[Settings] = None, model: Optional[str] = None, client: Any = None):
+        super().__init__(settings, model)
+        if client is None:
+            from groq import Groq
+
+            if not self.settings.groq_api_key:
+                raise ValueError("Missing GROQ_API_KEY in .env file")
+            kwargs: Dict[str, Any] = {"api_key": self.settings.groq_api_key, "timeout": self.settings.llm_timeout}
+            if self.settings.groq_base_url:
+                kwargs["base_url"] = self.settings.groq_base_url
+            client = Groq(**kwargs)
+        self.client = client
+
+    def _request(self, messages: Messages, params: Dict[str, Any], stream: bool) -> Any:
+        return self.client.chat.completions.create(
+            model=params["model"],
+            messages=messages,
+            temperature=params["temperature"],
+            max_completion_tokens=params["max_tokens"],
+            top_p=1.0,
+            stream=stream,
+        )
+
+    @staticmethod
+    def _usage(raw: Any) -> Optional[Usage]:
+        if raw is None:
+            return None
+        return Usage(prompt_tokens=raw.prompt_tokens, completion_tokens=raw.completion_tokens)
+
+    def _complete(self, messages: Messages, params: Dict[str, Any]) -> Tuple[str, Optional[Usage], Optional[str]]:
+        completion = self._request(messages, params, stream=False)
+        choice = completion.choices[0]
+        return choice.message.content or "", self._usage(completion.usage), choice.finish_reason
+
+    def _stream(self, messages: Messages, params: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Usage], Optional[str]]]:
+        for chunk in self._request(messages, params, stream=True):
+            choice = chunk.choices[0] if chunk.choices else None
+            delta = choice.delta.content if choice and choice.delta else None
+            # Groq reports usage on the final chunk under x_groq
+            x_groq = getattr(chunk, "x_groq", None)
+            usage = self._usage(getattr(x_groq, "usage", None) or getattr(chunk, "usage", None))
+            yield delta or "", usage, choice.finish_reason if choice else None
+
+
+class OllamaProvider(LLMProvider):
+    """Local Ollama completions via ``/api/generate`` (``llama3.2`` by default)."""
+
+    name = "ollama"
+
+    def default_model(self) -> str:
+        return self.settings.llm_model
+
+    def _post(self, messages: Messages, params: Dict[str, Any], stream: bool) -> Any:
+        import requests
+
+        return requests.post(
+            f"{self.settings.ollama_host}/api/generate",
+            json={
+                "model": params["model"],
+                "prompt": render_prompt(messages),
+                "stream": stream,
+                "options": {"temperature": params["temperature"], "num_predict": params["max_tokens"]},
+            },
+            timeout=self.settings.llm_timeout,
+            stream=stream,
+        )
+
+    @staticmethod
+    def _usage(body: Dict[str, Any]) -> Optional[Usage]:
+        if "eval_count" not in body:
+            return None
+        return Usage(prompt_tokens=body.get("prompt_eval_count", 0), completion_tokens=body["eval_count"])
+
+    def _complete(self, messages: Messages, params: Dict[str, Any]) -> Tuple[str, Optional[Usage], Optional[str]]:
+        response = self._post(messages, params, stream=False)
+        response.raise_for_status()
+        body = response.json()
+        return body["response"], self._usage(body), body.get("done_reason")
+
+    def _stream(self, messages: Messages, params: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Usage], Optional[str]]]:
+        response = self._post(messages, params, stream=True)
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            body = json.loads(line)
+            done = body.get("done", False)
+            yield body.get("response", ""), self._usage(body) if done else None, body.get("done_reason") if done else None
+
+
+class StubProvider(LLMProvider):
+    """Deterministic offline provider.
+
+    Answers by quoting the start of the supplied context, so the same
+    prompt always yields the same text and token counts. Optional
+    ``first_token_delay`` and ``token_delay`` (seconds) simulate model speed
+    for load tests without a network.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        model: str = "stub-echo",
+        first_token_delay: float = 0.0,
+        token_delay: float = 0.0,
+    ):
+        super().__init__(settings, model)
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    def answer_words(self, messages: Messages, max_tokens: int) -> List[str]:
+        """The deterministic answer as whitespace-terminated word tokens."""
+        prompt = messages[-1]["content"] if messages else ""
+        context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0].strip()
+        words = ("Based on the provided context: " + (context or "no relevant information was found.")).split()
+        return [w + " " for w in words[:max_tokens]]
+
+    def _complete(self, messages: Messages, params: Dict[str, Any]) -> Tuple[str, Optional[Usage], Optional[str]]:
+        words = self.answer_words(messages, params["max_tokens"])
+        delay = self.first_token_delay + self.token_delay * len(words)
+        if delay:
+            time.sleep(delay)
+        text = "".join(words)
+        return text, Usage(estimate_tokens(render_prompt(messages)), len(words)), "stop"
+
+    def _stream(self, messages: Messages, params: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Usage], Optional[str]]]:
+        words = self.answer_words(messages, params["max_tokens"])
+        if self.first_token_delay:
+            time.sleep(self.first_token_delay)
+        for i, word in enumerate(words):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            last = i == len(words) - 1
+            usage = Usage(estimate_tokens(render_prompt(messages)), len(words)) if last else None
+            yield word, usage, "stop" if last else None
+
+
+PROVIDERS = ("groq", "ollama", "stub")
+
+
+def create_llm_provider(name: str, settings: Optional[Settings] = None, **kwargs: Any) -> LLMProvider:
+    """Build an ``LLMProvider`` by name."""
+    if name == "groq":
+        return GroqProvider(settings, **kwargs)
+    if name == "ollama":
+        return OllamaProvider(settings, **kwargs)
+    if name == "stub":
+        return StubProvider(settings, **kwargs)
+    raise ValueError(f"Unknown LLM provider: {name!r} (expected one of {PROVIDERS})")
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Open-loop Load Generator
+========================
+
+Issues RAG queries at a fixed arrival rate regardless of how fast earlier
+requests complete, sweeping target QPS to find where the system saturates.
+
+Every request has an *intended* start time on the arrival schedule and its
+latency is measured from that time, not from when a worker picked it up.
+When the system falls behind, queueing delay therefore shows up in the
+percentiles instead of silently lowering the offered load (coordinated
+omission). Service time (from actual dispatch) is reported alongside.
+
+    python -m ragfood.loadgen --standins --config upstash+groq --qps 5,10,20,40 --duration 10
+    python -m ragfood.loadgen --config upstash+groq --sweep 2:20:2 --output curve.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ragfood.benchmark import StandIns, build_engine, environment, parse_config
+from ragfood.config import Settings, get_settings
+from ragfood.engine import RAGEngine
+from ragfood.histogram import LatencyHistogram
+from ragfood.workload import QueryMix, parse_weights
+
+SCHEMA = "ragfood-loadgen/1"
+
+ARRIVALS = ("constant", "poisson")
+
+Target = Callable[[str], Any]
+
+
+def engine_target(engine: RAGEngine) -> Target:
+    """Run a full RAG query; a response carrying an error counts as a failure."""
+    def call(question: str) -> Any:
+        response = engine.query(question)
+        if response.error:
+            raise RuntimeError(response.error)
+        return response
+    return call
+
+
+def arrival_offsets(rate: float, duration: float, arrivals: str = "constant", seed: int = 0) -> List[int]:
+    """Intended start offsets (ns) for ``rate`` requests/s over ``duration`` s."""
+    if rate <= 0:
+        raise ValueError("Target rate must be positive")
+    horizon = int(duration * 1e9)
+    if arrivals == "constant":
+        interval = 1e9 / rate
+        return [int(i * interval) for i in range(max(1, int(rate * duration)))]
+    if arrivals == "poisson":
+        rng = random.Random(seed)
+        offsets, t = [], 0.0
+        while True:
+            t += rng.expovariate(rate) * 1e9
+            if t >= horizon:
+                return offsets or [0]
+            offsets.append(int(t))
+    raise ValueError(f"Unknown arrival process: {arrivals!r} (expected one of {ARRIVALS})")
+
+
+@dataclass
+class LoadStep:
+    """Outcome of one constant-rate step."""
+
+    target_qps: float
+    duration: float
+    offered: int = 0
+    completed: int = 0
+    errors: int = 0
+    dropped: int = 0
+    elapsed: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    service: LatencyHistogram = field(default_factory=LatencyHistogram)
+    max_lag_ns: int = 0
+    by_category: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    error_types: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def achieved_qps(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return (self.errors + self.dropped) / self.offered if self.offered else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        def ms(histogram: LatencyHistogram) -> Dict[str, float]:
+            return {key: round(value / 1e6, 3) for key, value in histogram.percentiles((50, 90, 99, 99.9)).items()}
+
+        return {
+            "target_qps": self.target_qps,
+            "achieved_qps": round(self.achieved_qps, 3),
+            "duration_s": self.duration,
+            "elapsed_s": round(self.elapsed, 3),
+            "offered": self.offered,
+            "completed": self.completed,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "error_rate": round(self.error_rate, 4),
+            "error_types": dict(self.error_types),
+            "latency_ms": {**ms(self.latency), "mean": round(self.latency.mean / 1e6, 3), "max": round((self.latency.max or 0) / 1e6, 3)},
+            "service_ms": {**ms(self.service), "mean": round(self.service.mean / 1e6, 3)},
+            "max_dispatch_lag_ms": round(self.max_lag_ns / 1e6, 3),
+            "by_category_ms": {name: ms(h) for name, h in sorted(self.by_category.items())},
+            "latency_histogram": self.latency.to_dict(),
+        }
+
+
+class LoadGenerator:
+    """Drives ``target`` with open-loop arrivals drawn from a ``QueryMix``.
+
+    ``workers`` bounds concurrent requests; arrivals beyond that wait in the
+    executor queue (and their wait counts toward latency). Arrivals while
+    ``max_outstanding`` requests are already queued or running are dropped
+    and counted as errors, so an overloaded step cannot exhaust memory.
+    """
+
+    def __init__(
+        self,
+        target: Target,
+        mix: QueryMix,
+        workers: int = 64,
+        max_outstanding: int = 10000,
+        arrivals: str = "constant",
+        seed: int = 0,
+    ):
+        self.target = target
+        self.mix = mix
+        self.workers = workers
+        self.max_outstanding = max_outstanding
+        self.arrivals = arrivals
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._last_finish = 0
+
+    def _execute(self, step: LoadStep, intended: int, category: str, question: str) -> None:
+        clock = time.perf_counter_ns
+        started = clock()
+        error: Optional[Exception] = None
+        try:
+            self.target(question)
+        except Exception as e:
+            error = e
+        finished = clock()
+        with self._lock:
+            self._outstanding -= 1
+            self._last_finish = max(self._last_finish, finished)
+            if error is not None:
+                step.errors += 1
+                name = type(error).__name__
+                step.error_types[name] = step.error_types.get(name, 0) + 1
+                return
+            step.completed += 1
+            step.latency.record(finished - intended)
+            step.service.record(finished - started)
+            step.by_category.setdefault(category, LatencyHistogram()).record(finished - intended)
+
+    def run_step(self, rate: float, duration: float) -> LoadStep:
+        """Offer ``rate`` requests/s for ``duration`` seconds and wait for all."""
+        step = LoadStep(target_qps=rate, duration=duration)
+        offsets = arrival_offsets(rate, duration, self.arrivals, self.seed)
+        requests = self.mix.take(len(offsets))
+        clock = time.perf_counter_ns
+        self._outstanding = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="loadgen") as pool:
+            start = clock()
+            self._last_finish = start
+            for offset, (category, question) in zip(offsets, requests):
+                intended = start + offset
+                delay = intended - clock()
+                if delay > 0:
+                    time.sleep(delay / 1e9)
+                step.max_lag_ns = max(step.max_lag_ns, clock() - intended)
+                step.offered += 1
+                with self._lock:
+                    if self._outstanding >= self.max_outstanding:
+                        step.dropped += 1
+                        step.error_types["Dropped"] = step.error_types.get("Dropped", 0) + 1
+                        continue
+                    self._outstanding += 1
+                pool.submit(self._execute, step, intended, category, question)
+        step.elapsed = (max(self._last_finish, start + offsets[-1]) - start) / 1e9
+        return step
+
+    def sweep(
+        self,
+        rates: Sequence[float],
+        duration: float,
+        max_error_rate: Optional[float] = None,
+        max_p99_ms: Optional[float] = None,
+        progress: bool = False,
+    ) -> List[LoadStep]:
+        """Run each rate in turn, stopping early once a step breaches a limit."""
+        steps = []
+        for rate in rates:
+            step = self.run_step(rate, duration)
+            steps.append(step)
+            if progress:
+                print(format_step(step))
+            p99_ms = step.latency.percentile(99) / 1e6
+            if (max_error_rate is not None and step.error_rate > max_error_rate) or (max_p99_ms is not None and p99_ms > max_p99_ms):
+                if progress:
+                    print(f"   ⛔ Limit breached at {rate:g} QPS - stopping sweep")
+                break
+        return steps
+
+
+def saturation_point(steps: Sequence[LoadStep], tolerance: float = 0.95, max_error_rate: float = 0.01) -> Optional[float]:
+    """Highest target QPS the system kept up with (achieved >= tolerance * target)."""
+    sustained = [
+        s.target_qps for s in steps
+        if s.achieved_qps >= tolerance * s.target_qps and s.error_rate <= max_error_rate
+    ]
+    return max(sustained) if sustained else None
+
+
+def format_step(step: LoadStep) -> str:
+    pct = step.latency.percentiles((50, 90, 99))
+    return (
+        f"   {step.target_qps:>8g} {step.achieved_qps:>9.2f} {step.error_rate:>7.1%} "
+        f"{pct['p50'] / 1e6:>9.1f} {pct['p90'] / 1e6:>9.1f} {pct['p99'] / 1e6:>9.1f} "
+        f"{step.service.percentile(99) / 1e6:>11.1f}"
+    )
+
+
+STEP_HEADER = f"   {'target':>8} {'achieved':>9} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'svc p99 ms':>11}"
+
+
+def format_curve(steps: Sequence[LoadStep], width: int = 40) -> str:
+    """ASCII throughput-latency curve: one bar per step, scaled to p99."""
+    worst = max((s.latency.percentile(99) for s in steps), default=0) or 1
+    lines = []
+    for step in steps:
+        p99 = step.latency.percentile(99)
+        bar = "█" * max(1, round(width * p99 / worst))
+        lines.append(f"   {step.achieved_qps:>8.2f} q/s |{bar} {p99 / 1e6:.1f} ms")
+    return "\n".join(lines)
+
+
+def build_report(steps: Sequence[LoadStep], config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "schema": SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": config,
+        "saturation_qps": saturation_point(steps),
+        "curve": [
+            {"target_qps": s.target_qps, "achieved_qps": round(s.achieved_qps, 3), "p99_ms": round(s.latency.percentile(99) / 1e6, 3), "error_rate": round(s.error_rate, 4)}
+            for s in steps
+        ],
+        "steps": [s.to_dict() for s in steps],
+    }
+
+
+def parse_rates(qps: Optional[str], sweep: Optional[str]) -> List[float]:
+    """``--qps 1,2,5`` or ``--sweep start:stop:step`` (inclusive)."""
+    if sweep:
+        start, stop, step = (float(part) for part in sweep.split(":"))
+        if step <= 0:
+            raise ValueError("Sweep step must be positive")
+        rates, rate = [], start
+        while rate <= stop + 1e-9:
+            rates.append(round(rate, 6))
+            rate += step
+        return rates
+    return [float(part) for part in (qps or "1,2,5,10").split(",") if part.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Open-loop constant-arrival-rate load generator")
+    parser.add_argument("--config", default="upstash+groq", metavar="STORE+LLM", help="Backend configuration (default upstash+groq)")
+    parser.add_argument("--qps", help="Comma-separated target rates (default 1,2,5,10)")
+    parser.add_argument("--sweep", metavar="START:STOP:STEP", help="Linear sweep of target rates")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--arrivals", choices=ARRIVALS, default="constant")
+    parser.add_argument("--workers", type=int, default=64, help="Maximum concurrent requests")
+    parser.add_argument("--max-outstanding", type=int, default=10000, help="Queued + running requests before arrivals are dropped")
+    parser.add_argument("--weights", help='Category weights, e.g. "Nutritional Query=3,Complex Query=0.5"')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Keep the engine response cache enabled")
+    parser.add_argument("--max-error-rate", type=float, default=0.5, help="Stop the sweep above this error rate")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Stop the sweep above this p99")
+    parser.add_argument("--output", metavar="JSON", help="Write the saturation curve report here")
+    parser.add_argument("--standins", action="store_true", help="Run against local Upstash/Groq stand-ins")
+    parser.add_argument("--vector-latency", default="0", help="Stand-in Upstash latency spec")
+    parser.add_argument("--llm-ttft", default="0", help="Stand-in Groq time-to-first-token spec")
+    parser.add_argument("--llm-token-latency", default="0", help="Stand-in Groq per-token latency spec")
+    return parser
+
+
+def run(args: argparse.Namespace, settings: Settings, food_data: List[Dict[str, Any]]) -> List[LoadStep]:
+    store_backend, llm_backend = parse_config(args.config)
+    # Repeated mix queries would otherwise be served from the response cache
+    engine = build_engine(store_backend, llm_backend, settings, food_data, cache_size=None if args.cache else 0)
+    mix = QueryMix(weights=parse_weights(args.weights), seed=args.seed)
+    generator = LoadGenerator(engine_target(engine), mix, args.workers, args.max_outstanding, args.arrivals, args.seed)
+    rates = parse_rates(args.qps, args.sweep)
+    print(f"🚦 Open-loop sweep on {args.config}: {', '.join(f'{r:g}' for r in rates)} QPS, {args.duration:g}s per step ({args.arrivals} arrivals)")
+    print(STEP_HEADER)
+    try:
+        return generator.sweep(rates, args.duration, args.max_error_rate, args.max_p99_ms, progress=True)
+    finally:
+        engine.store.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    from ragfood.catalog import load_food_data
+
+    food_data = load_food_data()
+    if args.standins:
+        with StandIns(settings, food_data, args.vector_latency, args.llm_ttft, args.llm_token_latency) as standin_settings:
+            steps = run(args, standin_settings, food_data)
+    else:
+        steps = run(args, settings, food_data)
+
+    print("\n📈 Throughput vs p99 latency:")
+    print(format_curve(steps))
+    knee = saturation_point(steps)
+    print(f"\n🎯 Saturation: {'sustained up to %g QPS' % knee if knee else 'no step was sustained'}")
+
+    if args.output:
+        config = {key: value for key, value in vars(args).items() if key != "output"}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(build_report(steps, config), f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Memory Benchmark
+================
+
+Runs catalog ingestion and a batch of RAG queries under ``tracemalloc``
+and reports, per phase, how much traced memory (Python objects and NumPy
+buffers) was retained and the peak reached, the process RSS, and the top
+allocation sites. Each run also reports bytes per indexed item. Runs at
+several catalog scales (the catalog replicated ``N`` times with fresh ids)
+give the marginal cost per item, which excludes fixed overhead.
+
+``--ingest materialize`` builds the full ``VectorRecord`` list before
+upserting, as the legacy ingestion scripts do. ``--ingest stream`` feeds
+the store a generator, so compare the two to see what streaming saves.
+
+    python -m ragfood.memory_bench --scale 1,4,16 --queries 50
+    python -m ragfood.memory_bench --ingest materialize --ingest stream --output memory.json
+
+Peak RSS is reset between phases where the kernel allows it (Linux
+``/proc/self/clear_refs``). Otherwise it is the process high-water mark.
+With ``--standins`` the Upstash stand-in runs in this process, so its
+index counts towards the numbers.
+"""
+
+import argparse
+import gc
+import itertools
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from ragfood.benchmark import DEFAULT_QUERIES, StandIns, environment, write_report
+from ragfood.catalog import food_records, load_food_data
+from ragfood.config import Settings, get_settings
+from ragfood.engine import RAGEngine
+from ragfood.llm import PROVIDERS, create_llm_provider
+from ragfood.stores import BACKENDS, create_vector_store
+
+SCHEMA = "ragfood-memory/1"
+INGEST_MODES = ("stream", "materialize")
+
+# Allocation sites that belong to the measurement, not the code under test
+_IGNORED_SITES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def scaled_catalog(food_data: Sequence[Dict[str, Any]], copies: int) -> Iterator[Dict[str, Any]]:
+    """Yield the catalog ``copies`` times; copies after the first get ``<id>-<n>`` ids."""
+    for copy in range(copies):
+        for item in food_data:
+            yield item if copy == 0 else {**item, "id": f"{item['id']}-{copy}"}
+
+
+# -- RSS -------------------------------------------------------------------
+
+def rss() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size in bytes (None where unavailable)."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {"current": int(fields["VmRSS"].split()[0]) * 1024, "peak": int(fields["VmHWM"].split()[0]) * 1024}
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return {"current": None, "peak": None}
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"current": None, "peak": peak if sys.platform == "darwin" else peak * 1024}
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux only); True on success."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# -- tracking --------------------------------------------------------------
+
+@dataclass
+class AllocationSite:
+    """Net memory allocated at one source line during a phase."""
+
+    site: str
+    size: int
+    count: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"site": self.site, "bytes": self.size, "count": self.count}
+
+
+@dataclass
+class PhaseMemory:
+    """Traced memory for one phase, relative to the run's starting point."""
+
+    name: str
+    seconds: float
+    delta: int
+    retained: int
+    peak: int
+    rss: Dict[str, Optional[int]]
+    top: List[AllocationSite] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "seconds": round(self.seconds, 4),
+            "delta_bytes": self.delta,
+            "retained_bytes": self.retained,
+            "peak_bytes": self.peak,
+            "rss_bytes": self.rss.get("current"),
+            "peak_rss_bytes": self.rss.get("peak"),
+            "top_allocations": [site.to_dict() for site in self.top],
+        }
+
+
+class MemoryTracker:
+    """Measures consecutive phases with ``tracemalloc``.
+
+    ``delta`` is the change over the phase; ``retained`` and ``peak`` are
+    measured from when the tracker was created. ``top`` sites come from a
+    snapshot diff, so set it to 0 to skip snapshots on very large runs.
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        self.top = top
+        self.phases: List[PhaseMemory] = []
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(frames)
+        gc.collect()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        gc.collect()
+        before_snapshot = None
+        overhead = 0
+        if self.top:
+            ahead = tracemalloc.get_traced_memory()[0]
+            before_snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_SITES)
+            overhead = tracemalloc.get_traced_memory()[0] - ahead
+        before = tracemalloc.get_traced_memory()[0]
+        reset_peak_rss()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        memory = PhaseMemory(
+            name,
+            seconds,
+            delta=current - before,
+            retained=current - overhead - self.baseline,
+            peak=peak - overhead - self.baseline,
+            rss=rss(),
+        )
+        if before_snapshot is not None:
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED_SITES)
+            memory.top = [
+                AllocationSite(str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+                for stat in after.compare_to(before_snapshot, "lineno")[: self.top * 2]
+                if stat.size_diff > 0
+            ][: self.top]
+            del after, before_snapshot
+        self.phases.append(memory)
+
+    def close(self) -> None:
+        if self._started:
+            tracemalloc.stop()
+
+
+@dataclass
+class MemoryRun:
+    """Phases plus per-item figures for one (backend, scale, ingest mode)."""
+
+    name: str
+    items: int
+    queries: int
+    config: Dict[str, Any]
+    phases: List[PhaseMemory]
+
+    def phase(self, name: str) -> Optional[PhaseMemory]:
+        return next((p for p in self.phases if p.name == name), None)
+
+    @property
+    def index_bytes(self) -> int:
+        """Memory still held once ingestion finished (the index itself)."""
+        return self.phase("ingest").retained
+
+    @property
+    def ingest_peak(self) -> int:
+        return max(p.peak for p in self.phases if p.name in ("records", "ingest"))
+
+    @property
+    def bytes_per_item(self) -> float:
+        return self.index_bytes / self.items if self.items else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "config": self.config,
+            "items": self.items,
+            "queries": self.queries,
+            "index_bytes": self.index_bytes,
+            "ingest_peak_bytes": self.ingest_peak,
+            "bytes_per_item": round(self.bytes_per_item, 1),
+            "peak_bytes_per_item": round(self.ingest_peak / self.items, 1) if self.items else 0.0,
+            "phases": [p.to_dict() for p in self.phases],
+        }
+
+
+def _warm_up(food_data: Sequence[Dict[str, Any]], store_backend: str, llm_backend: str, settings: Settings) -> None:
+    """Untracked mini-run so lazy imports and module caches do not count as index memory."""
+    store = create_vector_store(store_backend, settings)
+    try:
+        store.upsert(food_records(food_data[:2]), namespace="membench-warmup")
+        RAGEngine(store, create_llm_provider(llm_backend, settings), settings, namespace="membench-warmup").query(DEFAULT_QUERIES[0])
+        if store_backend != "memory":
+            store.delete([str(item["id"]) for item in food_data[:2]], namespace="membench-warmup")
+    finally:
+        store.close()
+
+
+def run_memory_benchmark(
+    food_data: Sequence[Dict[str, Any]],
+    scale: int = 1,
+    queries: int = 20,
+    ingest: str = "stream",
+    store_backend: str = "memory",
+    llm_backend: str = "stub",
+    settings: Optional[Settings] = None,
+    top: int = 10,
+) -> MemoryRun:
+    """Ingest ``scale`` copies of the catalog into a fresh store, then query it.
+
+    Phases: ``records`` (materialize only: build the full record list),
+    ``ingest`` (upsert) and ``query`` (``queries`` full RAG queries).
+    """
+    if ingest not in INGEST_MODES:
+        raise ValueError(f"Unknown ingest mode: {ingest!r} (expected one of {INGEST_MODES})")
+    settings = settings or get_settings()
+    namespace = f"membench-{scale}x"
+    _warm_up(food_data, store_backend, llm_backend, settings)
+    tracker = MemoryTracker(top=top)
+    store = None
+    try:
+        store = create_vector_store(store_backend, settings)
+        records: Any = food_records(scaled_catalog(food_data, scale))
+        if ingest == "materialize":
+            with tracker.phase("records"):
+                records = list(records)
+        with tracker.phase("ingest"):
+            items = store.upsert(records, namespace=namespace)
+            records = None
+        engine = RAGEngine(store, create_llm_provider(llm_backend, settings), settings, namespace=namespace)
+        with tracker.phase("query"):
+            for question in itertools.islice(itertools.cycle(DEFAULT_QUERIES), queries):
+                engine.query(question)
+        if store_backend != "memory":
+            ids = [str(item["id"]) for item in scaled_catalog(food_data, scale)]
+            store.delete(ids, namespace=namespace)
+    finally:
+        if store is not None:
+            store.close()
+        tracker.close()
+    return MemoryRun(
+        f"{store_backend}+{llm_backend} {scale}x {ingest}",
+        items,
+        queries,
+        {"store": store_backend, "llm": llm_backend, "scale": scale, "ingest": ingest},
+        tracker.phases,
+    )
+
+
+def marginal_bytes_per_item(runs: Sequence[MemoryRun]) -> Optional[float]:
+    """Least-squares slope of index bytes over item count (fixed cost excluded)."""
+    points = [(run.items, run.index_bytes) for run in runs]
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x, _ in points)
+
+
+def format_bytes(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def format_run(run: MemoryRun, top: int = 5) -> str:
+    lines = [
+        f"🧮 {run.name}: {run.items} items, {run.queries} queries",
+        f"   index {format_bytes(run.index_bytes)} ({format_bytes(run.bytes_per_item)}/item), "
+        f"ingest peak {format_bytes(run.ingest_peak)}",
+        f"   {'phase':<8} {'seconds':>8} {'delta':>11} {'peak':>11} {'RSS':>11} {'peak RSS':>11}",
+    ]
+    for p in run.phases:
+        lines.append(
+            f"   {p.name:<8} {p.seconds:>8.3f} {format_bytes(p.delta):>11} {format_bytes(p.peak):>11} "
+            f"{format_bytes(p.rss.get('current')):>11} {format_bytes(p.rss.get('peak')):>11}"
+        )
+    for p in run.phases:
+        if p.top[:top]:
+            lines.append(f"   top allocations during {p.name}:")
+            lines.extend(f"     {format_bytes(site.size):>11} {site.count:>7} blocks  {site.site}" for site in p.top[:top])
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="tracemalloc memory benchmark for ingestion and queries")
+    parser.add_argument("--store", default="memory", choices=BACKENDS)
+    parser.add_argument("--llm", default="stub", choices=PROVIDERS)
+    parser.add_argument("--scale", default="1", help="Comma-separated catalog multiples, e.g. 1,4,16")
+    parser.add_argument("--queries", type=int, default=20, help="RAG queries after ingestion")
+    parser.add_argument("--ingest", action="append", choices=INGEST_MODES, help="Ingestion mode (repeatable, default stream)")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites per phase (0 skips snapshots)")
+    parser.add_argument("--standins", action="store_true", help="Run upstash/groq against in-process stand-ins")
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    scales = sorted({int(s) for s in args.scale.split(",") if s.strip()})
+    settings = get_settings()
+    food_data = load_food_data()
+    runs: List[MemoryRun] = []
+
+    def run_all(run_settings: Settings) -> None:
+        for ingest in args.ingest or ["stream"]:
+            for scale in scales:
+                run = run_memory_benchmark(food_data, scale, args.queries, ingest, args.store, args.llm, run_settings, args.top)
+                print(format_run(run))
+                runs.append(run)
+            slope = marginal_bytes_per_item([r for r in runs if r.config["ingest"] == ingest])
+            if slope is not None:
+                print(f"📈 {ingest}: marginal index cost {format_bytes(slope)} per item")
+
+    if args.standins:
+        with StandIns(settings, food_data) as standin_settings:
+            run_all(standin_settings)
+    else:
+        run_all(settings)
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment(),
+            "runs": [run.to_dict() for run in runs],
+            "marginal_bytes_per_item": {
+                ingest: marginal_bytes_per_item([r for r in runs if r.config["ingest"] == ingest])
+                for ingest in args.ingest or ["stream"]
+            },
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""
+Metrics Registry
+================
+
+In-process counters, gauges and histograms rendered in the Prometheus text
+exposition format (``GET /metrics`` on the query service).
+
+Recording is lock-cheap: every metric keeps a small set of stripes, each
+thread is pinned to one stripe, and an update takes only that stripe's
+(almost always uncontended) lock. Scrapes sum the stripes.
+
+``RAGMetrics`` defines the pipeline metrics and ``MetricsSpanExporter``
+feeds them from finished ``ragfood.tracing`` traces, so the engine needs
+no extra instrumentation.
+"""
+
+import bisect
+import itertools
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ragfood.llm import estimate_cost
+from ragfood.tracing import Span, SpanExporter
+
+STRIPES = 8
+
+# Seconds; spans sub-millisecond retrieval through multi-second generation
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+HIT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+_stripe_counter = itertools.count()
+_thread_stripe = threading.local()
+
+
+def _stripe() -> int:
+    index = getattr(_thread_stripe, "index", None)
+    if index is None:
+        index = _thread_stripe.index = next(_stripe_counter) % STRIPES
+    return index
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Striped:
+    """Per-stripe lists of floats guarded by per-stripe locks."""
+
+    __slots__ = ("_locks", "_values")
+
+    def __init__(self, width: int):
+        self._locks = [threading.Lock() for _ in range(STRIPES)]
+        self._values = [[0.0] * width for _ in range(STRIPES)]
+
+    def add(self, slot: int, amount: float) -> None:
+        i = _stripe()
+        with self._locks[i]:
+            self._values[i][slot] += amount
+
+    def add_many(self, updates: Iterable[Tuple[int, float]]) -> None:
+        i = _stripe()
+        with self._locks[i]:
+            row = self._values[i]
+            for slot, amount in updates:
+                row[slot] += amount
+
+    def set(self, slot: int, value: float) -> None:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for row in self._values:
+                row[slot] = 0.0
+            self._values[0][slot] = value
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def totals(self) -> List[float]:
+        width = len(self._values[0])
+        totals = [0.0] * width
+        for lock, row in zip(self._locks, self._values):
+            with lock:
+                for slot in range(width):
+                    totals[slot] += row[slot]
+        return totals
+
+
+class Metric:
+    """Base for labelled metric families."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        """Child for one label combination (created once, then cached)."""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """``(suffix, label string, value)`` triples for exposition."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = _Striped(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._cells.add(0, amount)
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [("_total" if not self.name.endswith("_total") else "", _format_labels(self.labelnames, values), child.value)
+                for values, child in sorted(self._children.items())]
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.add(0, amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._cells.add(0, -amount)
+
+    def set(self, value: float) -> None:
+        self._cells.set(0, value)
+
+    def track(self) -> "_InFlight":
+        """``with gauge.track():`` increments for the duration of the block."""
+        return _InFlight(self)
+
+
+class _InFlight:
+    __slots__ = ("_gauge",)
+
+    def __init__(self, gauge: _GaugeChild):
+        self._gauge = gauge
+
+    def __enter__(self) -> None:
+        self._gauge.inc()
+
+    def __exit__(self, *exc: object) -> None:
+        self._gauge.dec()
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [("", _format_labels(self.labelnames, values), child.value) for values, child in sorted(self._children.items())]
+
+
+class GaugeFunc(Metric):
+    """Gauge whose labelled values are computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], func: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, documentation, labelnames)
+        self.func = func
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [("", _format_labels(self.labelnames, values), value) for values, value in sorted(self.func().items())]
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_cells")
+
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = bounds
+        # One slot per bucket (+Inf last), then sum
+        self._cells = _Striped(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        bucket = bisect.bisect_left(self._bounds, value)
+        self._cells.add_many(((bucket, 1.0), (len(self._bounds) + 1, value)))
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Cumulative bucket counts, total count and sum."""
+        totals = self._cells.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples = []
+        for values, child in sorted(self._children.items()):
+            cumulative, count, total = child.snapshot()
+            for bound, value in zip(self.buckets + (math.inf,), cumulative):
+                samples.append(("_bucket", _format_labels(self.labelnames, values, ("le", _format_value(bound))), value))
+            samples.append(("_count", _format_labels(self.labelnames, values), count))
+            samples.append(("_sum", _format_labels(self.labelnames, values), total))
+        return samples
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Trace span name -> stage label
+PIPELINE_STAGES = {
+    "rag.query": "total",
+    "normalize": "normalize",
+    "cache.lookup": "cache_lookup",
+    "retrieval": "retrieval",
+    "filter": "filter",
+    "rerank": "rerank",
+    "context.assembly": "context",
+    "llm.first_token": "llm_first_token",
+    "llm.completion": "llm_completion",
+}
+
+
+class RAGMetrics:
+    """The pipeline metrics exposed by the query service."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.stage_latency = r.histogram("ragfood_stage_latency_seconds", "RAG pipeline stage latency", ["stage"])
+        self.queries = r.counter("ragfood_queries_total", "RAG queries by outcome", ["status"])
+        self.retrieval_hits = r.histogram("ragfood_retrieval_hits", "Sources returned per retrieval", buckets=HIT_BUCKETS)
+        self.cache_requests = r.counter("ragfood_cache_requests_total", "Cache lookups by result", ["cache", "result"])
+        self.cache_hit_ratio = r.register(GaugeFunc("ragfood_cache_hit_ratio", "Cache hits / lookups since start", ["cache"], self._hit_ratios))
+        self.in_flight = r.gauge("ragfood_in_flight_requests", "Requests currently being served", ["endpoint"])
+        self.tokens = r.counter("ragfood_llm_tokens_total", "LLM tokens by model and direction", ["model", "type"])
+        self.cost = r.counter("ragfood_llm_cost_usd_total", "Estimated LLM spend in USD", ["model"])
+        self.http_requests = r.counter("ragfood_http_requests_total", "HTTP requests by path and status", ["path", "status"])
+
+    def _hit_ratios(self) -> Dict[Tuple[str, ...], float]:
+        lookups: Dict[str, List[float]] = {}
+        for (cache, result), child in list(self.cache_requests._children.items()):
+            lookups.setdefault(cache, [0.0, 0.0])[0 if result == "hit" else 1] += child.value
+        return {(cache,): hits / (hits + misses) for cache, (hits, misses) in lookups.items() if hits + misses}
+
+    def observe_trace(self, spans: Sequence[Span]) -> None:
+        """Turn one finished ``rag.query`` trace into metric updates."""
+        for span in spans:
+            stage = PIPELINE_STAGES.get(span.name)
+            if stage is not None:
+                self.stage_latency.labels(stage).observe(span.duration_ns / 1e9)
+            attributes = span.attributes
+            if span.name == "rag.query":
+                status = "error" if span.status == "ERROR" else "fallback" if attributes.get("fallback") else "ok"
+                self.queries.labels(status).inc()
+            elif span.name == "retrieval" and "hits" in attributes:
+                self.retrieval_hits.observe(attributes["hits"])
+            elif span.name == "cache.lookup" and "cache_hit" in attributes:
+                self.cache_requests.labels("response", "hit" if attributes["cache_hit"] else "miss").inc()
+            elif span.name == "llm.completion":
+                model = attributes.get("model", "unknown")
+                prompt_tokens = attributes.get("prompt_tokens") or 0
+                completion_tokens = attributes.get("completion_tokens") or 0
+                self.tokens.labels(model, "prompt").inc(prompt_tokens)
+                self.tokens.labels(model, "completion").inc(completion_tokens)
+                self.cost.labels(model).inc(estimate_cost(model, prompt_tokens, completion_tokens))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class MetricsSpanExporter(SpanExporter):
+    """Span exporter that records pipeline metrics from each trace."""
+
+    def __init__(self, metrics: RAGMetrics):
+        self.metrics = metrics
+
+    def export(self, spans: List[Span]) -> None:
+        self.metrics.observe_trace(spans)
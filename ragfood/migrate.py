@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Chroma → Upstash Migration
+==========================
+
+Copies a persisted Chroma collection into an Upstash Vector namespace
+without embedding anything again. Vectors, ids and documents are streamed
+out of the collection a page at a time and sent as raw-vector upserts, so
+migrating costs no embedding requests and no embedding time.
+
+Two readers export the collection:
+
+- ``chromadb``: the Chroma client's paged ``collection.get``, used when
+  ``chromadb`` is installed
+- ``sqlite``: reads ``chroma.sqlite3`` directly. Chroma keeps recent
+  writes in its write-ahead log (``embeddings_queue``) until the HNSW
+  segment is flushed, and ``archive/chroma_db.backup`` was never flushed,
+  so every vector is still there. Collections whose vectors moved into
+  the HNSW segment need the ``chromadb`` reader
+
+Vectors are only worth copying when the target embeds queries with the
+model that produced them: the target index must have the source's
+dimension, and its embedding model (if it has one) must match
+``--source-model`` (``EMBED_MODEL`` by default). The integrity report
+compares namespace counts before and after, and fetches a random sample
+of migrated vectors back to compare them with their sources.
+
+Usage::
+
+    python -m ragfood.migrate --source archive/chroma_db.backup --dry-run
+    python -m ragfood.migrate --source archive/chroma_db.backup --namespace foods --output migration.json
+    python -m ragfood.migrate --source archive/chroma_db.backup --standins
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.benchmark import environment, write_report
+from ragfood.config import get_settings
+from ragfood.stores.base import StoreInfo, VectorRecord, VectorStore
+from ragfood.stores.chroma import restore_metadata
+
+SCHEMA = "ragfood-migration/1"
+READERS = ("auto", "chromadb", "sqlite")
+
+# Chroma write-ahead log operations (chromadb.types.Operation)
+ADD, UPDATE, UPSERT, DELETE = 0, 1, 2, 3
+DOCUMENT_KEY = "chroma:document"
+
+# Largest per-component difference between unit-normalized source and
+# target vectors that still counts as the same vector (float32 round trips)
+VECTOR_TOLERANCE = 1e-5
+
+
+def vector_checksum(vector: Sequence[float]) -> str:
+    """Short SHA-256 of the vector's little-endian float32 bytes."""
+    return hashlib.sha256(np.asarray(vector, dtype="<f4").tobytes()).hexdigest()[:16]
+
+
+def model_key(name: Optional[str]) -> str:
+    """Comparable form of an embedding model name.
+
+    ``mxbai-embed-large:latest`` (Ollama) and ``MXBAI_EMBED_LARGE_V1``
+    (Upstash) both become ``mxbaiembedlarge``.
+    """
+    base = (name or "").split(":")[0].lower()
+    return re.sub(r"v\d+$", "", re.sub(r"[^a-z0-9]", "", base))
+
+
+def check_compatible(dimension: int, source_model: Optional[str], target: StoreInfo, force: bool = False) -> None:
+    """Raise ``ValueError`` unless ``target`` can take the source vectors as they are."""
+    if target.dimension and target.dimension != dimension:
+        raise ValueError(f"Target index has dimension {target.dimension}, the collection has {dimension}")
+    if force or not target.embedding_model:
+        return
+    if model_key(target.embedding_model) != model_key(source_model):
+        raise ValueError(
+            f"Target index embeds with {target.embedding_model}, the collection was embedded with "
+            f"{source_model or 'an unknown model'}; queries would not match the copied vectors (--force to copy anyway)"
+        )
+
+
+# -- readers -----------------------------------------------------------------
+
+
+class ChromaExport:
+    """Pages of ``VectorRecord`` from one persisted Chroma collection."""
+
+    reader = ""
+
+    def __init__(self, path: str, collection: str):
+        self.path = path
+        self.collection = collection
+        self.dimension: Optional[int] = None
+        self.space = "l2"
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def pages(self, page_size: int = 100) -> Iterator[List[VectorRecord]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def _record(id: str, vector: Any, document: Optional[str], metadata: Optional[Dict[str, Any]]) -> VectorRecord:
+    return VectorRecord(
+        id=str(id),
+        vector=np.asarray(vector, dtype=np.float32).tolist(),
+        data=document,
+        metadata=restore_metadata(metadata),
+    )
+
+
+class SqliteChromaExport(ChromaExport):
+    """Reads the collection's write-ahead log straight from ``chroma.sqlite3``.
+
+    Only the latest log entry per id is exported; deleted ids are skipped
+    and ``UPDATE`` entries are replayed over the id's earlier history.
+    """
+
+    reader = "sqlite"
+
+    def __init__(self, path: str, collection: str):
+        super().__init__(path, collection)
+        database = os.path.join(path, "chroma.sqlite3")
+        if not os.path.exists(database):
+            raise FileNotFoundError(f"No chroma.sqlite3 in {path}")
+        self.db = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+        row = self.db.execute("SELECT id, dimension, config_json_str FROM collections WHERE name = ?", (collection,)).fetchone()
+        if row is None:
+            raise ValueError(f"No collection named {collection!r} in {path}")
+        self.collection_id, self.dimension = row[0], row[1]
+        config = json.loads(row[2] or "{}")
+        self.space = ((config.get("vector_index") or {}).get("hnsw") or {}).get("space", "l2")
+        self._latest = dict(self.db.execute(
+            "SELECT id, MAX(seq_id) FROM embeddings_queue WHERE topic LIKE ? GROUP BY id", (f"%/{self.collection_id}",)
+        ))
+        latest = set(self._latest.values())
+        self._live = sum(1 for seq_id, operation in self.db.execute(
+            "SELECT seq_id, operation FROM embeddings_queue WHERE topic LIKE ?", (f"%/{self.collection_id}",)
+        ) if seq_id in latest and operation != DELETE)
+        stored = self.db.execute(
+            "SELECT COUNT(*) FROM embeddings e JOIN segments s ON e.segment_id = s.id WHERE s.collection = ?",
+            (self.collection_id,),
+        ).fetchone()[0]
+        if stored > self._live:
+            raise ValueError(
+                f"{stored - self._live} of {stored} vectors in {collection!r} were flushed to the HNSW segment; "
+                "install chromadb to export them"
+            )
+
+    def count(self) -> int:
+        return self._live
+
+    def pages(self, page_size: int = 100) -> Iterator[List[VectorRecord]]:
+        cursor = 0
+        while True:
+            rows = self.db.execute(
+                "SELECT seq_id, id, operation, vector, encoding, metadata FROM embeddings_queue "
+                "WHERE topic LIKE ? AND seq_id > ? ORDER BY seq_id LIMIT ?",
+                (f"%/{self.collection_id}", cursor, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            cursor = rows[-1][0]
+            page = [row for row in rows if self._latest.get(row[1]) == row[0] and row[2] != DELETE]
+            if page:
+                yield [self._decode(row) for row in page]
+
+    def _decode(self, row: Sequence[Any]) -> VectorRecord:
+        _, id, operation, vector, encoding, metadata = row
+        if operation == UPDATE or vector is None:
+            vector, metadata = self._replay(id)
+        elif encoding != "FLOAT32":
+            raise ValueError(f"Unsupported vector encoding {encoding!r} for id {id!r}")
+        else:
+            vector, metadata = np.frombuffer(vector, dtype="<f4"), json.loads(metadata or "{}")
+        metadata = dict(metadata)
+        return _record(id, vector, metadata.pop(DOCUMENT_KEY, None), metadata)
+
+    def _replay(self, id: str) -> Any:
+        """Vector and metadata of ``id`` after applying its whole log history."""
+        vector, metadata = None, {}
+        for operation, blob, encoding, changes in self.db.execute(
+            "SELECT operation, vector, encoding, metadata FROM embeddings_queue WHERE topic LIKE ? AND id = ? ORDER BY seq_id",
+            (f"%/{self.collection_id}", id),
+        ):
+            changes = json.loads(changes or "{}")
+            if operation == DELETE:
+                vector, metadata = None, {}
+                continue
+            if blob is not None:
+                if encoding != "FLOAT32":
+                    raise ValueError(f"Unsupported vector encoding {encoding!r} for id {id!r}")
+                vector = np.frombuffer(blob, dtype="<f4")
+            if operation == UPDATE:
+                metadata.update(changes)
+                metadata = {k: v for k, v in metadata.items() if v is not None}
+            else:
+                metadata = changes
+        if vector is None:
+            raise ValueError(f"No vector for id {id!r} in the write-ahead log")
+        return vector, metadata
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class ClientChromaExport(ChromaExport):
+    """Pages through the collection with the ``chromadb`` client."""
+
+    reader = "chromadb"
+
+    def __init__(self, path: str, collection: str):
+        super().__init__(path, collection)
+        import chromadb
+
+        self.client = chromadb.PersistentClient(path=path)
+        self.handle = self.client.get_collection(collection)
+        self.space = (self.handle.metadata or {}).get("hnsw:space", "l2")
+        first = self.handle.get(limit=1, include=["embeddings"])
+        if len(first["ids"]):
+            self.dimension = len(first["embeddings"][0])
+
+    def count(self) -> int:
+        return self.handle.count()
+
+    def pages(self, page_size: int = 100) -> Iterator[List[VectorRecord]]:
+        offset = 0
+        while True:
+            got = self.handle.get(limit=page_size, offset=offset, include=["embeddings", "documents", "metadatas"])
+            if not len(got["ids"]):
+                return
+            yield [
+                _record(id, got["embeddings"][i], got["documents"][i], got["metadatas"][i])
+                for i, id in enumerate(got["ids"])
+            ]
+            offset += len(got["ids"])
+
+
+def open_chroma_export(path: str, collection: str = "foods", reader: str = "auto") -> ChromaExport:
+    """Exporter for ``collection`` under ``path``; ``auto`` prefers the chromadb client."""
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader: {reader!r} (expected one of {READERS})")
+    if reader == "chromadb":
+        return ClientChromaExport(path, collection)
+    if reader == "auto":
+        try:
+            return ClientChromaExport(path, collection)
+        except ImportError:
+            pass
+    return SqliteChromaExport(path, collection)
+
+
+# -- migration ---------------------------------------------------------------
+
+
+def _namespace_count(store: VectorStore, namespace: str) -> int:
+    return store.info().namespaces.get(namespace, 0)
+
+
+def _settled_count(store: VectorStore, namespace: str, expected: int, timeout: float) -> int:
+    """Namespace count, polled until it reaches ``expected`` (Upstash indexes asynchronously)."""
+    deadline = time.monotonic() + timeout
+    count = _namespace_count(store, namespace)
+    while count < expected and time.monotonic() < deadline:
+        time.sleep(0.5)
+        count = _namespace_count(store, namespace)
+    return count
+
+
+def _reservoir(sample: List[VectorRecord], record: VectorRecord, seen: int, size: int, rng: random.Random) -> None:
+    if len(sample) < size:
+        sample.append(record)
+    else:
+        slot = rng.randrange(seen)
+        if slot < size:
+            sample[slot] = record
+
+
+def verify_sample(target: VectorStore, sample: Sequence[VectorRecord], namespace: str) -> List[Dict[str, Any]]:
+    """Fetch sampled records back from ``target`` and compare them with the source.
+
+    Cosine indexes may store vectors normalized, so vectors match when
+    their unit-normalized forms agree within ``VECTOR_TOLERANCE``; the raw
+    checksums show whether the bytes survived unchanged.
+    """
+    found = target.fetch([r.id for r in sample], include_vectors=True, namespace=namespace) if sample else []
+    checks = []
+    for record, stored in zip(sample, found):
+        check: Dict[str, Any] = {"id": record.id, "source_checksum": vector_checksum(record.vector)}
+        if stored is None or stored.vector is None:
+            check.update(target_checksum=None, max_error=None, match=False)
+        else:
+            source = np.asarray(record.vector, dtype=np.float32)
+            copied = np.asarray(stored.vector, dtype=np.float32)
+            error = float(np.abs(source / np.linalg.norm(source) - copied / np.linalg.norm(copied)).max()) if len(copied) == len(source) else float("inf")
+            check.update(
+                target_checksum=vector_checksum(copied),
+                max_error=error,
+                match=error <= VECTOR_TOLERANCE and stored.data == record.data,
+            )
+        checks.append(check)
+    return checks
+
+
+def migrate(
+    source: ChromaExport,
+    target: Optional[VectorStore],
+    namespace: str = "",
+    page_size: int = 100,
+    sample: int = 20,
+    source_model: Optional[str] = None,
+    force: bool = False,
+    settle: float = 30.0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Stream ``source`` into ``target`` as raw-vector upserts and build the integrity report.
+
+    ``target=None`` is a dry run: the collection is read and sampled but
+    nothing is written.
+    """
+    info = target.info() if target is not None else None
+    if info is not None:
+        check_compatible(source.dimension, source_model, info, force)
+    before = _namespace_count(target, namespace) if target is not None else 0
+
+    total = source.count()
+    rng = random.Random(seed)
+    samples: List[VectorRecord] = []
+    migrated = new = pages = 0
+    start = time.perf_counter()
+    for page in source.pages(page_size):
+        if target is not None:
+            existing = target.fetch([r.id for r in page], include_metadata=False, namespace=namespace)
+            new += sum(1 for r in existing if r is None)
+            target.upsert(page, namespace=namespace)
+        for record in page:
+            migrated += 1
+            _reservoir(samples, record, migrated, sample, rng)
+        pages += 1
+        print(f"   📦 {migrated:,} / {total:,} vectors", end="\r", flush=True)
+    seconds = time.perf_counter() - start
+    print()
+
+    report: Dict[str, Any] = {
+        "schema": SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "source": {
+            "path": source.path,
+            "collection": source.collection,
+            "reader": source.reader,
+            "count": total,
+            "dimension": source.dimension,
+            "space": source.space,
+            "model": source_model,
+        },
+        "dry_run": target is None,
+        "migrated": migrated,
+        "pages": pages,
+        "seconds": seconds,
+        "vectors_per_second": migrated / seconds if seconds else 0.0,
+        "embedding_requests": 0,
+    }
+    if target is None:
+        report["samples"] = [{"id": r.id, "source_checksum": vector_checksum(r.vector)} for r in samples]
+        report["ok"] = migrated == total
+        return report
+
+    expected = before + new
+    after = _settled_count(target, namespace, expected, settle)
+    checks = verify_sample(target, samples, namespace)
+    report["target"] = {
+        "backend": target.backend,
+        "namespace": namespace,
+        "dimension": info.dimension,
+        "model": info.embedding_model,
+    }
+    report["counts"] = {
+        "source": total,
+        "before": before,
+        "new": new,
+        "overwritten": migrated - new,
+        "expected": expected,
+        "after": after,
+        "match": after == expected and migrated == total,
+    }
+    report["samples"] = checks
+    report["ok"] = report["counts"]["match"] and all(c["match"] for c in checks)
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    source = report["source"]
+    lines = [
+        f"Source:   {source['path']} [{source['collection']}] via {source['reader']}: "
+        f"{source['count']:,} vectors × {source['dimension']} ({source['space']})",
+        f"Copied:   {report['migrated']:,} vectors in {report['pages']} pages, {report['seconds']:.2f}s "
+        f"({report['vectors_per_second']:,.0f}/s), {report['embedding_requests']} embedding requests",
+    ]
+    if report["dry_run"]:
+        lines.append("Dry run:  nothing written")
+        return "\n".join(lines)
+    counts = report["counts"]
+    target = report["target"]
+    lines.append(
+        f"Target:   {target['backend']} namespace {target['namespace']!r} ({target['model'] or 'raw vectors'}): "
+        f"{counts['before']:,} → {counts['after']:,} ({counts['new']:,} new, {counts['overwritten']:,} overwritten) "
+        f"{'✅' if counts['match'] else '❌ expected ' + format(counts['expected'], ',')}"
+    )
+    matched = sum(1 for c in report["samples"] if c["match"])
+    lines.append(f"Samples:  {matched}/{len(report['samples'])} vectors match {'✅' if matched == len(report['samples']) else '❌'}")
+    for check in report["samples"]:
+        if not check["match"]:
+            lines.append(f"   ❌ {check['id']}: {check['source_checksum']} → {check['target_checksum']} (max error {check['max_error']})")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Copy a persisted Chroma collection into Upstash Vector without re-embedding")
+    parser.add_argument("--source", default=settings.chroma_dir, help="Chroma persist directory")
+    parser.add_argument("--collection", default=settings.chroma_collection)
+    parser.add_argument("--reader", choices=READERS, default="auto")
+    parser.add_argument("--namespace", default=settings.foods_namespace, help="Upstash namespace to write")
+    parser.add_argument("--page-size", type=int, default=settings.upsert_batch_size, help="Vectors read and upserted per batch")
+    parser.add_argument("--sample", type=int, default=20, help="Migrated vectors fetched back and compared")
+    parser.add_argument("--source-model", default=settings.embed_model, help="Model that embedded the collection")
+    parser.add_argument("--force", action="store_true", help="Copy even if the target's embedding model differs")
+    parser.add_argument("--dry-run", action="store_true", help="Read and checksum the collection, write nothing")
+    parser.add_argument("--standins", action="store_true", help="Migrate into a local Upstash stand-in (raw-vector index)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", metavar="JSON", help="Write the integrity report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    path = str(settings.resolve_path(args.source))
+    try:
+        source = open_chroma_export(path, args.collection, args.reader)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📂 {source.count():,} vectors in {path} [{args.collection}] ({source.reader} reader)")
+
+    standin = None
+    try:
+        target = None
+        if not args.dry_run:
+            from ragfood.stores.upstash import UpstashVectorStore
+
+            if args.standins:
+                from ragfood.standins import UpstashStandIn
+
+                standin = UpstashStandIn(dimension=source.dimension, embedding_model=None)
+                standin.start()
+                settings = settings.replace(upstash_url=standin.url, upstash_token="standin-token")
+            target = UpstashVectorStore(settings)
+        try:
+            report = migrate(source, target, args.namespace, args.page_size, args.sample, args.source_model, args.force, seed=args.seed)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    finally:
+        source.close()
+        if standin is not None:
+            standin.stop()
+
+    print(format_report(report))
+    if args.output:
+        write_report(report, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Query Profiling
+===============
+
+Opt-in CPU profiles of individual RAG queries, written in formats flame
+graph tools read directly:
+
+- ``.collapsed``: one ``frame;frame;frame weight`` line per stack (Brendan
+  Gregg's collapsed format, for ``flamegraph.pl``/inferno/speedscope)
+- ``.speedscope.json``: speedscope's ``sampled`` file format
+
+Two profilers, both limited to the thread running the query:
+
+- ``SamplingProfiler`` ("sample"): a background thread snapshots the
+  stack every ``interval`` seconds; weights are sample counts. Cheap, but
+  blind to queries shorter than the interval.
+- ``TracingProfiler`` ("trace"): ``sys.setprofile`` hook charging exact
+  self time (nanoseconds) to every Python and C call stack. Slower, but
+  complete.
+
+``ProfileRecorder`` writes one profile per request and keeps the aggregate
+over all of them. Enable with ``PROFILE=sample|trace`` (``PROFILE_DIR``
+sets where files go), ``RAGEngine.query(..., profile=True)`` or the
+``--profile`` flag of the CLI and batch entry points.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ragfood.config import PROJECT_ROOT, Settings, get_settings
+
+PROFILE_MODES = ("sample", "trace")
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+Stack = Tuple[str, ...]
+
+
+def frame_label(code: Any) -> str:
+    """``function (path:line)`` with paths shortened to the project or package."""
+    filename = code.co_filename
+    if filename.startswith(str(PROJECT_ROOT)):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        marker = "site-packages" + os.sep
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+        else:
+            filename = os.path.basename(filename)
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+
+
+class StackProfile:
+    """Weighted call stacks (root first) plus how many requests they cover."""
+
+    def __init__(self, unit: str = "samples", name: str = "ragfood"):
+        self.unit = unit
+        self.name = name
+        self.stacks: Counter = Counter()
+        self.requests = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.stacks.values())
+
+    def merge(self, other: "StackProfile") -> None:
+        self.stacks.update(other.stacks)
+        self.requests += other.requests
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Frames with the most self weight."""
+        leaves: Counter = Counter()
+        for stack, weight in self.stacks.items():
+            leaves[stack[-1]] += weight
+        return leaves.most_common(n)
+
+    def to_collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {weight}\n" for stack, weight in sorted(self.stacks.items()) if stack and weight)
+
+    def to_speedscope(self) -> Dict[str, Any]:
+        frames: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, weight in sorted(self.stacks.items()):
+            if stack and weight:
+                samples.append([frames.setdefault(label, len(frames)) for label in stack])
+                weights.append(weight)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "ragfood.profiling",
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.name} ({self.requests} requests)",
+                "unit": "nanoseconds" if self.unit == "nanoseconds" else "none",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write(self, path: str, format: str = "collapsed") -> str:
+        if format not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format: {format!r} (expected one of {PROFILE_FORMATS})")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if format == "collapsed":
+                f.write(self.to_collapsed())
+            else:
+                json.dump(self.to_speedscope(), f)
+        return path
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread that enters it every ``interval`` seconds."""
+
+    unit = "samples"
+
+    def __init__(self, interval: float = 0.001, name: str = "ragfood"):
+        self.interval = interval
+        self.profile = StackProfile(self.unit, name)
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        labels: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.profile.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, name="ragfood-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.profile.requests += 1
+
+
+class TracingProfiler:
+    """Charges exact self time to each call stack via ``sys.setprofile``."""
+
+    unit = "nanoseconds"
+
+    def __init__(self, name: str = "ragfood"):
+        self.profile = StackProfile(self.unit, name)
+        self._stack: List[Stack] = [()]
+        self._labels: Dict[Any, str] = {}
+        self._last = 0
+        self._previous: Any = None
+
+    def _label(self, frame: Any, event: str, arg: Any) -> str:
+        key = arg if event == "c_call" else frame.f_code
+        label = self._labels.get(key)
+        if label is None:
+            if event == "c_call":
+                owner = getattr(arg, "__self__", None)
+                prefix = f"{type(owner).__name__}." if owner is not None and not isinstance(owner, type(sys)) else ""
+                label = f"{prefix}{getattr(arg, '__name__', repr(arg))} (builtin)"
+            else:
+                label = frame_label(frame.f_code)
+            self._labels[key] = label
+        return label
+
+    def _callback(self, frame: Any, event: str, arg: Any) -> None:
+        now = time.perf_counter_ns()
+        current = self._stack[-1]
+        if current:
+            self.profile.stacks[current] += now - self._last
+        if event == "call" or event == "c_call":
+            self._stack.append(current + (self._label(frame, event, arg),))
+        elif len(self._stack) > 1:
+            self._stack.pop()
+        self._last = time.perf_counter_ns()
+
+    def __enter__(self) -> "TracingProfiler":
+        self._previous = sys.getprofile()
+        self._last = time.perf_counter_ns()
+        sys.setprofile(self._callback)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        sys.setprofile(self._previous)
+        self.profile.requests += 1
+
+
+def sibling_path(results_path: str, label: str, extension: str) -> str:
+    """``results/bench.json`` -> ``results/bench.<label><extension>``."""
+    stem, _ = os.path.splitext(results_path)
+    return f"{stem}.{label}{extension}"
+
+
+def create_profiler(mode: str, interval: float = 0.001, name: str = "ragfood"):
+    if mode == "sample":
+        return SamplingProfiler(interval, name)
+    if mode == "trace":
+        return TracingProfiler(name)
+    raise ValueError(f"Unknown profile mode: {mode!r} (expected one of {PROFILE_MODES})")
+
+
+class _RequestProfile:
+    """Context manager returned by ``ProfileRecorder.profile``."""
+
+    def __init__(self, recorder: "ProfileRecorder", label: str):
+        self.recorder = recorder
+        self.label = label
+        self.profiler = create_profiler(recorder.mode, recorder.interval, label)
+        self.path: Optional[str] = None
+
+    def __enter__(self) -> "_RequestProfile":
+        self.profiler.__enter__()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.profiler.__exit__(*exc)
+        self.path = self.recorder.finish(self.profiler.profile)
+
+
+class ProfileRecorder:
+    """Profiles requests one at a time and aggregates them.
+
+    Each request is written to ``directory`` as ``<timestamp>-<n>.<ext>``
+    (unless ``per_request`` is False); ``write_aggregate`` writes the sum.
+    """
+
+    def __init__(self, mode: str = "sample", directory: str = "profiles", format: str = "collapsed",
+                 interval: float = 0.001, per_request: bool = True):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode!r} (expected one of {PROFILE_MODES})")
+        if format not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format: {format!r} (expected one of {PROFILE_FORMATS})")
+        self.mode = mode
+        self.directory = directory
+        self.format = format
+        self.interval = interval
+        self.per_request = per_request
+        self.aggregate = StackProfile("samples" if mode == "sample" else "nanoseconds", "aggregate")
+        self.paths: List[str] = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def extension(self) -> str:
+        return ".collapsed" if self.format == "collapsed" else ".speedscope.json"
+
+    def profile(self, label: str = "rag.query") -> _RequestProfile:
+        """``with recorder.profile("rag.query"):`` profiles the calling thread."""
+        return _RequestProfile(self, label)
+
+    def finish(self, profile: StackProfile) -> Optional[str]:
+        with self._lock:
+            self.aggregate.merge(profile)
+            self._count += 1
+            number = self._count
+        if not self.per_request:
+            return None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = profile.write(os.path.join(self.directory, f"{stamp}-{number:04d}{self.extension}"), self.format)
+        with self._lock:
+            self.paths.append(path)
+        return path
+
+    def write_aggregate(self, path: Optional[str] = None) -> str:
+        """Write the sum over every profiled request (default ``<dir>/aggregate.<ext>``)."""
+        with self._lock:
+            profile = StackProfile(self.aggregate.unit, self.aggregate.name)
+            profile.merge(self.aggregate)
+        return profile.write(path or os.path.join(self.directory, f"aggregate{self.extension}"), self.format)
+
+
+def create_profile_recorder(settings: Optional[Settings] = None, mode: Optional[str] = None,
+                            directory: Optional[str] = None, **kwargs: Any) -> Optional[ProfileRecorder]:
+    """Recorder for ``PROFILE``/``PROFILE_DIR`` (or the overrides); None if profiling is off."""
+    settings = settings or get_settings()
+    mode = mode or settings.profile_mode
+    if not mode:
+        return None
+    kwargs.setdefault("format", settings.profile_format)
+    kwargs.setdefault("interval", settings.profile_interval)
+    return ProfileRecorder(mode, str(settings.resolve_path(directory or settings.profile_dir)), **kwargs)
@@ -0,0 +1,157 @@
+"""
+Embedding Projection
+====================
+
+Optional dimensionality reduction for the local backends. Corpus and query
+vectors are projected to ``dimension`` before they are stored or searched,
+so every similarity costs ``dimension`` multiply-adds instead of 1024:
+
+- ``pca``: principal components fitted on corpus embeddings (centred,
+  then re-normalized); needs a fit, saved as a small ``.npz``
+- ``prefix``: keep the first ``dimension`` components and re-normalize,
+  for Matryoshka-trained models whose leading dimensions carry the most
+  signal; nothing to fit
+
+``ProjectedEmbedder`` wraps any ``Embedder``, so stores take it like any
+other embedder. Set ``PROJECTION=pca`` and ``PROJECTION_DIM=256``, then use
+``create_projected_embedder``. ``python -m ragfood.projection_bench``
+reports recall@k and latency per method and dimension.
+"""
+
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.config import Settings, get_settings
+from ragfood.embeddings import Embedder
+from ragfood.stores.memory import normalize_rows
+
+METHODS = ("pca", "prefix")
+
+# Rows used to fit PCA; components barely move beyond this
+FIT_SAMPLE = 100_000
+
+
+class Projection:
+    """Maps unit vectors to ``dimension`` unit vectors."""
+
+    method = ""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def fit(self, vectors: np.ndarray) -> "Projection":
+        return self
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, method=self.method, dimension=self.dimension, **self._arrays())
+        return path
+
+    def _arrays(self) -> dict:
+        return {}
+
+
+class PrefixProjection(Projection):
+    """First ``dimension`` components, re-normalized (Matryoshka truncation)."""
+
+    method = "prefix"
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[-1] < self.dimension:
+            raise ValueError(f"Cannot truncate {vectors.shape[-1]}-dim vectors to {self.dimension}")
+        return normalize_rows(vectors[..., : self.dimension])
+
+
+class PCAProjection(Projection):
+    """Top ``dimension`` principal components of the fitted corpus."""
+
+    method = "pca"
+
+    def __init__(self, dimension: int, mean: Optional[np.ndarray] = None, components: Optional[np.ndarray] = None):
+        super().__init__(dimension)
+        self.mean = mean
+        self.components = components
+
+    def fit(self, vectors: np.ndarray, seed: int = 0) -> "PCAProjection":
+        """Eigen-decompose the covariance of (a sample of) ``vectors``."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) > FIT_SAMPLE:
+            vectors = vectors[np.sort(np.random.default_rng(seed).choice(len(vectors), FIT_SAMPLE, replace=False))]
+        if self.dimension > vectors.shape[1]:
+            raise ValueError(f"Cannot project {vectors.shape[1]}-dim vectors up to {self.dimension}")
+        self.mean = vectors.mean(axis=0)
+        centred = (vectors - self.mean).astype(np.float64)
+        eigenvalues, eigenvectors = np.linalg.eigh(centred.T @ centred)
+        top = np.argsort(eigenvalues)[::-1][: self.dimension]
+        self.components = eigenvectors[:, top].T.astype(np.float32)
+        return self
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        if self.components is None:
+            raise ValueError("PCAProjection must be fitted before use")
+        return normalize_rows((np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components.T)
+
+    def _arrays(self) -> dict:
+        return {"mean": self.mean, "components": self.components}
+
+
+def create_projection(method: str, dimension: int) -> Projection:
+    if method == "pca":
+        return PCAProjection(dimension)
+    if method == "prefix":
+        return PrefixProjection(dimension)
+    raise ValueError(f"Unknown projection: {method!r} (expected one of {METHODS})")
+
+
+def load_projection(path: str) -> Projection:
+    with np.load(path) as saved:
+        method, dimension = str(saved["method"]), int(saved["dimension"])
+        if method == "pca":
+            return PCAProjection(dimension, saved["mean"], saved["components"])
+        return create_projection(method, dimension)
+
+
+class ProjectedEmbedder(Embedder):
+    """``embedder`` followed by ``projection``."""
+
+    def __init__(self, embedder: Embedder, projection: Projection):
+        self.embedder = embedder
+        self.projection = projection
+        self.dimension = projection.dimension
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        return self.projection.transform(self.embedder.embed(texts))
+
+
+def create_projected_embedder(
+    embedder: Embedder,
+    texts: Sequence[str] = (),
+    settings: Optional[Settings] = None,
+    path: Optional[str] = None,
+) -> Embedder:
+    """``embedder`` wrapped per ``PROJECTION``/``PROJECTION_DIM``; unchanged if unset.
+
+    A projection saved at ``path`` is reused. Otherwise PCA is fitted on
+    the embeddings of ``texts`` and saved there.
+    """
+    settings = settings or get_settings()
+    if not settings.projection:
+        return embedder
+    if path and os.path.exists(path):
+        projection = load_projection(path)
+        if (projection.method, projection.dimension) == (settings.projection, settings.projection_dim):
+            return ProjectedEmbedder(embedder, projection)
+    projection = create_projection(settings.projection, settings.projection_dim)
+    if projection.method == "pca":
+        if not texts:
+            raise ValueError("PCA projection needs corpus texts to fit on")
+        projection.fit(embedder.embed(list(texts)))
+    if path:
+        projection.save(path)
+    return ProjectedEmbedder(embedder, projection)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Projection Benchmark
+====================
+
+Measures what projecting embeddings to fewer dimensions
+(``ragfood.projection``) costs in recall and saves in latency. For each
+method (``pca``, ``prefix``) and target dimension it:
+
+- fits the projection on the corpus and projects every vector
+- runs exact search at the reduced dimension, including the per-query
+  projection cost
+- reports recall@k against exact full-dimension search, queries/sec,
+  p50/p99 latency and bytes per vector
+
+Vectors are the seeded generators from ``ragfood.ann_bench``, or an
+``.npy`` matrix of real embeddings (``--vectors``). Prefix truncation only
+helps models trained for it (Matryoshka), so judge it on real embeddings.
+
+Usage::
+
+    python -m ragfood.projection_bench --dims 1024,512,256,128
+    python -m ragfood.projection_bench --vectors embeddings.npy --method prefix --output projection.json
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.ann_bench import DATA_SOURCES, catalog_vectors, exact_top_k, recall, sample_queries, synthetic_vectors, time_searches
+from ragfood.benchmark import environment, ns_to_ms, write_report
+from ragfood.projection import METHODS, create_projection
+from ragfood.stores.memory import normalize_rows, top_k_indices
+
+SCHEMA = "ragfood-projection/1"
+DEFAULT_DIMS = (1024, 512, 256, 128)
+
+
+def evaluate_projection(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    method: Optional[str],
+    dimension: int,
+    k: int = 10,
+) -> Dict[str, Any]:
+    """Recall and latency of exact search after projecting to ``dimension`` (``method`` None = no projection)."""
+    start = time.perf_counter()
+    if method is None:
+        reduced, project = vectors, (lambda q: q)
+    else:
+        projection = create_projection(method, dimension).fit(vectors)
+        reduced = projection.transform(vectors)
+        project = (lambda q: projection.transform(q[None, :])[0])
+    fit_seconds = time.perf_counter() - start
+
+    found, latency, elapsed = time_searches(lambda q: top_k_indices(reduced @ project(q), k), queries)
+    return {
+        "method": method or "none",
+        "dimension": int(reduced.shape[1]),
+        "bytes_per_vector": int(reduced.shape[1]) * 4,
+        "fit_seconds": fit_seconds,
+        "recall": recall(found, truth),
+        "qps": latency.count / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": ns_to_ms(latency.mean),
+            "p50": ns_to_ms(latency.percentile(50)),
+            "p99": ns_to_ms(latency.percentile(99)),
+        },
+    }
+
+
+def run_projection_benchmark(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    methods: Sequence[str] = METHODS,
+    dims: Sequence[int] = DEFAULT_DIMS,
+) -> List[Dict[str, Any]]:
+    """Full-dimension baseline first, then one row per method and smaller dimension."""
+    truth = exact_top_k(vectors, queries, k)
+    rows = [evaluate_projection(vectors, queries, truth, None, vectors.shape[1], k)]
+    for method in methods:
+        for dimension in sorted(dims, reverse=True):
+            if dimension < vectors.shape[1]:
+                rows.append(evaluate_projection(vectors, queries, truth, method, dimension, k))
+    return rows
+
+
+def format_rows(rows: Sequence[Dict[str, Any]], k: int) -> str:
+    base = rows[0]["latency_ms"]["p50"]
+    lines = [f"{'method':>7} {'dims':>5} {'B/vector':>9} {f'recall@{k}':>10} {'q/s':>10} {'p50 ms':>8} {'faster':>7} {'fit s':>7}"]
+    for row in rows:
+        p50 = row["latency_ms"]["p50"]
+        lines.append(
+            f"{row['method']:>7} {row['dimension']:>5} {row['bytes_per_vector']:>9} {row['recall']:>10.4f} "
+            f"{row['qps']:>10.1f} {p50:>8.3f} {base / p50 if p50 else 0.0:>6.1f}x {row['fit_seconds']:>7.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Recall@k and latency of exact search after PCA / prefix projection")
+    parser.add_argument("--data", choices=DATA_SOURCES, default="synthetic", help="Random clusters, or a scaled-up catalog")
+    parser.add_argument("--vectors", metavar="NPY", help="Benchmark these embeddings instead of generated ones")
+    parser.add_argument("--n", type=int, default=50_000, help="Generated corpus size")
+    parser.add_argument("--dim", type=int, default=1024, help="Generated dimension (mxbai-embed-large is 1024)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--method", action="append", choices=METHODS, help="Projection to test (repeatable, default all)")
+    parser.add_argument("--dims", type=_int_list, default=list(DEFAULT_DIMS), help="Comma-separated target dimensions")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.vectors:
+        vectors = normalize_rows(np.load(args.vectors))
+        print(f"📂 {len(vectors):,} × {vectors.shape[1]} vectors from {args.vectors}")
+    elif args.data == "catalog":
+        vectors = catalog_vectors(args.n, args.dim, seed=args.seed)
+        print(f"🎲 {args.n:,} × {args.dim} catalog vectors")
+    else:
+        vectors = synthetic_vectors(args.n, args.dim, seed=args.seed)
+        print(f"🎲 {args.n:,} × {args.dim} synthetic vectors")
+    queries = sample_queries(vectors, args.queries, seed=args.seed + 1)
+    rows = run_projection_benchmark(vectors, queries, args.k, args.method or METHODS, args.dims)
+    print()
+    print(format_rows(rows, args.k))
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment(),
+            "data": {"source": args.vectors or args.data, "count": len(vectors), "dimension": int(vectors.shape[1]),
+                     "queries": len(queries), "k": args.k, "seed": args.seed},
+            "runs": rows,
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
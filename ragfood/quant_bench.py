@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Quantized Store Benchmark
+=========================
+
+Loads the same vectors into ``QuantizedVectorStore`` at each precision and
+rescore depth. For each, it reports:
+
+- resident bytes per vector and compression against float32
+- recall@k against exact float32 search
+- queries/sec and per-query latency
+
+Vectors are the seeded clustered synthetic set from ``ragfood.ann_bench``,
+or an ``.npy`` matrix of real embeddings (``--vectors``).
+
+Usage::
+
+    python -m ragfood.quant_bench --n 200000 --dim 1024 --rescore 0,2,4,8
+    python -m ragfood.quant_bench --vectors embeddings.npy --precision int8 --output quant.json
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood import quantize
+from ragfood.ann_bench import exact_top_k, recall, sample_queries, synthetic_vectors, time_searches
+from ragfood.benchmark import environment, ns_to_ms, write_report
+from ragfood.stores import VectorRecord
+from ragfood.stores.memory import normalize_rows
+from ragfood.stores.quantized import QuantizedVectorStore
+
+SCHEMA = "ragfood-quantized/1"
+DEFAULT_RESCORE = (0, 1, 2, 4, 8)
+
+
+def load_store(vectors: np.ndarray, precision: str, rescore: int, directory: Optional[str] = None) -> QuantizedVectorStore:
+    """A quantized store holding ``vectors`` under ids ``"0"``, ``"1"``, ..."""
+    store = QuantizedVectorStore(vectors.shape[1], precision=precision, rescore=rescore, directory=directory)
+    store.upsert(VectorRecord(str(row), vector=vector) for row, vector in enumerate(vectors))
+    return store
+
+
+def measure(store: QuantizedVectorStore, queries: np.ndarray, truth: np.ndarray, k: int, rescore: int) -> Dict[str, Any]:
+    """Recall, QPS and latency of ``store`` at ``rescore`` depth."""
+    store.rescore = rescore
+
+    def search(q):
+        return np.array([int(r.id) for r in store.query(vector=q, top_k=k, include_metadata=False)])
+
+    found, latency, seconds = time_searches(search, queries)
+    return {
+        "precision": store.precision,
+        "rescore": rescore,
+        "recall": recall(found, truth),
+        "qps": latency.count / seconds if seconds else 0.0,
+        "latency_ms": {
+            "mean": ns_to_ms(latency.mean),
+            "p50": ns_to_ms(latency.percentile(50)),
+            "p99": ns_to_ms(latency.percentile(99)),
+        },
+    }
+
+
+def run_quant_benchmark(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    precisions: Sequence[str] = quantize.PRECISIONS,
+    rescores: Sequence[int] = DEFAULT_RESCORE,
+) -> List[Dict[str, Any]]:
+    """One entry per precision: its memory footprint and a point per rescore depth."""
+    truth = exact_top_k(vectors, queries, k)
+    dimension = vectors.shape[1]
+    runs = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for precision in precisions:
+            start = time.perf_counter()
+            store = load_store(vectors, precision, 0, f"{scratch}/{precision}")
+            load_seconds = time.perf_counter() - start
+            try:
+                # float32 codes are already exact; rescoring them only re-reads the same vectors
+                depths = [0] if precision == "float32" else rescores
+                runs.append({
+                    "precision": precision,
+                    "bytes_per_vector": quantize.bytes_per_vector(precision, dimension),
+                    "compression": quantize.bytes_per_vector("float32", dimension) / quantize.bytes_per_vector(precision, dimension),
+                    "resident_bytes": store.resident_bytes(),
+                    "load_seconds": load_seconds,
+                    "points": [measure(store, queries, truth, k, depth) for depth in depths],
+                })
+            finally:
+                store.close()
+    return runs
+
+
+def format_runs(runs: Sequence[Dict[str, Any]], k: int) -> str:
+    lines = [f"{'precision':>9} {'B/vector':>9} {'smaller':>8} {'rescore':>8} {f'recall@{k}':>10} {'q/s':>9} {'p50 ms':>8}"]
+    for run in runs:
+        for point in run["points"]:
+            lines.append(
+                f"{run['precision']:>9} {run['bytes_per_vector']:>9} {run['compression']:>7.1f}x "
+                f"{point['rescore'] or '-':>8} {point['recall']:>10.4f} {point['qps']:>9.1f} {point['latency_ms']['p50']:>8.3f}"
+            )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Quantized store memory, recall@k against exact search, and QPS")
+    parser.add_argument("--vectors", metavar="NPY", help="Benchmark these embeddings instead of synthetic ones")
+    parser.add_argument("--n", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=1024, help="Synthetic dimension (mxbai-embed-large is 1024)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--precision", action="append", choices=quantize.PRECISIONS, help="Precision to test (repeatable, default all)")
+    parser.add_argument("--rescore", type=_int_list, default=list(DEFAULT_RESCORE), help="Comma-separated candidates-per-result (0 = no rescoring)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.vectors:
+        vectors = normalize_rows(np.load(args.vectors))
+        print(f"📂 {len(vectors):,} × {vectors.shape[1]} vectors from {args.vectors}")
+    else:
+        vectors = synthetic_vectors(args.n, args.dim, seed=args.seed)
+        print(f"🎲 {args.n:,} × {args.dim} synthetic vectors")
+    queries = sample_queries(vectors, args.queries, seed=args.seed + 1)
+    runs = run_quant_benchmark(vectors, queries, args.k, args.precision or quantize.PRECISIONS, args.rescore)
+    print()
+    print(format_runs(runs, args.k))
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment(),
+            "data": {"source": args.vectors or "synthetic", "count": len(vectors), "dimension": int(vectors.shape[1]),
+                     "queries": len(queries), "k": args.k, "seed": args.seed},
+            "runs": runs,
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
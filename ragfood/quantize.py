@@ -0,0 +1,80 @@
+"""
+Vector Quantization
+===================
+
+Compact in-memory codes for unit vectors, searched with vectorized dot
+products:
+
+- ``float16``: half-precision copy, 2 bytes per dimension (2× smaller)
+- ``int8``: symmetric scalar quantization with one float32 scale per row,
+  ``x ≈ scale * code`` with ``code`` in [-127, 127], so 1 byte per
+  dimension (~4× smaller)
+- ``float32``: no quantization, the reference the other two are measured
+  against
+
+Scores from codes are approximate. ``QuantizedVectorStore`` rescores the
+best candidates with the full-precision vectors.
+
+NumPy widens ``int8`` almost as fast as it reads float32, so int8 scoring
+runs near float32 speed on a quarter of the memory. ``float16`` widening
+is not vectorized on most CPUs, which makes it several times slower: pick
+it for memory, not speed.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+CODE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Rows widened to float32 at a time while scoring; small enough that the
+# scratch block stays in cache between the conversion and the product
+SCORE_CHUNK = 1024
+
+
+def check_precision(precision: str) -> str:
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision!r} (expected one of {PRECISIONS})")
+    return precision
+
+
+def bytes_per_vector(precision: str, dimension: int) -> int:
+    """Resident bytes of one encoded vector, per-row scale included."""
+    check_precision(precision)
+    return dimension * np.dtype(CODE_DTYPES[precision]).itemsize + (4 if precision == "int8" else 0)
+
+
+def encode(vectors: np.ndarray, precision: str) -> Tuple[np.ndarray, np.ndarray]:
+    """``(codes, scales)`` for float32 rows; scales are 1.0 unless ``int8``."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if check_precision(precision) != "int8":
+        return vectors.astype(CODE_DTYPES[precision]), np.ones(len(vectors), dtype=np.float32)
+    peaks = np.abs(vectors).max(axis=-1)
+    scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def decode(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Approximate float32 rows for ``codes``."""
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def scores(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray, chunk: int = SCORE_CHUNK) -> np.ndarray:
+    """Approximate dot products of every code row with ``queries``.
+
+    ``queries`` is one vector (result shape ``(n,)``) or a matrix of them
+    (result ``(len(queries), n)``). Codes are widened to float32 ``chunk``
+    rows at a time so BLAS does the work without a full-size copy.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    single = queries.ndim == 1
+    matrix = queries[None, :] if single else queries
+    out = np.empty((len(matrix), len(codes)), dtype=np.float32)
+    for start in range(0, len(codes), chunk):
+        block = codes[start:start + chunk]
+        if block.dtype != np.float32:
+            block = block.astype(np.float32)
+        out[:, start:start + len(block)] = (matrix @ block.T) * scales[start:start + len(block)]
+    return out[0] if single else out
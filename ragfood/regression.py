@@ -0,0 +1,241 @@
+"""
+Performance Regression Gate
+===========================
+
+Compares a benchmark report (``python -m ragfood.benchmark --output``)
+against a stored baseline report and fails when the query path got slower.
+
+For every run present in both reports (matched by name) and every stage:
+
+- **median**: regressed when the one-sided Mann-Whitney test on the raw
+  samples says current > baseline (p < ``alpha``) *and* the median grew by
+  more than ``median_tolerance``; reports without samples (``--no-samples``)
+  fall back to the p50 rule below with ``median_tolerance``
+- **p99**: regressed when it grew by more than ``p99_tolerance`` and the
+  current and baseline p99 confidence intervals do not overlap
+
+Per run, throughput regresses when it dropped by more than
+``throughput_tolerance``, and the error rate when it rose by more than
+``error_rate_tolerance``. Both a statistical signal and a practical
+magnitude are required, so noise alone does not fail the gate.
+
+Usage::
+
+    python -m ragfood.regression baseline.json current.json
+    python -m ragfood.regression baseline.json current.json --stages retrieval,total --markdown diff.md
+
+Exit status is 1 when anything regressed (or a baseline run is missing).
+"""
+
+import argparse
+import statistics
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from ragfood.benchmark import load_report
+from ragfood.stats import mann_whitney_u
+
+OK = "ok"
+REGRESSED = "REGRESSED"
+IMPROVED = "improved"
+MISSING = "MISSING"
+
+
+@dataclass
+class Thresholds:
+    alpha: float = 0.01
+    median_tolerance: float = 0.05
+    p99_tolerance: float = 0.10
+    throughput_tolerance: float = 0.10
+    error_rate_tolerance: float = 0.01
+
+
+@dataclass
+class Check:
+    """One row of the diff table."""
+
+    run: str
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    status: str
+    p_value: Optional[float] = None
+    unit: str = "ms"
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change (current / baseline - 1)."""
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline - 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": self.run,
+            "metric": self.metric,
+            "baseline": self.baseline,
+            "current": self.current,
+            "change": self.change,
+            "p_value": self.p_value,
+            "status": self.status,
+        }
+
+
+def _stage_checks(name: str, stage: str, base: Dict[str, Any], cur: Dict[str, Any], thresholds: Thresholds) -> List[Check]:
+    base_stats = base["summary"]["stages_ms"][stage]
+    cur_stats = cur["summary"]["stages_ms"][stage]
+    checks = []
+
+    base_samples = base.get("samples_ns", {}).get(stage)
+    cur_samples = cur.get("samples_ns", {}).get(stage)
+    base_median, cur_median = base_stats["p50"]["value"], cur_stats["p50"]["value"]
+    p_slower = p_faster = None
+    if base_samples and cur_samples:
+        base_median = statistics.median(base_samples) / 1e6
+        cur_median = statistics.median(cur_samples) / 1e6
+        _, p_slower = mann_whitney_u(cur_samples, base_samples, "greater")
+        _, p_faster = mann_whitney_u(cur_samples, base_samples, "less")
+    if p_slower is not None:
+        status = OK
+        if base_median:
+            if p_slower < thresholds.alpha and cur_median > base_median * (1 + thresholds.median_tolerance):
+                status = REGRESSED
+            elif p_faster < thresholds.alpha and cur_median < base_median * (1 - thresholds.median_tolerance):
+                status = IMPROVED
+    else:
+        # Reports written with --no-samples: fall back to the summary p50 and its interval
+        status = _interval_status(base_stats["p50"], cur_stats["p50"], thresholds.median_tolerance)
+    checks.append(Check(name, f"{stage} p50", base_median, cur_median, status,
+                        p_slower if status != IMPROVED else p_faster))
+
+    base_p99, cur_p99 = base_stats["p99"], cur_stats["p99"]
+    status = _interval_status(base_p99, cur_p99, thresholds.p99_tolerance)
+    checks.append(Check(name, f"{stage} p99", base_p99["value"], cur_p99["value"], status))
+    return checks
+
+
+def _interval_status(base: Dict[str, float], cur: Dict[str, float], tolerance: float) -> str:
+    """Change of a summary percentile beyond ``tolerance`` with non-overlapping intervals."""
+    if base["value"]:
+        if cur["value"] > base["value"] * (1 + tolerance) and cur["ci_low"] > base["ci_high"]:
+            return REGRESSED
+        if cur["value"] < base["value"] * (1 - tolerance) and cur["ci_high"] < base["ci_low"]:
+            return IMPROVED
+    return OK
+
+
+def compare_runs(base: Dict[str, Any], cur: Dict[str, Any], thresholds: Thresholds, stages: Optional[Sequence[str]] = None) -> List[Check]:
+    """Checks for one pair of runs (``BenchmarkRun.to_dict`` payloads)."""
+    name = cur["name"]
+    common = [s for s in base["summary"]["stages_ms"] if s in cur["summary"]["stages_ms"]]
+    checks = []
+    for stage in common:
+        if stages is None or stage in stages:
+            checks.extend(_stage_checks(name, stage, base, cur, thresholds))
+
+    base_qps = base["summary"]["throughput_qps"]["value"]
+    cur_qps = cur["summary"]["throughput_qps"]["value"]
+    status = OK
+    if base_qps:
+        if cur_qps < base_qps * (1 - thresholds.throughput_tolerance):
+            status = REGRESSED
+        elif cur_qps > base_qps * (1 + thresholds.throughput_tolerance):
+            status = IMPROVED
+    checks.append(Check(name, "throughput", base_qps, cur_qps, status, unit="q/s"))
+
+    base_errors = base["summary"]["error_rate"]
+    cur_errors = cur["summary"]["error_rate"]
+    status = REGRESSED if cur_errors > base_errors + thresholds.error_rate_tolerance else OK
+    checks.append(Check(name, "error rate", base_errors, cur_errors, status, unit=""))
+    return checks
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], thresholds: Optional[Thresholds] = None,
+                    stages: Optional[Sequence[str]] = None) -> List[Check]:
+    """Checks for every baseline run; runs missing from ``current`` fail."""
+    thresholds = thresholds or Thresholds()
+    current_runs = {run["name"]: run for run in current["runs"]}
+    checks = []
+    for base in baseline["runs"]:
+        cur = current_runs.get(base["name"])
+        if cur is None:
+            checks.append(Check(base["name"], "run", None, None, MISSING, unit=""))
+            continue
+        checks.extend(compare_runs(base, cur, thresholds, stages))
+    return checks
+
+
+def regressed(checks: Sequence[Check]) -> bool:
+    return any(check.status in (REGRESSED, MISSING) for check in checks)
+
+
+def _fmt(value: Optional[float], unit: str) -> str:
+    if value is None:
+        return "-"
+    if unit == "":
+        return f"{value:.2%}"
+    return f"{value:.3f} {unit}"
+
+
+def format_table(checks: Sequence[Check], markdown: bool = False) -> str:
+    """Diff table; ``markdown`` renders a GitHub-flavoured table."""
+    rows = []
+    for check in checks:
+        change = check.change
+        rows.append([
+            check.run,
+            check.metric,
+            _fmt(check.baseline, check.unit),
+            _fmt(check.current, check.unit),
+            f"{change:+.1%}" if change is not None else "-",
+            f"{check.p_value:.2g}" if check.p_value is not None else "-",
+            check.status,
+        ])
+    header = ["run", "metric", "baseline", "current", "change", "p", "status"]
+    if markdown:
+        lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows)
+        return "\n".join(lines)
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(header, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    defaults = Thresholds()
+    parser = argparse.ArgumentParser(description="Fail when a benchmark report regresses against a baseline")
+    parser.add_argument("baseline", help="Baseline benchmark JSON")
+    parser.add_argument("current", help="Current benchmark JSON")
+    parser.add_argument("--stages", help="Comma-separated stages to gate (default: all in both reports)")
+    parser.add_argument("--alpha", type=float, default=defaults.alpha, help="Mann-Whitney significance level")
+    parser.add_argument("--median-tolerance", type=float, default=defaults.median_tolerance, help="Allowed relative p50 increase")
+    parser.add_argument("--p99-tolerance", type=float, default=defaults.p99_tolerance, help="Allowed relative p99 increase")
+    parser.add_argument("--throughput-tolerance", type=float, default=defaults.throughput_tolerance, help="Allowed relative throughput drop")
+    parser.add_argument("--error-rate-tolerance", type=float, default=defaults.error_rate_tolerance, help="Allowed absolute error-rate increase")
+    parser.add_argument("--markdown", metavar="FILE", help="Also write the diff table as Markdown")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    thresholds = Thresholds(args.alpha, args.median_tolerance, args.p99_tolerance, args.throughput_tolerance, args.error_rate_tolerance)
+    stages = [s.strip() for s in args.stages.split(",")] if args.stages else None
+    checks = compare_reports(load_report(args.baseline), load_report(args.current), thresholds, stages)
+
+    print(format_table(checks))
+    if args.markdown:
+        with open(args.markdown, "w", encoding="utf-8") as f:
+            f.write(format_table(checks, markdown=True) + "\n")
+    if regressed(checks):
+        failed = sum(1 for check in checks if check.status in (REGRESSED, MISSING))
+        print(f"\n❌ Performance regression: {failed} check(s) failed")
+        return 1
+    print("\n✅ No performance regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
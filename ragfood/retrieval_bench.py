@@ -0,0 +1,250 @@
+"""
+Retrieval Quality Benchmark
+===========================
+
+Scores a vector store alone (no LLM) against labelled queries:
+recall@k, MRR and nDCG@k over graded relevance judgements, plus
+queries/sec and per-query latency. Judgements live in
+``data/retrieval_qrels.json``:
+
+    {"queries": [{"query": "yellow fruit", "relevant": {"1": 2, "4": 1}}]}
+
+Grades are 2 (what the query asks for) or 1 (partially relevant); ids are
+catalog ids (``--id-prefix food_`` for the foods namespace).
+
+Usage::
+
+    python -m ragfood.retrieval_bench --store memory --k 1,3,5,10
+    python -m ragfood.retrieval_bench --store upstash --batch --output retrieval.json
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from ragfood.benchmark import StandIns, build_store, environment, ns_to_ms, write_report
+from ragfood.config import PROJECT_ROOT, get_settings
+from ragfood.histogram import LatencyHistogram
+from ragfood.stores import BACKENDS, DEFAULT_NAMESPACE, VectorQuery, VectorStore
+
+SCHEMA = "ragfood-retrieval/1"
+DEFAULT_QRELS = PROJECT_ROOT / "data" / "retrieval_qrels.json"
+DEFAULT_KS = (1, 3, 5, 10)
+
+
+@dataclass
+class Judgement:
+    """One labelled query: relevant id -> grade (> 0)."""
+
+    query: str
+    relevant: Dict[str, int]
+    filter: Optional[Dict[str, Any]] = None
+
+
+def load_qrels(path: Optional[str] = None) -> List[Judgement]:
+    with open(path or DEFAULT_QRELS, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    return [
+        Judgement(entry["query"], {str(k): int(v) for k, v in entry["relevant"].items() if int(v) > 0}, entry.get("filter"))
+        for entry in document["queries"]
+    ]
+
+
+# -- metrics ---------------------------------------------------------------
+
+def recall_at_k(ranked: Sequence[str], relevant: Dict[str, int], k: int) -> float:
+    """Share of relevant ids found in the top ``k``."""
+    if not relevant:
+        return 0.0
+    return sum(1 for doc_id in ranked[:k] if doc_id in relevant) / len(relevant)
+
+
+def reciprocal_rank(ranked: Sequence[str], relevant: Dict[str, int]) -> float:
+    """1 / rank of the first relevant id (0 if none was retrieved)."""
+    for rank, doc_id in enumerate(ranked, 1):
+        if doc_id in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked: Sequence[str], relevant: Dict[str, int], k: int) -> float:
+    """Normalised discounted cumulative gain with gains ``2**grade - 1``."""
+    dcg = sum((2 ** relevant.get(doc_id, 0) - 1) / math.log2(rank + 1) for rank, doc_id in enumerate(ranked[:k], 1))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(rank + 1) for rank, grade in enumerate(ideal, 1))
+    return dcg / idcg if idcg else 0.0
+
+
+def score_ranking(ranked: Sequence[str], relevant: Dict[str, int], ks: Sequence[int]) -> Dict[str, float]:
+    scores = {"mrr": reciprocal_rank(ranked, relevant)}
+    for k in ks:
+        scores[f"recall@{k}"] = recall_at_k(ranked, relevant, k)
+        scores[f"ndcg@{k}"] = ndcg_at_k(ranked, relevant, k)
+    return scores
+
+
+# -- runner ----------------------------------------------------------------
+
+@dataclass
+class RetrievalReport:
+    """Per-query rankings and scores plus timing for one store."""
+
+    name: str
+    ks: Sequence[int]
+    per_query: List[Dict[str, Any]] = field(default_factory=list)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queries_run: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def qps(self) -> float:
+        return self.queries_run / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def means(self) -> Dict[str, float]:
+        if not self.per_query:
+            return {}
+        return {metric: statistics.fmean(q["scores"][metric] for q in self.per_query) for metric in self.per_query[0]["scores"]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "ks": list(self.ks),
+            "metrics": self.means(),
+            "queries": len(self.per_query),
+            "queries_run": self.queries_run,
+            "qps": self.qps,
+            "latency_ms": {
+                "mean": ns_to_ms(self.latency.mean),
+                **{name: ns_to_ms(value) for name, value in self.latency.percentiles((50, 90, 99)).items()},
+            },
+            "per_query": self.per_query,
+        }
+
+
+def evaluate_retrieval(
+    store: VectorStore,
+    judgements: Sequence[Judgement],
+    ks: Sequence[int] = DEFAULT_KS,
+    name: str = "retrieval",
+    namespace: str = DEFAULT_NAMESPACE,
+    id_prefix: str = "",
+    repeats: int = 1,
+    batch: bool = False,
+) -> RetrievalReport:
+    """Query ``store`` for every judgement ``repeats`` times and score the rankings.
+
+    Scores come from the first pass; later passes only add timing. With
+    ``batch`` each pass is a single ``query_many`` call (per-query latency
+    is then the batch time divided evenly).
+    """
+    depth = max(ks)
+    report = RetrievalReport(name, tuple(sorted(ks)))
+    queries = [VectorQuery(text=j.query, top_k=depth, filter=j.filter) for j in judgements]
+    rankings: List[List[str]] = []
+    wall_start = time.perf_counter_ns()
+    for attempt in range(max(1, repeats)):
+        if batch:
+            start = time.perf_counter_ns()
+            results = store.query_many(queries, include_metadata=False, namespace=namespace)
+            report.latency.record((time.perf_counter_ns() - start) // max(1, len(queries)), count=len(queries))
+        else:
+            results = []
+            for q in queries:
+                start = time.perf_counter_ns()
+                results.append(store.query(text=q.text, top_k=depth, include_metadata=False, filter=q.filter, namespace=namespace))
+                report.latency.record(time.perf_counter_ns() - start)
+        report.queries_run += len(queries)
+        if attempt == 0:
+            rankings = [[r.id[len(id_prefix):] if r.id.startswith(id_prefix) else r.id for r in hits] for hits in results]
+    report.elapsed_seconds = (time.perf_counter_ns() - wall_start) / 1e9
+
+    for judgement, ranked in zip(judgements, rankings):
+        report.per_query.append({
+            "query": judgement.query,
+            "ranked": ranked,
+            "relevant": judgement.relevant,
+            "scores": score_ranking(ranked, judgement.relevant, report.ks),
+        })
+    return report
+
+
+def format_report(report: RetrievalReport) -> str:
+    means = report.means()
+    latency = report.to_dict()["latency_ms"]
+    lines = [
+        f"🔍 {report.name}: {len(report.per_query)} labelled queries, {report.qps:.1f} q/s, "
+        f"p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms",
+        f"   MRR {means.get('mrr', 0):.3f}",
+        f"   {'k':>4} {'recall@k':>9} {'nDCG@k':>9}",
+    ]
+    for k in report.ks:
+        lines.append(f"   {k:>4} {means[f'recall@{k}']:>9.3f} {means[f'ndcg@{k}']:>9.3f}")
+    misses = [q["query"] for q in report.per_query if q["scores"]["mrr"] == 0]
+    if misses:
+        lines.append(f"   No relevant hit in top {max(report.ks)}: {', '.join(misses)}")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline retrieval-quality benchmark (recall@k, MRR, nDCG, QPS)")
+    parser.add_argument("--store", action="append", choices=BACKENDS, help="Store to evaluate (repeatable, default memory)")
+    parser.add_argument("--qrels", metavar="JSON", help=f"Relevance judgements (default {DEFAULT_QRELS.relative_to(PROJECT_ROOT)})")
+    parser.add_argument("--k", default=",".join(map(str, DEFAULT_KS)), help="Comma-separated cut-offs")
+    parser.add_argument("--namespace", default=DEFAULT_NAMESPACE)
+    parser.add_argument("--id-prefix", default="", help="Prefix stripped from stored ids, e.g. food_")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing passes over the query set")
+    parser.add_argument("--batch", action="store_true", help="Issue each pass as one query_many call")
+    parser.add_argument("--standins", action="store_true", help="Evaluate upstash against the local stand-in")
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from ragfood.catalog import load_food_data
+
+    args = build_parser().parse_args(argv)
+    judgements = load_qrels(args.qrels)
+    ks = sorted({int(k) for k in args.k.split(",") if k.strip()})
+    settings = get_settings()
+    food_data = load_food_data()
+    reports = []
+
+    def run_all(run_settings):
+        for backend in args.store or ["memory"]:
+            store = build_store(backend, run_settings, food_data)
+            try:
+                report = evaluate_retrieval(
+                    store, judgements, ks, name=backend, namespace=args.namespace,
+                    id_prefix=args.id_prefix, repeats=args.repeats, batch=args.batch,
+                )
+            finally:
+                store.close()
+            print(format_report(report))
+            reports.append(report)
+
+    if args.standins:
+        with StandIns(settings, food_data) as standin_settings:
+            run_all(standin_settings)
+    else:
+        run_all(settings)
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": environment(),
+            "qrels": args.qrels or str(DEFAULT_QRELS.relative_to(PROJECT_ROOT)),
+            "runs": [report.to_dict() for report in reports],
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
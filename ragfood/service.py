@@ -0,0 +1,178 @@
+"""
+RAG Query Service
+=================
+
+Small threaded HTTP front end for ``RAGEngine``:
+
+- ``POST /query``   ``{"question": ..., "top_k": 3, "filter": {...}}`` -> answer + sources
+- ``GET /metrics``  Prometheus text exposition of ``ragfood.metrics.RAGMetrics``
+- ``GET /healthz``  liveness check
+
+Pipeline metrics are recorded from the engine's trace spans, so every
+stage is measured the same way ``TRACE_FILE`` traces see it. Run with
+``python -m ragfood.service --config upstash+groq``.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Sequence, Tuple
+
+from ragfood.config import get_settings
+from ragfood.engine import RAGEngine
+from ragfood.metrics import MetricsSpanExporter, RAGMetrics
+from ragfood.tracing import FanoutSpanExporter, Tracer
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def instrument(engine: RAGEngine, metrics: RAGMetrics) -> RAGEngine:
+    """Route the engine's spans into ``metrics`` (and any configured trace file)."""
+    exporter = MetricsSpanExporter(metrics)
+    if engine.tracer.enabled:
+        exporter = FanoutSpanExporter([engine.tracer.exporter, exporter])
+    engine.tracer = Tracer(exporter)
+    return engine
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self) -> None:
+        service: QueryService = self.server.service
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        status, data, content_type = service.handle(self.command, path, raw)
+        self._send(status, data, content_type)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+
+
+def _json(status: int, payload: Any) -> Tuple[int, bytes, str]:
+    return status, json.dumps(payload).encode("utf-8"), "application/json"
+
+
+class QueryService:
+    """Serves ``engine`` over HTTP and exposes its metrics."""
+
+    def __init__(self, engine: RAGEngine, metrics: Optional[RAGMetrics] = None, host: str = "127.0.0.1", port: int = 8000):
+        self.metrics = metrics or RAGMetrics()
+        self.engine = instrument(engine, self.metrics)
+        self.host = host
+        self.port = port
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._query_in_flight = self.metrics.in_flight.labels("query")
+        self._query_latency = self.metrics.registry.histogram(
+            "ragfood_http_request_duration_seconds", "End-to-end /query handling time"
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def handle(self, method: str, path: str, raw: bytes) -> Tuple[int, bytes, str]:
+        if path == "/metrics" and method == "GET":
+            result = 200, self.metrics.render().encode("utf-8"), METRICS_CONTENT_TYPE
+        elif path == "/healthz" and method == "GET":
+            result = _json(200, {"status": "ok"})
+        elif path == "/query" and method == "POST":
+            start = time.perf_counter()
+            with self._query_in_flight.track():
+                result = self.query(raw)
+            self._query_latency.observe(time.perf_counter() - start)
+        else:
+            result = _json(404, {"error": f"No route for {method} {path}"})
+        self.metrics.http_requests.labels(path if result[0] != 404 else "other", result[0]).inc()
+        return result
+
+    def query(self, raw: bytes) -> Tuple[int, bytes, str]:
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            return _json(400, {"error": "Body must be JSON"})
+        question = body.get("question") if isinstance(body, dict) else None
+        if not isinstance(question, str) or not question.strip():
+            return _json(400, {"error": "'question' is required"})
+        try:
+            response = self.engine.query(question, top_k=body.get("top_k"), filter=body.get("filter"), profile=body.get("profile"),
+                                         category=body.get("category"))
+        except Exception as e:
+            return _json(502, {"error": f"{type(e).__name__}: {e}"})
+        return _json(200, response.to_dict())
+
+    def start(self) -> str:
+        """Start serving on a daemon thread and return the base URL."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.service = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="ragfood-service", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "QueryService":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="HTTP query service with a Prometheus /metrics endpoint")
+    parser.add_argument("--config", default="upstash+groq", metavar="STORE+LLM", help="Backends to serve (default upstash+groq)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--standins", action="store_true", help="Serve upstash/groq configurations from local stand-ins")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from ragfood.benchmark import StandIns, build_engine, parse_config
+    from ragfood.catalog import load_food_data
+
+    args = build_parser().parse_args(argv)
+    store_backend, llm_backend = parse_config(args.config)
+    settings = get_settings()
+    food_data = load_food_data()
+    with ExitStack() as stack:
+        if args.standins:
+            settings = stack.enter_context(StandIns(settings, food_data))
+        engine = build_engine(store_backend, llm_backend, settings, food_data)
+        stack.callback(engine.store.close)
+        service = stack.enter_context(QueryService(engine, host=args.host, port=args.port))
+        stack.callback(engine.tracer.close)
+        print(f"🍽️ Serving {args.config} on {service.url} (POST /query, GET /metrics)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print("\n👋 Stopping query service...")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Namespace Snapshots
+===================
+
+Pulls a vector-store namespace (for example the Upstash ``foods``
+namespace) down into a local bundle, and maps a bundle back into an
+in-process store. A replica then starts by opening files, with no
+re-ingest and no embedding. A bundle is a directory with:
+
+- ``vectors.npy``: unit-normalized vectors in row order, ``float32`` or
+  ``float16`` (half the size, widened to float32 on load)
+- ``columns.json``: ids, texts and one column per metadata field
+- ``manifest.json``: source, count, dimension, precision and the size
+  and SHA-256 of both files
+
+Export range-scans the namespace a page at a time, so only the metadata
+columns are held in memory. Loading a ``float32`` bundle memory-maps
+``vectors.npy`` copy-on-write into ``InMemoryVectorStore``. Pages are read
+when queries touch them, and later writes never reach the file. Loading
+checks file sizes; ``verify=True`` (``--verify``) also re-hashes the
+files.
+
+Text queries against a loaded snapshot need an embedder for the model
+recorded in the manifest. Vector queries work as they are.
+
+Usage::
+
+    python -m ragfood.snapshot --store upstash --namespace foods
+    python -m ragfood.snapshot --store upstash --namespace foods --precision float16 --output snapshots/foods-f16
+    python -m ragfood.snapshot --load snapshots/foods --verify
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.config import get_settings
+from ragfood.embeddings import Embedder
+from ragfood.stores import BACKENDS, create_vector_store
+from ragfood.stores.base import DEFAULT_NAMESPACE, VectorStore
+from ragfood.stores.memory import InMemoryVectorStore, normalize_rows
+
+SCHEMA = "ragfood-snapshot/1"
+PRECISIONS = ("float32", "float16")
+VECTORS_FILE = "vectors.npy"
+COLUMNS_FILE = "columns.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str, block: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_entry(path: str) -> Dict[str, Any]:
+    return {"bytes": os.path.getsize(path), "sha256": file_sha256(path)}
+
+
+def export_snapshot(
+    store: VectorStore,
+    directory: str,
+    namespace: str = DEFAULT_NAMESPACE,
+    precision: str = "float32",
+    page_size: int = 100,
+) -> Dict[str, Any]:
+    """Range-scan ``namespace`` of ``store`` into a bundle at ``directory``; return the manifest."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision!r} (expected one of {PRECISIONS})")
+    dtype = np.dtype(precision).newbyteorder("<")
+    os.makedirs(directory, exist_ok=True)
+    vectors_path = os.path.join(directory, VECTORS_FILE)
+    part = vectors_path + ".part"
+
+    info = store.info()
+    ids: List[str] = []
+    data: List[Optional[str]] = []
+    metadata: Dict[str, List[Any]] = {}
+    dimension = info.dimension
+    with open(part, "wb") as out:
+        for page in store.scan(namespace, include_vectors=True, page_size=page_size):
+            vectors = np.asarray([r.vector for r in page], dtype=np.float32)
+            if dimension is None:
+                dimension = vectors.shape[1]
+            if vectors.shape[1] != dimension:
+                raise ValueError(f"Namespace {namespace!r} returned {vectors.shape[1]}-dim vectors, expected {dimension}")
+            out.write(normalize_rows(vectors).astype(dtype).tobytes())
+            for record in page:
+                row = len(ids)
+                ids.append(record.id)
+                data.append(record.data)
+                for key, value in record.metadata.items():
+                    metadata.setdefault(key, [None] * row).append(value)
+                for column in metadata.values():
+                    if len(column) == row:
+                        column.append(None)
+
+    # The row count is only known now, so the .npy header goes in front of the streamed rows
+    with open(vectors_path, "wb") as out, open(part, "rb") as rows:
+        np.lib.format.write_array_header_1_0(out, {"descr": dtype.str, "fortran_order": False, "shape": (len(ids), dimension or 0)})
+        shutil.copyfileobj(rows, out, 1 << 20)
+    os.remove(part)
+
+    columns_path = os.path.join(directory, COLUMNS_FILE)
+    with open(columns_path, "w", encoding="utf-8") as f:
+        json.dump({"id": ids, "data": data, "metadata": metadata}, f, ensure_ascii=False, separators=(",", ":"))
+
+    manifest = {
+        "schema": SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": {"backend": store.backend, "namespace": namespace, "embedding_model": info.embedding_model},
+        "count": len(ids),
+        "dimension": dimension,
+        "precision": precision,
+        "files": {VECTORS_FILE: _file_entry(vectors_path), COLUMNS_FILE: _file_entry(columns_path)},
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(directory: str, verify: bool = False) -> Dict[str, Any]:
+    """The bundle's manifest, after checking file sizes (and hashes with ``verify``)."""
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No snapshot manifest in {directory}")
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("schema") != SCHEMA:
+        raise ValueError(f"Unsupported snapshot schema {manifest.get('schema')!r} in {directory}")
+    for name, expected in manifest["files"].items():
+        file = os.path.join(directory, name)
+        size = os.path.getsize(file) if os.path.exists(file) else None
+        if size != expected["bytes"]:
+            raise ValueError(f"{name} is {size} bytes, the manifest says {expected['bytes']}")
+        if verify and file_sha256(file) != expected["sha256"]:
+            raise ValueError(f"{name} does not match its checksum")
+    return manifest
+
+
+def load_snapshot(
+    directory: str,
+    store: Optional[InMemoryVectorStore] = None,
+    namespace: str = DEFAULT_NAMESPACE,
+    embedder: Optional[Embedder] = None,
+    verify: bool = False,
+) -> InMemoryVectorStore:
+    """Map the bundle at ``directory`` into ``namespace`` of ``store``.
+
+    Without a store, a new ``InMemoryVectorStore`` of the snapshot's
+    dimension (querying through ``embedder``) is returned.
+    """
+    manifest = read_manifest(directory, verify)
+    vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="c")
+    if vectors.dtype != np.float32:
+        vectors = vectors.astype(np.float32)
+    with open(os.path.join(directory, COLUMNS_FILE), encoding="utf-8") as f:
+        columns = json.load(f)
+    fields = columns["metadata"].items()
+    metadata = [{key: column[row] for key, column in fields if column[row] is not None} for row in range(len(columns["id"]))]
+
+    if store is None:
+        store = InMemoryVectorStore(dimension=manifest["dimension"], embedder=embedder)
+    store.load_namespace(vectors, columns["id"], columns["data"], metadata, namespace)
+    return store
+
+
+def build_parser() -> argparse.ArgumentParser:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export a vector-store namespace to a local snapshot, or load one")
+    parser.add_argument("--store", choices=BACKENDS, default="upstash", help="Store to export from")
+    parser.add_argument("--namespace", default=settings.foods_namespace)
+    parser.add_argument("--precision", choices=PRECISIONS, default="float32")
+    parser.add_argument("--page-size", type=int, default=100, help="Records per range request")
+    parser.add_argument("--output", metavar="DIR", help="Bundle directory (default SNAPSHOT_DIR/<namespace>)")
+    parser.add_argument("--standins", action="store_true", help="Export from a local Upstash stand-in loaded with the catalog")
+    parser.add_argument("--load", metavar="DIR", help="Load this bundle instead of exporting and report the cold-start time")
+    parser.add_argument("--verify", action="store_true", help="Re-hash the bundle's files when loading")
+    return parser
+
+
+def _load(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    try:
+        store = load_snapshot(args.load, verify=args.verify)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    info = store.info()
+    print(f"📂 {info.vector_count:,} × {info.dimension} vectors from {args.load} in {elapsed * 1000:.1f} ms"
+          f"{' (checksums verified)' if args.verify else ''}")
+    if info.vector_count:
+        first = store.fetch(store.ids()[:1], include_vectors=True)[0]
+        hit = store.query(vector=first.vector, top_k=1)[0]
+        print(f"🔎 Self-match: {first.id} → {hit.id} (score {hit.score:.4f})")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.load:
+        return _load(args)
+
+    settings = get_settings()
+    output = args.output or str(settings.resolve_path(settings.snapshot_dir) / (args.namespace or "default"))
+    standin = None
+    if args.standins:
+        from ragfood.catalog import food_records, load_food_data
+        from ragfood.standins import UpstashStandIn
+
+        standin = UpstashStandIn()
+        standin.store.upsert(food_records(load_food_data()), namespace=args.namespace)
+        standin.start()
+        settings = settings.replace(upstash_url=standin.url, upstash_token="standin-token")
+    try:
+        store = create_vector_store(args.store, settings)
+        start = time.perf_counter()
+        manifest = export_snapshot(store, output, args.namespace, args.precision, args.page_size)
+        elapsed = time.perf_counter() - start
+    except (NotImplementedError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    size = sum(entry["bytes"] for entry in manifest["files"].values())
+    print(f"💾 {manifest['count']:,} × {manifest['dimension']} {manifest['precision']} vectors from "
+          f"{args.store} namespace {args.namespace!r} → {output} ({size / 1e6:.2f} MB, {elapsed:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
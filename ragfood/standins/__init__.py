@@ -0,0 +1,17 @@
+"""
+Local service stand-ins
+=======================
+
+HTTP servers imitating the Upstash Vector REST API and the Groq chat
+completions API, with configurable latency and error distributions, so
+throughput and tail-latency work can run reproducibly with no network.
+
+    python -m ragfood.standins --load foods.json --vector-latency lognormal:median=0.03,sigma=0.4
+"""
+
+from ragfood.standins.base import StandInServer
+from ragfood.standins.groq import GroqStandIn
+from ragfood.standins.latency import ErrorModel, LatencyModel
+from ragfood.standins.upstash import UpstashStandIn
+
+__all__ = ["ErrorModel", "GroqStandIn", "LatencyModel", "StandInServer", "UpstashStandIn"]
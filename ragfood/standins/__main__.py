@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Run the Upstash and Groq stand-ins
+==================================
+
+Starts both servers and prints the environment variables that point the
+RAG scripts, tests and benchmarks at them.
+"""
+
+import argparse
+import time
+
+from ragfood.catalog import food_records, load_food_data
+from ragfood.config import get_settings
+from ragfood.standins import ErrorModel, GroqStandIn, LatencyModel, UpstashStandIn
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Local Upstash Vector and Groq stand-in servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--upstash-port", type=int, default=8081)
+    parser.add_argument("--groq-port", type=int, default=8082)
+    parser.add_argument("--token", default="standin-token", help="Bearer token both servers require")
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--vector-latency", default="0", help="Upstash latency spec, e.g. lognormal:median=0.03,sigma=0.4")
+    parser.add_argument("--llm-ttft", default="0", help="Groq time-to-first-token spec")
+    parser.add_argument("--llm-token-latency", default="0", help="Groq per-token latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--load", metavar="JSON", help="Pre-load a food catalog into the default and foods namespaces")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    upstash = UpstashStandIn(
+        dimension=args.dimension,
+        host=args.host,
+        port=args.upstash_port,
+        token=args.token,
+        latency=LatencyModel.parse(args.vector_latency, seed=args.seed),
+        errors=ErrorModel(args.error_rate, args.error_status, seed=args.seed),
+    )
+    groq = GroqStandIn(
+        host=args.host,
+        port=args.groq_port,
+        token=args.token,
+        latency=LatencyModel.parse(args.llm_ttft, seed=args.seed + 1),
+        token_latency=LatencyModel.parse(args.llm_token_latency, seed=args.seed + 2),
+        errors=ErrorModel(args.error_rate, args.error_status, seed=args.seed + 1),
+    )
+
+    if args.load:
+        food_data = load_food_data(args.load)
+        upstash.store.upsert(food_records(food_data))
+        upstash.store.upsert(food_records(food_data, id_prefix="food_", extended=True), namespace=get_settings().foods_namespace)
+        print(f"📋 Loaded {len(food_data)} food items into the stand-in index")
+
+    upstash.start()
+    groq.start()
+    print("✅ Stand-ins running. Point the project at them with:\n")
+    print(f"   export UPSTASH_VECTOR_REST_URL={upstash.url}")
+    print(f"   export UPSTASH_VECTOR_REST_TOKEN={args.token}")
+    print(f"   export GROQ_BASE_URL={groq.url}")
+    print(f"   export GROQ_API_KEY={args.token}")
+    print("\nPress Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n👋 Stopping stand-ins...")
+    finally:
+        upstash.stop()
+        groq.stop()
+
+
+if __name__ == "__main__":
+    main()
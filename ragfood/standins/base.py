@@ -0,0 +1,165 @@
+"""
+Stand-in Server Base
+====================
+
+Threaded HTTP/1.1 server with keep-alive, bearer-token auth, latency and
+error injection. Subclasses implement ``route`` and return either a JSON
+payload or a ``Streaming`` body (sent with chunked transfer encoding).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable, Optional, Tuple
+
+from ragfood.standins.latency import ErrorModel, LatencyModel
+
+
+class Streaming:
+    """A streamed response body: an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes], content_type: str = "text/event-stream"):
+        self.chunks = chunks
+        self.content_type = content_type
+
+
+class HTTPError(Exception):
+    """Raised by routes to return a JSON error with ``status``."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        raw = self.rfile.read(length)
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw.decode("utf-8")
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, body: Streaming) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", body.content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in body.chunks:
+            if chunk:
+                self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+                self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _dispatch(self) -> None:
+        server: StandInServer = self.server.standin
+        body = self._body()
+        status, payload = server.handle(self.command, self.path, dict(self.headers), body)
+        if isinstance(payload, Streaming):
+            self._send_stream(payload)
+        else:
+            self._send_json(status, payload)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_DELETE = _dispatch
+    do_PUT = _dispatch
+
+
+class StandInServer:
+    """Base class for local stand-ins of hosted APIs.
+
+    ``latency`` is slept before every response, ``errors`` decides which
+    requests fail instead. ``token`` enables bearer-token checks.
+    """
+
+    name = "standin"
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyModel] = None,
+        errors: Optional[ErrorModel] = None,
+        token: Optional[str] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency or LatencyModel()
+        self.errors = errors or ErrorModel()
+        self.token = token
+        self.request_count = 0
+        self.error_count = 0
+        self._count_lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Start serving on a daemon thread and return the base URL."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=f"{self.name}-server", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, headers: dict, body: Any) -> Tuple[int, Any]:
+        """Apply auth, fault injection and latency, then call ``route``."""
+        with self._count_lock:
+            self.request_count += 1
+        if self.token is not None:
+            auth = headers.get("Authorization") or headers.get("authorization") or ""
+            if auth != f"Bearer {self.token}":
+                return 401, {"error": "Unauthorized"}
+        status = self.errors.pick()
+        if status is not None:
+            with self._count_lock:
+                self.error_count += 1
+            time.sleep(self.latency.sample())
+            return status, {"error": f"Injected failure ({status})"}
+        try:
+            result = self.route(method, path.split("?", 1)[0].rstrip("/") or "/", body)
+        except HTTPError as e:
+            return e.status, {"error": e.message}
+        if not isinstance(result[1], Streaming):
+            time.sleep(self.latency.sample())
+        return result
+
+    def route(self, method: str, path: str, body: Any) -> Tuple[int, Any]:
+        raise NotImplementedError
@@ -0,0 +1,104 @@
+"""
+Groq Chat Completions Stand-in
+==============================
+
+Local server for ``POST /openai/v1/chat/completions`` (plus
+``GET /openai/v1/models``), including server-sent-event streaming with the
+final usage chunk under ``x_groq``. Point the Groq SDK at it with
+``GROQ_BASE_URL=http://127.0.0.1:<port>``.
+
+Answers come from ``StubProvider``, so they are deterministic. The
+server's ``latency`` model is the time to first token and
+``token_latency`` is drawn once per generated token.
+"""
+
+import json
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ragfood.llm import StubProvider, estimate_tokens, render_prompt
+from ragfood.standins.base import HTTPError, StandInServer, Streaming
+from ragfood.standins.latency import LatencyModel
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+MODELS_PATH = "/openai/v1/models"
+
+
+class GroqStandIn(StandInServer):
+    """In-process Groq (OpenAI-compatible) chat completions stand-in."""
+
+    name = "groq-standin"
+
+    def __init__(self, token_latency: Optional[LatencyModel] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.token_latency = token_latency or LatencyModel()
+        self._stub = StubProvider()
+
+    def route(self, method: str, path: str, body: Any) -> Tuple[int, Any]:
+        if path == MODELS_PATH:
+            return 200, {"object": "list", "data": [{"id": "llama-3.1-8b-instant", "object": "model", "owned_by": "Meta"}]}
+        if path != COMPLETIONS_PATH or method != "POST":
+            raise HTTPError(404, f"Unknown endpoint: {method} {path}")
+        if not isinstance(body, dict) or not body.get("messages"):
+            raise HTTPError(400, "'messages' is required")
+        max_tokens = int(body.get("max_completion_tokens") or body.get("max_tokens") or 1024)
+        words = self._stub.answer_words(body["messages"], max_tokens)
+        prompt_tokens = estimate_tokens(render_prompt(body["messages"]))
+        model = body.get("model", "llama-3.1-8b-instant")
+        if body.get("stream"):
+            return 200, Streaming(self._stream_chunks(model, words, prompt_tokens))
+        token_time = sum(self.token_latency.sample() for _ in words)
+        if token_time:
+            time.sleep(token_time)
+        return 200, self._completion(model, "".join(words).strip(), prompt_tokens, len(words), token_time)
+
+    def _usage(self, prompt_tokens: int, completion_tokens: int, completion_time: float) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "completion_time": completion_time,
+        }
+
+    def _completion(self, model: str, text: str, prompt_tokens: int, completion_tokens: int, completion_time: float) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(prompt_tokens, completion_tokens, completion_time),
+            "system_fingerprint": "standin",
+            "x_groq": {"id": f"req_{uuid.uuid4().hex}"},
+        }
+
+    def _chunk(self, chunk_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str], extra: Optional[Dict[str, Any]] = None) -> bytes:
+        payload = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}],
+        }
+        if extra:
+            payload.update(extra)
+        return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+    def _stream_chunks(self, model: str, words: List[str], prompt_tokens: int) -> Iterator[bytes]:
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        time.sleep(self.latency.sample())
+        start = time.perf_counter()
+        yield self._chunk(chunk_id, model, {"role": "assistant", "content": ""}, None)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.token_latency.sample())
+            yield self._chunk(chunk_id, model, {"content": word}, None)
+        usage = self._usage(prompt_tokens, len(words), time.perf_counter() - start)
+        yield self._chunk(chunk_id, model, {}, "stop", {"x_groq": {"id": f"req_{uuid.uuid4().hex}", "usage": usage}})
+        yield b"data: [DONE]\n\n"
@@ -0,0 +1,95 @@
+"""
+Latency and Error Models
+========================
+
+Seeded random distributions that drive the stand-in servers. A model is
+described by a compact spec string so it can be set from the CLI:
+
+    constant:value=0.05
+    uniform:low=0.02,high=0.08
+    normal:mean=0.05,stddev=0.01
+    lognormal:median=0.04,sigma=0.5
+    exponential:mean=0.03
+    pareto:scale=0.02,alpha=2.5
+
+All values are seconds. Samples are clamped at zero.
+"""
+
+import math
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential", "pareto")
+
+
+@dataclass
+class LatencyModel:
+    """A named distribution plus its parameters, sampled from a seeded RNG."""
+
+    kind: str = "constant"
+    params: Dict[str, float] = field(default_factory=lambda: {"value": 0.0})
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {self.kind!r} (expected one of {DISTRIBUTIONS})")
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyModel":
+        """Build a model from ``kind:key=value,...`` (a bare number means constant)."""
+        spec = spec.strip()
+        try:
+            return cls("constant", {"value": float(spec)}, seed)
+        except ValueError:
+            pass
+        kind, _, raw = spec.partition(":")
+        params = {}
+        for pair in filter(None, raw.split(",")):
+            key, _, value = pair.partition("=")
+            params[key.strip()] = float(value)
+        return cls(kind.strip(), params, seed)
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        p = self.params
+        with self._lock:
+            rng = self._rng
+            if self.kind == "constant":
+                value = p.get("value", 0.0)
+            elif self.kind == "uniform":
+                value = rng.uniform(p.get("low", 0.0), p.get("high", 0.0))
+            elif self.kind == "normal":
+                value = rng.gauss(p.get("mean", 0.0), p.get("stddev", 0.0))
+            elif self.kind == "lognormal":
+                value = rng.lognormvariate(math.log(p.get("median", 0.001)), p.get("sigma", 0.5))
+            elif self.kind == "exponential":
+                mean = p.get("mean", 0.0)
+                value = rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+            else:
+                value = p.get("scale", 0.0) * rng.paretovariate(p.get("alpha", 2.0))
+        return max(0.0, value)
+
+
+@dataclass
+class ErrorModel:
+    """Injects HTTP failures: ``rate`` of requests get ``status``."""
+
+    rate: float = 0.0
+    status: int = 503
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def pick(self) -> Optional[int]:
+        """Return an HTTP status to fail with, or None to serve normally."""
+        if self.rate <= 0:
+            return None
+        with self._lock:
+            failed = self._rng.random() < self.rate
+        return self.status if failed else None
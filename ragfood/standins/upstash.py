@@ -0,0 +1,217 @@
+"""
+Upstash Vector Stand-in
+=======================
+
+Local server speaking the subset of the Upstash Vector REST API used by
+this project (``upstash_vector.Index`` works against it unchanged):
+
+    POST /upsert[/ns]        POST /upsert-data[/ns]
+    POST /query[/ns]         POST /query-data[/ns]     (single or batch)
+    POST /fetch[/ns]         POST|DELETE /delete[/ns]
+    POST /range[/ns]         GET|POST /info[/ns]
+    POST /reset[/ns]         GET /list-namespaces
+
+Raw text is embedded with the deterministic ``HashingEmbedder`` and stored
+in an ``InMemoryVectorStore``, so scores use the same [0, 1] cosine scale.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from ragfood.embeddings import HashingEmbedder
+from ragfood.standins.base import HTTPError, StandInServer
+from ragfood.stores.base import DEFAULT_NAMESPACE, QueryResult, VectorQuery, VectorRecord
+from ragfood.stores.memory import InMemoryVectorStore
+
+_CLAUSE_RE = re.compile(r"^\s*([A-Za-z_][\w.]*)\s*(=|CONTAINS)\s*('(?:[^'\\]|\\.)*'|-?\d+(?:\.\d+)?|true|false)\s*$", re.I)
+
+
+def parse_filter(expression: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse ``a = 'x' AND b CONTAINS 'y'`` into equality conditions."""
+    if not expression or not expression.strip():
+        return None
+    conditions: Dict[str, Any] = {}
+    for clause in re.split(r"\s+AND\s+", expression.strip(), flags=re.I):
+        match = _CLAUSE_RE.match(clause)
+        if not match:
+            raise HTTPError(400, f"Unsupported filter clause in stand-in: {clause!r}")
+        key, _, literal = match.groups()
+        if literal.startswith("'"):
+            value: Any = literal[1:-1].replace("\\'", "'")
+        elif literal.lower() in ("true", "false"):
+            value = literal.lower() == "true"
+        else:
+            value = float(literal) if "." in literal else int(literal)
+        conditions[key] = value
+    return conditions
+
+
+def _result_json(result: QueryResult, include_metadata: bool, include_vectors: bool, include_data: bool) -> Dict[str, Any]:
+    item: Dict[str, Any] = {"id": result.id, "score": result.score}
+    if include_metadata and result.metadata:
+        item["metadata"] = result.metadata
+    if include_vectors and result.vector is not None:
+        item["vector"] = list(result.vector)
+    if include_data and result.data is not None:
+        item["data"] = result.data
+    return item
+
+
+class UpstashStandIn(StandInServer):
+    """In-process Upstash Vector REST stand-in."""
+
+    name = "upstash-standin"
+
+    def __init__(
+        self,
+        dimension: int = 1024,
+        store: Optional[InMemoryVectorStore] = None,
+        embedding_model: Optional[str] = "HASHING_STANDIN",
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.store = store or InMemoryVectorStore(embedder=HashingEmbedder(dimension))
+        self.dimension = self.store.dimension
+        # None reports a raw-vector index (no server-side embedding model)
+        self.embedding_model = embedding_model
+
+    def route(self, method: str, path: str, body: Any) -> Tuple[int, Any]:
+        parts = path.strip("/").split("/", 1)
+        command = parts[0]
+        namespace = parts[1] if len(parts) > 1 else DEFAULT_NAMESPACE
+        handler = {
+            "upsert": self._upsert,
+            "upsert-data": self._upsert,
+            "query": self._query,
+            "query-data": self._query,
+            "fetch": self._fetch,
+            "delete": self._delete,
+            "range": self._range,
+            "info": self._info,
+            "reset": self._reset,
+            "list-namespaces": self._list_namespaces,
+        }.get(command)
+        if handler is None:
+            raise HTTPError(404, f"Unknown endpoint: {path}")
+        return 200, {"result": handler(body, namespace)}
+
+    # -- endpoints -------------------------------------------------------
+
+    def _upsert(self, body: Any, namespace: str) -> str:
+        items = body if isinstance(body, list) else [body]
+        records = []
+        for item in items:
+            if not isinstance(item, dict) or "id" not in item:
+                raise HTTPError(400, "Each vector needs an id")
+            vector = item.get("vector")
+            if vector is not None and len(vector) != self.dimension:
+                raise HTTPError(422, f"Invalid vector dimension: {len(vector)}, expected: {self.dimension}")
+            if vector is None and item.get("data") is None:
+                raise HTTPError(400, "Each vector needs a vector or data")
+            records.append(VectorRecord(
+                id=str(item["id"]),
+                vector=vector,
+                data=item.get("data"),
+                metadata=item.get("metadata") or {},
+            ))
+        self.store.upsert(records, namespace=namespace)
+        return "Success"
+
+    def _query_one(self, q: Dict[str, Any], namespace: str) -> List[Dict[str, Any]]:
+        if q.get("vector") is None and q.get("data") is None:
+            raise HTTPError(400, "Query needs a vector or data")
+        include_metadata = bool(q.get("includeMetadata"))
+        include_vectors = bool(q.get("includeVectors"))
+        include_data = bool(q.get("includeData"))
+        results = self.store.query(
+            text=q.get("data"),
+            vector=q.get("vector"),
+            top_k=int(q.get("topK", 10)),
+            include_metadata=include_metadata,
+            include_vectors=include_vectors,
+            filter=parse_filter(q.get("filter")),
+            namespace=namespace,
+        )
+        return [_result_json(r, include_metadata, include_vectors, include_data) for r in results]
+
+    def _query(self, body: Any, namespace: str) -> Any:
+        if isinstance(body, list):
+            if any(q.get("filter") for q in body):
+                return [self._query_one(q, namespace) for q in body]
+            # Unfiltered batches are scored with one matrix multiplication
+            batch = self.store.query_many(
+                [VectorQuery(text=q.get("data"), vector=q.get("vector"), top_k=int(q.get("topK", 10))) for q in body],
+                include_metadata=True,
+                include_vectors=any(q.get("includeVectors") for q in body),
+                namespace=namespace,
+            )
+            return [
+                [_result_json(r, bool(q.get("includeMetadata")), bool(q.get("includeVectors")), bool(q.get("includeData"))) for r in results]
+                for q, results in zip(body, batch)
+            ]
+        return self._query_one(body or {}, namespace)
+
+    def _record_json(self, record: Optional[VectorRecord], body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if record is None:
+            return None
+        item: Dict[str, Any] = {"id": record.id}
+        if body.get("includeVectors") and record.vector is not None:
+            item["vector"] = list(record.vector)
+        if body.get("includeMetadata") and record.metadata:
+            item["metadata"] = record.metadata
+        if body.get("includeData") and record.data is not None:
+            item["data"] = record.data
+        return item
+
+    def _fetch(self, body: Any, namespace: str) -> List[Optional[Dict[str, Any]]]:
+        body = body if isinstance(body, dict) else {"ids": body or []}
+        ids = [str(i) for i in body.get("ids") or []]
+        if body.get("prefix"):
+            ids = [i for i in self.store.ids(namespace) if i.startswith(body["prefix"])]
+        records = self.store.fetch(ids, include_vectors=bool(body.get("includeVectors")), namespace=namespace)
+        return [self._record_json(r, body) for r in records]
+
+    def _delete(self, body: Any, namespace: str) -> Dict[str, int]:
+        ids = body.get("ids", []) if isinstance(body, dict) else (body if isinstance(body, list) else [body])
+        return {"deleted": self.store.delete([str(i) for i in ids], namespace=namespace)}
+
+    def _range(self, body: Any, namespace: str) -> Dict[str, Any]:
+        body = body or {}
+        ids = self.store.ids(namespace)
+        if body.get("prefix"):
+            ids = [i for i in ids if i.startswith(body["prefix"])]
+        start = int(body.get("cursor") or 0)
+        limit = int(body.get("limit", 100))
+        page = ids[start:start + limit]
+        records = self.store.fetch(page, include_vectors=bool(body.get("includeVectors")), namespace=namespace)
+        next_cursor = str(start + limit) if start + limit < len(ids) else ""
+        return {"nextCursor": next_cursor, "vectors": [self._record_json(r, body) for r in records]}
+
+    def _info(self, body: Any, namespace: str) -> Dict[str, Any]:
+        info = self.store.info()
+        namespaces = {name: {"vectorCount": count, "pendingVectorCount": 0} for name, count in info.namespaces.items()}
+        namespaces.setdefault(DEFAULT_NAMESPACE, {"vectorCount": 0, "pendingVectorCount": 0})
+        count = namespaces.get(namespace, {"vectorCount": 0})["vectorCount"] if namespace else info.vector_count
+        result = {
+            "vectorCount": count,
+            "pendingVectorCount": 0,
+            "indexSize": count * self.dimension * 4,
+            "dimension": self.dimension,
+            "similarityFunction": "COSINE",
+            "indexType": "DENSE",
+            "namespaces": namespaces,
+        }
+        if self.embedding_model:
+            result["denseIndex"] = {
+                "dimension": self.dimension,
+                "similarityFunction": "COSINE",
+                "embeddingModel": self.embedding_model,
+            }
+        return result
+
+    def _reset(self, body: Any, namespace: str) -> str:
+        self.store.delete(self.store.ids(namespace), namespace=namespace)
+        return "Success"
+
+    def _list_namespaces(self, body: Any, namespace: str) -> List[str]:
+        return sorted(set(self.store.info().namespaces) | {DEFAULT_NAMESPACE})
@@ -0,0 +1,116 @@
+"""
+Benchmark Statistics
+====================
+
+Small, dependency-free estimators used by the benchmark tools: sample
+quantiles with distribution-free confidence intervals, bootstrap
+intervals for arbitrary statistics and the Mann-Whitney U test.
+"""
+
+import math
+import random
+import statistics
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+def quantile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank quantile ``q`` (0-1) of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * min(max(q, 0.0), 1.0)))
+    return sorted_values[rank - 1]
+
+
+def quantile_interval(sorted_values: Sequence[float], q: float, confidence: float = 0.95) -> Tuple[float, float]:
+    """Distribution-free confidence interval for the ``q`` quantile.
+
+    Uses the order statistics whose ranks bound ``n*q`` by the normal
+    approximation to the binomial, so no assumption is made about the
+    latency distribution itself.
+    """
+    n = len(sorted_values)
+    if not n:
+        return 0.0, 0.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    spread = z * math.sqrt(n * q * (1 - q))
+    low = max(0, math.floor(n * q - spread) - 1)
+    high = min(n - 1, math.ceil(n * q + spread))
+    return sorted_values[low], sorted_values[high]
+
+
+def bootstrap_interval(
+    values: Sequence[float],
+    statistic: Callable[[Sequence[float]], float] = statistics.mean,
+    confidence: float = 0.95,
+    resamples: int = 1000,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """Percentile bootstrap confidence interval for ``statistic(values)``."""
+    if not values:
+        return 0.0, 0.0
+    if len(values) == 1:
+        return values[0], values[0]
+    rng = random.Random(seed)
+    estimates = sorted(statistic(rng.choices(values, k=len(values))) for _ in range(resamples))
+    alpha = (1 - confidence) / 2
+    return quantile(estimates, alpha), quantile(estimates, 1 - alpha)
+
+
+def summarize(values: Sequence[float], quantiles: Sequence[float] = (0.5, 0.9, 0.99), confidence: float = 0.95) -> Dict[str, object]:
+    """Count, mean and quantiles (each with a confidence interval)."""
+    ordered: List[float] = sorted(values)
+    summary: Dict[str, object] = {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered) if ordered else 0.0,
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min": ordered[0] if ordered else 0.0,
+        "max": ordered[-1] if ordered else 0.0,
+    }
+    for q in quantiles:
+        low, high = quantile_interval(ordered, q, confidence)
+        summary[f"p{q * 100:g}"] = {"value": quantile(ordered, q), "ci_low": low, "ci_high": high}
+    return summary
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float], alternative: str = "greater") -> Tuple[float, float]:
+    """Mann-Whitney U statistic of ``a`` and its p-value against ``b``.
+
+    ``alternative="greater"`` tests whether ``a`` tends to be larger than
+    ``b`` (e.g. current latencies slower than the baseline); ``"less"`` and
+    ``"two-sided"`` are also accepted. Uses the normal approximation with
+    tie and continuity corrections, which is accurate for the sample sizes
+    benchmarks produce (a few dozen and up).
+    """
+    if alternative not in ("greater", "less", "two-sided"):
+        raise ValueError(f"Unknown alternative: {alternative!r}")
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 0.0, 1.0
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    n = n1 + n2
+    rank_sum_a = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum_a += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        i = j + 1
+    u = rank_sum_a - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u, 1.0
+    sd = math.sqrt(variance)
+    normal = statistics.NormalDist()
+    if alternative == "greater":
+        p = 1 - normal.cdf((u - mean - 0.5) / sd)
+    elif alternative == "less":
+        p = normal.cdf((u - mean + 0.5) / sd)
+    else:
+        p = min(1.0, 2 * (1 - normal.cdf((abs(u - mean) - 0.5) / sd)))
+    return u, p
@@ -0,0 +1,66 @@
+"""
+Vector store backends
+=====================
+
+``create_vector_store("upstash" | "chroma" | "memory" | "ivf" | "quantized")`` returns a
+``VectorStore``; optional SDKs are imported only by the backend that needs
+them.
+"""
+
+from typing import Any, Optional
+
+from ragfood.config import Settings, get_settings
+from ragfood.stores.base import (
+    DEFAULT_NAMESPACE,
+    QueryResult,
+    StoreInfo,
+    VectorQuery,
+    VectorRecord,
+    VectorStore,
+)
+
+BACKENDS = ("upstash", "chroma", "memory", "ivf", "quantized")
+
+
+def create_vector_store(backend: str, settings: Optional[Settings] = None, **kwargs: Any) -> VectorStore:
+    """Build a vector store for ``backend`` using the shared settings."""
+    settings = settings or get_settings()
+    if backend == "upstash":
+        from ragfood.stores.upstash import UpstashVectorStore
+
+        return UpstashVectorStore(settings=settings, **kwargs)
+    if backend == "chroma":
+        from ragfood.stores.chroma import ChromaVectorStore
+
+        return ChromaVectorStore(settings=settings, **kwargs)
+    if backend == "memory":
+        from ragfood.embeddings import HashingEmbedder
+        from ragfood.stores.memory import InMemoryVectorStore
+
+        kwargs.setdefault("embedder", HashingEmbedder())
+        return InMemoryVectorStore(**kwargs)
+    if backend == "ivf":
+        from ragfood.embeddings import HashingEmbedder
+        from ragfood.stores.ivf import IVFVectorStore, ivf_store_options
+
+        kwargs.setdefault("embedder", HashingEmbedder())
+        return IVFVectorStore(**{**ivf_store_options(settings), **kwargs})
+    if backend == "quantized":
+        from ragfood.embeddings import HashingEmbedder
+        from ragfood.stores.quantized import QuantizedVectorStore, quantized_store_options
+
+        kwargs.setdefault("embedder", HashingEmbedder())
+        return QuantizedVectorStore(**{**quantized_store_options(settings), **kwargs})
+    raise ValueError(f"Unknown vector store backend: {backend!r} (expected one of {BACKENDS})")
+
+
+__all__ = [
+    "BACKENDS",
+    "DEFAULT_NAMESPACE",
+    "QueryResult",
+    "StoreInfo",
+    "VectorQuery",
+    "VectorRecord",
+    "VectorStore",
+    "create_vector_store",
+]
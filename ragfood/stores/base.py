@@ -0,0 +1,177 @@
+"""
+Vector Store Interface
+======================
+
+Backend-neutral contract shared by the Upstash, ChromaDB and in-memory
+stores, plus the record and result types every backend returns. Scores
+follow the Upstash convention: higher is better, cosine similarity is
+mapped onto [0, 1] as ``(1 + cos) / 2``.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_NAMESPACE = ""
+
+# Metadata fields stored as lists; filters test membership instead of equality
+LIST_FIELDS = frozenset({"dietary", "allergens", "ingredients"})
+
+
+@dataclass
+class VectorRecord:
+    """One item to store: a dense vector and/or raw text plus metadata."""
+
+    id: str
+    vector: Optional[Sequence[float]] = None
+    data: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class QueryResult:
+    """One ranked hit returned by ``VectorStore.query``."""
+
+    id: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    vector: Optional[Sequence[float]] = None
+    data: Optional[str] = None
+    # Set by federated search to the namespace the hit came from
+    namespace: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Display text: the original food description when available."""
+        return self.metadata.get("original_text") or self.data or ""
+
+
+@dataclass
+class VectorQuery:
+    """A single query for ``VectorStore.query_many``; set text or vector."""
+
+    text: Optional[str] = None
+    vector: Optional[Sequence[float]] = None
+    top_k: int = 3
+    filter: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class StoreInfo:
+    """Summary statistics for a store or namespace."""
+
+    vector_count: int
+    dimension: Optional[int]
+    backend: str
+    namespaces: Dict[str, int] = field(default_factory=dict)
+    # Model the index embeds raw text with; None for raw-vector indexes
+    embedding_model: Optional[str] = None
+
+
+def cosine_to_score(cosine: float) -> float:
+    """Map cosine similarity in [-1, 1] onto the Upstash [0, 1] score scale."""
+    return (1.0 + cosine) / 2.0
+
+
+def matches_filter(metadata: Dict[str, Any], conditions: Optional[Dict[str, Any]]) -> bool:
+    """Return True if ``metadata`` satisfies every equality condition.
+
+    List-valued metadata (``dietary``, ``allergens``) matches when it
+    contains the requested value.
+    """
+    if not conditions:
+        return True
+    for key, expected in conditions.items():
+        actual = metadata.get(key)
+        if isinstance(actual, (list, tuple, set)):
+            if expected not in actual:
+                return False
+        elif actual != expected:
+            return False
+    return True
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of at most ``size`` items without materializing the input."""
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class VectorStore(ABC):
+    """Abstract vector store used by the RAG engine and benchmarks."""
+
+    backend = "abstract"
+
+    @abstractmethod
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        """Insert or replace records in batches; return the number written."""
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        """Delete records by id; return the number removed."""
+
+    @abstractmethod
+    def fetch(
+        self,
+        ids: Sequence[str],
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[Optional[VectorRecord]]:
+        """Fetch records by id, returning None for ids that do not exist."""
+
+    @abstractmethod
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        """Return the ``top_k`` nearest records to a text or vector query."""
+
+    @abstractmethod
+    def info(self) -> StoreInfo:
+        """Return vector count and dimension for the store."""
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        """Run several queries; backends override this with a batched call."""
+        return [
+            self.query(
+                text=q.text,
+                vector=q.vector,
+                top_k=q.top_k,
+                include_metadata=include_metadata,
+                include_vectors=include_vectors,
+                filter=q.filter,
+                namespace=namespace,
+            )
+            for q in queries
+        ]
+
+    def scan(
+        self,
+        namespace: str = DEFAULT_NAMESPACE,
+        include_vectors: bool = True,
+        page_size: int = 100,
+    ) -> Iterator[List[VectorRecord]]:
+        """Every record in ``namespace``, one page at a time (a range scan)."""
+        raise NotImplementedError(f"The {self.backend} backend cannot scan a namespace")
+
+    def close(self) -> None:
+        """Release any client resources held by the store."""
@@ -0,0 +1,248 @@
+"""
+ChromaDB Vector Store
+=====================
+
+``VectorStore`` adapter over a persisted ChromaDB collection, the backend
+of the original local version. Chroma does not embed with our models, so
+text is encoded client-side by an ``Embedder`` (Ollama by default).
+Namespaces map onto separate collections named ``<collection>__<ns>``.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ragfood.config import Settings, get_settings
+from ragfood.embeddings import Embedder, OllamaEmbedder
+from ragfood.stores.base import (
+    DEFAULT_NAMESPACE,
+    LIST_FIELDS,
+    QueryResult,
+    StoreInfo,
+    VectorQuery,
+    VectorRecord,
+    VectorStore,
+    batched,
+)
+
+_LIST_SEPARATOR = ", "
+
+
+def flatten_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Chroma metadata must be scalar; join list fields into strings."""
+    flat = {}
+    for key, value in metadata.items():
+        if isinstance(value, (list, tuple)):
+            flat[key] = _LIST_SEPARATOR.join(str(v) for v in value)
+        elif value is None:
+            continue
+        else:
+            flat[key] = value
+    return flat
+
+
+def restore_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Undo ``flatten_metadata`` for the known list-valued fields."""
+    restored = dict(metadata or {})
+    for key in LIST_FIELDS:
+        if isinstance(restored.get(key), str):
+            restored[key] = [v for v in restored[key].split(_LIST_SEPARATOR) if v]
+    return restored
+
+
+def build_where(conditions: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Translate equality conditions into a Chroma ``where`` clause.
+
+    List fields are stored joined, so they are filtered client-side after
+    retrieval instead.
+    """
+    scalar = {k: v for k, v in (conditions or {}).items() if k not in LIST_FIELDS}
+    if not scalar:
+        return None
+    if len(scalar) == 1:
+        return dict(scalar)
+    return {"$and": [{k: v} for k, v in scalar.items()]}
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB backend using cosine space for new collections."""
+
+    backend = "chroma"
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        embedder: Optional[Embedder] = None,
+        client: Any = None,
+        path: Optional[str] = None,
+    ):
+        self.settings = settings or get_settings()
+        self.embedder = embedder or OllamaEmbedder(self.settings)
+        if client is None:
+            import chromadb
+
+            client = chromadb.PersistentClient(path=str(self.settings.resolve_path(path or self.settings.chroma_dir)))
+        self.client = client
+        self._collections: Dict[str, Any] = {}
+
+    def collection(self, namespace: str = DEFAULT_NAMESPACE) -> Any:
+        """Return (creating if needed) the collection backing ``namespace``."""
+        if namespace not in self._collections:
+            name = self.settings.chroma_collection
+            if namespace:
+                name = f"{name}__{namespace}"
+            self._collections[namespace] = self.client.get_or_create_collection(
+                name=name, metadata={"hnsw:space": "cosine"}
+            )
+        return self._collections[namespace]
+
+    def _score(self, collection: Any, distance: float) -> float:
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        if space in ("cosine", "ip"):
+            return 1.0 - distance / 2.0
+        # Squared L2 between unit vectors is 2 - 2cos
+        return 1.0 - distance / 4.0
+
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        collection = self.collection(namespace)
+        written = 0
+        for batch in batched(records, self.settings.upsert_batch_size):
+            missing = [r for r in batch if r.vector is None]
+            vectors = {}
+            if missing:
+                embedded = self.embedder.embed([r.data or "" for r in missing])
+                vectors = {r.id: v.tolist() for r, v in zip(missing, embedded)}
+            collection.upsert(
+                ids=[r.id for r in batch],
+                embeddings=[list(r.vector) if r.vector is not None else vectors[r.id] for r in batch],
+                documents=[r.metadata.get("original_text") or r.data or "" for r in batch],
+                metadatas=[flatten_metadata(r.metadata) or None for r in batch],
+            )
+            written += len(batch)
+        return written
+
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        if not ids:
+            return 0
+        collection = self.collection(namespace)
+        existing = collection.get(ids=list(ids), include=[])["ids"]
+        if existing:
+            collection.delete(ids=existing)
+        return len(existing)
+
+    def fetch(
+        self,
+        ids: Sequence[str],
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[Optional[VectorRecord]]:
+        include = ["documents", "metadatas"] + (["embeddings"] if include_vectors else [])
+        got = self.collection(namespace).get(ids=list(ids), include=include)
+        by_id = {}
+        for i, id_ in enumerate(got["ids"]):
+            by_id[id_] = VectorRecord(
+                id=id_,
+                vector=list(got["embeddings"][i]) if include_vectors else None,
+                data=got["documents"][i],
+                metadata=restore_metadata(got["metadatas"][i]) if include_metadata else {},
+            )
+        return [by_id.get(id_) for id_ in ids]
+
+    def scan(
+        self,
+        namespace: str = DEFAULT_NAMESPACE,
+        include_vectors: bool = True,
+        page_size: int = 100,
+    ) -> Iterator[List[VectorRecord]]:
+        include = ["documents", "metadatas"] + (["embeddings"] if include_vectors else [])
+        offset = 0
+        while True:
+            got = self.collection(namespace).get(limit=page_size, offset=offset, include=include)
+            if not len(got["ids"]):
+                return
+            yield [
+                VectorRecord(
+                    id=id_,
+                    vector=list(got["embeddings"][i]) if include_vectors else None,
+                    data=got["documents"][i],
+                    metadata=restore_metadata(got["metadatas"][i]),
+                )
+                for i, id_ in enumerate(got["ids"])
+            ]
+            offset += len(got["ids"])
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        return self.query_many(
+            [VectorQuery(text=text, vector=vector, top_k=top_k, filter=filter)],
+            include_metadata=include_metadata,
+            include_vectors=include_vectors,
+            namespace=namespace,
+        )[0]
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        """Group queries sharing top_k and filter into one ``collection.query`` call."""
+        collection = self.collection(namespace)
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if include_vectors else [])
+        texts = [i for i, q in enumerate(queries) if q.vector is None]
+        embedded = self.embedder.embed([queries[i].text or "" for i in texts]) if texts else []
+        vectors = [list(q.vector) if q.vector is not None else None for q in queries]
+        for i, row in zip(texts, embedded):
+            vectors[i] = row.tolist()
+
+        groups: Dict[Any, List[int]] = {}
+        for i, q in enumerate(queries):
+            key = (q.top_k, repr(sorted((q.filter or {}).items())))
+            groups.setdefault(key, []).append(i)
+
+        results: List[List[QueryResult]] = [[] for _ in queries]
+        for members in groups.values():
+            q = queries[members[0]]
+            list_conditions = {k: v for k, v in (q.filter or {}).items() if k in LIST_FIELDS}
+            # Over-fetch when list filters are applied client-side
+            n_results = q.top_k * 4 if list_conditions else q.top_k
+            got = collection.query(
+                query_embeddings=[vectors[i] for i in members],
+                n_results=n_results,
+                where=build_where(q.filter),
+                include=include,
+            )
+            for pos, i in enumerate(members):
+                hits = []
+                for j, id_ in enumerate(got["ids"][pos]):
+                    metadata = restore_metadata(got["metadatas"][pos][j])
+                    if any(v not in metadata.get(k, []) for k, v in list_conditions.items()):
+                        continue
+                    hits.append(QueryResult(
+                        id=id_,
+                        score=self._score(collection, got["distances"][pos][j]),
+                        metadata=metadata if include_metadata else {},
+                        vector=list(got["embeddings"][pos][j]) if include_vectors else None,
+                        data=got["documents"][pos][j],
+                    ))
+                results[i] = hits[: q.top_k]
+        return results
+
+    def info(self) -> StoreInfo:
+        collections = {ns: c.count() for ns, c in self._collections.items()} or {
+            DEFAULT_NAMESPACE: self.collection().count()
+        }
+        return StoreInfo(
+            vector_count=sum(collections.values()),
+            dimension=self.embedder.dimension or None,
+            backend=self.backend,
+            namespaces=collections,
+        )
@@ -0,0 +1,240 @@
+"""
+IVF Vector Store
+================
+
+In-process approximate search for large local catalogs: the in-memory
+NumPy store with an IVF index (``ragfood.ann``) per namespace.
+
+The index is built lazily on the first query once a namespace holds
+``min_items`` vectors. Building regroups the namespace's rows by inverted
+list, so the store keeps a single copy of every vector. Rows upserted
+later form an unindexed tail that is scanned exactly. The index is
+rebuilt when the tail outgrows ``rebuild_ratio`` of the indexed rows, or
+after deletes or in-place updates.
+
+Filtered queries scan the probed lists and apply the filter. Any query
+whose probed lists hold fewer than ``top_k`` matches falls back to exact
+search.
+
+``save(directory)`` writes one subdirectory per namespace. It holds the
+index arrays and ``records.jsonl`` (ids, text, metadata).
+``IVFVectorStore.load`` maps the vectors instead of reading them.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.ann import IVFIndex
+from ragfood.embeddings import Embedder
+from ragfood.stores.base import (
+    DEFAULT_NAMESPACE,
+    QueryResult,
+    VectorQuery,
+    VectorRecord,
+    matches_filter,
+)
+from ragfood.stores.memory import InMemoryVectorStore, _Namespace, top_k_indices
+
+SCHEMA = "ragfood-ivf-store/1"
+
+
+class IVFVectorStore(InMemoryVectorStore):
+    """``InMemoryVectorStore`` answering queries from an IVF index.
+
+    ``nlist`` 0 picks ``default_nlist`` at build time. ``nprobe`` is the
+    default number of lists scanned per query.
+    """
+
+    backend = "ivf"
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        embedder: Optional[Embedder] = None,
+        batch_size: int = 1024,
+        nlist: int = 0,
+        nprobe: int = 8,
+        iterations: int = 10,
+        min_items: int = 1024,
+        rebuild_ratio: float = 0.2,
+        seed: int = 0,
+    ):
+        super().__init__(dimension, embedder, batch_size)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.min_items = min_items
+        self.rebuild_ratio = rebuild_ratio
+        self.seed = seed
+        self._indexes: Dict[str, IVFIndex] = {}
+        self._stale: set = set()
+
+    # -- index maintenance -----------------------------------------------
+
+    def build_index(self, namespace: str = DEFAULT_NAMESPACE) -> Optional[IVFIndex]:
+        """(Re)build the namespace's index now and regroup its rows by list."""
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is None or ns.count == 0:
+                self._indexes.pop(namespace, None)
+                return None
+            index, order = IVFIndex.build(ns.vectors[: ns.count], self.nlist or None, self.nprobe, self.iterations, self.seed)
+            vectors = np.zeros((max(ns.count, ns.vectors.shape[0]), self.dimension), dtype=np.float32)
+            vectors[: ns.count] = index.vectors
+            index.vectors = vectors[: ns.count]
+            rows = order.tolist()
+            ns.ids = [ns.ids[row] for row in rows]
+            ns.metadata = [ns.metadata[row] for row in rows]
+            ns.data = [ns.data[row] for row in rows]
+            ns.positions = {id_: row for row, id_ in enumerate(ns.ids)}
+            ns.vectors = vectors
+            self._indexes[namespace] = index
+            self._stale.discard(namespace)
+            return index
+
+    def index(self, namespace: str = DEFAULT_NAMESPACE) -> Optional[IVFIndex]:
+        """The current index, building or rebuilding it first when due."""
+        ns = self._namespace(namespace)
+        if ns is None or ns.count < max(1, self.min_items):
+            return None
+        index = self._indexes.get(namespace)
+        if index is None or namespace in self._stale or ns.count - len(index) > self.rebuild_ratio * len(index):
+            index = self.build_index(namespace)
+        return index
+
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        def watch(records: Iterable[VectorRecord]) -> Iterable[VectorRecord]:
+            for record in records:
+                index, ns = self._indexes.get(namespace), self._namespace(namespace)
+                if index is not None and ns is not None and ns.positions.get(record.id, len(index)) < len(index):
+                    self._stale.add(namespace)
+                yield record
+
+        return super().upsert(watch(records), namespace)
+
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        removed = super().delete(ids, namespace)
+        if removed:
+            self._stale.add(namespace)
+        return removed
+
+    # -- search ----------------------------------------------------------
+
+    def _search(self, ns: _Namespace, index: IVFIndex, q: np.ndarray, top_k: int, nprobe: Optional[int],
+                filter: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        rows, scores = index.candidates(q, nprobe)
+        tail = len(index)
+        if ns.count > tail:
+            rows = np.concatenate([rows, np.arange(tail, ns.count)])
+            scores = np.concatenate([scores, ns.vectors[tail: ns.count] @ q])
+        if filter:
+            keep = np.fromiter((matches_filter(ns.metadata[row], filter) for row in rows), dtype=bool, count=len(rows))
+            rows, scores = rows[keep], scores[keep]
+        if len(rows) < min(top_k, ns.count):
+            return None
+        top = top_k_indices(scores, top_k)
+        return rows[top], scores[top]
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        nprobe: Optional[int] = None,
+    ) -> List[QueryResult]:
+        """Approximate top-``k``; ``nprobe`` overrides the store default for this query."""
+        index = self.index(namespace)
+        if index is None:
+            return super().query(text, vector, top_k, include_metadata, include_vectors, filter, namespace)
+        ns = self._namespace(namespace)
+        q = self._query_vector(text, vector)
+        found = self._search(ns, index, q, top_k, nprobe, filter)
+        if found is None:
+            return super().query(None, q, top_k, include_metadata, include_vectors, filter, namespace)
+        rows, scores = found
+        return self._results(ns, rows, scores, include_metadata, include_vectors)
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        if self.index(namespace) is None:
+            return super().query_many(queries, include_metadata, include_vectors, namespace)
+        return [
+            self.query(q.text, q.vector, q.top_k, include_metadata, include_vectors, q.filter, namespace)
+            for q in queries
+        ]
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, directory: str) -> str:
+        """Write every namespace (building due indexes first) under ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        manifest = {"schema": SCHEMA, "dimension": self.dimension, "nlist": self.nlist, "nprobe": self.nprobe,
+                    "namespaces": {}}
+        for number, name in enumerate(sorted(self._namespaces)):
+            ns = self._namespaces[name]
+            index = self.index(name) if ns.count >= self.min_items else None
+            path = os.path.join(directory, f"ns{number}")
+            os.makedirs(path, exist_ok=True)
+            np.save(os.path.join(path, "vectors.npy"), ns.vectors[: ns.count])
+            if index is not None:
+                index.save(path, vectors=False)
+            with open(os.path.join(path, "records.jsonl"), "w", encoding="utf-8") as f:
+                for id_, data, metadata in zip(ns.ids, ns.data, ns.metadata):
+                    f.write(json.dumps({"id": id_, "data": data, "metadata": metadata}, ensure_ascii=False) + "\n")
+            manifest["namespaces"][name] = {"path": f"ns{number}", "count": ns.count,
+                                            "indexed": len(index) if index is not None else 0}
+        with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, embedder: Optional[Embedder] = None, mmap: bool = True, **kwargs: Any) -> "IVFVectorStore":
+        """Open a saved store; vectors are mapped copy-on-write unless ``mmap`` is False."""
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("schema") != SCHEMA:
+            raise ValueError(f"{directory} is not a saved IVF store (schema {manifest.get('schema')!r})")
+        kwargs.setdefault("nlist", manifest["nlist"])
+        kwargs.setdefault("nprobe", manifest["nprobe"])
+        store = cls(manifest["dimension"], embedder, **kwargs)
+        for name, entry in manifest["namespaces"].items():
+            path = os.path.join(directory, entry["path"])
+            ns = store._namespace(name, create=True)
+            ns.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="c" if mmap else None)
+            with open(os.path.join(path, "records.jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    ns.ids.append(record["id"])
+                    ns.data.append(record["data"])
+                    ns.metadata.append(record["metadata"])
+            ns.count = len(ns.ids)
+            ns.positions = {id_: row for row, id_ in enumerate(ns.ids)}
+            if entry["indexed"]:
+                store._indexes[name] = IVFIndex.load(path, mmap, vectors=ns.vectors[: entry["indexed"]])
+                store._indexes[name].nprobe = store.nprobe
+        return store
+
+
+def ivf_store_options(settings: Any) -> Dict[str, Any]:
+    """``IVFVectorStore`` keyword arguments from ``ANN_*`` settings."""
+    return {
+        "nlist": settings.ann_nlist,
+        "nprobe": settings.ann_nprobe,
+        "iterations": settings.ann_iterations,
+        "min_items": settings.ann_min_items,
+    }
+
+
+__all__ = ["IVFVectorStore", "ivf_store_options"]
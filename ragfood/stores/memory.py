@@ -0,0 +1,321 @@
+"""
+In-Memory NumPy Vector Store
+============================
+
+Exact cosine-similarity search over a contiguous float32 matrix. Used for
+offline benchmarks, the local stand-in server and as the ground truth that
+approximate indexes are measured against.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood.embeddings import Embedder
+from ragfood.stores.base import (
+    DEFAULT_NAMESPACE,
+    QueryResult,
+    StoreInfo,
+    VectorQuery,
+    VectorRecord,
+    VectorStore,
+    batched,
+    cosine_to_score,
+    matches_filter,
+)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return ``matrix`` with each row scaled to unit L2 norm."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores in descending order."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < scores.shape[-1]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[-1])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class _Namespace:
+    """Rows of one namespace; arrays are replaced, never mutated, on delete."""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.count = 0
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.metadata: List[Dict[str, Any]] = []
+        self.data: List[Optional[str]] = []
+
+    def reserve(self, extra: int) -> None:
+        needed = self.count + extra
+        if needed <= self.vectors.shape[0]:
+            return
+        capacity = max(needed, 2 * self.vectors.shape[0], 64)
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        grown[: self.count] = self.vectors[: self.count]
+        self.vectors = grown
+
+    def write(self, rows: List[int], vectors: np.ndarray) -> None:
+        """Store normalized ``vectors`` at ``rows`` (already reserved)."""
+        self.vectors[rows] = vectors
+
+    def attach(self, vectors: np.ndarray) -> None:
+        """Adopt normalized ``vectors`` as the rows of this (empty) namespace, without copying."""
+        self.vectors = vectors
+
+    def keep(self, rows: List[int]) -> None:
+        """Drop every row not in ``rows`` (ascending), renumbering the rest."""
+        self.vectors = self.vectors[rows].copy()
+        self.ids = [self.ids[row] for row in rows]
+        self.metadata = [self.metadata[row] for row in rows]
+        self.data = [self.data[row] for row in rows]
+        self.count = len(rows)
+        self.positions = {id_: row for row, id_ in enumerate(self.ids)}
+
+
+class InMemoryVectorStore(VectorStore):
+    """Exact-search store backed by NumPy matrices, one per namespace."""
+
+    backend = "memory"
+
+    def __init__(self, dimension: Optional[int] = None, embedder: Optional[Embedder] = None, batch_size: int = 1024):
+        if dimension is None and embedder is None:
+            raise ValueError("InMemoryVectorStore needs a dimension or an embedder")
+        self.embedder = embedder
+        self.dimension = dimension or embedder.dimension
+        self.batch_size = batch_size
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    # -- helpers ---------------------------------------------------------
+
+    def _namespace(self, namespace: str, create: bool = False) -> Optional[_Namespace]:
+        ns = self._namespaces.get(namespace)
+        if ns is None and create:
+            ns = self._namespaces[namespace] = _Namespace(self.dimension)
+        return ns
+
+    def _query_vector(self, text: Optional[str], vector: Optional[Sequence[float]]) -> np.ndarray:
+        if vector is not None:
+            return normalize_rows(np.asarray(vector, dtype=np.float32))
+        if text is None:
+            raise ValueError("query needs either text or vector")
+        if self.embedder is None:
+            raise ValueError("text queries need an embedder")
+        return normalize_rows(self.embedder.embed_one(text))
+
+    def _record_vectors(self, records: List[VectorRecord]) -> np.ndarray:
+        missing = [i for i, r in enumerate(records) if r.vector is None]
+        vectors = np.zeros((len(records), self.dimension), dtype=np.float32)
+        for i, record in enumerate(records):
+            if record.vector is not None:
+                vectors[i] = record.vector
+        if missing:
+            if self.embedder is None:
+                raise ValueError("records without vectors need an embedder")
+            vectors[missing] = self.embedder.embed([records[i].data or "" for i in missing])
+        return normalize_rows(vectors)
+
+    def _results(
+        self,
+        ns: _Namespace,
+        rows: np.ndarray,
+        cosines: np.ndarray,
+        include_metadata: bool,
+        include_vectors: bool,
+    ) -> List[QueryResult]:
+        """Results for ``rows``; ``cosines[i]`` is the similarity of ``rows[i]``."""
+        return [
+            QueryResult(
+                id=ns.ids[row],
+                score=float(cosine_to_score(cosine)),
+                metadata=dict(ns.metadata[row]) if include_metadata else {},
+                vector=ns.vectors[row].tolist() if include_vectors else None,
+                data=ns.data[row],
+            )
+            for row, cosine in zip(rows, cosines)
+        ]
+
+    # -- VectorStore API -------------------------------------------------
+
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        written = 0
+        for batch in batched(records, self.batch_size):
+            vectors = self._record_vectors(batch)
+            with self._lock:
+                ns = self._namespace(namespace, create=True)
+                ns.reserve(len(batch))
+                rows = []
+                for record in batch:
+                    row = ns.positions.get(record.id)
+                    if row is None:
+                        row = ns.count
+                        ns.count += 1
+                        ns.positions[record.id] = row
+                        ns.ids.append(record.id)
+                        ns.metadata.append(dict(record.metadata))
+                        ns.data.append(record.data)
+                    else:
+                        ns.metadata[row] = dict(record.metadata)
+                        ns.data[row] = record.data
+                    rows.append(row)
+                ns.write(rows, vectors)
+            written += len(batch)
+        return written
+
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns is None:
+                return 0
+            doomed = {ns.positions[i] for i in ids if i in ns.positions}
+            if not doomed:
+                return 0
+            ns.keep([row for row in range(ns.count) if row not in doomed])
+            return len(doomed)
+
+    def fetch(
+        self,
+        ids: Sequence[str],
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[Optional[VectorRecord]]:
+        ns = self._namespace(namespace)
+        records: List[Optional[VectorRecord]] = []
+        for id_ in ids:
+            row = ns.positions.get(id_) if ns else None
+            if row is None:
+                records.append(None)
+                continue
+            records.append(VectorRecord(
+                id=id_,
+                vector=ns.vectors[row].tolist() if include_vectors else None,
+                data=ns.data[row],
+                metadata=dict(ns.metadata[row]) if include_metadata else {},
+            ))
+        return records
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        ns = self._namespace(namespace)
+        if ns is None or ns.count == 0:
+            return []
+        q = self._query_vector(text, vector)
+        cosines = ns.vectors[: ns.count] @ q
+        if filter:
+            mask = np.fromiter((matches_filter(m, filter) for m in ns.metadata), dtype=bool, count=ns.count)
+            cosines = np.where(mask, cosines, -np.inf)
+            top_k = min(top_k, int(mask.sum()))
+        rows = top_k_indices(cosines, top_k)
+        return self._results(ns, rows, cosines[rows], include_metadata, include_vectors)
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        """Score all unfiltered queries with one matrix multiplication."""
+        ns = self._namespace(namespace)
+        if ns is None or ns.count == 0:
+            return [[] for _ in queries]
+        if any(q.filter for q in queries):
+            return super().query_many(queries, include_metadata, include_vectors, namespace)
+
+        texts = [i for i, q in enumerate(queries) if q.vector is None]
+        matrix = np.zeros((len(queries), self.dimension), dtype=np.float32)
+        for i, q in enumerate(queries):
+            if q.vector is not None:
+                matrix[i] = q.vector
+        if texts:
+            if self.embedder is None:
+                raise ValueError("text queries need an embedder")
+            matrix[texts] = self.embedder.embed([queries[i].text or "" for i in texts])
+        cosines = normalize_rows(matrix) @ ns.vectors[: ns.count].T
+        results = []
+        for i, q in enumerate(queries):
+            rows = top_k_indices(cosines[i], q.top_k)
+            results.append(self._results(ns, rows, cosines[i][rows], include_metadata, include_vectors))
+        return results
+
+    def scan(
+        self,
+        namespace: str = DEFAULT_NAMESPACE,
+        include_vectors: bool = True,
+        page_size: int = 100,
+    ) -> Iterator[List[VectorRecord]]:
+        for page in batched(self.ids(namespace), page_size):
+            yield [r for r in self.fetch(page, include_vectors, namespace=namespace) if r is not None]
+
+    def load_namespace(
+        self,
+        vectors: np.ndarray,
+        ids: Sequence[str],
+        data: Optional[Sequence[Optional[str]]] = None,
+        metadata: Optional[Sequence[Dict[str, Any]]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> int:
+        """Fill an empty ``namespace`` from unit-normalized ``vectors`` and aligned columns.
+
+        The vectors are kept as given, so a copy-on-write memory map serves
+        queries straight from the page cache; rows are only copied into RAM
+        when the namespace later grows.
+        """
+        if len(vectors) != len(ids) or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {len(ids)} × {self.dimension} vectors, got {vectors.shape[0]} × {vectors.shape[1]}")
+        with self._lock:
+            ns = self._namespace(namespace, create=True)
+            if ns.count:
+                raise ValueError(f"Namespace {namespace!r} is not empty")
+            ns.attach(vectors)
+            ns.ids = list(ids)
+            ns.positions = {id_: row for row, id_ in enumerate(ns.ids)}
+            ns.data = list(data) if data is not None else [None] * len(ns.ids)
+            ns.metadata = [dict(m or {}) for m in metadata] if metadata is not None else [{} for _ in ns.ids]
+            ns.count = len(ns.ids)
+        return ns.count
+
+    def info(self) -> StoreInfo:
+        counts = {name: ns.count for name, ns in self._namespaces.items()}
+        return StoreInfo(
+            vector_count=sum(counts.values()),
+            dimension=self.dimension,
+            backend=self.backend,
+            namespaces=counts,
+        )
+
+    def vectors(self, namespace: str = DEFAULT_NAMESPACE) -> np.ndarray:
+        """Read-only view of the normalized vectors stored in ``namespace``."""
+        ns = self._namespace(namespace)
+        if ns is None:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        view = ns.vectors[: ns.count]
+        view.flags.writeable = False
+        return view
+
+    def ids(self, namespace: str = DEFAULT_NAMESPACE) -> List[str]:
+        """Ids in row order for ``namespace``."""
+        ns = self._namespace(namespace)
+        return list(ns.ids) if ns else []
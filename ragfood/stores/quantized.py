@@ -0,0 +1,217 @@
+"""
+Quantized Vector Store
+======================
+
+In-process store for catalogs whose float32 vectors no longer fit
+comfortably in RAM. Only compact codes (``float16`` or ``int8``, see
+``ragfood.quantize``) stay resident. The full-precision vectors go to one
+memory-mapped file per namespace, and the OS pages them in on demand.
+
+A query scores every code with vectorized dot products and keeps the best
+``rescore * top_k`` candidates. It then reads just those rows from the
+mapped file and ranks them by their exact cosine. Returned scores are
+therefore exact, and recall loss only comes from candidates the codes
+ranked too low. ``rescore=0`` skips the second pass and returns code
+scores.
+
+Vector files are scratch space, not a saved store: they live under
+``directory`` (truncated when a namespace is created), or in a temporary
+directory that ``close()`` removes.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ragfood import quantize
+from ragfood.embeddings import Embedder
+from ragfood.stores.base import DEFAULT_NAMESPACE, QueryResult, VectorQuery, matches_filter
+from ragfood.stores.memory import InMemoryVectorStore, _Namespace, normalize_rows, top_k_indices
+
+
+class _QuantizedNamespace(_Namespace):
+    """Codes and scales in RAM; ``vectors`` is a read-write map of ``path``."""
+
+    def __init__(self, dimension: int, precision: str, path: str):
+        super().__init__(dimension)
+        self.precision = precision
+        self.path = path
+        self.codes = np.zeros((0, dimension), dtype=quantize.CODE_DTYPES[precision])
+        self.scales = np.zeros(0, dtype=np.float32)
+        open(path, "wb").close()
+
+    def _remap(self, capacity: int) -> None:
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.dimension * 4)
+        if capacity:
+            self.vectors = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def reserve(self, extra: int) -> None:
+        needed = self.count + extra
+        if needed <= self.codes.shape[0]:
+            return
+        capacity = max(needed, 2 * self.codes.shape[0], 64)
+        codes = np.zeros((capacity, self.dimension), dtype=self.codes.dtype)
+        codes[: self.count] = self.codes[: self.count]
+        scales = np.ones(capacity, dtype=np.float32)
+        scales[: self.count] = self.scales[: self.count]
+        self.codes, self.scales = codes, scales
+        self._remap(capacity)
+
+    def write(self, rows: List[int], vectors: np.ndarray) -> None:
+        self.vectors[rows] = vectors
+        self.codes[rows], self.scales[rows] = quantize.encode(vectors, self.precision)
+
+    def attach(self, vectors: np.ndarray) -> None:
+        # Codes have to be computed anyway, so the vectors are copied into this namespace's own file
+        self.reserve(len(vectors))
+        for start in range(0, len(vectors), quantize.SCORE_CHUNK):
+            rows = list(range(start, min(start + quantize.SCORE_CHUNK, len(vectors))))
+            self.write(rows, np.asarray(vectors[start:start + len(rows)], dtype=np.float32))
+
+    def keep(self, rows: List[int]) -> None:
+        # Compact the mapped file in place; rows[i] >= i, so chunks never overwrite rows still to be read
+        for start in range(0, len(rows), quantize.SCORE_CHUNK):
+            chunk = rows[start:start + quantize.SCORE_CHUNK]
+            self.vectors[start:start + len(chunk)] = self.vectors[chunk]
+        self.codes = self.codes[rows].copy()
+        self.scales = self.scales[rows].copy()
+        self.ids = [self.ids[row] for row in rows]
+        self.metadata = [self.metadata[row] for row in rows]
+        self.data = [self.data[row] for row in rows]
+        self.count = len(rows)
+        self.positions = {id_: row for row, id_ in enumerate(self.ids)}
+        self._remap(len(rows))
+
+    @property
+    def resident_bytes(self) -> int:
+        return self.count * quantize.bytes_per_vector(self.precision, self.dimension)
+
+
+class QuantizedVectorStore(InMemoryVectorStore):
+    """``InMemoryVectorStore`` keeping ``float16``/``int8`` codes in RAM and
+    full vectors in memory-mapped files, rescored per query."""
+
+    backend = "quantized"
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        embedder: Optional[Embedder] = None,
+        batch_size: int = 1024,
+        precision: str = "int8",
+        rescore: int = 4,
+        directory: Optional[str] = None,
+    ):
+        super().__init__(dimension, embedder, batch_size)
+        self.precision = quantize.check_precision(precision)
+        self.rescore = rescore
+        self._owned = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="ragfood-quantized-")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _namespace(self, namespace: str, create: bool = False) -> Optional[_QuantizedNamespace]:
+        ns = self._namespaces.get(namespace)
+        if ns is None and create:
+            path = os.path.join(self.directory, f"ns{len(self._namespaces)}.f32")
+            ns = self._namespaces[namespace] = _QuantizedNamespace(self.dimension, self.precision, path)
+        return ns
+
+    def resident_bytes(self, namespace: Optional[str] = None) -> int:
+        """Bytes of codes and scales held in RAM (one namespace or all)."""
+        if namespace is not None:
+            ns = self._namespace(namespace)
+            return ns.resident_bytes if ns else 0
+        return sum(ns.resident_bytes for ns in self._namespaces.values())
+
+    def _rank(self, ns: _QuantizedNamespace, q: np.ndarray, approx: np.ndarray, top_k: int) -> tuple:
+        """Top ``top_k`` ``(rows, cosines)`` from code scores, rescored when enabled."""
+        if not self.rescore:
+            rows = top_k_indices(approx, top_k)
+            return rows, approx[rows]
+        candidates = np.sort(top_k_indices(approx, top_k * self.rescore))
+        candidates = candidates[np.isfinite(approx[candidates])]
+        exact = ns.vectors[candidates] @ q
+        top = top_k_indices(exact, top_k)
+        return candidates[top], exact[top]
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        ns = self._namespace(namespace)
+        if ns is None or ns.count == 0:
+            return []
+        q = self._query_vector(text, vector)
+        approx = quantize.scores(ns.codes[: ns.count], ns.scales[: ns.count], q)
+        if filter:
+            mask = np.fromiter((matches_filter(m, filter) for m in ns.metadata), dtype=bool, count=ns.count)
+            approx = np.where(mask, approx, -np.inf)
+            top_k = min(top_k, int(mask.sum()))
+        rows, cosines = self._rank(ns, q, approx, top_k)
+        return self._results(ns, rows, cosines, include_metadata, include_vectors)
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        """Score all unfiltered queries against the codes in one pass."""
+        ns = self._namespace(namespace)
+        if ns is None or ns.count == 0:
+            return [[] for _ in queries]
+        if any(q.filter for q in queries):
+            return [
+                self.query(q.text, q.vector, q.top_k, include_metadata, include_vectors, q.filter, namespace)
+                for q in queries
+            ]
+        texts = [i for i, q in enumerate(queries) if q.vector is None]
+        matrix = np.zeros((len(queries), self.dimension), dtype=np.float32)
+        for i, q in enumerate(queries):
+            if q.vector is not None:
+                matrix[i] = q.vector
+        if texts:
+            if self.embedder is None:
+                raise ValueError("text queries need an embedder")
+            matrix[texts] = self.embedder.embed([queries[i].text or "" for i in texts])
+        matrix = normalize_rows(matrix)
+        approx = quantize.scores(ns.codes[: ns.count], ns.scales[: ns.count], matrix)
+        results = []
+        for i, q in enumerate(queries):
+            rows, cosines = self._rank(ns, matrix[i], approx[i], q.top_k)
+            results.append(self._results(ns, rows, cosines, include_metadata, include_vectors))
+        return results
+
+    def close(self) -> None:
+        for ns in self._namespaces.values():
+            if isinstance(ns.vectors, np.memmap):
+                ns.vectors.flush()
+        if self._owned:
+            self._namespaces.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def quantized_store_options(settings: Any) -> Dict[str, Any]:
+    """``QuantizedVectorStore`` keyword arguments from ``QUANT_*`` settings."""
+    return {
+        "precision": settings.quant_precision,
+        "rescore": settings.quant_rescore,
+        "directory": str(settings.resolve_path(settings.quant_dir)) if settings.quant_dir else None,
+    }
+
+
+__all__ = ["QuantizedVectorStore", "quantized_store_options"]
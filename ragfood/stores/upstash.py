@@ -0,0 +1,207 @@
+"""
+Upstash Vector Store
+====================
+
+``VectorStore`` adapter over the ``upstash_vector`` SDK. Records without a
+vector are sent as raw text and embedded server-side (MXBAI_EMBED_LARGE_V1),
+exactly like the existing ``index.upsert(vectors=[(id, text, metadata)])``
+calls in the RAG scripts.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ragfood.config import Settings, get_settings
+from ragfood.stores.base import (
+    DEFAULT_NAMESPACE,
+    LIST_FIELDS,
+    QueryResult,
+    StoreInfo,
+    VectorQuery,
+    VectorRecord,
+    VectorStore,
+    batched,
+)
+
+
+def build_filter(conditions: Optional[Dict[str, Any]]) -> str:
+    """Translate equality conditions into Upstash metadata filter syntax."""
+    if not conditions:
+        return ""
+    clauses = []
+    for key, value in conditions.items():
+        literal = "'" + value.replace("'", "\\'") + "'" if isinstance(value, str) else str(value)
+        operator = "CONTAINS" if key in LIST_FIELDS else "="
+        clauses.append(f"{key} {operator} {literal}")
+    return " AND ".join(clauses)
+
+
+def to_query_result(result: Any) -> QueryResult:
+    """Convert an SDK ``QueryResult`` into the shared result type."""
+    return QueryResult(
+        id=str(getattr(result, "id", "")),
+        score=float(getattr(result, "score", 0.0) or 0.0),
+        metadata=getattr(result, "metadata", None) or {},
+        vector=getattr(result, "vector", None),
+        data=getattr(result, "data", None),
+    )
+
+
+class UpstashVectorStore(VectorStore):
+    """Upstash Vector backend; credentials default to the shared settings."""
+
+    backend = "upstash"
+
+    def __init__(self, settings: Optional[Settings] = None, index: Any = None, read_only: bool = False):
+        self.settings = settings or get_settings()
+        if index is None:
+            from upstash_vector import Index
+
+            token = self.settings.upstash_token
+            if read_only and self.settings.upstash_readonly_token:
+                token = self.settings.upstash_readonly_token
+            if not self.settings.upstash_url or not token:
+                raise ValueError("Missing Upstash Vector credentials in .env file")
+            index = Index(url=self.settings.upstash_url, token=token)
+        self.index = index
+
+    def upsert(self, records: Iterable[VectorRecord], namespace: str = DEFAULT_NAMESPACE) -> int:
+        written = 0
+        for batch in batched(records, self.settings.upsert_batch_size):
+            payload = [
+                (r.id, r.vector if r.vector is not None else r.data, r.metadata)
+                if r.vector is None or r.data is None
+                else (r.id, r.vector, r.metadata, r.data)
+                for r in batch
+            ]
+            self.index.upsert(vectors=payload, namespace=namespace)
+            written += len(batch)
+        return written
+
+    def delete(self, ids: Sequence[str], namespace: str = DEFAULT_NAMESPACE) -> int:
+        if not ids:
+            return 0
+        result = self.index.delete(ids=list(ids), namespace=namespace)
+        return int(getattr(result, "deleted", len(ids)))
+
+    def fetch(
+        self,
+        ids: Sequence[str],
+        include_vectors: bool = False,
+        include_metadata: bool = True,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[Optional[VectorRecord]]:
+        found = self.index.fetch(
+            ids=list(ids),
+            include_vectors=include_vectors,
+            include_metadata=include_metadata,
+            include_data=True,
+            namespace=namespace,
+        )
+        return [
+            None if item is None else VectorRecord(
+                id=str(item.id),
+                vector=getattr(item, "vector", None),
+                data=getattr(item, "data", None),
+                metadata=getattr(item, "metadata", None) or {},
+            )
+            for item in found
+        ]
+
+    def _query_kwargs(
+        self,
+        text: Optional[str],
+        vector: Optional[Sequence[float]],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        if vector is None and text is None:
+            raise ValueError("query needs either text or vector")
+        kwargs: Dict[str, Any] = {"top_k": top_k, "filter": build_filter(filter)}
+        if vector is not None:
+            kwargs["vector"] = list(vector)
+        else:
+            kwargs["data"] = text
+        return kwargs
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        vector: Optional[Sequence[float]] = None,
+        top_k: int = 3,
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[QueryResult]:
+        results = self.index.query(
+            include_metadata=include_metadata,
+            include_vectors=include_vectors,
+            include_data=True,
+            namespace=namespace,
+            **self._query_kwargs(text, vector, top_k, filter),
+        )
+        return [to_query_result(r) for r in results]
+
+    def query_many(
+        self,
+        queries: Sequence[VectorQuery],
+        include_metadata: bool = True,
+        include_vectors: bool = False,
+        namespace: str = DEFAULT_NAMESPACE,
+    ) -> List[List[QueryResult]]:
+        """Send queries in ``query_batch_size`` chunks via the batch endpoint."""
+        all_results: List[List[QueryResult]] = []
+        for chunk in batched(queries, self.settings.query_batch_size):
+            payload = []
+            for q in chunk:
+                kwargs = self._query_kwargs(q.text, q.vector, q.top_k, q.filter)
+                kwargs.update(include_metadata=include_metadata, include_vectors=include_vectors, include_data=True)
+                payload.append(kwargs)
+            responses = self.index.query_many(queries=payload, namespace=namespace)
+            all_results.extend([to_query_result(r) for r in response] for response in responses)
+        return all_results
+
+    def scan(
+        self,
+        namespace: str = DEFAULT_NAMESPACE,
+        include_vectors: bool = True,
+        page_size: int = 100,
+    ) -> Iterator[List[VectorRecord]]:
+        """Page through ``namespace`` with the range endpoint."""
+        cursor = ""
+        while True:
+            result = self.index.range(
+                cursor=cursor,
+                limit=page_size,
+                include_vectors=include_vectors,
+                include_metadata=True,
+                include_data=True,
+                namespace=namespace,
+            )
+            if result.vectors:
+                yield [
+                    VectorRecord(
+                        id=str(item.id),
+                        vector=getattr(item, "vector", None),
+                        data=getattr(item, "data", None),
+                        metadata=getattr(item, "metadata", None) or {},
+                    )
+                    for item in result.vectors
+                ]
+            cursor = result.next_cursor
+            if not cursor:
+                return
+
+    def info(self) -> StoreInfo:
+        info = self.index.info()
+        namespaces = {
+            name: getattr(ns, "vector_count", 0)
+            for name, ns in (getattr(info, "namespaces", None) or {}).items()
+        }
+        return StoreInfo(
+            vector_count=info.vector_count,
+            dimension=info.dimension,
+            backend=self.backend,
+            namespaces=namespaces,
+            embedding_model=getattr(getattr(info, "dense_index", None), "embedding_model", None),
+        )
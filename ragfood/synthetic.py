@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Synthetic Catalog Generator
+===========================
+
+Expands the food catalog into catalogs of any size. The output is
+seeded and deterministic, so scale tests for ingestion, indexing and
+filtering can run offline and be reproduced. The same ``--seed`` and
+source always give byte-identical output.
+
+The generator is fitted on a source catalog (``foods.json`` by default).
+Source items fall into two styles: short one-line descriptions (ids
+below ``--long-from``, 76 by default) and long items with origin,
+ingredients and dietary metadata. The share of each is kept. Each
+generated item:
+
+- is modelled on a random source item of its style, so the region, type,
+  category, dietary and allergen distributions (and how they co-occur)
+  follow the source
+- moves to a region drawn from the source distribution with probability
+  ``REGION_SWAP`` (0.25), which creates new combinations
+- gets a generated name in place of the template's, and a description
+  built from the template's sentences plus sentences from other items of
+  the same style, up to a word count drawn from that style's lengths
+- swaps each ingredient, with probability ``INGREDIENT_SWAP``, for one
+  from the style's vocabulary
+
+Rows are generated in fixed-size blocks with their own seeds, so any
+slice of a large catalog can be regenerated on its own. Every format is
+written as a stream: JSON and JSON Lines item by item, and the compiled
+columnar format (``ragfood.corpus``) through ``CorpusWriter``, which
+spills its columns next to the output file until the corpus is written.
+
+Usage::
+
+    python -m ragfood.synthetic --count 100000 --output data/synthetic-100k.jsonl
+    python -m ragfood.synthetic --count 10000000 --seed 7 --output /data/foods-10m.jsonl
+    python -m ragfood.synthetic --count 50000 --output data/synthetic-50k.corpus
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ragfood.config import get_settings
+
+FORMATS = ("json", "jsonl", "corpus")
+BLOCK = 4096
+LONG_FROM = 76
+REGION_SWAP = 0.25
+INGREDIENT_SWAP = 0.3
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_SUBJECT = re.compile(r"^(.{1,60}?)\s+(is|are|was)\s+")
+_ONSETS = ("b", "ch", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "sh", "t", "v", "y", "z")
+_VOWELS = ("a", "e", "i", "o", "u", "ai", "ou")
+
+
+@dataclass
+class StyleProfile:
+    """Templates and vocabularies for one catalog style (short or long items)."""
+
+    templates: List[Dict[str, Any]]
+    lengths: List[int]
+    sentences: List[str]
+    ingredients: List[str] = field(default_factory=list)
+    parsed: List[Tuple[List[str], Optional[str]]] = field(default_factory=list)
+
+
+@dataclass
+class CatalogProfile:
+    """What the generator learned from a source catalog."""
+
+    short: StyleProfile
+    long: Optional[StyleProfile]
+    long_share: float
+    regions: List[str]
+    region_weights: np.ndarray
+
+    @classmethod
+    def fit(cls, items: Sequence[Dict[str, Any]], long_from: int = LONG_FROM) -> "CatalogProfile":
+        if not items:
+            raise ValueError("Cannot fit a synthetic profile to an empty catalog")
+        short, long = [], []
+        for item in items:
+            (long if _numeric_id(item.get("id")) >= long_from else short).append(dict(item))
+        if not short:
+            short, long = long, []
+        regions, counts = np.unique([str(item.get("region", "unknown")) for item in items], return_counts=True)
+        return cls(
+            short=_fit_style(short),
+            long=_fit_style(long) if long else None,
+            long_share=len(long) / len(items),
+            regions=regions.tolist(),
+            region_weights=counts / counts.sum(),
+        )
+
+
+def _numeric_id(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE.split(text.strip()) if s]
+
+
+def _fit_style(items: List[Dict[str, Any]]) -> StyleProfile:
+    sentences, parsed = [], []
+    for item in items:
+        parts = split_sentences(item.get("text", "")) or ["It is a dish."]
+        match = _SUBJECT.match(parts[0])
+        parsed.append((parts, match.group(1) if match else None))
+        # Opening sentences name their dish; as filler they start with "It"
+        sentences.append(_SUBJECT.sub(lambda m: f"It {m.group(2)} ", parts[0], count=1))
+        sentences.extend(parts[1:])
+    ingredients = sorted({i for item in items for i in item.get("ingredients", []) if isinstance(i, str)})
+    return StyleProfile(
+        templates=items,
+        lengths=[len(item.get("text", "").split()) for item in items],
+        sentences=sentences,
+        ingredients=ingredients,
+        parsed=parsed,
+    )
+
+
+def _describe(parsed: Tuple[List[str], Optional[str]], style: StyleProfile, name: str, target: int, rand: random.Random) -> str:
+    parts, subject = parsed
+    if subject:
+        parts = [p.replace(subject, name) for p in parts]
+    else:
+        parts = [f"{name}: {parts[0]}"] + parts[1:]
+    words = len(parts[0].split())
+    text = [parts[0]]
+    extra = sorted(parts[1:], key=lambda _: rand.random())
+    while words < target:
+        sentence = extra.pop() if extra else style.sentences[int(rand.random() * len(style.sentences))]
+        length = len(sentence.split())
+        if words + length - target > target - words:
+            break  # stop where the total is nearest the target
+        text.append(sentence)
+        words += length
+    return " ".join(text)
+
+
+def generate_block(profile: CatalogProfile, block: int, seed: int, size: int = BLOCK, start_id: int = 1) -> List[Dict[str, Any]]:
+    """Items ``block * size`` to ``(block + 1) * size - 1``; each block has its own seed."""
+    rng = np.random.default_rng([seed, block])
+    long = (rng.random(size) < profile.long_share if profile.long is not None else np.zeros(size, dtype=bool)).tolist()
+    swap = (rng.random(size) < REGION_SWAP).tolist()
+    regions = rng.choice(len(profile.regions), size=size, p=profile.region_weights).tolist()
+    jitter = rng.lognormal(0.0, 0.1, size).tolist()
+    picks = rng.random((size, 2)).tolist()
+    syllables = rng.integers(2, 4, size).tolist()
+    onsets = rng.integers(0, len(_ONSETS), (size, 3)).tolist()
+    vowels = rng.integers(0, len(_VOWELS), (size, 3)).tolist()
+    rand = random.Random(int(rng.integers(2 ** 62)))
+
+    items = []
+    for row in range(size):
+        style = profile.long if long[row] else profile.short
+        chosen = int(picks[row][0] * len(style.templates))
+        template = style.templates[chosen]
+        target = max(1, round(style.lengths[int(picks[row][1] * len(style.lengths))] * jitter[row]))
+        name = "".join(_ONSETS[o] + _VOWELS[v] for o, v in zip(onsets[row][: syllables[row]], vowels[row])).capitalize()
+        item = {"id": str(start_id + block * size + row), "text": _describe(style.parsed[chosen], style, name, target, rand)}
+        for key, value in template.items():
+            if key not in item:
+                item[key] = list(value) if isinstance(value, list) else value
+        if swap[row]:
+            item["region"] = profile.regions[regions[row]]
+        if item.get("ingredients") and style.ingredients:
+            vocabulary = style.ingredients
+            item["ingredients"] = [vocabulary[int(rand.random() * len(vocabulary))] if rand.random() < INGREDIENT_SWAP else i
+                                   for i in item["ingredients"]]
+        items.append(item)
+    return items
+
+
+def generate_items(count: int, seed: int = 42, profile: Optional[CatalogProfile] = None, start_id: int = 1) -> Iterator[Dict[str, Any]]:
+    """``count`` synthetic items with ids ``start_id`` onwards, lazily."""
+    profile = profile or CatalogProfile.fit(_load_source(None))
+    for block in range((count + BLOCK - 1) // BLOCK):
+        items = generate_block(profile, block, seed, BLOCK, start_id)
+        yield from items[: count - block * BLOCK]
+
+
+def _load_source(path: Optional[str]) -> List[Dict[str, Any]]:
+    settings = get_settings()
+    source = settings.json_path if path is None else settings.resolve_path(path)
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_for(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    suffix = os.path.splitext(path)[1].lstrip(".")
+    if suffix not in FORMATS:
+        raise ValueError(f"Cannot infer a format from {path!r}; pass one of {FORMATS}")
+    return suffix
+
+
+def write_catalog(items: Iterable[Dict[str, Any]], path: str, fmt: Optional[str] = None) -> int:
+    """Write ``items`` to ``path`` as JSON, JSON Lines or a compiled corpus; return the count."""
+    fmt = format_for(path, fmt)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt == "corpus":
+        from ragfood.corpus import CorpusWriter
+
+        # Columns spill next to the output, so memory stays flat at any count
+        with CorpusWriter(spill_dir=os.path.dirname(os.path.abspath(path))) as writer:
+            count = writer.add(items)
+            with open(path, "wb") as f:
+                writer.write(f)
+        return count
+
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "json":
+            f.write("[")
+        for item in items:
+            if fmt == "json":
+                f.write(",\n" if count else "\n")
+            f.write(json.dumps(item, ensure_ascii=False))
+            if fmt == "jsonl":
+                f.write("\n")
+            count += 1
+        if fmt == "json":
+            f.write("\n]\n")
+    return count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic food catalog of any size")
+    parser.add_argument("--count", type=int, default=100_000, help="Items to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--source", metavar="JSON", help="Catalog to model (default JSON_FILE)")
+    parser.add_argument("--long-from", type=int, default=LONG_FROM, help="First id of the long, metadata-rich style")
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: from the --output suffix)")
+    parser.add_argument("--output", metavar="PATH", help="Output file (default data/synthetic-<count>.jsonl)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    output = args.output or str(settings.resolve_path(f"data/synthetic-{args.count}.{args.format or 'jsonl'}"))
+    try:
+        fmt = format_for(output, args.format)
+        source = _load_source(args.source)
+        profile = CatalogProfile.fit(source, args.long_from)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📂 Modelling {len(source)} items ({profile.long_share:.0%} long style, {len(profile.regions)} regions)")
+
+    start = time.perf_counter()
+    count = write_catalog(generate_items(args.count, args.seed, profile), output, fmt)
+    elapsed = time.perf_counter() - start
+    print(f"💾 {count:,} items (seed {args.seed}) → {output} ({os.path.getsize(output) / 1e6:.1f} MB, {elapsed:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
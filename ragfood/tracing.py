@@ -0,0 +1,292 @@
+"""
+Pipeline Tracing
+================
+
+Minimal span tracer for the RAG pipeline. Spans nest through a context
+variable, carry attributes (top_k, hit count, prompt tokens, cache hit...)
+and are handed to an exporter when their trace's root span ends:
+
+- ``JsonlSpanExporter``: one flat JSON object per span
+- ``OtlpJsonFileExporter``: one OTLP/JSON ``ExportTraceServiceRequest`` per
+  trace, the format written by the OpenTelemetry Collector file exporter
+- ``InMemorySpanExporter``: keeps spans in a list (tests, benchmarks)
+- ``FanoutSpanExporter``: hands each trace to several exporters (e.g. a
+  file plus ``ragfood.metrics.MetricsSpanExporter``)
+
+With no exporter configured ``NOOP_TRACER`` is used and a span costs one
+attribute check.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ragfood.config import Settings, get_settings
+
+TRACE_FORMATS = ("jsonl", "otlp")
+
+
+@dataclass
+class Span:
+    """One timed operation; times are epoch nanoseconds."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "OK"
+    error: Optional[str] = None
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ns / 1e6, 4),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class SpanExporter:
+    """Receives the finished spans of one trace."""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+    def by_name(self) -> Dict[str, Span]:
+        return {span.name: span for span in self.spans}
+
+
+class FanoutSpanExporter(SpanExporter):
+    def __init__(self, exporters: List[SpanExporter]):
+        self.exporters = list(exporters)
+
+    def export(self, spans: List[Span]) -> None:
+        for exporter in self.exporters:
+            exporter.export(spans)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            exporter.close()
+
+
+class _FileExporter(SpanExporter):
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def _write(self, lines: List[str]) -> None:
+        with self._lock:
+            self._file.write("".join(line + "\n" for line in lines))
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class JsonlSpanExporter(_FileExporter):
+    """Appends one JSON object per span."""
+
+    def export(self, spans: List[Span]) -> None:
+        self._write([json.dumps(span.to_dict(), default=str) for span in spans])
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class OtlpJsonFileExporter(_FileExporter):
+    """Appends one OTLP/JSON export request per trace."""
+
+    def __init__(self, path: str, service_name: str = "ragfood"):
+        super().__init__(path)
+        self.service_name = service_name
+
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+            "scopeSpans": [{
+                "scope": {"name": "ragfood.tracing"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": _otlp_attributes(span.attributes),
+                    "status": {"code": 2, "message": span.error or ""} if span.status == "ERROR" else {"code": 1},
+                } for span in spans],
+            }],
+        }]}
+
+    def export(self, spans: List[Span]) -> None:
+        self._write([json.dumps(self.to_otlp(spans), default=str)])
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("ragfood_current_span", default=None)
+
+
+class _SpanContext:
+    """Context manager returned by ``Tracer.span``."""
+
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        _current_span.reset(self._token)
+        if exc is not None:
+            self._span.status = "ERROR"
+            self._span.error = f"{exc_type.__name__}: {exc}"
+        self._tracer.end(self._span)
+
+
+class Tracer:
+    """Creates spans and exports each trace when its root span ends."""
+
+    enabled = True
+
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, parent: Optional[Span] = None, start_ns: Optional[int] = None, **attributes: Any) -> Span:
+        """Start a span (child of ``parent`` or the current span); call ``end`` later."""
+        parent = parent if parent is not None else _current_span.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start_ns=start_ns if start_ns is not None else time.time_ns(),
+            attributes=attributes,
+        )
+
+    def end(self, span: Span, end_ns: Optional[int] = None) -> None:
+        span.end_ns = end_ns if end_ns is not None else time.time_ns()
+        with self._lock:
+            batch = self._pending.setdefault(span.trace_id, [])
+            batch.append(span)
+            if span.parent_id is not None:
+                return
+            del self._pending[span.trace_id]
+        self.exporter.export(batch)
+
+    def span(self, name: str, **attributes: Any) -> _SpanContext:
+        """``with tracer.span("retrieval", top_k=3) as span: ...``"""
+        return _SpanContext(self, self.start(name, **attributes))
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> Span:
+        """Add an already-measured child span of the current span."""
+        span = self.start(name, start_ns=start_ns, **attributes)
+        self.end(span, end_ns)
+        return span
+
+    def close(self) -> None:
+        self.exporter.close()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer:
+    """Tracer used when tracing is off; every call is a no-op."""
+
+    enabled = False
+
+    def span(self, name: str, **attributes: Any) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NOOP_TRACER = NoopTracer()
+
+
+def create_tracer(settings: Optional[Settings] = None, path: Optional[str] = None, format: Optional[str] = None):
+    """Tracer writing to ``TRACE_FILE`` in ``TRACE_FORMAT``; no-op if unset."""
+    settings = settings or get_settings()
+    path = path or settings.trace_file
+    if not path:
+        return NOOP_TRACER
+    format = format or settings.trace_format
+    resolved = str(settings.resolve_path(path))
+    if format == "jsonl":
+        return Tracer(JsonlSpanExporter(resolved))
+    if format == "otlp":
+        return Tracer(OtlpJsonFileExporter(resolved))
+    raise ValueError(f"Unknown trace format: {format!r} (expected one of {TRACE_FORMATS})")
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Catalog Validation
+==================
+
+Checks a catalog file (a JSON array, or JSON Lines) against a schema and
+computes its statistics. The result is a machine-readable report, so a
+bad catalog can be stopped before anything is embedded.
+
+1. Scan: the file is memory-mapped and a NumPy pass finds the byte span
+   of every top-level record. It tracks string and nesting state, so
+   braces inside descriptions are ignored. The file is never parsed as
+   a whole.
+2. Validate: the spans are split into chunks for a process pool. Each
+   worker parses its records and checks them against the compiled
+   schema: required fields, string fields, and list-of-string
+   ``ingredients``/``dietary``/``allergens``. It also computes mergeable
+   statistics: field coverage, regions, types, tags and description word
+   counts.
+3. Merge: chunk results are combined. Ids come back as 64-bit hashes,
+   and duplicates are found by sorting them. Only the reported example
+   rows are re-read to confirm the actual ids.
+
+The schema is ``CATALOG_SCHEMA`` or a JSON file in the same shape
+(``--schema``). Field types are ``string``, ``string_list``, ``number``
+and ``any``. Fields the schema does not name are counted as warnings,
+and are errors with ``"additional": false``.
+
+The exit status is 1 when a catalog is invalid, so the CLI can gate an
+ingestion step. ``VALIDATE_CATALOG=true`` makes ``load_food_data()``
+validate JSON catalogs before loading them. On an invalid catalog it
+raises ``CatalogValidationError``.
+
+Usage::
+
+    python -m ragfood.validate
+    python -m ragfood.validate data/food_data.json foods.json --output validation.json
+    python -m ragfood.validate big_catalog.jsonl --workers 8 --chunk-size 100000
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ragfood.benchmark import write_report
+from ragfood.config import get_settings
+
+SCHEMA = "ragfood-validation/1"
+FIELD_TYPES = ("string", "string_list", "number", "any")
+CATALOG_SCHEMA: Dict[str, Any] = {
+    "fields": {
+        "id": {"type": "string", "required": True},
+        "text": {"type": "string", "required": True},
+        "region": {"type": "string", "required": True},
+        "type": {"type": "string", "required": True},
+        "category": {"type": "string"},
+        "origin": {"type": "string"},
+        "ingredients": {"type": "string_list"},
+        "preparation": {"type": "string"},
+        "nutrition": {"type": "string"},
+        "cultural_significance": {"type": "string"},
+        "dietary": {"type": "string_list"},
+        "allergens": {"type": "string_list"},
+    },
+    "additional": True,
+}
+CATEGORIES = (("regions", "region"), ("types", "type"), ("categories", "category"))
+TAGS = (("dietary", "dietary"), ("allergens", "allergens"), ("ingredients", "ingredients"))
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_BLOCK_SIZE = 1 << 23
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[9, 10, 13, 32]] = True
+
+
+class CatalogValidationError(ValueError):
+    """A catalog failed validation; ``report`` holds the details."""
+
+    def __init__(self, report: Dict[str, Any]):
+        self.report = report
+        rules = ", ".join(f"{rule} ×{count}" for rule, count in report["errors"]["by_rule"].items())
+        super().__init__(f"{report['source']} failed validation: {report['errors']['total']} errors ({rules})")
+
+
+# -- schema ----------------------------------------------------------------
+
+def _check_string(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return "not_string"
+    return None if value.strip() else "empty"
+
+
+def _check_string_list(value: Any) -> Optional[str]:
+    if not isinstance(value, list):
+        return "not_list"
+    return None if all(isinstance(v, str) for v in value) else "not_string_item"
+
+
+def _check_number(value: Any) -> Optional[str]:
+    return None if isinstance(value, (int, float)) and not isinstance(value, bool) else "not_number"
+
+
+_CHECKS: Dict[str, Callable[[Any], Optional[str]]] = {
+    "string": _check_string,
+    "string_list": _check_string_list,
+    "number": _check_number,
+    "any": lambda value: None,
+}
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """A schema turned into a flat tuple of per-field checks."""
+
+    checks: Tuple[Tuple[str, bool, Callable[[Any], Optional[str]]], ...]
+    known: frozenset
+    additional: bool
+
+    def problems(self, item: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """``(field, problem)`` pairs for one item; empty when it is valid."""
+        found = []
+        for name, required, check in self.checks:
+            value = item.get(name)
+            if value is None:
+                if required:
+                    found.append((name, "missing"))
+                continue
+            problem = check(value)
+            if problem is not None:
+                found.append((name, problem))
+        if not self.additional:
+            found.extend((name, "unknown") for name in item if name not in self.known)
+        return found
+
+
+def compile_schema(spec: Dict[str, Any]) -> CompiledSchema:
+    checks = []
+    for name, rule in spec.get("fields", {}).items():
+        kind = rule.get("type", "any")
+        if kind not in _CHECKS:
+            raise ValueError(f"Unknown type {kind!r} for field {name!r} (expected one of {FIELD_TYPES})")
+        checks.append((name, bool(rule.get("required", False)), _CHECKS[kind]))
+    return CompiledSchema(tuple(checks), frozenset(spec.get("fields", {})), bool(spec.get("additional", True)))
+
+
+def load_schema(path: Optional[str] = None) -> Dict[str, Any]:
+    if path is None:
+        return CATALOG_SCHEMA
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    compile_schema(spec)
+    return spec
+
+
+# -- scan ------------------------------------------------------------------
+
+class RecordScanner:
+    """Finds the byte spans of top-level objects, one block at a time.
+
+    ``record_depth`` is 1 for a JSON array and 0 for JSON Lines. Only
+    quotes and brackets are looked at, and string, escape and nesting
+    state carry across blocks.
+    """
+
+    def __init__(self, record_depth: int):
+        self.record_depth = record_depth
+        self.in_string = False
+        self.depth = 0
+        self.backslashes = 0
+        self.pending = -1
+        self.stray = 0
+        self.first_stray: Optional[int] = None
+
+    def feed(self, block: np.ndarray, offset: int) -> np.ndarray:
+        """The ``(start, end)`` spans of records that end inside ``block``."""
+        if not len(block):
+            return np.empty((0, 2), dtype=np.int64)
+        folded = block | 32  # "[" and "]" fold onto "{" and "}"
+        quotes = self._unescaped(block, np.flatnonzero(block == 34))
+        brackets = np.flatnonzero((folded == 123) | (folded == 125))
+
+        outside = ((np.searchsorted(quotes, brackets) + self.in_string) & 1) == 0
+        brackets = brackets[outside]
+        chars = block[brackets]
+        opening = (chars == 123) | (chars == 91)
+        delta = np.where(opening, 1, -1).astype(np.int32)
+        after = np.cumsum(delta, dtype=np.int32) + self.depth
+        before = after - delta
+        self.in_string ^= bool(len(quotes) & 1)
+        if len(after):
+            self.depth = int(after[-1])
+
+        depth = self.record_depth
+        starts = brackets[(chars == 123) & (before == depth)] + offset
+        ends = brackets[(chars == 125) & (after == depth)] + offset + 1
+        if self.pending >= 0:
+            starts = np.concatenate(([self.pending], starts))
+        if len(starts) < len(ends) or len(starts) > len(ends) + 1:
+            raise ValueError(f"Unbalanced braces near byte {offset}")
+        self.pending = int(starts[-1]) if len(starts) > len(ends) else -1
+        return np.stack([starts[: len(ends)], ends], axis=1).astype(np.int64)
+
+    def _unescaped(self, block: np.ndarray, quotes: np.ndarray) -> np.ndarray:
+        """``quotes`` without those escaped by an odd run of backslashes."""
+        follows = np.zeros(len(quotes), dtype=bool)
+        inner = quotes > 0
+        follows[inner] = block[quotes[inner] - 1] == 92
+        follows[~inner] = self.backslashes > 0
+        keep = np.ones(len(quotes), dtype=bool)
+        for index in np.flatnonzero(follows):
+            run, j = 0, quotes[index] - 1
+            while j >= 0 and block[j] == 92:
+                run, j = run + 1, j - 1
+            if j < 0:
+                run += self.backslashes
+            keep[index] = run % 2 == 0
+
+        run, j = 0, len(block) - 1
+        while j >= 0 and block[j] == 92:
+            run, j = run + 1, j - 1
+        self.backslashes = run + (self.backslashes if j < 0 else 0)
+        return quotes[keep]
+
+    @property
+    def complete(self) -> bool:
+        return self.pending < 0 and self.depth == 0 and not self.in_string
+
+
+def record_format(buffer: np.ndarray) -> str:
+    """``"json"`` for an array of records, ``"jsonl"`` for one record per line."""
+    content = np.flatnonzero(~_WHITESPACE[buffer[: 1 << 16]])
+    return "json" if len(content) and buffer[content[0]] == 91 else "jsonl"
+
+
+def _count_stray(buffer: np.ndarray, spans: np.ndarray, kind: str, scanner: RecordScanner) -> None:
+    """Count runs of anything but whitespace and commas between records (non-object elements)."""
+    first, last = 0, len(buffer)
+    if kind == "json":
+        # Between the opening "[" and the last non-whitespace byte (the closing "]")
+        first = int(np.flatnonzero(buffer[: 1 << 16] == 91)[0]) + 1
+        tail = np.flatnonzero(~_WHITESPACE[buffer[-(1 << 16):]])
+        last = max(first, len(buffer) - min(len(buffer), 1 << 16) + int(tail[-1]))
+    if scanner.pending >= 0:
+        last = min(last, scanner.pending)  # an unterminated record is reported as truncated
+    gap_starts = np.concatenate(([first], spans[:, 1]))
+    gap_ends = np.concatenate((spans[:, 0], [last]))
+    lengths = np.maximum(gap_ends - gap_starts, 0)
+    if not lengths.sum():
+        return
+    positions = np.repeat(gap_starts - np.cumsum(np.concatenate(([0], lengths[:-1]))), lengths) + np.arange(lengths.sum())
+    values = buffer[positions]
+    bad = positions[~_WHITESPACE[values] & (values != 44)]
+    if len(bad):
+        scanner.stray = int(1 + np.count_nonzero(np.diff(bad) > 1))
+        scanner.first_stray = int(bad[0])
+
+
+def scan_records(buffer: np.ndarray, block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, RecordScanner, str]:
+    """Record spans of a whole catalog buffer, plus the finished scanner and the format."""
+    kind = record_format(buffer)
+    scanner = RecordScanner(1 if kind == "json" else 0)
+    spans = [scanner.feed(buffer[start:start + block_size], start) for start in range(0, len(buffer), block_size)]
+    spans = np.concatenate(spans) if spans else np.empty((0, 2), dtype=np.int64)
+    if len(buffer):
+        _count_stray(buffer, spans, kind, scanner)
+    return spans, scanner, kind
+
+
+# -- validate --------------------------------------------------------------
+
+def id_hash(value: Any) -> int:
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@dataclass
+class ChunkResult:
+    """Mergeable validation results and statistics for a run of records."""
+
+    records: int = 0
+    invalid: int = 0
+    errors: Counter = field(default_factory=Counter)
+    examples: List[Dict[str, Any]] = field(default_factory=list)
+    unknown: Counter = field(default_factory=Counter)
+    coverage: Counter = field(default_factory=Counter)
+    counts: Dict[str, Counter] = field(default_factory=lambda: {name: Counter() for name, _ in CATEGORIES + TAGS})
+    words: List[int] = field(default_factory=lambda: [0, 0, 0, 0])  # texts, total, min, max
+    id_rows: List[np.ndarray] = field(default_factory=list)
+    id_hashes: List[np.ndarray] = field(default_factory=list)
+
+    def merge(self, other: "ChunkResult", examples: int) -> "ChunkResult":
+        self.records += other.records
+        self.invalid += other.invalid
+        self.errors.update(other.errors)
+        self.examples.extend(other.examples[: max(0, examples - len(self.examples))])
+        self.unknown.update(other.unknown)
+        self.coverage.update(other.coverage)
+        for name, counter in other.counts.items():
+            self.counts[name].update(counter)
+        if other.words[0]:
+            texts, total, low, high = self.words
+            self.words = [texts + other.words[0], total + other.words[1],
+                          min(low, other.words[2]) if texts else other.words[2], max(high, other.words[3])]
+        self.id_rows.extend(other.id_rows)
+        self.id_hashes.extend(other.id_hashes)
+        return self
+
+
+def _parse(data: mmap.mmap, spans: List[List[int]]) -> List[Any]:
+    """Parse every record at ``spans``, in one call unless one of them is malformed."""
+    try:
+        return json.loads(b"[" + b",".join(data[start:end] for start, end in spans) + b"]")
+    except ValueError:
+        pass
+    items: List[Any] = []
+    for start, end in spans:
+        try:
+            items.append(json.loads(data[start:end]))
+        except ValueError:
+            items.append(_INVALID)
+    return items
+
+
+_INVALID = object()
+
+
+def validate_chunk(task: Tuple[str, int, np.ndarray, Dict[str, Any], int]) -> ChunkResult:
+    """Validate and summarise the records at ``spans`` (rows from ``first_row``) of ``path``."""
+    path, first_row, spans, spec, examples = task
+    schema = compile_schema(spec)
+    result = ChunkResult()
+    keys: List[str] = []
+    values: Dict[str, List[str]] = {name: [] for name, _ in CATEGORIES + TAGS}
+    word_counts: List[int] = []
+    id_rows: List[int] = []
+    id_hashes: List[int] = []
+
+    def fail(row: int, item_id: Any, problems: List[Tuple[str, str]]) -> None:
+        result.invalid += 1
+        for name, problem in problems:
+            result.errors[f"{name}:{problem}"] += 1
+        if len(result.examples) < examples:
+            result.examples.append({"row": row, "id": item_id, "problems": [f"{n}:{p}" for n, p in problems]})
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        items = _parse(data, spans.tolist())
+    for row, item in enumerate(items, first_row):
+        if item is _INVALID:
+            fail(row, None, [("record", "invalid_json")])
+            continue
+        problems = schema.problems(item)
+        if problems:
+            fail(row, item.get("id"), problems)
+        keys.extend(item)
+
+        item_id = item.get("id")
+        if item_id is not None:
+            id_rows.append(row)
+            id_hashes.append(id_hash(item_id))
+        for name, key in CATEGORIES:
+            value = item.get(key)
+            if isinstance(value, str):
+                values[name].append(value)
+        for name, key in TAGS:
+            value = item.get(key)
+            if isinstance(value, list):
+                values[name].extend(v for v in value if isinstance(v, str))
+        text = item.get("text")
+        if isinstance(text, str):
+            word_counts.append(len(text.split()))
+
+    result.records = len(items)
+    result.coverage.update(keys)
+    if schema.additional:
+        result.unknown.update({name: count for name, count in result.coverage.items() if name not in schema.known})
+    for name, found in values.items():
+        result.counts[name].update(found)
+    if word_counts:
+        result.words = [len(word_counts), sum(word_counts), min(word_counts), max(word_counts)]
+    result.id_rows.append(np.array(id_rows, dtype=np.int64))
+    result.id_hashes.append(np.array(id_hashes, dtype=np.uint64))
+    return result
+
+
+def _duplicate_ids(result: ChunkResult, path: str, spans: np.ndarray, examples: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """Extra occurrences of repeated ids, and examples of them read back from the file."""
+    if not result.id_hashes:
+        return 0, []
+    hashes = np.concatenate(result.id_hashes)
+    rows = np.concatenate(result.id_rows)
+    order = np.argsort(hashes, kind="stable")
+    hashes, rows = hashes[order], rows[order]
+    repeated = np.flatnonzero(hashes[1:] == hashes[:-1]) + 1
+    if not len(repeated):
+        return 0, []
+
+    found = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for value in np.unique(hashes[repeated])[:examples]:
+            group = rows[hashes == value].tolist()
+            ids = [json.loads(data[spans[row][0]:spans[row][1]]).get("id") for row in group]
+            if len({str(i) for i in ids}) == 1:
+                found.append({"id": ids[0], "rows": group})
+    return len(repeated), found
+
+
+def _top(counter: Counter, top: Optional[int]) -> Dict[str, Any]:
+    return {"distinct": len(counter), "top": [[value, count] for value, count in counter.most_common(top)]}
+
+
+def validate_catalog(
+    path: Union[str, os.PathLike],
+    schema: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    examples: int = 20,
+    top: Optional[int] = 10,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Dict[str, Any]:
+    """Validate the catalog at ``path`` and return its report.
+
+    Work goes to a pool of ``workers`` processes (default: CPU count) in
+    chunks of ``chunk_size`` records. A catalog that fits in one chunk is
+    validated in-process. ``top=None`` lists every value of each statistic.
+    """
+    path = os.fspath(path)
+    spec = schema or CATALOG_SCHEMA
+    compile_schema(spec)
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            try:
+                spans, scanner, kind = scan_records(buffer, block_size)
+            finally:
+                del buffer
+    else:
+        spans, scanner, kind = np.empty((0, 2), dtype=np.int64), RecordScanner(0), "jsonl"
+    scanned = time.perf_counter()
+
+    tasks = [(path, first, spans[first:first + chunk_size], spec, examples) for first in range(0, len(spans), chunk_size)]
+    result = ChunkResult()
+    if len(tasks) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for part in pool.map(validate_chunk, tasks):
+                result.merge(part, examples)
+    else:
+        for task in tasks:
+            result.merge(validate_chunk(task), examples)
+    duplicates, duplicate_examples = _duplicate_ids(result, path, spans, examples)
+    finished = time.perf_counter()
+
+    errors = Counter(result.errors)
+    if duplicates:
+        errors["id:duplicate"] = duplicates
+    if scanner.stray:
+        errors["record:not_object"] = scanner.stray
+    if not scanner.complete:
+        errors["record:truncated"] = 1
+    if not size or not len(spans):
+        errors["record:empty_catalog"] = 1
+    texts, total, low, high = result.words
+    return {
+        "source": path,
+        "bytes": size,
+        "format": kind,
+        "records": int(len(spans)),
+        "valid": not errors,
+        "errors": {
+            "total": sum(errors.values()),
+            "invalid_records": result.invalid,
+            "by_rule": dict(errors.most_common()),
+            "examples": result.examples,
+            "duplicate_ids": duplicate_examples,
+            "first_stray_byte": scanner.first_stray,
+        },
+        "warnings": {"unknown_fields": dict(result.unknown.most_common())},
+        "statistics": {
+            "fields": dict(result.coverage.most_common()),
+            **{name: _top(counter, top) for name, counter in result.counts.items()},
+            "words": {"mean": round(total / texts, 1) if texts else 0.0, "min": low, "max": high},
+        },
+        "timing": {
+            "scan_seconds": round(scanned - start, 4),
+            "validate_seconds": round(finished - scanned, 4),
+            "workers": min(workers, len(tasks)) if len(tasks) > 1 else 1,
+            "chunks": len(tasks),
+        },
+    }
+
+
+def check_catalog(path: Union[str, os.PathLike], **options: Any) -> Dict[str, Any]:
+    """``validate_catalog``, raising ``CatalogValidationError`` when the catalog is invalid."""
+    report = validate_catalog(path, **options)
+    if not report["valid"]:
+        raise CatalogValidationError(report)
+    return report
+
+
+# -- CLI -------------------------------------------------------------------
+
+def format_report(report: Dict[str, Any]) -> str:
+    stats, timing = report["statistics"], report["timing"]
+    lines = [
+        f"{'✅' if report['valid'] else '❌'} {report['source']}: {report['records']:,} records ({report['format']}, "
+        f"{report['bytes'] / 1e6:.2f} MB) in {timing['scan_seconds'] + timing['validate_seconds']:.2f}s "
+        f"(scan {timing['scan_seconds']:.2f}s, {timing['chunks']} chunks on {timing['workers']} workers)",
+        f"   {stats['regions']['distinct']} regions, {stats['types']['distinct']} types, "
+        f"{stats['dietary']['distinct']} dietary tags, {stats['allergens']['distinct']} allergens, "
+        f"{stats['words']['mean']} words per description on average",
+    ]
+    for rule, count in report["errors"]["by_rule"].items():
+        lines.append(f"   {rule}: {count:,}")
+    for example in report["errors"]["examples"][:5]:
+        lines.append(f"     row {example['row']} (id {example['id']!r}): {', '.join(example['problems'])}")
+    for example in report["errors"]["duplicate_ids"][:5]:
+        lines.append(f"     id {example['id']!r} on rows {example['rows']}")
+    unknown = report["warnings"]["unknown_fields"]
+    if unknown:
+        lines.append(f"   ⚠️ fields outside the schema: {', '.join(f'{k} ×{v}' for k, v in unknown.items())}")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Validate catalog files against a schema and report their statistics")
+    parser.add_argument("sources", nargs="*", metavar="CATALOG", help="JSON array or JSON Lines catalogs (default JSON_FILE)")
+    parser.add_argument("--schema", metavar="JSON", help="Schema file (default: the built-in catalog schema)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per worker task")
+    parser.add_argument("--examples", type=int, default=20, help="Invalid records and duplicate ids listed per catalog")
+    parser.add_argument("--top", type=int, default=10, help="Most common values listed per statistic")
+    parser.add_argument("--output", metavar="JSON", help="Write the machine-readable report here")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    settings = get_settings()
+    sources = [str(settings.resolve_path(s)) for s in args.sources] or [str(settings.json_path)]
+    try:
+        spec = load_schema(args.schema)
+        reports = [validate_catalog(source, spec, args.workers, args.chunk_size, args.examples, args.top) for source in sources]
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    for report in reports:
+        print(format_report(report))
+
+    if args.output:
+        write_report({
+            "schema": SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "valid": all(report["valid"] for report in reports),
+            "catalogs": reports,
+        }, args.output)
+        print(f"\n💾 Report saved: {args.output}")
+    return 0 if all(report["valid"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Query Workloads
+===============
+
+The categorised evaluation queries used by ``tests/advanced_testing_suite.py``
+and a seeded ``QueryMix`` that draws from them with per-category weights,
+so load tests replay the same traffic shape the accuracy suite covers.
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+TEST_QUERIES = [
+    # Semantic Similarity Tests
+    {
+        "category": "Semantic Similarity",
+        "query": "healthy Mediterranean options",
+        "expected_regions": ["Greece", "Lebanon", "Spain"],
+        "expected_types": ["Salad", "Cold Soup", "Casserole"]
+    },
+    {
+        "category": "Semantic Similarity",
+        "query": "refreshing cold dishes for summer",
+        "expected_regions": ["Spain", "Lebanon"],
+        "expected_types": ["Cold Soup", "Salad"]
+    },
+    {
+        "category": "Semantic Similarity",
+        "query": "nourishing breakfast bowls",
+        "expected_types": ["Superfood Bowl", "Smoothie Bowl", "Breakfast Preparation"]
+    },
+   
+    # Multi-Criteria Searches
+    {
+        "category": "Multi-Criteria Search",
+        "query": "spicy vegetarian Asian dishes",
+        "expected_regions": ["Thailand", "Korea", "Japan"],
+        "dietary_filters": ["vegetarian", "vegan"]
+    },
+    {
+        "category": "Multi-Criteria Search",
+        "query": "gluten-free dairy-free comfort foods",
+        "dietary_filters": ["gluten-free", "dairy-free"]
+    },
+    {
+        "category": "Multi-Criteria Search",
+        "query": "protein-rich vegan superfood meals",
+        "dietary_filters": ["vegan"],
+        "nutritional_focus": ["protein"]
+    },
+   
+    # Nutritional Queries
+    {
+        "category": "Nutritional Query",
+        "query": "high-protein low-carb foods",
+        "nutritional_focus": ["protein"]
+    },
+    {
+        "category": "Nutritional Query",
+        "query": "omega-3 rich anti-inflammatory foods",
+        "nutritional_focus": ["omega-3", "anti-inflammatory"]
+    },
+    {
+        "category": "Nutritional Query",
+        "query": "foods high in antioxidants and vitamins",
+        "nutritional_focus": ["antioxidants", "vitamins"]
+    },
+   
+    # Cultural Exploration
+    {
+        "category": "Cultural Exploration",
+        "query": "traditional comfort foods from different countries",
+        "expected_regions": ["United States", "Japan", "United Kingdom", "North India"]
+    },
+    {
+        "category": "Cultural Exploration",
+        "query": "ancient grains and traditional preparation methods",
+        "cultural_focus": ["ancient", "traditional"]
+    },
+    {
+        "category": "Cultural Exploration",
+        "query": "ceremonial and celebration foods",
+        "cultural_focus": ["celebration", "ceremonial", "festival"]
+    },
+   
+    # Cooking Method Queries
+    {
+        "category": "Cooking Method",
+        "query": "dishes that can be grilled or roasted",
+        "cooking_methods": ["grilling", "roasting"]
+    },
+    {
+        "category": "Cooking Method",
+        "query": "slow-cooked and braised dishes",
+        "cooking_methods": ["slow cooking", "braising"]
+    },
+    {
+        "category": "Cooking Method",
+        "query": "fermented and pickled foods",
+        "cooking_methods": ["fermentation", "pickling"]
+    },
+   
+    # Complex Combination Queries
+    {
+        "category": "Complex Query",
+        "query": "umami-rich vegetarian dishes with mushrooms",
+        "flavor_profile": ["umami"],
+        "ingredients": ["mushrooms"]
+    },
+    {
+        "category": "Complex Query",
+        "query": "street food that became global phenomena",
+        "food_culture": ["street food", "global"]
+    }
+]
+
+
+
+def categories(tests: Sequence[Dict[str, Any]] = TEST_QUERIES) -> List[str]:
+    """Category names in first-seen order."""
+    return list(dict.fromkeys(test["category"] for test in tests))
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    """Parse ``"Nutritional Query=3,Complex Query=0.5"`` into weights."""
+    weights: Dict[str, float] = {}
+    for pair in filter(None, (spec or "").split(",")):
+        name, _, value = pair.partition("=")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+class QueryMix:
+    """Weighted random draw of ``(category, query)`` pairs.
+
+    A category is picked by weight (default: equal), then a query uniformly
+    within it. The RNG is seeded, so a mix replays the same sequence.
+    """
+
+    def __init__(
+        self,
+        tests: Sequence[Dict[str, Any]] = TEST_QUERIES,
+        weights: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+    ):
+        self.by_category: Dict[str, List[str]] = {}
+        for test in tests:
+            self.by_category.setdefault(test["category"], []).append(test["query"])
+        weights = weights or {}
+        unknown = set(weights) - set(self.by_category)
+        if unknown:
+            raise ValueError(f"Unknown query categories: {sorted(unknown)} (expected from {list(self.by_category)})")
+        self.categories = [name for name in self.by_category if weights.get(name, 1.0) > 0]
+        if not self.categories:
+            raise ValueError("Query mix has no categories with positive weight")
+        self.weights = [weights.get(name, 1.0) for name in self.categories]
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_queries(cls, queries: Sequence[str], category: str = "Custom", seed: int = 0) -> "QueryMix":
+        return cls([{"category": category, "query": query} for query in queries], seed=seed)
+
+    def sample(self) -> Tuple[str, str]:
+        category = self._rng.choices(self.categories, self.weights)[0]
+        return category, self._rng.choice(self.by_category[category])
+
+    def take(self, count: int) -> List[Tuple[str, str]]:
+        return [self.sample() for _ in range(count)]
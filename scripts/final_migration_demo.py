@@ -3,26 +3,16 @@
 Final RAG Implementation: ChromaDB to Upstash Vector Migration Complete
 """
 
-import os
+import sys
+from pathlib import Path
 import json
-from dotenv import load_dotenv
 from upstash_vector import Index
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import get_settings
+
+settings = get_settings()
 
-# Manual fallback for environment variables
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        print("❌ .env file not found!")
-        exit(1)
 
 def demonstrate_working_rag():
     """Demonstrate the fully working RAG system with Upstash Vector."""
@@ -30,8 +20,8 @@ def demonstrate_working_rag():
     print("=" * 60)
     
     # Initialize Upstash Vector
-    url = os.getenv("UPSTASH_VECTOR_REST_URL")
-    token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+    url = settings.upstash_url
+    token = settings.upstash_token
     index = Index(url=url, token=token)
     
     # Show system status
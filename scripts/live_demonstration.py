@@ -4,12 +4,18 @@ Live Demonstration Script for RAG Food Assistant Cloud System
 Shows real-time performance comparison and cloud system capabilities
 """
 
+import sys
 import time
 import json
 import os
+import statistics
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import build_engine, time_query
+from ragfood.config import get_settings
+
 def print_header(title, char="=", width=80):
     """Print a formatted header"""
     print(f"\n{char * width}")
@@ -22,53 +28,42 @@ def print_section(title, char="-", width=60):
     print(f" {title}")
     print(f"{char * width}")
 
-def simulate_query_performance(query, system_type="cloud"):
-    """Simulate query performance with realistic timing"""
+def build_system(system_type):
+    """Build the RAG engine for the cloud or local system (None if unavailable)"""
+    store_backend, llm_backend = ("upstash", "groq") if system_type == "cloud" else ("chroma", "ollama")
+    try:
+        return build_engine(store_backend, llm_backend, get_settings())
+    except Exception as e:
+        print(f"⚠️ {system_type.title()} system unavailable: {e}")
+        return None
+
+def measure_query_performance(engine, query, system_type="cloud", warmup=1, trials=3):
+    """Measure real query performance: warm-up, then the median of repeated trials"""
     print(f"🔍 Query: \"{query}\"")
     print(f"📊 System: {system_type.title()}")
     
-    if system_type == "local":
-        # Simulate local system performance
-        print("   ⏳ Starting local Ollama embedding generation...")
-        time.sleep(0.8)  # Simulate embedding time
-        print("   🔍 Searching ChromaDB vector database...")
-        time.sleep(0.6)  # Simulate search time
-        print("   🧠 Generating response with local Llama 3.2...")
-        time.sleep(1.2)  # Simulate LLM inference
-        total_time = 2.6
-        
-        # Simulate responses
-        if "mediterranean" in query.lower():
-            response = "Based on the retrieved context, Mediterranean options include Greek Moussaka, which is a layered dish with eggplant, meat, and béchamel sauce, originating from Greece. It's rich in vegetables and represents the Mediterranean diet philosophy of fresh, wholesome ingredients."
-        elif "spicy" in query.lower() and "vegetarian" in query.lower():
-            response = "I found these spicy vegetarian options: Thai Green Curry can be made vegetarian using tofu and vegetables while maintaining the authentic spicy flavor from Thai chilies and curry paste. The dish represents the balance of heat and flavor in Thai cuisine."
-        elif "protein" in query.lower():
-            response = "For high-protein options, I found Quinoa Buddha Bowl, which provides complete amino acids from quinoa, making it an excellent plant-based protein source. It typically includes various vegetables, nuts, and seeds for additional protein."
-        else:
-            response = "Based on the local database search, I found relevant food items that match your query. The local system provides detailed information about various cuisines and their cultural significance."
-            
-    else:  # cloud system
-        # Simulate cloud system performance  
-        print("   ⚡ Upstash Vector auto-embedding and search...")
-        time.sleep(0.2)  # Simulate fast cloud processing
-        print("   🚀 Groq Cloud API inference (llama-3.1-8b-instant)...")
-        time.sleep(0.7)  # Simulate fast LLM inference
-        total_time = 0.9
-        
-        # Simulate enhanced responses
-        if "mediterranean" in query.lower():
-            response = "Based on my enhanced database, here are excellent Mediterranean options:\n\n🇬🇷 **Greek Moussaka** - Traditional layered dish with eggplant, spiced meat, and creamy béchamel. Rich in vegetables and Mediterranean flavors.\n\n🇱🇧 **Lebanese Tabbouleh** - Fresh parsley salad with tomatoes, mint, and bulgur. High in antioxidants and represents the Mediterranean diet's emphasis on fresh herbs.\n\n🇮🇹 **Italian Caprese** - Fresh mozzarella, tomatoes, and basil. Simple yet perfect example of Mediterranean cuisine's focus on quality ingredients."
-        elif "spicy" in query.lower() and "vegetarian" in query.lower():
-            response = "Here are fantastic spicy vegetarian Asian dishes:\n\n🌶️ **Thai Green Curry (Vegetarian)** - Authentic curry paste with coconut milk, Thai eggplant, and tofu. The green chilies provide intense heat balanced by creamy coconut.\n\n🥢 **Korean Bibimbap** - Mixed rice bowl with kimchi and gochujang sauce. Fermented vegetables provide both spice and probiotics.\n\n🍜 **Sichuan Mapo Tofu** - Silky tofu in spicy fermented bean sauce with Sichuan peppercorns. Authentic numbing spice experience."
-        elif "protein" in query.lower():
-            response = "Excellent high-protein options from my database:\n\n💪 **Quinoa Buddha Bowl** - Complete protein superfood with all essential amino acids. Typically 8-10g protein per serving from quinoa alone.\n\n🥜 **Spirulina Energy Balls** - Superfood algae provides 60% protein by weight, plus B-vitamins and minerals.\n\n🐟 **Greek-style Grilled Fish** - Lean protein (25-30g per serving) with Mediterranean herbs and olive oil."
-        else:
-            response = "I found comprehensive information from my enhanced 110-item cultural food database. The cloud system provides detailed nutritional data, cultural significance, and preparation methods for foods from 17+ global regions."
-    
-    print(f"   ✅ Response generated in {total_time:.1f} seconds")
+    if engine is None:
+        print("   ❌ System not available - skipping measurement")
+        return None, None
+    
+    try:
+        for _ in range(warmup):
+            time_query(engine, query)
+        timings = [time_query(engine, query) for _ in range(trials)]
+    except Exception as e:
+        print(f"   ❌ Query failed: {e}")
+        return None, None
+    
+    medians = {stage: statistics.median(t.stages[stage] for t in timings) / 1e9 for stage in ("retrieval", "generation", "total")}
+    total_time = medians["total"]
+    response = timings[-1].generation.text
+    
+    print(f"   🔍 Retrieval: {medians['retrieval']:.3f}s (median of {trials} trials)")
+    print(f"   🧠 Generation: {medians['generation']:.3f}s")
+    print(f"   ✅ Response generated in {total_time:.3f} seconds")
     print(f"\n🤖 **AI Response:**")
     print(f"{response}")
-    print(f"\n⏱️  **Performance**: {total_time:.1f}s | **System**: {system_type.title()}")
+    print(f"\n⏱️  **Performance**: {total_time:.3f}s | **System**: {system_type.title()}")
     
     return total_time, response
 
@@ -92,6 +87,8 @@ def run_live_demonstration():
         "Tell me about traditional comfort foods from different countries"
     ]
     
+    cloud_engine = build_system("cloud")
+    local_engine = build_system("local")
     cloud_times = []
     local_times = []
     
@@ -100,21 +97,25 @@ def run_live_demonstration():
         
         # Cloud system demonstration
         print("🌟 **CLOUD SYSTEM (Upstash + Groq)**")
-        cloud_time, cloud_response = simulate_query_performance(query, "cloud")
-        cloud_times.append(cloud_time)
+        cloud_time, cloud_response = measure_query_performance(cloud_engine, query, "cloud")
         
         print(f"\n{'='*60}")
         
         # Local system comparison  
         print("💻 **LOCAL SYSTEM COMPARISON (ChromaDB + Ollama)**")
-        local_time, local_response = simulate_query_performance(query, "local")
-        local_times.append(local_time)
+        local_time, local_response = measure_query_performance(local_engine, query, "local")
         
-        # Performance comparison
-        improvement = ((local_time - cloud_time) / local_time) * 100
-        print(f"\n📈 **PERFORMANCE COMPARISON**:")
-        print(f"   Cloud: {cloud_time:.1f}s | Local: {local_time:.1f}s")
-        print(f"   🚀 Cloud is {improvement:.0f}% FASTER!")
+        # Performance comparison (only when both systems answered)
+        if cloud_time is not None and local_time is not None:
+            cloud_times.append(cloud_time)
+            local_times.append(local_time)
+            improvement = ((local_time - cloud_time) / local_time) * 100
+            print(f"\n📈 **PERFORMANCE COMPARISON**:")
+            print(f"   Cloud: {cloud_time:.3f}s | Local: {local_time:.3f}s")
+            if improvement >= 0:
+                print(f"   🚀 Cloud is {improvement:.0f}% FASTER!")
+            else:
+                print(f"   🐢 Cloud is {-improvement:.0f}% slower on this query")
         
         if i < len(test_queries):
             print(f"\n{'🔄 Next Query':^60}")
@@ -122,14 +123,20 @@ def run_live_demonstration():
     
     print_section("📊 Overall Performance Summary")
     
-    avg_cloud = sum(cloud_times) / len(cloud_times)
-    avg_local = sum(local_times) / len(local_times)
-    overall_improvement = ((avg_local - avg_cloud) / avg_local) * 100
-    
-    print(f"📈 **PERFORMANCE RESULTS**:")
-    print(f"   • Cloud System Average: {avg_cloud:.1f} seconds")
-    print(f"   • Local System Average: {avg_local:.1f} seconds") 
-    print(f"   • Overall Improvement: {overall_improvement:.0f}% FASTER")
+    if cloud_times:
+        avg_cloud = sum(cloud_times) / len(cloud_times)
+        avg_local = sum(local_times) / len(local_times)
+        overall_improvement = ((avg_local - avg_cloud) / avg_local) * 100
+        performance_result = f"{overall_improvement:.0f}% {'faster' if overall_improvement >= 0 else 'slower'} than local system"
+        
+        print(f"📈 **PERFORMANCE RESULTS** (measured, {len(cloud_times)} queries):")
+        print(f"   • Cloud System Average: {avg_cloud:.3f} seconds")
+        print(f"   • Local System Average: {avg_local:.3f} seconds") 
+        print(f"   • Overall: Cloud {performance_result}")
+    else:
+        avg_cloud = avg_local = None
+        performance_result = "not measured (both systems must be available)"
+        print("⚠️ No queries completed on both systems - comparison skipped")
     print(f"   • Response Quality: Superior cultural context and accuracy")
     
     print_section("🌟 Live Database Showcase")
@@ -220,7 +227,7 @@ def run_live_demonstration():
     print_header("🎉 Live Demonstration Complete - System Ready for Production!")
     
     print("📈 **KEY DEMONSTRATION RESULTS**:")
-    print(f"   🚀 Performance: {overall_improvement:.0f}% faster than local system")
+    print(f"   🚀 Performance: {performance_result}")
     print("   💰 Cost: 99.8% reduction in operating expenses")
     print("   📊 Database: 314% over requirements (110 vs 35+ items)")
     print("   🧪 Testing: 17/17 comprehensive tests passing")
@@ -242,9 +249,11 @@ def run_live_demonstration():
     print("   5. 🔄 Continuous optimization and feature enhancement")
     
     print(f"\n⭐ **The RAG Food Assistant cloud migration is COMPLETE and PRODUCTION-READY!**")
+    
+    return {"avg_cloud": avg_cloud, "avg_local": avg_local, "queries": len(cloud_times), "result": performance_result}
 
-def create_demonstration_log():
-    """Create a log file of the demonstration"""
+def create_demonstration_log(metrics):
+    """Create a log file of the demonstration with the measured metrics"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = f"demonstration_log_{timestamp}.txt"
     
@@ -254,18 +263,20 @@ def create_demonstration_log():
         f.write("=" * 60 + "\n\n")
         
         f.write("DEMONSTRATION SUMMARY:\n")
-        f.write("• Cloud system performance: 67% faster than local\n")
+        f.write(f"• Cloud system performance: {metrics['result']}\n")
         f.write("• Database enhancement: 110 items (314% over requirement)\n")
         f.write("• Cost reduction: 99.8% savings annually\n")
         f.write("• Testing coverage: 17/17 comprehensive tests passing\n")
         f.write("• Production readiness: ✅ COMPLETE\n\n")
         
-        f.write("PERFORMANCE METRICS:\n")
-        f.write("• Average cloud response: 1.1 seconds\n")
-        f.write("• Average local response: 3.3 seconds\n")
-        f.write("• Improvement factor: 3x faster\n")
-        f.write("• Error rate: <1% (vs 4% local)\n")
-        f.write("• Concurrent user capacity: Unlimited\n\n")
+        f.write("PERFORMANCE METRICS (median of repeated trials per query):\n")
+        if metrics["queries"]:
+            f.write(f"• Queries measured on both systems: {metrics['queries']}\n")
+            f.write(f"• Average cloud response: {metrics['avg_cloud']:.3f} seconds\n")
+            f.write(f"• Average local response: {metrics['avg_local']:.3f} seconds\n")
+            f.write(f"• Improvement factor: {metrics['avg_local'] / metrics['avg_cloud']:.1f}x\n\n")
+        else:
+            f.write("• Not measured: cloud and local systems must both be available\n\n")
         
         f.write("TECHNICAL ACHIEVEMENTS:\n")
         f.write("• Migration: ChromaDB+Ollama → Upstash+Groq\n")
@@ -282,14 +293,14 @@ def create_demonstration_log():
 
 if __name__ == "__main__":
     # Run the live demonstration
-    run_live_demonstration()
+    metrics = run_live_demonstration()
     
     # Create demonstration log
-    log_file = create_demonstration_log()
+    log_file = create_demonstration_log(metrics)
     print(f"\n📄 Demonstration log saved to: {log_file}")
     
     print(f"\n🎬 **DEMONSTRATION COMPLETE**")
-    print("   This script simulates the cloud system performance")
-    print("   Real deployment would show actual API responses")
-    print("   All metrics are based on actual testing results")
+    print("   Timings are measured against the configured cloud and local systems")
+    print("   (warm-up query, then the median of repeated trials per query)")
+    print("   For full statistics run: python -m ragfood.benchmark")
     print("   System is ready for live production deployment")
\ No newline at end of file
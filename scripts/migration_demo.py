@@ -4,27 +4,16 @@ RAG System Migration Demo: ChromaDB to Upstash Vector
 Demonstrates successful migration with sample queries.
 """
 
-import os
-import json
-from dotenv import load_dotenv
+import sys
+from pathlib import Path
 from upstash_vector import Index
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import load_food_data
+from ragfood.config import get_settings
+
+settings = get_settings()
 
-# Manual fallback for environment variables
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    print("📝 Loading environment variables...")
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        print("❌ .env file not found!")
-        exit(1)
 
 def demo_migration():
     """Demonstrate the successful migration from ChromaDB to Upstash Vector."""
@@ -34,8 +23,8 @@ def demo_migration():
     # Step 1: Initialize Upstash Vector
     print("\n📌 Step 1: Connecting to Upstash Vector...")
     try:
-        url = os.getenv("UPSTASH_VECTOR_REST_URL")
-        token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+        url = settings.upstash_url
+        token = settings.upstash_token
         
         if not url or not token:
             raise ValueError("Missing Upstash credentials")
@@ -56,8 +45,7 @@ def demo_migration():
     # Step 2: Load and display food data info
     print("\n📌 Step 2: Food Data Status...")
     try:
-        with open("foods.json", "r", encoding="utf-8") as f:
-            food_data = json.load(f)
+        food_data = load_food_data()
         
         print(f"✅ Loaded {len(food_data)} food items")
         print(f"   • Sample items: {', '.join([item['id'] for item in food_data[:5]])}")
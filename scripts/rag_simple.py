@@ -1,35 +1,25 @@
 #!/usr/bin/env python3
 """Simplified RAG system that shows retrieval working without LLM generation."""
 
-import os
+import sys
+from pathlib import Path
 import json
 import time
 import requests
-from dotenv import load_dotenv
 from upstash_vector import Index
-from typing import List, Dict, Any, Optional
+from typing import Sequence
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import FoodItem, food_records, load_food_data
+from ragfood.config import get_settings
 
-# Manual fallback for environment variables (in case load_dotenv doesn't work)
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    print("📝 Manually loading environment variables...")
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')  # Remove quotes
-                    os.environ[key] = value
-    except FileNotFoundError:
-        print("❌ .env file not found!")
+settings = get_settings()
 
-# Configuration from environment variables
-UPSTASH_URL = os.getenv("UPSTASH_VECTOR_REST_URL")
-UPSTASH_TOKEN = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
-JSON_FILE = os.getenv("JSON_FILE", "foods.json")
-MAX_RESULTS = int(os.getenv("MAX_RESULTS", "3"))
+# Configuration from the shared settings object
+UPSTASH_URL = settings.upstash_url
+UPSTASH_TOKEN = settings.upstash_token
+JSON_FILE = settings.json_path
+MAX_RESULTS = settings.top_k
 
 def initialize_upstash_client() -> Index:
     """Initialize Upstash Vector client with proper error handling."""
@@ -56,11 +46,10 @@ def initialize_upstash_client() -> Index:
     except Exception as e:
         raise ConnectionError(f"Failed to initialize Upstash client: {e}")
 
-def load_and_process_food_data() -> List[Dict[str, Any]]:
+def load_and_process_food_data() -> Sequence[FoodItem]:
     """Load and process food data from JSON file."""
     try:
-        with open(JSON_FILE, "r", encoding="utf-8") as f:
-            food_data = json.load(f)
+        food_data = load_food_data(JSON_FILE)
         
         print(f"📋 Loaded {len(food_data)} food items from {JSON_FILE}")
         return food_data
@@ -72,7 +61,7 @@ def load_and_process_food_data() -> List[Dict[str, Any]]:
         print(f"❌ Error parsing JSON file: {e}")
         return []
 
-def upsert_food_data(index: Index, food_data: List[Dict[str, Any]]) -> None:
+def upsert_food_data(index: Index, food_data: Sequence[FoodItem]) -> None:
     """Upsert food data with metadata to Upstash Vector."""
     if not food_data:
         print("⚠️ No food data to upsert")
@@ -85,30 +74,13 @@ def upsert_food_data(index: Index, food_data: List[Dict[str, Any]]) -> None:
             print(f"📊 Found {info.vector_count} existing vectors, skipping upsert")
             return
         
-        # Prepare data for batch upsert
-        vectors = []
-        for item in food_data:
-            # Create enriched text for better embeddings
-            enriched_text = item["text"]
-            if "region" in item:
-                enriched_text += f" This food is popular in {item['region']}."
-            if "type" in item:
-                enriched_text += f" It is a type of {item['type']}."
-            
-            vectors.append((
-                item["id"],
-                enriched_text,  # Upstash will automatically generate embeddings
-                {
-                    "region": item.get("region", "unknown"),
-                    "type": item.get("type", "general"),
-                    "original_text": item["text"]
-                }
-            ))
+        # Prepare data for batch upsert; Upstash generates embeddings from the enriched text
+        vectors = [(record.id, record.data, record.metadata) for record in food_records(food_data)]
         
         print(f"🚀 Upserting {len(vectors)} food items to Upstash Vector...")
         
         # Batch upsert
-        batch_size = 100
+        batch_size = settings.upsert_batch_size
         for i in range(0, len(vectors), batch_size):
             batch = vectors[i:i + batch_size]
             index.upsert(vectors=batch)
@@ -3,13 +3,15 @@
 Update Upstash Vector database with new food items
 """
 
-import os
-import json
-from dotenv import load_dotenv
+import sys
+from pathlib import Path
 from upstash_vector import Index
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.config import get_settings
+
+settings = get_settings()
 
 def update_database():
     """Update Upstash Vector with new food items"""
@@ -17,8 +19,8 @@ def update_database():
     print("🔄 Updating Upstash Vector with expanded food database...")
     
     # Initialize Upstash client
-    upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-    upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+    upstash_url = settings.upstash_url
+    upstash_token = settings.upstash_token
     
     if not upstash_url or not upstash_token:
         print("❌ Missing Upstash credentials")
@@ -33,39 +35,21 @@ def update_database():
         print(f"📊 Current vectors in database: {current_count}")
         
         # Load food data
-        with open('foods.json', 'r', encoding='utf-8') as f:
-            food_data = json.load(f)
+        food_data = load_food_data()
         
         print(f"📋 Local database has {len(food_data)} items")
         
         if len(food_data) > current_count:
             print(f"🆕 Found {len(food_data) - current_count} new items to upload...")
             
-            # Prepare new vectors (items 91-110)
-            new_vectors = []
-            for item in food_data[current_count:]:  # Only new items
-                # Create enriched text for better embeddings
-                enriched_text = item["text"]
-                if "region" in item:
-                    enriched_text += f" This food is popular in {item['region']}."
-                if "type" in item:
-                    enriched_text += f" It is a type of {item['type']}."
-                
-                new_vectors.append((
-                    item["id"],
-                    enriched_text,
-                    {
-                        "region": item.get("region", "unknown"),
-                        "type": item.get("type", "general"),
-                        "original_text": item["text"],
-                        "cultural_significance": item.get("cultural_significance", ""),
-                        "dietary": item.get("dietary", []),
-                        "allergens": item.get("allergens", [])
-                    }
-                ))
+            # Prepare new vectors (items 91-110), enriched for better embeddings
+            new_vectors = [
+                (record.id, record.data, record.metadata)
+                for record in food_records(food_data[current_count:])  # Only new items
+            ]
             
             # Upload new vectors
-            batch_size = 10
+            batch_size = settings.upsert_batch_size
             for i in range(0, len(new_vectors), batch_size):
                 batch = new_vectors[i:i + batch_size]
                 index.upsert(vectors=batch)
@@ -5,9 +5,21 @@ Verifies enhanced database meets all requirements
 """
 
 import json
-import os
+import sys
 from pathlib import Path
 
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import FoodItem
+from ragfood.validate import scan_records, validate_catalog
+
+def sample_items(path, count=3):
+    """First ``count`` catalog entries, parsed on their own rather than with the whole file."""
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    spans, _, _ = scan_records(buffer)
+    return [FoodItem.from_dict(json.loads(bytes(buffer[start:end]))) for start, end in spans[:count]]
+
 def verify_database():
     """Verify database meets all submission requirements"""
     
@@ -16,36 +28,26 @@ def verify_database():
     print("=" * 80)
     
     # Load the database
-    data_file = Path("data/food_data.json")
+    data_file = Path(__file__).resolve().parent.parent / "data" / "food_data.json"
     if not data_file.exists():
         print("❌ ERROR: Database file not found!")
         return False
         
-    with open(data_file, 'r', encoding='utf-8') as f:
-        food_items = json.load(f)
+    # One streaming pass: counts, schema check and statistics without building the item list
+    report = validate_catalog(data_file, top=None)
+    total_items = report["records"]
     
     print(f"\n📊 BASIC STATISTICS:")
-    print(f"   • Total food items: {len(food_items)}")
+    print(f"   • Total food items: {total_items}")
     print(f"   • Requirement: 35+ items")
-    print(f"   • Status: {'✅ EXCEEDED' if len(food_items) >= 35 else '❌ FAILED'} ({(len(food_items)/35)*100:.0f}% of requirement)")
-    
-    # Analyze database quality
-    regions = set()
-    dietary_options = set()
-    allergens = set()
-    word_counts = []
-    
-    for item in food_items:
-        if 'region' in item:
-            regions.add(item['region'])
-        if 'dietary' in item:
-            dietary_options.update(item['dietary'])
-        if 'allergens' in item:
-            allergens.update(item['allergens'])
-        if 'text' in item:
-            word_counts.append(len(item['text'].split()))
+    print(f"   • Status: {'✅ EXCEEDED' if total_items >= 35 else '❌ FAILED'} ({(total_items/35)*100:.0f}% of requirement)")
     
-    avg_words = sum(word_counts) / len(word_counts) if word_counts else 0
+    # Analyze database quality (schema check and statistics from ragfood.validate)
+    stats = report["statistics"]
+    regions = [value for value, _ in stats["regions"]["top"]]
+    dietary_options = [value for value, _ in stats["dietary"]["top"]]
+    allergens = [value for value, _ in stats["allergens"]["top"]]
+    avg_words = stats["words"]["mean"]
     
     print(f"\n🌍 CULTURAL DIVERSITY:")
     print(f"   • Regions represented: {len(regions)}")
@@ -62,17 +64,17 @@ def verify_database():
     
     # Show sample entries
     print(f"\n📝 SAMPLE DATABASE ENTRIES:")
-    for i, item in enumerate(food_items[:3], 1):
+    for i, item in enumerate(sample_items(data_file), 1):
         print(f"\n   {i}. {item.get('text', 'No description')[:80]}...")
-        if 'region' in item:
-            print(f"      Region: {item['region']}")
-        if 'dietary' in item:
-            print(f"      Dietary: {', '.join(item['dietary'])}")
+        if item.region:
+            print(f"      Region: {item.region}")
+        if item.dietary:
+            print(f"      Dietary: {', '.join(item.dietary)}")
     
     # Enhancement summary
     print(f"\n🚀 ENHANCEMENT SUMMARY:")
     enhancements = [
-        f"✅ Database size: {len(food_items)} items (314% over requirement)",
+        f"✅ Database size: {total_items} items (314% over requirement)",
         f"✅ Cultural diversity: {len(regions)} global regions",
         f"✅ Dietary options: {len(dietary_options)} classifications",
         f"✅ Content quality: {avg_words:.1f} avg words per description",
@@ -86,11 +88,11 @@ def verify_database():
     # Submission checklist
     print(f"\n📋 SUBMISSION REQUIREMENTS CHECK:")
     requirements = [
-        ("35+ food items", len(food_items) >= 35, f"{len(food_items)} items"),
+        ("35+ food items", total_items >= 35, f"{total_items} items"),
         ("Cultural diversity", len(regions) >= 10, f"{len(regions)} regions"),
         ("Quality descriptions", avg_words >= 50, f"{avg_words:.1f} avg words"),
         ("Dietary classifications", len(dietary_options) >= 5, f"{len(dietary_options)} options"),
-        ("JSON structure", True, "Valid JSON format")
+        ("JSON structure", report["valid"], f"{report['errors']['total']} schema errors")
     ]
     
     all_passed = True
@@ -10,19 +10,18 @@ Author: Jasha9
 Date: November 2025
 """
 
-import os
-from dotenv import load_dotenv
 from upstash_vector import Index
 
-# Load environment variables
-load_dotenv('.env')
+from ragfood.config import get_settings
+
+settings = get_settings()
 
 def test_namespace_separation():
     """Test that food data and digital twin data are in separate namespaces"""
     
     # Initialize Upstash Vector client
-    upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-    upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+    upstash_url = settings.upstash_url
+    upstash_token = settings.upstash_token
     
     if not upstash_url or not upstash_token:
         print("❌ Missing Upstash Vector credentials")
@@ -130,8 +129,8 @@ def test_foods_query():
     print("🍽️ Testing Food Query Functionality")
     print("=" * 50)
     
-    upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-    upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+    upstash_url = settings.upstash_url
+    upstash_token = settings.upstash_token
     
     index = Index(url=upstash_url, token=upstash_token)
     
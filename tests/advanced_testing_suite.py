@@ -5,40 +5,50 @@ Implements comprehensive testing with semantic similarity, multi-criteria search
 nutritional queries, cultural exploration, and performance benchmarking.
 """
 
-import os
+import sys
 import json
-import time
-import statistics
-from typing import Dict, List, Tuple, Any
+import argparse
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Any
 from datetime import datetime
-from dotenv import load_dotenv
-from upstash_vector import Index
-from groq import Groq
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.cassette import MODES, Cassette
+from ragfood.config import get_settings
+from ragfood.evaluation import EvalRunner, open_backends, rag_executor, score_response
+from ragfood.ledger import create_usage_ledger
+from ragfood.profiling import PROFILE_MODES, create_profile_recorder
+from ragfood.workload import TEST_QUERIES
+
+settings = get_settings()
 
 class AdvancedRAGTester:
     """Advanced testing suite for RAG system performance and accuracy"""
     
-    def __init__(self):
-        """Initialize the testing system"""
+    def __init__(self, workers: int = 8, cassette: Optional[str] = None, mode: str = "auto", profile: Optional[str] = None,
+                 ledger: Optional[str] = None):
+        """Initialize the testing system
+
+        With ``cassette`` set, every Upstash and Groq call is recorded there
+        and ``mode="replay"`` re-runs the suite offline from the recording.
+        With ``profile`` ("sample" or "trace") every test case is CPU-profiled
+        into ``PROFILE_DIR``. Token usage and cost of every case are appended
+        to ``ledger`` (default ``USAGE_LEDGER``).
+        """
+        self.workers = workers
+        self.cassette = Cassette(cassette, mode) if cassette else None
+        self.profiler = create_profile_recorder(mode=profile) if profile else None
+        self.ledger = create_usage_ledger(path=ledger)
         self.setup_clients()
         self.test_results = []
         self.performance_data = []
         
     def setup_clients(self):
-        """Setup Upstash Vector and Groq clients"""
+        """Setup Upstash Vector and Groq clients (or their recordings)"""
         try:
-            # Upstash Vector setup
-            upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-            upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
-            self.index = Index(url=upstash_url, token=upstash_token)
-            
-            # Groq setup
-            groq_key = os.getenv("GROQ_API_KEY")
-            self.groq_client = Groq(api_key=groq_key)
-            
+            self.store, self.llm = open_backends("upstash", "groq", cassette=self.cassette)
+            if self.cassette is not None:
+                print(f"📼 Cassette {self.cassette.path} ({self.cassette.mode}, {len(self.cassette)} recorded calls)")
             print("✅ Clients initialized successfully")
             
         except Exception as e:
@@ -47,331 +57,31 @@ class AdvancedRAGTester:
     
     def execute_rag_query(self, query: str) -> Tuple[str, float, Dict]:
         """Execute a complete RAG query with timing and metadata"""
-        start_time = time.time()
-        
-        try:
-            # Step 1: Vector search
-            search_start = time.time()
-            results = self.index.query(
-                data=query,
-                top_k=3,
-                include_metadata=True
-            )
-            search_time = time.time() - search_start
-            
-            # Step 2: Extract contexts
-            contexts = []
-            for result in results:
-                metadata = result.metadata if hasattr(result, 'metadata') else {}
-                contexts.append({
-                    'text': metadata.get('original_text', ''),
-                    'region': metadata.get('region', 'unknown'),
-                    'type': metadata.get('type', 'general'),
-                    'score': result.score if hasattr(result, 'score') else 0,
-                    'cultural_significance': metadata.get('cultural_significance', ''),
-                    'dietary': metadata.get('dietary', []),
-                    'allergens': metadata.get('allergens', [])
-                })
-            
-            # Step 3: Generate response with Groq
-            if contexts:
-                context_text = "\n\n".join([
-                    f"Food: {ctx['text']}\nRegion: {ctx['region']}\nType: {ctx['type']}\n"
-                    f"Cultural Significance: {ctx['cultural_significance']}\n"
-                    f"Dietary Info: {', '.join(ctx['dietary'])}\n"
-                    f"Allergens: {', '.join(ctx['allergens'])}"
-                    for ctx in contexts
-                ])
-                
-                llm_start = time.time()
-                completion = self.groq_client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[
-                        {"role": "system", "content": "You are a knowledgeable food expert. Use the provided context to give detailed, accurate answers about food, cuisine, nutrition, and cooking. Include cultural insights when relevant."},
-                        {"role": "user", "content": f"""Based on this context, answer the question: "{query}"
-
-Context:
-{context_text}
-
-Provide a comprehensive answer that includes relevant details about the food, its cultural background, nutritional aspects, and preparation methods when applicable."""}
-                    ],
-                    temperature=0.7,
-                    max_completion_tokens=500
-                )
-                llm_time = time.time() - llm_start
-                
-                response = completion.choices[0].message.content.strip()
-                
-                # Collect metadata
-                metadata = {
-                    'contexts_found': len(contexts),
-                    'search_time': search_time,
-                    'llm_time': llm_time,
-                    'total_tokens': completion.usage.total_tokens,
-                    'input_tokens': completion.usage.prompt_tokens,
-                    'output_tokens': completion.usage.completion_tokens,
-                    'top_similarity_scores': [ctx['score'] for ctx in contexts[:3]]
-                }
-            else:
-                response = "I couldn't find relevant information about that query."
-                metadata = {
-                    'contexts_found': 0,
-                    'search_time': search_time,
-                    'llm_time': 0,
-                    'total_tokens': 0,
-                    'input_tokens': 0,
-                    'output_tokens': 0,
-                    'top_similarity_scores': []
-                }
-            
-            total_time = time.time() - start_time
-            return response, total_time, metadata
-            
-        except Exception as e:
-            total_time = time.time() - start_time
-            return f"Error: {e}", total_time, {'error': str(e)}
+        return rag_executor(self.store, self.llm)(query)
     
     def run_comprehensive_tests(self) -> Dict[str, Any]:
-        """Run all 15+ comprehensive test queries"""
+        """Run all 15+ comprehensive test queries over a bounded worker pool"""
         
         print("🧪 Starting Advanced RAG Testing Suite")
+        print(f"⚙️ Workers: {self.workers}")
         print("=" * 60)
         
-        test_queries = [
-            # Semantic Similarity Tests
-            {
-                'category': 'Semantic Similarity',
-                'query': 'healthy Mediterranean options',
-                'expected_regions': ['Greece', 'Lebanon', 'Spain'],
-                'expected_types': ['Salad', 'Cold Soup', 'Casserole']
-            },
-            {
-                'category': 'Semantic Similarity', 
-                'query': 'refreshing cold dishes for summer',
-                'expected_regions': ['Spain', 'Lebanon'],
-                'expected_types': ['Cold Soup', 'Salad']
-            },
-            {
-                'category': 'Semantic Similarity',
-                'query': 'nourishing breakfast bowls',
-                'expected_types': ['Superfood Bowl', 'Smoothie Bowl', 'Breakfast Preparation']
-            },
-            
-            # Multi-Criteria Searches
-            {
-                'category': 'Multi-Criteria Search',
-                'query': 'spicy vegetarian Asian dishes',
-                'expected_regions': ['Thailand', 'Korea', 'Japan'],
-                'dietary_filters': ['vegetarian', 'vegan']
-            },
-            {
-                'category': 'Multi-Criteria Search',
-                'query': 'gluten-free dairy-free comfort foods',
-                'dietary_filters': ['gluten-free', 'dairy-free']
-            },
-            {
-                'category': 'Multi-Criteria Search',
-                'query': 'protein-rich vegan superfood meals',
-                'dietary_filters': ['vegan'],
-                'nutritional_focus': ['protein']
-            },
-            
-            # Nutritional Queries
-            {
-                'category': 'Nutritional Query',
-                'query': 'high-protein low-carb foods',
-                'nutritional_focus': ['protein']
-            },
-            {
-                'category': 'Nutritional Query',
-                'query': 'omega-3 rich anti-inflammatory foods',
-                'nutritional_focus': ['omega-3', 'anti-inflammatory']
-            },
-            {
-                'category': 'Nutritional Query',
-                'query': 'foods high in antioxidants and vitamins',
-                'nutritional_focus': ['antioxidants', 'vitamins']
-            },
-            
-            # Cultural Exploration
-            {
-                'category': 'Cultural Exploration',
-                'query': 'traditional comfort foods from different countries',
-                'expected_regions': ['United States', 'Japan', 'United Kingdom', 'North India']
-            },
-            {
-                'category': 'Cultural Exploration',
-                'query': 'ancient grains and traditional preparation methods',
-                'cultural_focus': ['ancient', 'traditional']
-            },
-            {
-                'category': 'Cultural Exploration',
-                'query': 'ceremonial and celebration foods',
-                'cultural_focus': ['celebration', 'ceremonial', 'festival']
-            },
-            
-            # Cooking Method Queries
-            {
-                'category': 'Cooking Method',
-                'query': 'dishes that can be grilled or roasted',
-                'cooking_methods': ['grilling', 'roasting']
-            },
-            {
-                'category': 'Cooking Method',
-                'query': 'slow-cooked and braised dishes',
-                'cooking_methods': ['slow cooking', 'braising']
-            },
-            {
-                'category': 'Cooking Method',
-                'query': 'fermented and pickled foods',
-                'cooking_methods': ['fermentation', 'pickling']
-            },
-            
-            # Complex Combination Queries
-            {
-                'category': 'Complex Query',
-                'query': 'umami-rich vegetarian dishes with mushrooms',
-                'flavor_profile': ['umami'],
-                'ingredients': ['mushrooms']
-            },
-            {
-                'category': 'Complex Query',
-                'query': 'street food that became global phenomena',
-                'food_culture': ['street food', 'global']
+        test_queries = [dict(test) for test in TEST_QUERIES]
+        runner = EvalRunner(self.execute_rag_query, self.evaluate_response_accuracy, workers=self.workers,
+                            profiler=self.profiler, ledger=self.ledger)
+        results_summary = runner.run(test_queries)
+        if self.cassette is not None:
+            results_summary['cassette'] = {
+                'path': self.cassette.path,
+                'mode': self.cassette.mode,
+                'replayed_calls': self.cassette.hits,
+                'recorded_calls': self.cassette.recorded,
             }
-        ]
-        
-        results_summary = {
-            'total_tests': len(test_queries),
-            'successful_tests': 0,
-            'failed_tests': 0,
-            'average_response_time': 0,
-            'performance_data': [],
-            'accuracy_scores': [],
-            'category_performance': {},
-            'detailed_results': []
-        }
-        
-        for i, test in enumerate(test_queries, 1):
-            print(f"\n🧪 Test {i}/{len(test_queries)}: {test['category']}")
-            print(f"Query: '{test['query']}'")
-            
-            try:
-                # Execute query
-                response, response_time, metadata = self.execute_rag_query(test['query'])
-                
-                # Evaluate accuracy (simplified scoring system)
-                accuracy_score = self.evaluate_response_accuracy(test, response, metadata)
-                
-                # Store results
-                test_result = {
-                    'test_number': i,
-                    'category': test['category'],
-                    'query': test['query'],
-                    'response': response,
-                    'response_time': response_time,
-                    'metadata': metadata,
-                    'accuracy_score': accuracy_score,
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                results_summary['detailed_results'].append(test_result)
-                results_summary['performance_data'].append(response_time)
-                results_summary['accuracy_scores'].append(accuracy_score)
-                
-                # Update category performance
-                category = test['category']
-                if category not in results_summary['category_performance']:
-                    results_summary['category_performance'][category] = {
-                        'tests': 0, 'total_time': 0, 'total_accuracy': 0
-                    }
-                results_summary['category_performance'][category]['tests'] += 1
-                results_summary['category_performance'][category]['total_time'] += response_time
-                results_summary['category_performance'][category]['total_accuracy'] += accuracy_score
-                
-                if accuracy_score >= 0.6:  # 60% threshold for success
-                    results_summary['successful_tests'] += 1
-                else:
-                    results_summary['failed_tests'] += 1
-                
-                # Print immediate results
-                print(f"✅ Response Time: {response_time:.2f}s")
-                print(f"📊 Accuracy Score: {accuracy_score:.1%}")
-                print(f"🔍 Contexts Found: {metadata.get('contexts_found', 0)}")
-                if metadata.get('top_similarity_scores'):
-                    print(f"📈 Top Similarity: {max(metadata['top_similarity_scores']):.3f}")
-                
-            except Exception as e:
-                print(f"❌ Test failed: {e}")
-                results_summary['failed_tests'] += 1
-        
-        # Calculate summary statistics
-        if results_summary['performance_data']:
-            results_summary['average_response_time'] = statistics.mean(results_summary['performance_data'])
-            results_summary['median_response_time'] = statistics.median(results_summary['performance_data'])
-            results_summary['min_response_time'] = min(results_summary['performance_data'])
-            results_summary['max_response_time'] = max(results_summary['performance_data'])
-        
-        if results_summary['accuracy_scores']:
-            results_summary['average_accuracy'] = statistics.mean(results_summary['accuracy_scores'])
-            results_summary['median_accuracy'] = statistics.median(results_summary['accuracy_scores'])
-        
-        # Calculate category averages
-        for category, data in results_summary['category_performance'].items():
-            if data['tests'] > 0:
-                data['avg_time'] = data['total_time'] / data['tests']
-                data['avg_accuracy'] = data['total_accuracy'] / data['tests']
-        
         return results_summary
     
     def evaluate_response_accuracy(self, test_config: Dict, response: str, metadata: Dict) -> float:
         """Evaluate response accuracy based on test expectations"""
-        score = 0.0
-        max_score = 1.0
-        
-        response_lower = response.lower()
-        
-        # Check for expected regions
-        if 'expected_regions' in test_config:
-            region_score = 0
-            for region in test_config['expected_regions']:
-                if region.lower() in response_lower:
-                    region_score += 1
-            if test_config['expected_regions']:
-                score += 0.3 * (region_score / len(test_config['expected_regions']))
-        
-        # Check for expected types
-        if 'expected_types' in test_config:
-            type_score = 0
-            for food_type in test_config['expected_types']:
-                if food_type.lower() in response_lower:
-                    type_score += 1
-            if test_config['expected_types']:
-                score += 0.2 * (type_score / len(test_config['expected_types']))
-        
-        # Check dietary filters
-        if 'dietary_filters' in test_config:
-            dietary_score = 0
-            for dietary in test_config['dietary_filters']:
-                if dietary.lower() in response_lower:
-                    dietary_score += 1
-            if test_config['dietary_filters']:
-                score += 0.2 * (dietary_score / len(test_config['dietary_filters']))
-        
-        # Check nutritional focus
-        if 'nutritional_focus' in test_config:
-            nutrition_score = 0
-            for nutrient in test_config['nutritional_focus']:
-                if nutrient.lower() in response_lower:
-                    nutrition_score += 1
-            if test_config['nutritional_focus']:
-                score += 0.2 * (nutrition_score / len(test_config['nutritional_focus']))
-        
-        # Base quality score (response length and coherence)
-        if len(response) > 100 and 'error' not in response.lower():
-            score += 0.1
-        
-        return min(score, max_score)
+        return score_response(test_config, response, metadata)
     
     def generate_performance_report(self, results: Dict[str, Any]) -> str:
         """Generate comprehensive performance and accuracy report"""
@@ -451,9 +161,16 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 def main():
     """Run comprehensive testing suite"""
+    parser = argparse.ArgumentParser(description="Advanced RAG testing suite")
+    parser.add_argument("--workers", type=int, default=8, help="Test cases run concurrently")
+    parser.add_argument("--cassette", metavar="JSONL", help="Record backend calls here (or replay them)")
+    parser.add_argument("--mode", choices=MODES, default="auto", help="Cassette mode: record, replay or auto (replay hits, record misses)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="CPU-profile every test case (files go to PROFILE_DIR)")
+    parser.add_argument("--ledger", metavar="TSV", help="Append per-case token usage and cost here (default USAGE_LEDGER)")
+    args = parser.parse_args()
     try:
         print("🚀 Initializing Advanced RAG Testing Suite...")
-        tester = AdvancedRAGTester()
+        tester = AdvancedRAGTester(workers=args.workers, cassette=args.cassette, mode=args.mode, profile=args.profile, ledger=args.ledger)
         
         # Run comprehensive tests
         results = tester.run_comprehensive_tests()
@@ -478,8 +195,14 @@ def main():
         print(f"📊 Success Rate: {results['successful_tests']}/{results['total_tests']} ({results['successful_tests']/results['total_tests']*100:.1f}%)")
         print(f"⏱️ Average Response Time: {results.get('average_response_time', 0):.3f}s")
         print(f"🎯 Average Accuracy: {results.get('average_accuracy', 0):.1%}")
+        print(f"🕒 Wall Time: {results['wall_time']:.2f}s with {results['workers']} workers")
         print(f"📄 Report saved: test_report_{timestamp}.md")
         print(f"📊 Data saved: test_results_{timestamp}.json")
+        if tester.ledger is not None:
+            print(f"💰 Usage ledger: {tester.ledger.path} (python -m ragfood.ledger {tester.ledger.path} --by category)")
+        if tester.profiler is not None:
+            aggregate = tester.profiler.write_aggregate(f"test_profile_{timestamp}{tester.profiler.extension}")
+            print(f"🔥 Profiles: {len(tester.profiler.paths)} per test in {tester.profiler.directory}, aggregate {aggregate}")
         
     except Exception as e:
         print(f"❌ Testing failed: {e}")
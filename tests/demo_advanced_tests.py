@@ -4,14 +4,16 @@ Quick demonstration of advanced testing capabilities
 Shows key test examples without running the full suite
 """
 
-import os
+import sys
 import time
-from dotenv import load_dotenv
+from pathlib import Path
 from upstash_vector import Index
 from groq import Groq
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import get_settings
+
+settings = get_settings()
 
 def demo_advanced_tests():
     """Demonstrate key advanced testing capabilities"""
@@ -21,9 +23,9 @@ def demo_advanced_tests():
     
     # Setup clients
     try:
-        upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-        upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
-        groq_key = os.getenv("GROQ_API_KEY")
+        upstash_url = settings.upstash_url
+        upstash_token = settings.upstash_token
+        groq_key = settings.groq_api_key
         
         index = Index(url=upstash_url, token=upstash_token)
         groq_client = Groq(api_key=groq_key)
@@ -1,136 +1,92 @@
 #!/usr/bin/env python3
 """
 Performance Comparison Suite
-Compares cloud-based RAG system performance against simulated local system metrics
+Compares measured cloud RAG performance (Upstash Vector + Groq) against the
+local system (ChromaDB + Ollama) using the shared benchmark harness: warm-up
+queries, repeated trials and perf_counter_ns stage timings for both.
 """
 
-import os
-import time
+import sys
 import json
-import statistics
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional
 from datetime import datetime
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import BenchmarkRun, build_engine, build_report, run_benchmark, write_report
+from ragfood.config import get_settings
+from ragfood.llm import estimate_cost
+
 
 class PerformanceComparison:
     """Compare cloud vs local system performance metrics"""
     
-    def __init__(self):
+    def __init__(self, warmup: int = 2, trials: int = 3):
         """Initialize performance comparison suite"""
-        self.cloud_metrics = []
-        self.simulated_local_metrics = []
-        
-    def simulate_local_system_performance(self, query: str) -> Dict:
-        """Simulate local system performance (ChromaDB + Local Ollama)"""
-        # Simulate realistic local system timings based on typical performance
-        
-        # Local embedding generation (mxbai-embed-large on local CPU)
-        local_embedding_time = 0.5 + (len(query) * 0.01)  # 0.5-2s typical
-        
-        # ChromaDB local search
-        local_search_time = 0.1 + (len(query) * 0.005)  # 0.1-0.3s typical
-        
-        # Local Ollama LLM generation (llama3.2 on local CPU/GPU)
-        context_length = 500  # Estimated context length
-        local_llm_time = 3.0 + (context_length * 0.01)  # 3-8s typical
-        
-        # Total local system time
-        total_local_time = local_embedding_time + local_search_time + local_llm_time
-        
-        return {
-            'embedding_time': local_embedding_time,
-            'search_time': local_search_time,
-            'llm_time': local_llm_time,
-            'total_time': total_local_time,
-            'system_type': 'local',
-            'embedding_model': 'mxbai-embed-large (local CPU)',
-            'llm_model': 'llama3.2 (local CPU/GPU)',
-            'vector_db': 'ChromaDB (local SQLite)',
-            'estimated_cost': 0.0  # No API costs
-        }
-    
-    def measure_cloud_system_performance(self, query: str) -> Dict:
-        """Measure actual cloud system performance"""
-        from upstash_vector import Index
-        from groq import Groq
+        self.settings = get_settings()
+        self.warmup = warmup
+        self.trials = trials
+        self.runs: Dict[str, BenchmarkRun] = {}
         
+    def benchmark_system(self, system_type: str, test_queries: List[str]) -> Optional[BenchmarkRun]:
+        """Benchmark one system with warm-up and repeated trials"""
+        store_backend, llm_backend = ("upstash", "groq") if system_type == "cloud" else ("chroma", "ollama")
         try:
-            # Setup clients
-            upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-            upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
-            groq_key = os.getenv("GROQ_API_KEY")
-            
-            index = Index(url=upstash_url, token=upstash_token)
-            groq_client = Groq(api_key=groq_key)
-            
-            total_start = time.time()
-            
-            # Measure Upstash Vector search (includes auto-embedding)
-            search_start = time.time()
-            results = index.query(
-                data=query,
-                top_k=3,
-                include_metadata=True
-            )
-            search_time = time.time() - search_start
-            
-            # Prepare context
-            contexts = []
-            for result in results:
-                metadata = result.metadata if hasattr(result, 'metadata') else {}
-                contexts.append(metadata.get('original_text', ''))
-            
-            context_text = "\n\n".join(contexts[:3])
-            
-            # Measure Groq LLM generation
-            llm_start = time.time()
-            completion = groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": "You are a food expert. Answer questions based on the provided context."},
-                    {"role": "user", "content": f"Based on this context, answer: {query}\n\nContext:\n{context_text}"}
-                ],
-                temperature=0.7,
-                max_completion_tokens=300
+            engine = build_engine(store_backend, llm_backend, self.settings)
+        except Exception as e:
+            print(f"   ❌ {system_type.title()} system unavailable: {e}")
+            return None
+        try:
+            run = run_benchmark(
+                engine, test_queries, name=f"{system_type} ({store_backend}+{llm_backend})",
+                warmup=self.warmup, trials=self.trials, progress=True,
+                config={"store": store_backend, "llm": llm_backend, "model": engine.llm.model},
             )
-            llm_time = time.time() - llm_start
-            
-            total_time = time.time() - total_start
-            
-            # Calculate estimated cost
-            input_tokens = completion.usage.prompt_tokens
-            output_tokens = completion.usage.completion_tokens
-            estimated_cost = (input_tokens * 0.05 / 1000000) + (output_tokens * 0.08 / 1000000)
-            
-            return {
-                'embedding_time': 0.0,  # Handled by Upstash automatically
-                'search_time': search_time,
-                'llm_time': llm_time,
-                'total_time': total_time,
-                'system_type': 'cloud',
+        finally:
+            engine.store.close()
+        self.runs[system_type] = run
+        return run
+    
+    def query_metrics(self, run: Optional[BenchmarkRun], query: str, system_type: str) -> Dict:
+        """Median per-stage timings (seconds) for one query across trials"""
+        if run is None or query not in run.by_query:
+            reason = 'system unavailable' if run is None else 'all trials failed'
+            return {'error': reason, 'system_type': system_type}
+        
+        medians = run.query_medians(query)
+        usage = run.query_usage.get(query)
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else 0
+        metrics = {
+            'search_time': medians['retrieval'],
+            'llm_time': medians['generation'],
+            'total_time': medians['total'],
+            'trials': len(run.by_query[query]['total']),
+            'system_type': system_type,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+        }
+        if system_type == 'cloud':
+            metrics.update({
                 'embedding_model': 'MXBAI_EMBED_LARGE_V1 (Upstash)',
-                'llm_model': 'llama-3.1-8b-instant (Groq)',
+                'llm_model': f"{run.config.get('model')} (Groq)",
                 'vector_db': 'Upstash Vector (cloud)',
-                'estimated_cost': estimated_cost,
-                'input_tokens': input_tokens,
-                'output_tokens': output_tokens,
-                'contexts_found': len(results)
-            }
-            
-        except Exception as e:
-            return {
-                'error': str(e),
-                'total_time': 999.0,  # High penalty for errors
-                'system_type': 'cloud'
-            }
+                'estimated_cost': estimate_cost(run.config.get('model'), input_tokens, output_tokens),
+            })
+        else:
+            metrics.update({
+                'embedding_model': f"{self.settings.embed_model} (local Ollama)",
+                'llm_model': f"{run.config.get('model')} (local Ollama)",
+                'vector_db': 'ChromaDB (local SQLite)',
+                'estimated_cost': 0.0,  # No API costs
+            })
+        return metrics
     
     def run_performance_comparison(self, test_queries: List[str]) -> Dict:
         """Run performance comparison between cloud and local systems"""
         
         print("⚡ Running Performance Comparison Suite")
+        print(f"   {self.warmup} warm-up queries, {self.trials} trials per query")
         print("=" * 50)
         
         results = {
@@ -141,38 +97,30 @@ class PerformanceComparison:
             'timestamp': datetime.now().isoformat()
         }
         
+        print("\n☁️ Benchmarking cloud system...")
+        cloud_run = self.benchmark_system('cloud', test_queries)
+        print("\n💻 Benchmarking local system...")
+        local_run = self.benchmark_system('local', test_queries)
+        
         for i, query in enumerate(test_queries, 1):
-            print(f"\n🔍 Test {i}/{len(test_queries)}: '{query[:50]}...'")
+            print(f"\n🔍 Query {i}/{len(test_queries)}: '{query[:50]}...'")
             
-            # Measure cloud performance
-            print("   ☁️ Testing cloud system...")
-            cloud_metrics = self.measure_cloud_system_performance(query)
+            cloud_metrics = self.query_metrics(cloud_run, query, 'cloud')
+            local_metrics = self.query_metrics(local_run, query, 'local')
             results['cloud_results'].append(cloud_metrics)
-            
-            if 'error' not in cloud_metrics:
-                print(f"      Total Time: {cloud_metrics['total_time']:.3f}s")
-                print(f"      Search: {cloud_metrics['search_time']:.3f}s")
-                print(f"      LLM: {cloud_metrics['llm_time']:.3f}s")
-                print(f"      Cost: ${cloud_metrics['estimated_cost']:.6f}")
-            else:
-                print(f"      ❌ Error: {cloud_metrics['error']}")
-            
-            # Simulate local performance
-            print("   💻 Simulating local system...")
-            local_metrics = self.simulate_local_system_performance(query)
             results['local_results'].append(local_metrics)
             
-            print(f"      Total Time: {local_metrics['total_time']:.3f}s")
-            print(f"      Embedding: {local_metrics['embedding_time']:.3f}s")
-            print(f"      Search: {local_metrics['search_time']:.3f}s")
-            print(f"      LLM: {local_metrics['llm_time']:.3f}s")
+            for label, metrics in (("☁️ Cloud", cloud_metrics), ("💻 Local", local_metrics)):
+                if 'error' in metrics:
+                    print(f"   {label}: ❌ {metrics['error']}")
+                else:
+                    print(f"   {label}: {metrics['total_time']:.3f}s median "
+                          f"(search {metrics['search_time']:.3f}s, LLM {metrics['llm_time']:.3f}s)")
             
             # Show immediate comparison
-            if 'error' not in cloud_metrics:
+            if 'error' not in cloud_metrics and 'error' not in local_metrics:
                 speedup = local_metrics['total_time'] / cloud_metrics['total_time']
                 print(f"   📊 Cloud is {speedup:.1f}x faster than local")
-            
-            time.sleep(0.5)  # Brief pause to avoid rate limits
         
         # Calculate summary statistics
         self.calculate_comparison_summary(results)
@@ -182,43 +130,40 @@ class PerformanceComparison:
     def calculate_comparison_summary(self, results: Dict) -> None:
         """Calculate comprehensive comparison statistics"""
         
-        # Filter successful cloud results
-        successful_cloud = [r for r in results['cloud_results'] if 'error' not in r]
-        local_results = results['local_results']
+        cloud_run = self.runs.get('cloud')
+        local_run = self.runs.get('local')
         
-        if not successful_cloud:
+        if cloud_run is None or not cloud_run.completed:
             results['comparison_summary'] = {'error': 'No successful cloud tests'}
             return
+        if local_run is None or not local_run.completed:
+            results['comparison_summary'] = {'error': 'No successful local tests'}
+            return
         
-        # Calculate averages
-        cloud_times = [r['total_time'] for r in successful_cloud]
-        local_times = [r['total_time'] for r in local_results]
-        
-        cloud_search_times = [r['search_time'] for r in successful_cloud]
-        cloud_llm_times = [r['llm_time'] for r in successful_cloud]
-        
-        local_embedding_times = [r['embedding_time'] for r in local_results]
-        local_search_times = [r['search_time'] for r in local_results]
-        local_llm_times = [r['llm_time'] for r in local_results]
+        successful_cloud = [r for r in results['cloud_results'] if 'error' not in r]
+        cloud = cloud_run.summary()
+        local = local_run.summary()
+        cloud_stages = cloud['stages_ms']
+        local_stages = local['stages_ms']
         
         # Calculate costs
-        cloud_costs = [r.get('estimated_cost', 0) for r in successful_cloud]
-        total_cloud_cost = sum(cloud_costs)
+        total_cloud_cost = sum(r.get('estimated_cost', 0) for r in successful_cloud)
         
         results['comparison_summary'] = {
-            # Overall Performance
-            'cloud_avg_time': statistics.mean(cloud_times),
-            'local_avg_time': statistics.mean(local_times),
-            'cloud_median_time': statistics.median(cloud_times),
-            'local_median_time': statistics.median(local_times),
-            'speed_improvement': statistics.mean(local_times) / statistics.mean(cloud_times),
+            # Overall Performance (seconds, over every trial)
+            'cloud_avg_time': cloud_stages['total']['mean'] / 1000,
+            'local_avg_time': local_stages['total']['mean'] / 1000,
+            'cloud_median_time': cloud_stages['total']['p50']['value'] / 1000,
+            'local_median_time': local_stages['total']['p50']['value'] / 1000,
+            'cloud_p99_time': cloud_stages['total']['p99']['value'] / 1000,
+            'local_p99_time': local_stages['total']['p99']['value'] / 1000,
+            'speed_improvement': local_stages['total']['mean'] / cloud_stages['total']['mean'],
             
             # Component Performance
-            'cloud_avg_search_time': statistics.mean(cloud_search_times),
-            'cloud_avg_llm_time': statistics.mean(cloud_llm_times),
-            'local_avg_embedding_time': statistics.mean(local_embedding_times),
-            'local_avg_search_time': statistics.mean(local_search_times),
-            'local_avg_llm_time': statistics.mean(local_llm_times),
+            'cloud_avg_search_time': cloud_stages['retrieval']['mean'] / 1000,
+            'cloud_avg_llm_time': cloud_stages['generation']['mean'] / 1000,
+            'local_avg_search_time': local_stages['retrieval']['mean'] / 1000,
+            'local_avg_llm_time': local_stages['generation']['mean'] / 1000,
             
             # Cost Analysis
             'total_cloud_cost': total_cloud_cost,
@@ -226,8 +171,8 @@ class PerformanceComparison:
             'local_infrastructure_cost': 0.0,
             
             # Reliability
-            'cloud_success_rate': len(successful_cloud) / len(results['cloud_results']),
-            'local_success_rate': 1.0,  # Simulated, assumed perfect
+            'cloud_success_rate': 1 - cloud['error_rate'],
+            'local_success_rate': 1 - local['error_rate'],
             
             # Scalability
             'cloud_scalability': 'Auto-scaling',
@@ -251,7 +196,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## 🏆 Executive Summary
 
-The cloud-based RAG system (Upstash Vector + Groq) demonstrates **{summary['speed_improvement']:.1f}x faster** performance compared to a typical local setup (ChromaDB + Local Ollama).
+The cloud-based RAG system (Upstash Vector + Groq) demonstrates **{summary['speed_improvement']:.1f}x faster** performance compared to the local setup (ChromaDB + Local Ollama), measured over {self.trials} trials per query after {self.warmup} warm-up queries.
 
 ## 📊 Performance Metrics Comparison
 
@@ -260,6 +205,7 @@ The cloud-based RAG system (Upstash Vector + Groq) demonstrates **{summary['spee
 |--------|--------------|--------------|-------------|
 | **Average Total Time** | {summary['cloud_avg_time']:.3f}s | {summary['local_avg_time']:.3f}s | {summary['speed_improvement']:.1f}x faster |
 | **Median Total Time** | {summary['cloud_median_time']:.3f}s | {summary['local_median_time']:.3f}s | {summary['local_median_time']/summary['cloud_median_time']:.1f}x faster |
+| **p99 Total Time** | {summary['cloud_p99_time']:.3f}s | {summary['local_p99_time']:.3f}s | {summary['local_p99_time']/summary['cloud_p99_time']:.1f}x faster |
 
 ### 🔍 Component Performance Breakdown
 
@@ -269,8 +215,7 @@ The cloud-based RAG system (Upstash Vector + Groq) demonstrates **{summary['spee
 - **Total Pipeline**: {summary['cloud_avg_time']:.3f}s
 
 #### Local System (ChromaDB + Ollama)
-- **Embedding Generation**: {summary['local_avg_embedding_time']:.3f}s
-- **Vector Search**: {summary['local_avg_search_time']:.3f}s  
+- **Vector Search**: {summary['local_avg_search_time']:.3f}s (includes local embedding)
 - **LLM Generation**: {summary['local_avg_llm_time']:.3f}s
 - **Total Pipeline**: {summary['local_avg_time']:.3f}s
 
@@ -325,7 +270,7 @@ The cloud-based RAG system (Upstash Vector + Groq) demonstrates **{summary['spee
             cloud_result = results['cloud_results'][i]
             local_result = results['local_results'][i]
             
-            if 'error' not in cloud_result:
+            if 'error' not in cloud_result and 'error' not in local_result:
                 speedup = local_result['total_time'] / cloud_result['total_time']
                 report += f"""
 **Query {i+1}**: "{query[:50]}..."
@@ -420,8 +365,14 @@ def main():
         with open(f'performance_report_{timestamp}.md', 'w', encoding='utf-8') as f:
             f.write(report)
         
+        # Save benchmark harness report (histograms, percentiles with CIs)
+        write_report(build_report(list(comparer.runs.values())), f'performance_benchmark_{timestamp}.json')
+        
         # Print summary
         summary = results['comparison_summary']
+        if 'error' in summary:
+            print(f"❌ Performance comparison incomplete: {summary['error']}")
+            return
         print("\n" + "=" * 60)
         print("🎉 Performance Comparison Complete!")
         print(f"⚡ Speed Improvement: {summary['speed_improvement']:.1f}x faster")
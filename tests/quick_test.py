@@ -3,12 +3,14 @@
 Quick test to validate the fixed RAG system
 """
 
-import os
 import sys
-from dotenv import load_dotenv
+from pathlib import Path
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import load_food_data
+from ragfood.config import get_settings
+
+settings = get_settings()
 
 def test_connections():
     """Test all connections and components"""
@@ -17,9 +19,9 @@ def test_connections():
     
     # Test 1: Environment Variables
     print("1. Checking Environment Variables:")
-    groq_key = os.getenv("GROQ_API_KEY")
-    upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-    upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+    groq_key = settings.groq_api_key
+    upstash_url = settings.upstash_url
+    upstash_token = settings.upstash_token
     
     if groq_key:
         print("   ✅ GROQ_API_KEY found")
@@ -79,12 +81,10 @@ def test_connections():
     # Test 5: Data File
     print("\n5. Checking Data File:")
     try:
-        import json
-        with open("foods.json", "r", encoding="utf-8") as f:
-            food_data = json.load(f)
-        print(f"   ✅ foods.json loaded successfully ({len(food_data)} items)")
+        food_data = load_food_data()
+        print(f"   ✅ {settings.json_file} loaded successfully ({len(food_data)} items)")
     except Exception as e:
-        print(f"   ❌ foods.json loading failed: {e}")
+        print(f"   ❌ {settings.json_file} loading failed: {e}")
         return False
     
     print("\n🎉 All tests passed! Your RAG system is ready to use.")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Offline tests for the IVF approximate index, its store and the sweep benchmark."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.ann import IVFIndex, IVFPQIndex
+from ragfood.ann_bench import catalog_vectors, exact_top_k, main, recall, sample_queries, synthetic_vectors
+from ragfood.catalog import food_records, load_food_data
+from ragfood.embeddings import HashingEmbedder
+from ragfood.stores import VectorRecord, create_vector_store
+from ragfood.stores.ivf import IVFVectorStore
+
+
+def test_index_recall_grows_with_nprobe_and_is_exact_at_nlist():
+    vectors = synthetic_vectors(4000, 32, clusters=40, seed=1)
+    queries = sample_queries(vectors, 50, seed=2)
+    truth = exact_top_k(vectors, queries, 10)
+    index, order = IVFIndex.build(vectors, nlist=64, seed=0)
+
+    assert len(index) == 4000 and sorted(order.tolist()) == list(range(4000))
+    assert np.array_equal(index.vectors, vectors[order])
+    recalls = [recall([order[index.search(q, 10, nprobe)[0]] for q in queries], truth) for nprobe in (1, 8, 64)]
+    assert recalls[0] <= recalls[1] <= recalls[2] == 1.0
+    assert recalls[1] > 0.9
+
+
+def test_pq_index_codes_save_and_refine(tmp_path):
+    vectors = catalog_vectors(3000, 64, seed=4)
+    queries = sample_queries(vectors, 30, seed=5)
+    truth = exact_top_k(vectors, queries, 10)
+    index = IVFPQIndex.build(vectors, nlist=16, m=8, seed=0)
+
+    assert index.codes.shape == (3000, 8) and index.codes.dtype == np.uint8 and index.bytes_per_vector == 12
+    assert sorted(index.ids.tolist()) == list(range(3000))
+    rows = np.arange(0, 3000, 7)
+    error = np.linalg.norm(index.decode(rows) - vectors[index.ids[rows]], axis=1).mean()
+    assert error < np.linalg.norm(vectors[index.ids[rows]] - index.centroids[np.searchsorted(index.offsets, rows, side="right") - 1], axis=1).mean()
+    ids, scores = index.search(queries[0], 10, nprobe=16)
+    assert np.allclose(scores, vectors[ids] @ queries[0], atol=0.15)
+
+    index.save(str(tmp_path / "pq"))
+    np.save(tmp_path / "full.npy", vectors)
+    loaded = IVFPQIndex.load(str(tmp_path / "pq"), vectors=np.load(tmp_path / "full.npy", mmap_mode="r"))
+    assert isinstance(loaded.codes, np.memmap)
+    coarse = recall([loaded.search(q, 10, 16, refine=0)[0] for q in queries], truth)
+    refined = recall([loaded.search(q, 10, 16, refine=20)[0] for q in queries], truth)
+    assert refined > coarse and refined > 0.9
+    with pytest.raises(ValueError, match="divide"):
+        IVFPQIndex.build(vectors, nlist=4, m=7)
+
+
+def test_store_matches_exact_search_and_tracks_changes():
+    food_data = load_food_data()
+    exact = create_vector_store("memory")
+    ivf = IVFVectorStore(embedder=HashingEmbedder(), nlist=4, nprobe=4, min_items=0)
+    for store in (exact, ivf):
+        store.upsert(food_records(food_data))
+
+    for question in ("yellow fruit", "spicy curry", "sweet dessert"):
+        expected = [r.id for r in exact.query(question, top_k=5)]
+        assert [r.id for r in ivf.query(question, top_k=5)] == expected
+    assert ivf.index() is not None and ivf.index().nlist == 4
+
+    # A filter the probed lists cannot satisfy falls back to exact search
+    region = food_data[0]["region"]
+    filtered = ivf.query("spicy curry", top_k=3, nprobe=1, filter={"region": region})
+    assert [r.id for r in filtered] == [r.id for r in exact.query("spicy curry", top_k=3, filter={"region": region})]
+
+    index = ivf.index()
+    ivf.upsert([VectorRecord("new", data="purple ube jam from the Philippines")])
+    assert ivf.index() is index and ivf.query("purple ube jam", top_k=1)[0].id == "new"
+    ivf.upsert([VectorRecord("new", data="green matcha ice cream")])
+    assert ivf.index() is index
+    first = next(iter(food_records(food_data[:1])))
+    ivf.upsert([VectorRecord(first.id, data="blue cheese")])
+    assert ivf.index() is not index
+    assert ivf.delete(["new"]) == 1 and ivf.query("green matcha ice cream", top_k=1)[0].id != "new"
+
+
+def test_save_and_mmap_load_round_trip(tmp_path):
+    store = create_vector_store("ivf", min_items=0, nlist=4)
+    store.upsert(food_records(load_food_data()))
+    store.upsert([VectorRecord("tail", data="late addition", metadata={"region": "Nowhere"})], namespace="extra")
+    before = [r.id for r in store.query("coconut curry", top_k=5)]
+    store.save(str(tmp_path / "ann"))
+
+    loaded = IVFVectorStore.load(str(tmp_path / "ann"), embedder=HashingEmbedder(), min_items=0)
+    assert isinstance(loaded._namespace("").vectors, np.memmap)
+    assert [r.id for r in loaded.query("coconut curry", top_k=5)] == before
+    assert loaded.fetch(["tail"], namespace="extra")[0].metadata == {"region": "Nowhere"}
+    assert loaded.index().nlist == 4 and loaded.info().vector_count == store.info().vector_count
+
+    (tmp_path / "bad").mkdir()
+    (tmp_path / "bad" / "manifest.json").write_text(json.dumps({"schema": "other"}))
+    with pytest.raises(ValueError, match="not a saved IVF store"):
+        IVFVectorStore.load(str(tmp_path / "bad"))
+
+
+def test_sweep_report(tmp_path, capsys):
+    output = tmp_path / "ann.json"
+    assert main(["--n", "3000", "--dim", "16", "--queries", "20", "--nlist", "16,32",
+                 "--nprobe", "1,32", "--output", str(output)]) == 0
+    assert "exact" in capsys.readouterr().out
+
+    report = json.loads(output.read_text())
+    assert report["schema"] == "ragfood-ann/1" and report["exact"]["recall"] == 1.0
+    assert [build["nlist"] for build in report["builds"]] == [16, 32]
+    assert [point["nprobe"] for point in report["builds"][0]["points"]] == [1]
+    full = report["builds"][1]["points"][-1]
+    assert full["nprobe"] == 32 and full["recall"] == 1.0 and full["candidates_per_query"] == 3000
+
+    assert main(["--index", "ivfpq", "--data", "catalog", "--n", "2000", "--dim", "32", "--queries", "10",
+                 "--nlist", "8", "--nprobe", "8", "--m", "4,8", "--refine", "0,10", "--output", str(output)]) == 0
+    builds = json.loads(output.read_text())["builds"]
+    assert [(b["index"], b["m"], b["bytes_per_vector"]) for b in builds] == [("ivfpq", 4, 8), ("ivfpq", 8, 12)]
+    assert [p["refine"] for p in builds[0]["points"]] == [0, 10]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Offline tests for the latency histogram, statistics and benchmark harness."""
+
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import build_engine, build_report, load_report, run_benchmark, write_report
+from ragfood.catalog import load_food_data
+from ragfood.histogram import LatencyHistogram
+from ragfood.stats import quantile, quantile_interval, summarize
+
+
+def test_histogram_percentiles_within_precision_and_round_trip():
+    rng = random.Random(1)
+    values = sorted(int(rng.lognormvariate(15, 1)) for _ in range(5000))
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record_many(values[::2])
+    second.record_many(values[1::2])
+    histogram = first.merge(second)
+
+    assert histogram.count == len(values)
+    assert histogram.min == values[0] and histogram.max == values[-1]
+    for q in (50, 90, 99):
+        exact = quantile(values, q / 100)
+        assert abs(histogram.percentile(q) - exact) <= exact * 0.001 + 1
+    restored = LatencyHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+    assert restored.percentiles() == histogram.percentiles()
+
+
+def test_quantile_interval_brackets_the_estimate():
+    rng = random.Random(2)
+    values = sorted(rng.random() for _ in range(1000))
+    for q in (0.5, 0.9, 0.99):
+        low, high = quantile_interval(values, q)
+        assert low <= quantile(values, q) <= high
+    summary = summarize(values)
+    assert summary["count"] == 1000 and summary["p50"]["ci_low"] < summary["p50"]["ci_high"]
+
+
+def test_benchmark_run_reports_stages_and_writes_json(tmp_path):
+    engine = build_engine("memory", "stub", food_data=load_food_data("foods.json")[:20])
+    queries = ["spicy curry", "sweet tropical fruit", "Japanese soup"]
+
+    run = run_benchmark(engine, queries, name="memory+stub", warmup=2, trials=3, stream=True)
+
+    summary = run.summary()
+    assert summary["queries"] == 9 and summary["errors"] == 0
+    assert set(summary["stages_ms"]) == {"retrieval", "context", "generation", "first_token", "total"}
+    assert len(run.trial_seconds) == 3 and summary["throughput_qps"]["value"] > 0
+    assert set(run.query_medians("spicy curry")) >= {"retrieval", "generation", "total"}
+
+    path = tmp_path / "bench.json"
+    write_report(build_report([run]), str(path))
+    report = load_report(str(path))
+    assert report["schema"] == "ragfood-benchmark/1"
+    saved = report["runs"][0]
+    assert saved["histograms"]["total"]["count"] == 9
+    assert len(saved["samples_ns"]["total"]) == 9
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
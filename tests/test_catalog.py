@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Offline tests for compact FoodItem catalog records and their benchmark."""
+
+import json
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import DIETARY, FoodItem, enrich_text, food_metadata, food_records, load_food_data
+from ragfood.catalog_bench import main
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = [ROOT / "data" / "food_data.json", ROOT / "foods.json"]
+
+
+@pytest.mark.parametrize("source", SOURCES, ids=lambda p: p.name)
+def test_food_items_read_like_their_json(source):
+    items = json.loads(source.read_text(encoding="utf-8"))
+    loaded = load_food_data(str(source))
+    assert all(isinstance(item, FoodItem) for item in loaded)
+    assert loaded == items and [dict(item) for item in loaded] == items
+    assert pickle.loads(pickle.dumps(loaded)) == items
+
+    rich = next(item for item in loaded if "dietary" in item and "allergens" not in item)
+    assert rich.get("allergens") is None and rich.get("allergens", []) == [] and "allergens" not in rich
+    assert rich["ingredients"] == list(rich.ingredients) and rich.dietary == tuple(rich["dietary"])
+    with pytest.raises(KeyError):
+        rich["allergens"]
+
+
+def test_categories_are_interned_and_tags_coded():
+    copies = [FoodItem.from_dict(json.loads('{"id": "1", "region": "Japan", "type": "Main Course", "dietary": ["vegan", "gluten-free"]}'))
+              for _ in range(2)]
+    assert copies[0].region is copies[1].region and copies[0].dietary_codes is copies[1].dietary_codes
+    assert all(isinstance(code, int) for code in copies[0].dietary_codes)
+    assert DIETARY.decode(copies[0].dietary_codes) == ["vegan", "gluten-free"]
+    assert copies[0].has_dietary("vegan") and not copies[0].has_dietary("raw") and not copies[0].has_allergen("milk")
+    assert not hasattr(copies[0], "__dict__")
+
+    odd = FoodItem.from_dict({"id": 7, "text": "Tea", "dietary": "vegan", "rating": 5})
+    assert dict(odd) == {"id": 7, "text": "Tea", "dietary": "vegan", "rating": 5} and odd.dietary == ()
+
+
+def test_enrichment_matches_for_dicts_and_records():
+    raw = json.loads(SOURCES[0].read_text(encoding="utf-8"))
+    item = next(i for i in raw if "cultural_significance" in i)
+    expected = (f"{item['text']} This food is popular in {item['region']}. It is a type of {item['type']}."
+                f" Origin: {item['origin']}. Cultural significance: {item['cultural_significance']}")
+    assert enrich_text(item, extended=True) == enrich_text(FoodItem.from_dict(item), extended=True) == expected
+    assert food_metadata({"id": "x"}) == {"region": "unknown", "type": "general", "original_text": "",
+                                          "cultural_significance": "", "dietary": [], "allergens": []}
+    assert list(food_records(raw, id_prefix="food_")) == list(food_records(load_food_data(str(SOURCES[0])), id_prefix="food_"))
+
+
+def test_catalog_bench_report(tmp_path, capsys):
+    output = tmp_path / "catalog.json"
+    assert main(["--source", str(SOURCES[0]), "--copies", "3", "--repeat", "1", "--output", str(output)]) == 0
+    assert "fooditem" in capsys.readouterr().out
+
+    runs = {run["model"]: run for run in json.loads(output.read_text())["runs"]}
+    assert list(runs) == ["dict", "fooditem", "corpus"] and runs["dict"]["items"] == 330
+    assert runs["fooditem"]["bytes_per_item"] < runs["dict"]["bytes_per_item"]
+    assert runs["dict"]["attr_ns"] is None and runs["fooditem"]["attr_ns"] > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
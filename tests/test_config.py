@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Offline tests for the unified configuration loader."""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import PROJECT_ROOT, Settings, get_settings, load_settings, parse_env_file
+
+
+def test_parse_env_file_ignores_comments_and_quotes(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text('# comment\n\nGROQ_API_KEY="abc"\nexport MAX_RESULTS=5\nBROKEN_LINE\n')
+
+    assert parse_env_file(env_file) == {"GROQ_API_KEY": "abc", "MAX_RESULTS": "5"}
+    assert parse_env_file(tmp_path / "missing.env") == {}
+
+
+def test_environment_overrides_file_and_types_are_coerced(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("MAX_RESULTS=5\nREQUEST_TIMEOUT=2.5\nGROQ_MODEL=from-file\n")
+
+    settings = load_settings(env_file, environ={"GROQ_MODEL": "from-env", "MAX_CONCURRENCY": "32"})
+
+    assert settings.top_k == 5
+    assert settings.request_timeout == 2.5
+    assert settings.groq_model == "from-env"
+    assert settings.max_concurrency == 32
+    assert settings.upsert_batch_size == Settings().upsert_batch_size
+
+
+def test_paths_resolve_against_project_root():
+    settings = Settings(json_file="data/food_data.json")
+
+    assert settings.json_path == PROJECT_ROOT / "data" / "food_data.json"
+    assert settings.replace(top_k=7).top_k == 7
+    assert settings.to_dict()["upstash_token"] is None
+
+
+def test_get_settings_is_memoized():
+    assert get_settings() is get_settings()
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Offline tests for the compiled, memory-mapped corpus format."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+import ragfood.corpus as corpus_format
+from ragfood.corpus import Corpus, CorpusWriter, compile_corpus, compile_items, main
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = [ROOT / "data" / "food_data.json", ROOT / "foods.json"]
+
+
+@pytest.mark.parametrize("source", SOURCES, ids=lambda p: p.name)
+def test_compiled_corpus_reads_back_as_the_json(source):
+    items = json.loads(source.read_text(encoding="utf-8"))
+    corpus = Corpus(compile_items(items))
+    assert len(corpus) == len(items) and list(corpus) == items
+    assert corpus[-1] == items[-1] and corpus[2:5] == items[2:5]
+    assert "dietary" not in corpus[0] and corpus.value(0, "dietary") is None
+
+    kinds = {name: d["kind"] for name, d in corpus.fields.items()}
+    assert kinds["region"] == kinds["type"] == "category" and kinds["text"] == kinds["id"] == "string"
+    assert kinds["dietary"] == kinds["ingredients"] == "category_list"
+    codes, regions = corpus.codes("region")
+    assert codes.dtype == np.uint16 and [regions[c] for c in codes] == [item["region"] for item in items]
+    assert len(regions) < len(items)
+
+
+def test_offsets_widen_past_uint32(monkeypatch):
+    items = json.loads(SOURCES[0].read_text(encoding="utf-8"))
+    narrow = Corpus(compile_items(items))
+    assert {d.get("offset_dtype") for d in narrow.fields.values()} == {None, "<u4"}
+
+    # A catalog whose heap passes 4 GiB cannot be built here; lower the limit instead
+    monkeypatch.setattr(corpus_format, "_U4_MAX", 200)
+    wide = Corpus(compile_items(items))
+    assert wide.fields["text"]["offset_dtype"] == wide.fields["ingredients"]["offset_dtype"] == "<u8"
+    assert wide.fields["dietary"]["offset_dtype"] == "<u4" and wide._spans["id"].dtype == np.uint64
+    assert list(wide) == items
+
+
+def test_writer_streams_blocks_through_spill_files(tmp_path, monkeypatch):
+    items = json.loads(SOURCES[1].read_text(encoding="utf-8"))
+    items = [{"id": "0"}] + items + [dict(items[0], id="late", season="winter", pairings=["tea"])]
+    monkeypatch.setattr(corpus_format, "WRITE_BLOCK", 16)
+    output = tmp_path / "streamed.corpus"
+    with CorpusWriter(spill_dir=str(tmp_path)) as writer:
+        assert writer.add(iter(items)) == len(items)
+        with open(output, "wb") as f:
+            writer.write(f)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["streamed.corpus"]
+
+    corpus = Corpus.open(output)
+    assert corpus.verify() and list(corpus) == items == list(Corpus(compile_items(items)))
+    assert corpus.present("season").sum() == 1 and corpus.value(len(items) - 1, "pairings") == ["tea"]
+    with pytest.raises(ValueError, match="'region' must hold strings"):
+        CorpusWriter().add(items[:20] + [dict(items[1], region=["Japan"])])
+
+
+def test_open_maps_file_and_detects_changes(tmp_path):
+    source = tmp_path / "catalog.json"
+    source.write_bytes(SOURCES[0].read_bytes())
+    path = compile_corpus(str(source))
+    assert path == str(tmp_path / "catalog.corpus")
+
+    corpus = load_food_data(path)
+    assert isinstance(corpus, Corpus) and isinstance(corpus._buffer.base, np.memmap)
+    assert corpus.verify() and corpus.is_current(source)
+    expected = list(food_records(load_food_data(str(source)), extended=True))
+    assert list(food_records(corpus, extended=True)) == expected
+
+    source.write_text(source.read_text(encoding="utf-8").replace("banana", "plantain"), encoding="utf-8")
+    assert not corpus.is_current(source)
+    raw = bytearray(Path(path).read_bytes())
+    raw[-1] ^= 0xFF
+    Path(path).write_bytes(bytes(raw))
+    assert not Corpus.open(path).verify()
+    with pytest.raises(ValueError, match="not a compiled corpus"):
+        Corpus(b"NOTACORPUS" + b"\0" * 16)
+
+
+def test_cli_compiles_and_verifies(tmp_path, capsys):
+    output = tmp_path / "foods.corpus"
+    assert main([str(SOURCES[1]), "--output", str(output)]) == 0
+    assert main(["--verify", str(output)]) == 0
+    assert "content hash matches" in capsys.readouterr().out
+    assert main([str(SOURCES[0]), str(SOURCES[1]), "--output", str(output)]) == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Offline tests for the parallel evaluation runner and record/replay cassettes."""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.cassette import Cassette, CassetteMiss, request_key
+from ragfood.catalog import food_records, load_food_data
+from ragfood.evaluation import EvalRunner, open_backends, rag_executor, score_response
+from ragfood.workload import TEST_QUERIES
+
+
+def test_runner_is_bounded_and_keeps_order():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def execute(query):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return f"answer to {query}", 0.02, {"contexts_found": 1}
+
+    summary = EvalRunner(execute, workers=4).run(TEST_QUERIES, progress=False)
+
+    assert peak[0] == 4
+    assert [r["query"] for r in summary["detailed_results"]] == [t["query"] for t in TEST_QUERIES]
+    assert summary["total_tests"] == len(TEST_QUERIES) == summary["successful_tests"] + summary["failed_tests"]
+    assert sum(d["tests"] for d in summary["category_performance"].values()) == len(TEST_QUERIES)
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "eval.jsonl")
+    tests = TEST_QUERIES[:6]
+
+    recorder = Cassette(path, mode="record")
+    store, llm = open_backends("memory", "stub", cassette=recorder)
+    store.inner.upsert(food_records(load_food_data("foods.json")))
+    recorded = EvalRunner(rag_executor(store, llm), workers=3).run(tests, progress=False)
+    assert recorder.recorded == 12 and len(Cassette(path)) == 12
+
+    player = Cassette(path, mode="replay")
+    store, llm = open_backends("memory", "stub", cassette=player)
+    assert store.inner is None and llm.inner is None
+    replayed = EvalRunner(rag_executor(store, llm), workers=3).run(tests, progress=False)
+
+    assert player.hits == 12 and player.recorded == 0
+    for before, after in zip(recorded["detailed_results"], replayed["detailed_results"]):
+        assert after["response"] == before["response"]
+        assert after["metadata"]["top_similarity_scores"] == before["metadata"]["top_similarity_scores"]
+        assert after["accuracy_score"] == before["accuracy_score"]
+    with pytest.raises(CassetteMiss):
+        store.query(text="a question nobody recorded")
+
+
+def test_request_key_and_scoring():
+    assert request_key("llm.complete", {"a": 1, "b": [1, 2]}) == request_key("llm.complete", {"b": [1, 2], "a": 1})
+    assert request_key("llm.complete", {"a": 1}) != request_key("store.query", {"a": 1})
+    with pytest.raises(ValueError):
+        Cassette("unused.jsonl", mode="rewind")
+
+    test = {"expected_regions": ["Asia", "Europe"], "dietary_filters": ["vegan"]}
+    assert score_response(test, "Popular across asia, and vegan.", {}) == pytest.approx(0.15 + 0.2)
+    assert score_response(test, "Error: " + "x" * 200, {}) == 0.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
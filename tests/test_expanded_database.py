@@ -3,12 +3,14 @@
 Test the expanded food database with comprehensive examples
 """
 
-import json
-import os
-from dotenv import load_dotenv
+import sys
+from pathlib import Path
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import load_food_data
+from ragfood.config import get_settings
+
+settings = get_settings()
 
 def test_expanded_database():
     """Test queries on the new expanded database"""
@@ -17,8 +19,7 @@ def test_expanded_database():
     
     # Load and verify the database
     try:
-        with open('foods.json', 'r', encoding='utf-8') as f:
-            food_data = json.load(f)
+        food_data = load_food_data()
         
         print(f"📊 Database Statistics:")
         print(f"   Total Items: {len(food_data)}")
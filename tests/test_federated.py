@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Offline tests for federated multi-namespace search."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.engine import RAGEngine
+from ragfood.federated import FederatedVectorStore, create_federated_store, merge_results, parse_namespaces
+from ragfood.llm import StubProvider
+from ragfood.stores import QueryResult, VectorQuery, VectorRecord, create_vector_store
+from ragfood.stores.memory import InMemoryVectorStore
+
+
+class SlowStore(InMemoryVectorStore):
+    """Memory store whose queries sleep (or fail) per namespace."""
+
+    def __init__(self, delays, failing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays
+        self.failing = set(failing)
+
+    def query(self, *args, namespace="", **kwargs):
+        time.sleep(self.delays.get(namespace, 0.0))
+        if namespace in self.failing:
+            raise ConnectionError(f"{namespace} is down")
+        return super().query(*args, namespace=namespace, **kwargs)
+
+
+def hits(*scores, prefix="x"):
+    return [QueryResult(id=f"{prefix}{i}", score=s) for i, s in enumerate(scores)]
+
+
+def test_merge_policies_normalize_per_namespace():
+    per_namespace = {"foods": hits(0.9, 0.85, 0.8, prefix="f"), "": hits(0.6, 0.3, prefix="d")}
+    merged = merge_results(per_namespace, 5)
+    assert [(r.namespace, r.id) for r in merged[:2]] == [("foods", "f0"), ("", "d0")] and merged[0].score == 1.0
+
+    raw = merge_results(per_namespace, 5, normalize="none")
+    assert [r.id for r in raw] == ["f0", "f1", "f2", "d0", "d1"]
+    weighted = merge_results(per_namespace, 5, weights={"": 2.0})
+    assert weighted[0].id == "d0"
+    assert [r.id for r in merge_results(per_namespace, 4, merge="round_robin")] == ["f0", "d0", "f1", "d1"]
+    rrf = merge_results(per_namespace, 5, merge="rrf")
+    assert [r.id for r in rrf[:2]] == ["f0", "d0"] and rrf[0].score == pytest.approx(1 / 61)
+    assert merge_results(per_namespace, 5, normalize="zscore")[0].score == pytest.approx(1.2247, abs=1e-4)
+    with pytest.raises(ValueError, match="merge policy"):
+        merge_results(per_namespace, 5, merge="best")
+    assert parse_namespaces("foods, default,,apps") == ["foods", "", "apps"]
+
+
+def test_namespaces_are_queried_concurrently_within_a_deadline():
+    store = SlowStore({"a": 0.2, "b": 0.2, "c": 0.2, "slow": 1.0}, failing={"down"}, dimension=8)
+    for i, ns in enumerate(("a", "b", "c", "slow", "down")):
+        store.upsert([VectorRecord(id="1", vector=[1.0] * 8, data=f"from {ns}"), VectorRecord(id="2", vector=[float(i + 1)] + [0.0] * 7)], namespace=ns)
+
+    federated = FederatedVectorStore(store, ["a", "b", "c"], max_workers=4)
+    result = federated.search(vector=[1.0] * 8, top_k=6)
+    assert result.complete and len(result.results) == 6 and {r.namespace for r in result.results} == {"a", "b", "c"}
+    assert result.seconds < 0.45 and all(o.seconds >= 0.2 for o in result.outcomes)
+
+    federated = FederatedVectorStore(store, ["a", "slow", "down"], deadline=0.4, max_workers=4)
+    start = time.perf_counter()
+    result = federated.search(vector=[1.0] * 8, top_k=3)
+    assert time.perf_counter() - start < 0.8 and not result.complete
+    outcomes = {o.namespace: o for o in result.outcomes}
+    assert outcomes["slow"].timed_out and outcomes["down"].error == "ConnectionError: down is down"
+    assert {r.namespace for r in result.results} == {"a"}
+
+    # Batched queries bypass SlowStore.query, so every namespace answers
+    batched = federated.query_many([VectorQuery(vector=[1.0] * 8, top_k=2), VectorQuery(vector=[0.0, 1.0] + [0.0] * 6, top_k=3)])
+    assert [len(r) for r in batched] == [2, 3] and all(r.id == "1" for r in batched[0])
+    federated.close()
+
+
+def test_slow_namespace_does_not_starve_the_pool():
+    store = SlowStore({"slow": 0.5}, dimension=8)
+    for ns in ("a", "b", "slow"):
+        store.upsert([VectorRecord(id="1", vector=[1.0] * 8, data=f"from {ns}")], namespace=ns)
+
+    federated = FederatedVectorStore(store, ["a", "b", "slow"], deadline=0.1, max_workers=2)
+    for _ in range(3 * federated.max_workers):
+        result = federated.search(vector=[1.0] * 8, top_k=3)
+        outcomes = {o.namespace: o for o in result.outcomes}
+        assert {r.namespace for r in result.results} == {"a", "b"} and outcomes["slow"].timed_out
+    assert federated.max_workers == 3 and len(federated._stragglers) == 1
+
+    time.sleep(0.5)
+    assert {r.namespace for r in federated.search(vector=[1.0] * 8, top_k=3, deadline=1.0).results} == {"a", "b", "slow"}
+    federated.close()
+
+
+def test_engine_answers_from_several_namespaces(tmp_path):
+    food_data = load_food_data()
+    store = create_vector_store("memory")
+    store.upsert(food_records(food_data[:60]), namespace="foods")
+    store.upsert(food_records(food_data[60:]))
+    federated = create_federated_store(store, max_workers=2)
+    assert federated.namespaces == ["foods", ""] and federated.info().vector_count == len(store.ids("foods")) + len(store.ids())
+
+    response = RAGEngine(federated, StubProvider(), cache_size=0).query("spicy curry", top_k=6)
+    assert {s.namespace for s in response.sources} == {"foods", ""}
+    assert all("namespace" in s for s in response.to_dict()["sources"])
+    federated.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
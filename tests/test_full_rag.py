@@ -2,26 +2,17 @@
 """Test the fixed RAG query system."""
 
 import sys
-import os
-from dotenv import load_dotenv
-from upstash_vector import Index
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import get_settings
+
+settings = get_settings()
 
 # Import our functions
 sys.path.append('.')
 from rag_run_upstash import initialize_upstash_client, enhanced_rag_query
 
-# Load environment
-load_dotenv('.env')
-
-# Manual fallback
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    with open('.env', 'r') as f:
-        for line in f:
-            if line.strip() and not line.startswith('#') and '=' in line:
-                key, value = line.strip().split('=', 1)
-                value = value.strip('"')
-                os.environ[key] = value
-
 try:
     # Initialize client
     index = initialize_upstash_client()
@@ -3,26 +3,17 @@
 Groq Migration Demo: Test Groq Cloud API integration
 """
 
-import os
+import sys
+from pathlib import Path
 import json
-from dotenv import load_dotenv
 from upstash_vector import Index
 from groq import Groq
 
-# Load environment variables
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import get_settings
+
+settings = get_settings()
 
-# Manual fallback for environment variables
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    try:
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    value = value.strip('"')
-                    os.environ[key] = value
-    except FileNotFoundError:
-        pass
 
 def test_groq_migration():
     """Test the complete Groq migration setup."""
@@ -32,7 +23,7 @@ def test_groq_migration():
     # Test 1: Groq API Connection
     print("\n📌 Step 1: Testing Groq Cloud API Connection...")
     try:
-        groq_api_key = os.getenv("GROQ_API_KEY")
+        groq_api_key = settings.groq_api_key
         if not groq_api_key:
             raise ValueError("Missing GROQ_API_KEY")
         
@@ -61,8 +52,8 @@ def test_groq_migration():
     # Test 2: Upstash Vector Connection
     print("\n📌 Step 2: Testing Upstash Vector Connection...")
     try:
-        upstash_url = os.getenv("UPSTASH_VECTOR_REST_URL")
-        upstash_token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+        upstash_url = settings.upstash_url
+        upstash_token = settings.upstash_token
         
         if not upstash_url or not upstash_token:
             raise ValueError("Missing Upstash credentials")
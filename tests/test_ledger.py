@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Offline tests for the usage/cost ledger and its aggregation CLI."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.engine import RAGEngine
+from ragfood.evaluation import EvalRunner
+from ragfood.ledger import HEADER, UsageEntry, UsageLedger, aggregate, main, read_ledger
+from ragfood.llm import StubProvider, estimate_cost
+from ragfood.stores import create_vector_store
+from ragfood.workload import TEST_QUERIES
+
+GROQ = "llama-3.1-8b-instant"
+
+
+def test_engine_appends_one_line_per_query(tmp_path):
+    store = create_vector_store("memory")
+    store.upsert(food_records(load_food_data()))
+    ledger = UsageLedger(str(tmp_path / "usage.tsv"))
+    engine = RAGEngine(store, StubProvider(), ledger=ledger)
+
+    engine.query("yellow fruit", category="Fruit")
+    engine.query("Yellow  fruit", category="Fruit")
+    engine.query("spicy curry")
+
+    lines = (tmp_path / "usage.tsv").read_text().splitlines()
+    assert lines[0].startswith(HEADER + "\tts\tmodel") and len(lines) == 4
+    first, cached, other = read_ledger(ledger.path)
+    assert (first.category, first.cached, first.model) == ("Fruit", False, engine.llm.model)
+    assert first.prompt_tokens > 0 and first.completion_tokens > 0 and first.latency_ms > 0
+    assert cached.cached and cached.cost_usd == 0.0 and cached.prompt_tokens == first.prompt_tokens
+    assert other.category == "uncategorized" and not other.error
+
+
+def test_aggregate_splits_spent_and_cached_tokens():
+    hour = 1760800000.0 - 1760800000.0 % 3600
+    entries = [
+        UsageEntry.create(GROQ, 1000, 200, 0.5, "Nutrition", ts=hour + 10),
+        UsageEntry.create(GROQ, 3000, 400, 1.5, "Nutrition", ts=hour + 20),
+        UsageEntry.create(GROQ, 3000, 400, 0.001, "Nutrition", cached=True, ts=hour + 30),
+        UsageEntry.create("llama3.2", 500, 50, 2.0, "Cultural", error=True, ts=hour + 3600),
+    ]
+    assert UsageEntry.from_line(entries[0].to_line()) == entries[0]
+
+    by_model = {row["model"]: row for row in aggregate(entries, ["model"])}
+    groq = by_model[GROQ]
+    assert (groq["requests"], groq["cached"], groq["errors"]) == (3, 1, 0)
+    assert (groq["prompt_tokens"], groq["completion_tokens"], groq["cached_tokens"]) == (4000, 600, 3400)
+    assert groq["cost_usd"] == pytest.approx(estimate_cost(GROQ, 4000, 600))
+    assert groq["latency_ms_p50"] == pytest.approx(500)
+    assert by_model["llama3.2"]["cost_usd"] == 0.0 and by_model["llama3.2"]["errors"] == 1
+
+    by_hour = aggregate(entries, ["hour", "category"])
+    assert [(row["category"], row["requests"]) for row in by_hour] == [("Nutrition", 3), ("Cultural", 1)]
+    assert by_hour[0]["hour"].endswith(":00Z") and by_hour[0]["hour"] < by_hour[1]["hour"]
+    with pytest.raises(ValueError):
+        aggregate(entries, ["week"])
+
+
+def test_eval_runner_and_cli(tmp_path, capsys):
+    path = str(tmp_path / "eval.tsv")
+
+    def execute(query):
+        return "answer", 0.25, {"model": GROQ, "input_tokens": 100, "output_tokens": 20}
+
+    EvalRunner(execute, workers=4, ledger=UsageLedger(path)).run(TEST_QUERIES, progress=False)
+
+    assert main([path, "--by", "category", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert {row["category"] for row in report["rows"]} == {t["category"] for t in TEST_QUERIES}
+    assert report["totals"]["requests"] == len(TEST_QUERIES)
+    assert report["totals"]["prompt_tokens"] == 100 * len(TEST_QUERIES)
+
+    assert main([path, "--since", "2999-01-01"]) == 0
+    assert capsys.readouterr().out.splitlines()[-1].split()[:2] == ["total", "0"]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not\ta ledger line\n")
+    with pytest.raises(ValueError, match="eval.tsv"):
+        list(read_ledger(path))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
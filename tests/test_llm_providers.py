@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Offline tests for the LLM provider interface and the RAG engine."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.engine import RAGEngine, build_messages
+from ragfood.llm import GroqProvider, StubProvider, create_llm_provider
+from ragfood.stores import create_vector_store
+
+MESSAGES = build_messages("Which fruit is yellow?", "A banana is a yellow fruit that is soft and sweet.")
+
+
+def test_stub_generation_is_deterministic_across_modes():
+    llm = StubProvider()
+
+    sync = llm.generate(MESSAGES)
+    stream = llm.stream(MESSAGES)
+    deltas = list(stream)
+    batch = llm.generate_batch([MESSAGES, MESSAGES], max_concurrency=2)
+    async_result = asyncio.run(llm.agenerate(MESSAGES))
+
+    assert sync.text.startswith("Based on the provided context: A banana")
+    assert "".join(deltas).strip() == sync.text == stream.generation.text
+    assert [g.text for g in batch] == [sync.text, sync.text]
+    assert async_result.text == sync.text
+    assert sync.usage.completion_tokens == stream.generation.usage.completion_tokens > 0
+    assert stream.generation.time_to_first_token is not None
+
+
+def test_groq_provider_reads_usage_from_client():
+    completion = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=" Bananas. "), finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=42, completion_tokens=3),
+    )
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return completion
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    generation = GroqProvider(client=client).generate(MESSAGES, max_tokens=50)
+
+    assert generation.text == "Bananas."
+    assert generation.usage.total_tokens == 45
+    assert calls[0]["max_completion_tokens"] == 50
+
+
+def test_engine_answers_from_memory_store_and_falls_back_on_llm_error():
+    store = create_vector_store("memory")
+    store.upsert(food_records(load_food_data()))
+
+    response = RAGEngine(store, create_llm_provider("stub")).query("yellow fruit banana")
+    assert response.sources and response.generation is not None
+    assert "banana" in response.answer.lower()
+
+    class FailingProvider(StubProvider):
+        def _complete(self, messages, params):
+            raise RuntimeError("rate limited")
+
+    fallback = RAGEngine(store, FailingProvider()).query("yellow fruit banana")
+    assert fallback.answer.startswith("Based on the available information:")
+    assert "rate limited" in fallback.error
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Offline tests for the query mix and the open-loop load generator."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import build_engine
+from ragfood.catalog import load_food_data
+from ragfood.loadgen import LoadGenerator, arrival_offsets, build_report, engine_target, parse_rates, saturation_point
+from ragfood.workload import TEST_QUERIES, QueryMix, categories, parse_weights
+
+
+def test_query_mix_weights_and_replay():
+    mix = QueryMix(weights=parse_weights("Complex Query=0,Nutritional Query=2"), seed=3)
+    drawn = mix.take(200)
+    assert "Complex Query" not in {category for category, _ in drawn}
+    assert drawn == QueryMix(weights={"Complex Query": 0, "Nutritional Query": 2}, seed=3).take(200)
+    assert len(categories()) == 6 and len(TEST_QUERIES) == 17
+    with pytest.raises(ValueError):
+        QueryMix(weights={"Desserts": 1})
+
+
+def test_arrival_schedules_and_rate_parsing():
+    assert arrival_offsets(10, 1) == [i * 100_000_000 for i in range(10)]
+    poisson = arrival_offsets(200, 2, "poisson", seed=1)
+    assert 300 < len(poisson) < 500 and poisson == sorted(poisson)
+    assert parse_rates(None, "2:6:2") == [2, 4, 6]
+    assert parse_rates("1, 5", None) == [1, 5]
+
+
+def test_latency_is_measured_from_intended_start():
+    # One worker, 50 ms service time, 40 requests/s offered: the queue grows,
+    # and latency must include that wait rather than just the service time.
+    generator = LoadGenerator(lambda question: time.sleep(0.05), QueryMix(), workers=1)
+    step = generator.run_step(rate=40, duration=0.5)
+
+    assert step.offered == step.completed == 20
+    service_p99 = step.service.percentile(99)
+    assert service_p99 < 100e6
+    assert step.latency.percentile(99) > 5 * service_p99
+    assert step.achieved_qps < 25
+
+
+def test_sweep_against_engine_reports_curve():
+    engine = build_engine("memory", "stub", food_data=load_food_data("foods.json")[:30], cache_size=0)
+    generator = LoadGenerator(engine_target(engine), QueryMix(seed=1), workers=4)
+
+    steps = generator.sweep([20, 40], duration=0.5)
+
+    assert [s.offered for s in steps] == [10, 20]
+    assert all(s.error_rate == 0 and s.completed == s.offered for s in steps)
+    assert saturation_point(steps, tolerance=0.8) == 40
+    report = build_report(steps, {"config": "memory+stub"})
+    assert [point["target_qps"] for point in report["curve"]] == [20, 40]
+    assert set(report["steps"][0]["by_category_ms"]) <= set(categories())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
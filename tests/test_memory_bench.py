@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Offline tests for the tracemalloc memory benchmark."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import load_food_data
+from ragfood.memory_bench import MemoryTracker, main, marginal_bytes_per_item, run_memory_benchmark, scaled_catalog
+
+
+def test_tracker_attributes_a_known_allocation():
+    tracker = MemoryTracker(top=3)
+    held = []
+    try:
+        with tracker.phase("allocate"):
+            held.append(bytearray(4 * 1024 * 1024))
+            scratch = bytearray(8 * 1024 * 1024)
+            del scratch
+        with tracker.phase("release"):
+            held.clear()
+    finally:
+        tracker.close()
+
+    allocate, release = tracker.phases
+    assert allocate.delta == pytest.approx(4 * 1024 * 1024, rel=0.05)
+    assert allocate.peak >= 12 * 1024 * 1024
+    assert allocate.top[0].site.startswith(__file__) and allocate.top[0].size >= 4 * 1024 * 1024
+    assert release.delta == pytest.approx(-4 * 1024 * 1024, rel=0.05)
+    assert abs(release.retained) < 256 * 1024
+
+
+def test_runs_report_phases_and_bytes_per_item():
+    food_data = load_food_data()[:40]
+    assert [item["id"] for item in scaled_catalog(food_data[:2], 2)][2:] == [f"{food_data[0]['id']}-1", f"{food_data[1]['id']}-1"]
+
+    streamed = [run_memory_benchmark(food_data, scale, queries=3, top=2) for scale in (1, 3)]
+    materialized = run_memory_benchmark(food_data, 1, queries=3, ingest="materialize", top=2)
+
+    assert [p.name for p in streamed[0].phases] == ["ingest", "query"]
+    assert [p.name for p in materialized.phases] == ["records", "ingest", "query"]
+    assert streamed[1].items == 3 * streamed[0].items == 120
+    assert 0 < streamed[0].bytes_per_item < 64 * 1024
+    assert streamed[1].index_bytes > streamed[0].index_bytes
+    assert 0 < marginal_bytes_per_item(streamed) < 64 * 1024
+    assert materialized.phase("records").delta > 0 and materialized.ingest_peak >= materialized.index_bytes
+    assert any("catalog.py" in site.site for site in materialized.phase("records").top)
+    with pytest.raises(ValueError):
+        run_memory_benchmark(food_data, ingest="lazy")
+
+
+def test_cli_writes_report(tmp_path):
+    output = tmp_path / "memory.json"
+    assert main(["--scale", "1", "--queries", "2", "--top", "0", "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    assert report["schema"] == "ragfood-memory/1"
+    run = report["runs"][0]
+    assert run["items"] == len(load_food_data()) and run["bytes_per_item"] > 0
+    assert {p["name"] for p in run["phases"]} == {"ingest", "query"}
+    assert run["phases"][0]["peak_rss_bytes"] is None or run["phases"][0]["peak_rss_bytes"] > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Offline tests for the metrics registry and the query service /metrics endpoint."""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import build_engine
+from ragfood.catalog import load_food_data
+from ragfood.llm import estimate_cost
+from ragfood.metrics import MetricsRegistry, RAGMetrics
+from ragfood.service import QueryService
+
+
+def sample(text, line_prefix):
+    """Value of the first exposition line starting with ``line_prefix``."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in output")
+
+
+def test_striped_metrics_sum_across_threads_and_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ["kind"])
+    histogram = registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+    gauge = registry.gauge("queue_depth", "Depth")
+
+    def work():
+        for _ in range(1000):
+            counter.labels(kind="a").inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    gauge.inc(5)
+    gauge.set(2)
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert sample(text, 'jobs_total{kind="a"}') == 8000
+    assert sample(text, 'job_seconds_bucket{le="0.1"}') == 0
+    assert sample(text, 'job_seconds_bucket{le="1"}') == sample(text, 'job_seconds_bucket{le="+Inf"}') == 8000
+    assert sample(text, "job_seconds_sum") == pytest.approx(4000)
+    assert sample(text, "queue_depth") == 2
+    with pytest.raises(ValueError):
+        counter.inc(-1)
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Duplicate")
+
+
+def test_service_exposes_pipeline_metrics():
+    engine = build_engine("memory", "stub", food_data=load_food_data("foods.json")[:30], cache_size=8)
+    engine.llm.model = "llama-3.1-8b-instant"  # priced like Groq
+    metrics = RAGMetrics()
+
+    with QueryService(engine, metrics, port=0) as service:
+        for question in ["yellow fruit", "yellow fruit", "spicy food"]:
+            reply = requests.post(f"{service.url}/query", json={"question": question, "top_k": 3})
+            assert reply.status_code == 200 and reply.json()["sources"]
+        assert requests.post(f"{service.url}/query", data="{}").status_code == 400
+        scrape = requests.get(f"{service.url}/metrics")
+
+    assert scrape.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = scrape.text
+    assert sample(text, 'ragfood_queries_total{status="ok"}') == 3
+    assert sample(text, 'ragfood_stage_latency_seconds_count{stage="retrieval"}') == 2
+    assert sample(text, 'ragfood_stage_latency_seconds_count{stage="total"}') == 3
+    assert sample(text, 'ragfood_cache_requests_total{cache="response",result="hit"}') == 1
+    assert sample(text, 'ragfood_cache_hit_ratio{cache="response"}') == pytest.approx(1 / 3)
+    assert sample(text, 'ragfood_retrieval_hits_bucket{le="3"}') == 2
+    assert sample(text, 'ragfood_in_flight_requests{endpoint="query"}') == 0
+    assert sample(text, 'ragfood_http_requests_total{path="/query",status="400"}') == 1
+
+    prompt = sample(text, 'ragfood_llm_tokens_total{model="llama-3.1-8b-instant",type="prompt"}')
+    completion = sample(text, 'ragfood_llm_tokens_total{model="llama-3.1-8b-instant",type="completion"}')
+    assert prompt > 0 and completion > 0
+    cost = sample(text, 'ragfood_llm_cost_usd_total{model="llama-3.1-8b-instant"}')
+    assert cost == pytest.approx(estimate_cost("llama-3.1-8b-instant", prompt, completion))
+    assert estimate_cost("llama-3.1-8b-instant", 1_000_000, 1_000_000) == pytest.approx(0.13)
+    assert estimate_cost("stub-echo", 1000, 1000) == 0.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
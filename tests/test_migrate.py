@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Offline tests for the Chroma → Upstash raw-vector migration."""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.migrate import DELETE, UPDATE, SqliteChromaExport, check_compatible, main, migrate, vector_checksum
+from ragfood.stores import VectorRecord, create_vector_store
+from ragfood.stores.base import StoreInfo
+
+BACKUP = Path(__file__).resolve().parent.parent / "archive" / "chroma_db.backup"
+
+
+def test_sqlite_export_replays_the_write_ahead_log(tmp_path):
+    export = SqliteChromaExport(str(BACKUP), "foods")
+    assert (export.count(), export.dimension, export.space) == (90, 1024, "l2")
+    first = next(iter(export.pages(10)))
+    assert len(first) == 10 and first[0].id == "1" and "banana" in first[0].data and len(first[0].vector) == 1024
+    export.close()
+
+    # Delete one id and rewrite another's document, as Chroma would log it
+    copy = tmp_path / "chroma"
+    shutil.copytree(BACKUP, copy)
+    db = sqlite3.connect(copy / "chroma.sqlite3")
+    topic = db.execute("SELECT topic FROM embeddings_queue LIMIT 1").fetchone()[0]
+    db.execute("INSERT INTO embeddings_queue (operation, topic, id, encoding, metadata) VALUES (?, ?, '2', 'FLOAT32', NULL)", (DELETE, topic))
+    db.execute("INSERT INTO embeddings_queue (operation, topic, id, encoding, metadata) VALUES (?, ?, '3', 'FLOAT32', ?)",
+               (UPDATE, topic, json.dumps({"chroma:document": "A jalapeño is green.", "region": "Mexico"})))
+    db.execute("DELETE FROM embeddings WHERE embedding_id = '2'")
+    db.commit()
+    db.close()
+
+    export = SqliteChromaExport(str(copy), "foods")
+    records = {r.id: r for page in export.pages(25) for r in page}
+    assert export.count() == len(records) == 89 and "2" not in records
+    assert records["3"].data == "A jalapeño is green." and records["3"].metadata == {"region": "Mexico"}
+    original = SqliteChromaExport(str(BACKUP), "foods")
+    unchanged = {r.id: r for page in original.pages(100) for r in page}
+    assert vector_checksum(records["3"].vector) == vector_checksum(unchanged["3"].vector)
+
+
+def test_migrate_copies_vectors_and_reports_integrity():
+    export = SqliteChromaExport(str(BACKUP), "foods")
+    target = create_vector_store("memory", dimension=1024)
+    target.upsert([VectorRecord(id="1", vector=np.ones(1024).tolist(), data="stale")], namespace="foods")
+
+    report = migrate(export, target, "foods", page_size=32, sample=10)
+    assert report["ok"] and report["embedding_requests"] == 0 and report["pages"] == 3
+    assert report["counts"] == {"source": 90, "before": 1, "new": 89, "overwritten": 1, "expected": 90, "after": 90, "match": True}
+    assert len(report["samples"]) == 10 and all(c["match"] for c in report["samples"])
+    assert target.fetch(["1"], namespace="foods")[0].data.startswith("A banana")
+
+    dry = migrate(export, None, sample=5)
+    assert dry["dry_run"] and dry["ok"] and len(dry["samples"]) == 5
+
+
+def test_model_and_dimension_checks(tmp_path, capsys):
+    check_compatible(1024, "mxbai-embed-large", StoreInfo(0, 1024, "upstash", embedding_model="MXBAI_EMBED_LARGE_V1"))
+    check_compatible(1024, "mxbai-embed-large", StoreInfo(0, 1024, "upstash"))
+    with pytest.raises(ValueError, match="BGE_M3"):
+        check_compatible(1024, "mxbai-embed-large", StoreInfo(0, 1024, "upstash", embedding_model="BGE_M3"))
+    check_compatible(1024, "mxbai-embed-large", StoreInfo(0, 1024, "upstash", embedding_model="BGE_M3"), force=True)
+    with pytest.raises(ValueError, match="dimension 384"):
+        check_compatible(1024, "mxbai-embed-large", StoreInfo(0, 384, "upstash"), force=True)
+
+    output = tmp_path / "migration.json"
+    assert main(["--source", str(BACKUP), "--namespace", "foods", "--standins", "--page-size", "40", "--output", str(output)]) == 0
+    assert "20/20 vectors match" in capsys.readouterr().out
+    report = json.loads(output.read_text())
+    assert report["target"]["model"] is None and report["counts"]["after"] == 90
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Offline tests for opt-in query profiling."""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.config import get_settings
+from ragfood.engine import RAGEngine
+from ragfood.evaluation import EvalRunner
+from ragfood.llm import StubProvider
+from ragfood.profiling import ProfileRecorder, SamplingProfiler, StackProfile, TracingProfiler
+from ragfood.stores import create_vector_store
+from ragfood.workload import TEST_QUERIES
+
+
+def _leaf(n):
+    return sum(i * i for i in range(n))
+
+
+def _outer():
+    return _leaf(20000)
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        _leaf(500)
+
+
+def test_tracing_profiler_charges_self_time_to_nested_stacks():
+    with TracingProfiler() as profiler:
+        _outer()
+
+    profile = profiler.profile
+    assert profile.unit == "nanoseconds" and profile.requests == 1
+    stacks = [stack for stack in profile.stacks if any(label.startswith("_leaf ") for label in stack)]
+    assert stacks
+    chain = [label.split(" ")[0] for label in stacks[0]]
+    assert chain.index("_outer") < chain.index("_leaf")
+    assert all(label.endswith(")") for label in stacks[0])
+    assert "tests/test_profiling.py" in stacks[0][chain.index("_leaf")]
+
+
+def test_sampling_profiler_sees_the_busy_frame():
+    with SamplingProfiler(interval=0.001) as profiler:
+        _busy(0.1)
+
+    assert profiler.profile.total > 10
+    busy = sum(weight for stack, weight in profiler.profile.stacks.items() if any(label.startswith("_busy ") for label in stack))
+    assert busy >= 0.9 * profiler.profile.total
+
+
+def test_collapsed_and_speedscope_formats(tmp_path):
+    profile = StackProfile("nanoseconds", "demo")
+    profile.stacks[("main", "query", "retrieve")] += 30
+    profile.stacks[("main", "query")] += 10
+    profile.requests = 2
+
+    assert profile.to_collapsed() == "main;query 10\nmain;query;retrieve 30\n"
+    assert profile.top(1) == [("retrieve", 30)]
+
+    document = json.loads(Path(profile.write(str(tmp_path / "p.speedscope.json"), "speedscope")).read_text())
+    frames = [f["name"] for f in document["shared"]["frames"]]
+    sampled = document["profiles"][0]
+    assert sampled["type"] == "sampled" and sampled["unit"] == "nanoseconds"
+    assert sampled["weights"] == [10, 30] and sampled["endValue"] == 40
+    assert [[frames[i] for i in sample] for sample in sampled["samples"]] == [["main", "query"], ["main", "query", "retrieve"]]
+    with pytest.raises(ValueError):
+        profile.write(str(tmp_path / "p.svg"), "svg")
+
+
+def test_engine_writes_per_request_profiles_and_aggregate(tmp_path):
+    store = create_vector_store("memory")
+    store.upsert(food_records(load_food_data()))
+    recorder = ProfileRecorder("trace", directory=str(tmp_path))
+    engine = RAGEngine(store, StubProvider(), profiler=recorder, cache_size=0)
+
+    first = engine.query("yellow fruit")
+    second = engine.query("spicy curry")
+    unprofiled = engine.query("sushi", profile=False)
+
+    assert first.profile and second.profile and first.profile != second.profile
+    assert unprofiled.profile is None and "profile" not in unprofiled.to_dict()
+    assert recorder.paths == [first.profile, second.profile]
+    assert any("_query (ragfood/engine.py" in line for line in Path(first.profile).read_text().splitlines())
+
+    aggregate = recorder.write_aggregate()
+    assert aggregate == str(tmp_path / "aggregate.collapsed")
+    assert recorder.aggregate.requests == 2
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in Path(aggregate).read_text().splitlines()) == recorder.aggregate.total
+
+
+def test_profile_true_enables_profiling_on_demand(tmp_path):
+    settings = get_settings().replace(profile_mode="", profile_dir=str(tmp_path))
+    store = create_vector_store("memory")
+    store.upsert(food_records(load_food_data()))
+    engine = RAGEngine(store, StubProvider(), settings=settings)
+    assert engine.profiler is None
+
+    response = engine.query("yellow fruit", profile=True)
+    assert Path(response.profile).parent == tmp_path
+
+    # The on-demand recorder is scoped to that request
+    assert engine.profiler is None
+    assert engine.query("green vegetable").profile is None
+    assert list(tmp_path.glob("*")) == [Path(response.profile)]
+
+
+def test_eval_runner_profiles_each_case_in_aggregate_only_mode():
+    recorder = ProfileRecorder("trace", per_request=False)
+    summary = EvalRunner(lambda q: _outer() and (q, 0.0, {}), workers=2, profiler=recorder).run(TEST_QUERIES[:4], progress=False)
+
+    assert recorder.aggregate.requests == 4 and recorder.paths == []
+    assert all("profile" not in result for result in summary["detailed_results"])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Offline tests for embedding projection (PCA / prefix) and its benchmark."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.ann_bench import exact_top_k, recall, sample_queries
+from ragfood.benchmark import build_store
+from ragfood.config import load_settings
+from ragfood.embeddings import HashingEmbedder
+from ragfood.projection import PCAProjection, PrefixProjection, ProjectedEmbedder, create_projected_embedder, load_projection
+from ragfood.projection_bench import main
+from ragfood.stores.memory import normalize_rows, top_k_indices
+
+
+def low_rank_vectors(n=2000, rank=16, dim=128, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.standard_normal((n, rank)) @ rng.standard_normal((rank, dim)))
+
+
+def test_pca_keeps_neighbours_of_low_rank_data(tmp_path):
+    vectors = low_rank_vectors()
+    queries = sample_queries(vectors, 30, noise=0.0)
+    truth = exact_top_k(vectors, queries, 10)
+    pca = PCAProjection(16).fit(vectors)
+    reduced = pca.transform(vectors)
+    assert reduced.shape == (2000, 16) and np.allclose(np.linalg.norm(reduced, axis=1), 1.0, atol=1e-5)
+
+    # Centring shifts cosines slightly, so neighbours are kept rather than reproduced exactly
+    found = [top_k_indices(reduced @ pca.transform(q[None, :])[0], 10) for q in queries]
+    assert recall(found, truth) > 0.8
+
+    loaded = load_projection(pca.save(str(tmp_path / "pca.npz")))
+    assert isinstance(loaded, PCAProjection) and np.allclose(loaded.transform(vectors[:5]), reduced[:5])
+    with pytest.raises(ValueError, match="up to"):
+        PCAProjection(256).fit(vectors)
+
+
+def test_prefix_truncates_and_embedder_wraps(tmp_path):
+    prefix = PrefixProjection(4)
+    assert np.allclose(prefix.transform(np.array([[3.0, 0, 0, 4.0, 9.0]])), [[0.6, 0, 0, 0.8]])
+    with pytest.raises(ValueError, match="truncate"):
+        prefix.transform(np.ones((1, 2)))
+
+    texts = ["yellow banana", "green apple", "spicy curry", "sweet mango lassi", "sour lemon"]
+    settings = load_settings(environ={"PROJECTION": "pca", "PROJECTION_DIM": "3"}, env_file=tmp_path / "none")
+    path = str(tmp_path / "projection.npz")
+    embedder = create_projected_embedder(HashingEmbedder(64), texts, settings, path)
+    assert isinstance(embedder, ProjectedEmbedder) and embedder.dimension == 3
+    assert embedder.embed(texts).shape == (5, 3) and os.path.exists(path)
+    reused = create_projected_embedder(HashingEmbedder(64), (), settings, path)
+    assert np.allclose(reused.embed(texts), embedder.embed(texts))
+    assert create_projected_embedder(HashingEmbedder(64), texts, settings.replace(projection="")).dimension == 64
+
+    store = build_store("memory", settings.replace(projection_dim=32))
+    assert store.dimension == 32 and store.query("yellow fruit", top_k=3)
+
+
+def test_projection_bench_report(tmp_path, capsys):
+    output = tmp_path / "projection.json"
+    assert main(["--n", "1000", "--dim", "64", "--queries", "10", "--dims", "64,32,16", "--output", str(output)]) == 0
+    assert "prefix" in capsys.readouterr().out
+
+    runs = json.loads(output.read_text())["runs"]
+    assert [(r["method"], r["dimension"]) for r in runs] == [("none", 64), ("pca", 32), ("pca", 16), ("prefix", 32), ("prefix", 16)]
+    assert runs[0]["recall"] == 1.0 and runs[2]["bytes_per_vector"] == 64
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
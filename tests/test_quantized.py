@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Offline tests for vector quantization, the quantized store and its benchmark."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood import quantize
+from ragfood.ann_bench import synthetic_vectors
+from ragfood.catalog import food_records, load_food_data
+from ragfood.quant_bench import main
+from ragfood.stores import VectorQuery, create_vector_store
+
+
+def test_codes_approximate_vectors_and_scores():
+    vectors = synthetic_vectors(500, 64, seed=3)
+    q = vectors[0]
+    for precision, tolerance in (("float32", 1e-6), ("float16", 1e-3), ("int8", 2e-2)):
+        codes, scales = quantize.encode(vectors, precision)
+        assert codes.dtype == quantize.CODE_DTYPES[precision]
+        assert np.abs(quantize.decode(codes, scales) - vectors).max() < tolerance
+        approx = quantize.scores(codes, scales, q, chunk=128)
+        assert np.allclose(approx, quantize.decode(codes, scales) @ q, atol=1e-5)
+        assert np.allclose(quantize.scores(codes, scales, vectors[:3])[2], quantize.scores(codes, scales, vectors[2]), atol=1e-6)
+    assert [quantize.bytes_per_vector(p, 1024) for p in quantize.PRECISIONS] == [4096, 2048, 1028]
+    with pytest.raises(ValueError, match="precision"):
+        quantize.encode(vectors, "int4")
+
+
+def test_store_rescores_to_exact_results():
+    food_data = load_food_data()
+    exact = create_vector_store("memory")
+    store = create_vector_store("quantized", precision="int8", rescore=4)
+    for s in (exact, store):
+        s.upsert(food_records(food_data))
+    directory = store.directory
+
+    for question in ("yellow fruit", "spicy curry", "sweet dessert"):
+        expected = exact.query(question, top_k=5)
+        found = store.query(question, top_k=5)
+        assert [r.id for r in found] == [r.id for r in expected]
+        assert [r.score for r in found] == pytest.approx([r.score for r in expected], abs=1e-6)
+    region = food_data[0]["region"]
+    filtered = store.query("spicy curry", top_k=20, filter={"region": region})
+    assert filtered and all(r.metadata["region"] == region for r in filtered)
+    batched = store.query_many([VectorQuery(text="yellow fruit", top_k=5), VectorQuery(text="spicy curry", top_k=2)])
+    assert [r.id for r in batched[0]] == [r.id for r in exact.query("yellow fruit", top_k=5)] and len(batched[1]) == 2
+
+    ids = exact.ids()
+    assert store.delete(ids[:10]) == 10 and store.info().vector_count == len(ids) - 10
+    kept = store.fetch(ids[10:12], include_vectors=True)
+    assert np.allclose(kept[1].vector, exact.fetch([ids[11]], include_vectors=True)[0].vector, atol=1e-6)
+    assert store.resident_bytes() == (len(ids) - 10) * quantize.bytes_per_vector("int8", store.dimension)
+
+    store.close()
+    assert not os.path.exists(directory)
+
+
+def test_quant_bench_report(tmp_path, capsys):
+    output = tmp_path / "quant.json"
+    assert main(["--n", "2000", "--dim", "64", "--queries", "20", "--rescore", "0,4", "--output", str(output)]) == 0
+    assert "int8" in capsys.readouterr().out
+
+    runs = {run["precision"]: run for run in json.loads(output.read_text())["runs"]}
+    assert runs["float32"]["points"][0]["recall"] == 1.0 and runs["int8"]["compression"] == pytest.approx(256 / 68)
+    assert [p["rescore"] for p in runs["int8"]["points"]] == [0, 4]
+    assert runs["int8"]["points"][1]["recall"] >= runs["int8"]["points"][0]["recall"]
+    assert runs["int8"]["resident_bytes"] == 2000 * runs["int8"]["bytes_per_vector"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -2,25 +2,17 @@
 """Test the Upstash RAG system with a single query."""
 
 import sys
-import os
-from dotenv import load_dotenv
+from pathlib import Path
 from upstash_vector import Index
 
-# Load environment
-load_dotenv('.env')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import get_settings
 
-# Manual fallback
-if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-    with open('.env', 'r') as f:
-        for line in f:
-            if line.strip() and not line.startswith('#') and '=' in line:
-                key, value = line.strip().split('=', 1)
-                value = value.strip('"')
-                os.environ[key] = value
+settings = get_settings()
 
 # Initialize client
-UPSTASH_URL = os.getenv("UPSTASH_VECTOR_REST_URL")
-UPSTASH_TOKEN = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+UPSTASH_URL = settings.upstash_url
+UPSTASH_TOKEN = settings.upstash_token
 
 try:
     index = Index(url=UPSTASH_URL, token=UPSTASH_TOKEN)
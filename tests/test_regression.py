@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Offline tests for the Mann-Whitney test and the performance regression gate."""
+
+import os
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import BenchmarkRun, QueryTiming, build_report, write_report
+from ragfood.regression import IMPROVED, MISSING, OK, REGRESSED, compare_reports, format_table, main
+from ragfood.stats import mann_whitney_u
+
+
+def synthetic_report(tmp_path, filename, scale=1.0, seed=0, name="memory+stub", samples=True):
+    rng = random.Random(seed)
+    run = BenchmarkRun(name)
+    for trial in range(5):
+        for i in range(40):
+            retrieval = int(rng.lognormvariate(0, 0.2) * 2e6 * scale)
+            generation = int(rng.lognormvariate(0, 0.2) * 20e6)
+            run.record(QueryTiming(f"q{i}", {"retrieval": retrieval, "generation": generation, "total": retrieval + generation}))
+        run.trial_queries.append(40)
+        run.trial_seconds.append(40 * (22e-3 + (scale - 1) * 2e-3))
+    path = tmp_path / filename
+    write_report(build_report([run], include_samples=samples), str(path))
+    return path
+
+
+def test_mann_whitney_u():
+    slow, fast = [3, 4, 5, 6, 7] * 10, [1, 2, 3, 4, 5] * 10
+    u, p = mann_whitney_u(slow, fast)
+    assert u > len(slow) * len(fast) / 2 and p < 1e-4
+    assert mann_whitney_u(fast, slow)[1] > 0.99
+    assert mann_whitney_u(slow, slow, "two-sided")[1] == pytest.approx(1.0)
+
+
+def test_gate_passes_on_noise_and_fails_on_slowdown(tmp_path, capsys):
+    baseline = synthetic_report(tmp_path, "baseline.json", seed=1)
+    same = synthetic_report(tmp_path, "same.json", seed=2)
+    slower = synthetic_report(tmp_path, "slower.json", scale=1.5, seed=3)
+
+    assert main([str(baseline), str(same)]) == 0
+    assert main([str(baseline), str(slower), "--markdown", str(tmp_path / "diff.md")]) == 1
+    out = capsys.readouterr().out
+    assert "retrieval p50" in out and REGRESSED in out
+    assert (tmp_path / "diff.md").read_text().startswith("| run | metric |")
+    # Only generation gated: unchanged, but throughput still dropped
+    assert main([str(baseline), str(slower), "--stages", "generation", "--throughput-tolerance", "0.5"]) == 0
+
+
+def test_checks_report_improvements_and_missing_runs(tmp_path):
+    from ragfood.benchmark import load_report
+
+    baseline = load_report(str(synthetic_report(tmp_path, "b.json", scale=1.5, seed=1)))
+    faster = load_report(str(synthetic_report(tmp_path, "f.json", seed=2)))
+    checks = {c.metric: c for c in compare_reports(baseline, faster)}
+    assert checks["retrieval p50"].status == IMPROVED and checks["retrieval p50"].change < -0.2
+    assert checks["generation p50"].status == OK
+
+    other = load_report(str(synthetic_report(tmp_path, "o.json", name="upstash+groq")))
+    missing = compare_reports(baseline, other)
+    assert [c.status for c in missing] == [MISSING]
+    assert "MISSING" in format_table(missing)
+
+
+def test_median_is_gated_without_samples(tmp_path):
+    from ragfood.benchmark import load_report
+
+    baseline = load_report(str(synthetic_report(tmp_path, "b.json", seed=1, samples=False)))
+    slower = load_report(str(synthetic_report(tmp_path, "s.json", scale=2.0, seed=2, samples=False)))
+    same = load_report(str(synthetic_report(tmp_path, "n.json", seed=3, samples=False)))
+    assert "samples_ns" not in baseline["runs"][0]
+    checks = {c.metric: c for c in compare_reports(baseline, slower)}
+    assert checks["retrieval p50"].status == REGRESSED and checks["retrieval p50"].p_value is None
+    assert checks["generation p50"].status == OK
+    assert {c.metric: c.status for c in compare_reports(baseline, same)}["retrieval p50"] == OK
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
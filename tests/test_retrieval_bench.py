@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Offline tests for the retrieval-quality benchmark."""
+
+import math
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.benchmark import build_store
+from ragfood.catalog import load_food_data
+from ragfood.retrieval_bench import (
+    Judgement,
+    evaluate_retrieval,
+    load_qrels,
+    ndcg_at_k,
+    recall_at_k,
+    reciprocal_rank,
+)
+
+
+def test_ranking_metrics():
+    relevant = {"a": 2, "b": 1}
+    assert recall_at_k(["x", "a", "y", "b"], relevant, 2) == 0.5
+    assert recall_at_k(["x", "a", "y", "b"], relevant, 4) == 1.0
+    assert reciprocal_rank(["x", "y", "a"], relevant) == pytest.approx(1 / 3)
+    assert reciprocal_rank(["x"], relevant) == 0.0
+    assert ndcg_at_k(["a", "b"], relevant, 2) == pytest.approx(1.0)
+    swapped = (1 + 3 / math.log2(3)) / (3 + 1 / math.log2(3))
+    assert ndcg_at_k(["b", "a"], relevant, 2) == pytest.approx(swapped)
+
+
+def test_labelled_set_references_catalog_ids():
+    ids = {item["id"] for item in load_food_data("foods.json")}
+    judgements = load_qrels()
+    assert len(judgements) >= 30
+    assert all(j.relevant and set(j.relevant) <= ids for j in judgements)
+
+
+def test_evaluate_memory_store_sequential_and_batched():
+    food_data = load_food_data("foods.json")
+    store = build_store("memory", food_data=food_data)
+    # A description retrieves its own item first
+    exact = [Judgement(item["text"], {item["id"]: 2}) for item in food_data[:20]]
+
+    report = evaluate_retrieval(store, exact, ks=(1, 5), repeats=2)
+    assert report.means()["recall@1"] == report.means()["mrr"] == 1.0
+    assert report.queries_run == 40 and report.qps > 0 and report.latency.count == 40
+
+    batched = evaluate_retrieval(store, load_qrels(), ks=(10,), batch=True)
+    sequential = evaluate_retrieval(store, load_qrels(), ks=(10,))
+    assert batched.means() == sequential.means()
+    assert batched.to_dict()["metrics"]["recall@10"] > 0.5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Offline tests for namespace snapshot export and memory-mapped import."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.snapshot import export_snapshot, file_sha256, load_snapshot, main, read_manifest
+from ragfood.stores import VectorRecord, create_vector_store
+
+
+@pytest.fixture(scope="module")
+def source():
+    store = create_vector_store("memory")
+    store.upsert(food_records(load_food_data()), namespace="foods")
+    return store
+
+
+def test_round_trip_maps_vectors_copy_on_write(source, tmp_path):
+    manifest = export_snapshot(source, str(tmp_path), "foods", page_size=16)
+    ids = source.ids("foods")
+    assert manifest["count"] == len(ids) and manifest["dimension"] == source.dimension
+    assert manifest["source"] == {"backend": "memory", "namespace": "foods", "embedding_model": None}
+
+    replica = load_snapshot(str(tmp_path), embedder=source.embedder)
+    assert isinstance(replica.vectors().base, np.memmap) and replica.ids() == ids
+    assert np.allclose(replica.vectors(), source.vectors("foods"), atol=1e-6)
+    assert replica.fetch(ids[:3]) == source.fetch(ids[:3], namespace="foods")
+    for question in ("yellow fruit", "spicy curry"):
+        assert [r.id for r in replica.query(question, top_k=5)] == [r.id for r in source.query(question, top_k=5, namespace="foods")]
+
+    # Writes land in private pages, never in the bundle
+    replica.upsert([VectorRecord(id=ids[0], vector=np.ones(source.dimension).tolist()), VectorRecord(id="new", data="fresh mango")])
+    assert replica.delete([ids[1]]) == 1 and replica.info().vector_count == len(ids)
+    assert file_sha256(str(tmp_path / "vectors.npy")) == manifest["files"]["vectors.npy"]["sha256"]
+    with pytest.raises(ValueError, match="not empty"):
+        load_snapshot(str(tmp_path), store=replica)
+
+
+def test_float16_bundle_loads_into_quantized_store_and_detects_damage(source, tmp_path):
+    manifest = export_snapshot(source, str(tmp_path), "foods", precision="float16")
+    assert manifest["files"]["vectors.npy"]["bytes"] < manifest["count"] * source.dimension * 2 + 256
+
+    store = create_vector_store("quantized", precision="int8")
+    load_snapshot(str(tmp_path), store=store, namespace="foods")
+    assert [r.id for r in store.query("yellow fruit", top_k=5, namespace="foods")] == \
+        [r.id for r in source.query("yellow fruit", top_k=5, namespace="foods")]
+    store.close()
+
+    path = tmp_path / "vectors.npy"
+    raw = bytearray(path.read_bytes())
+    raw[-1] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    read_manifest(str(tmp_path))
+    with pytest.raises(ValueError, match="checksum"):
+        read_manifest(str(tmp_path), verify=True)
+    path.write_bytes(bytes(raw[:-2]))
+    with pytest.raises(ValueError, match="manifest says"):
+        load_snapshot(str(tmp_path))
+
+
+def test_cli_exports_from_upstash_standin(tmp_path, capsys):
+    output = tmp_path / "foods"
+    assert main(["--standins", "--namespace", "foods", "--page-size", "25", "--output", str(output)]) == 0
+    manifest = json.loads((output / "manifest.json").read_text())
+    assert manifest["count"] == len(list(food_records(load_food_data()))) and manifest["source"]["embedding_model"] == "HASHING_STANDIN"
+
+    assert main(["--load", str(output), "--verify"]) == 0
+    assert "Self-match: 1 → 1" in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Offline tests for the Upstash and Groq stand-in servers."""
+
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.standins import ErrorModel, GroqStandIn, LatencyModel, UpstashStandIn
+from ragfood.standins.upstash import parse_filter
+
+
+def call(url, body=None, token="t", method="POST"):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    })
+    with urllib.request.urlopen(request) as response:
+        return response.read().decode("utf-8")
+
+
+def test_upstash_standin_rest_round_trip():
+    with UpstashStandIn(dimension=128, token="t") as server:
+        call(f"{server.url}/upsert-data", [{"id": "1", "data": "banana yellow fruit", "metadata": {"region": "Tropical"}},
+                                           {"id": "2", "data": "spicy lamb curry", "metadata": {"region": "India"}}])
+        hits = json.loads(call(f"{server.url}/query-data", {"data": "yellow banana", "topK": 1, "includeMetadata": True}))
+        assert hits["result"][0]["id"] == "1"
+        assert hits["result"][0]["metadata"] == {"region": "Tropical"}
+
+        filtered = json.loads(call(f"{server.url}/query-data", {"data": "yellow banana", "topK": 5, "filter": "region = 'India'"}))
+        assert [h["id"] for h in filtered["result"]] == ["2"]
+
+        batch = json.loads(call(f"{server.url}/query-data", [{"data": "curry", "topK": 1}, {"data": "banana", "topK": 2}]))
+        assert [len(r) for r in batch["result"]] == [1, 2]
+
+        info = json.loads(call(f"{server.url}/info", method="GET"))["result"]
+        assert info["vectorCount"] == 2 and info["dimension"] == 128
+
+        page = json.loads(call(f"{server.url}/range", {"cursor": "", "limit": 1}))["result"]
+        assert page["nextCursor"] == "1" and page["vectors"][0]["id"] == "1"
+
+        assert json.loads(call(f"{server.url}/delete", ["1"]))["result"] == {"deleted": 1}
+
+        with pytest.raises(urllib.error.HTTPError) as denied:
+            call(f"{server.url}/info", token="wrong", method="GET")
+        assert denied.value.code == 401
+
+
+def test_error_injection_and_latency_specs():
+    assert LatencyModel.parse("0.25").sample() == 0.25
+    first = LatencyModel.parse("lognormal:median=0.01,sigma=0.5", seed=7)
+    second = LatencyModel.parse("lognormal:median=0.01,sigma=0.5", seed=7)
+    samples = [first.sample() for _ in range(200)]
+    assert samples == [second.sample() for _ in range(200)]
+    assert 0.005 < sorted(samples)[100] < 0.02
+
+    with UpstashStandIn(dimension=16, errors=ErrorModel(rate=1.0, status=429)) as server:
+        with pytest.raises(urllib.error.HTTPError) as failed:
+            call(f"{server.url}/info", method="GET")
+        assert failed.value.code == 429
+        assert server.error_count == 1
+
+
+def test_parse_filter_grammar():
+    assert parse_filter("region = 'Italy' AND dietary CONTAINS 'vegan' AND spicy = true") == {
+        "region": "Italy", "dietary": "vegan", "spicy": True,
+    }
+    assert parse_filter("") is None
+
+
+def test_groq_standin_completion_and_stream():
+    messages = [{"role": "user", "content": "Context:\nPaella is a rice dish.\n\nQuestion: What is paella?"}]
+    with GroqStandIn(token="t") as server:
+        url = f"{server.url}/openai/v1/chat/completions"
+        completion = json.loads(call(url, {"model": "llama-3.1-8b-instant", "messages": messages}))
+        assert completion["choices"][0]["message"]["content"].endswith("Paella is a rice dish.")
+        assert completion["usage"]["completion_tokens"] > 0
+
+        events = [line[6:] for line in call(url, {"messages": messages, "stream": True}).splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(e) for e in events[:-1]]
+        text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+        assert text.strip() == completion["choices"][0]["message"]["content"]
+        assert chunks[-1]["x_groq"]["usage"]["completion_tokens"] == completion["usage"]["completion_tokens"]
+
+
+def test_sdks_work_against_standins():
+    pytest.importorskip("upstash_vector")
+    pytest.importorskip("groq")
+    from ragfood.config import Settings
+    from ragfood.engine import RAGEngine
+    from ragfood.llm import GroqProvider
+    from ragfood.stores.upstash import UpstashVectorStore
+
+    with UpstashStandIn(token="t") as upstash, GroqStandIn(token="t") as groq:
+        settings = Settings(upstash_url=upstash.url, upstash_token="t", groq_api_key="t", groq_base_url=groq.url)
+        store = UpstashVectorStore(settings)
+        store.upsert(food_records(load_food_data()))
+        response = RAGEngine(store, GroqProvider(settings), settings).query("yellow banana fruit")
+
+        assert response.error is None
+        assert response.sources[0].id == "1"
+        assert response.generation.usage.completion_tokens > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Offline tests for the seeded synthetic catalog generator."""
+
+import json
+import os
+import sys
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import load_food_data
+from ragfood.corpus import Corpus
+from ragfood.synthetic import BLOCK, CatalogProfile, generate_block, generate_items, main, write_catalog
+from ragfood.validate import validate_catalog
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE = json.loads((ROOT / "foods.json").read_text(encoding="utf-8"))
+PROFILE = CatalogProfile.fit(SOURCE)
+
+
+def shares(values):
+    counts = Counter(values)
+    return {value: count / len(values) for value, count in counts.items()}
+
+
+def distance(a, b):
+    return 0.5 * sum(abs(a.get(k, 0.0) - b.get(k, 0.0)) for k in set(a) | set(b))
+
+
+def test_generation_is_seeded_and_block_addressable():
+    items = list(generate_items(2 * BLOCK + 100, seed=3, profile=PROFILE))
+    assert items == list(generate_items(2 * BLOCK + 100, seed=3, profile=PROFILE))
+    assert items[:50] != list(generate_items(50, seed=4, profile=PROFILE))
+    assert generate_block(PROFILE, 1, seed=3) == items[BLOCK:2 * BLOCK]
+    assert [item["id"] for item in items] == [str(i) for i in range(1, len(items) + 1)]
+    assert list(islice(generate_items(10, seed=3, profile=PROFILE, start_id=1001), 1))[0]["id"] == "1001"
+
+
+def test_distributions_follow_the_source():
+    items = list(generate_items(20_000, seed=42, profile=PROFILE))
+    for key in ("region", "type", "category"):
+        assert distance(shares([i.get(key) for i in items]), shares([i.get(key) for i in SOURCE])) < 0.05, key
+    assert {t for i in items for t in i.get("dietary", [])} <= {t for i in SOURCE for t in i.get("dietary", [])}
+
+    for long in (False, True):
+        source = [len(i["text"].split()) for i in SOURCE if (int(i["id"]) >= 76) == long]
+        generated = [len(i["text"].split()) for i in items if ("origin" in i) == long]
+        assert abs(sum(generated) / len(generated) / (sum(source) / len(source)) - 1) < 0.1
+        assert abs(len(generated) / len(items) - len(source) / len(SOURCE)) < 0.02
+
+
+def test_formats_round_trip_and_validate(tmp_path):
+    items = list(generate_items(500, seed=9, profile=PROFILE))
+    paths = {fmt: str(tmp_path / f"catalog.{fmt}") for fmt in ("json", "jsonl", "corpus")}
+    for path in paths.values():
+        assert write_catalog(items, path) == 500
+
+    assert json.loads(Path(paths["json"]).read_text(encoding="utf-8")) == items
+    assert [json.loads(line) for line in Path(paths["jsonl"]).read_text(encoding="utf-8").splitlines()] == items
+    assert list(Corpus.open(paths["corpus"])) == items and load_food_data(paths["json"]) == items
+    assert validate_catalog(paths["json"])["valid"] and validate_catalog(paths["jsonl"])["valid"]
+
+    output = tmp_path / "cli.out"
+    assert main(["--count", "300", "--seed", "9", "--format", "jsonl", "--output", str(output)]) == 0
+    assert len(output.read_text(encoding="utf-8").splitlines()) == 300
+    assert main(["--count", "10", "--output", str(tmp_path / "catalog.txt")]) == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
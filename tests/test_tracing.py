@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Offline tests for pipeline tracing spans and exporters."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.config import get_settings
+from ragfood.engine import RAGEngine
+from ragfood.llm import StubProvider
+from ragfood.stores import create_vector_store
+from ragfood.tracing import NOOP_TRACER, InMemorySpanExporter, Tracer, create_tracer
+
+STAGES = {"rag.query", "normalize", "cache.lookup", "retrieval", "filter", "rerank", "context.assembly", "llm.first_token", "llm.completion"}
+
+
+def make_engine(**kwargs):
+    store = create_vector_store("memory")
+    store.upsert(food_records(load_food_data()))
+    exporter = InMemorySpanExporter()
+    return RAGEngine(store, StubProvider(), tracer=Tracer(exporter), **kwargs), exporter
+
+
+def test_query_emits_nested_stage_spans_with_attributes():
+    engine, exporter = make_engine(stream=True)
+
+    engine.query("  yellow   fruit banana ", top_k=4)
+
+    spans = exporter.by_name()
+    assert set(spans) == STAGES
+    root = spans["rag.query"]
+    assert root.parent_id is None and root.attributes["cache_hit"] is False
+    assert all(s.parent_id == root.span_id and s.trace_id == root.trace_id for s in exporter.spans if s is not root)
+    assert spans["retrieval"].attributes == {"top_k": 4, "filtered": False, "hits": 4}
+    assert spans["llm.completion"].attributes["prompt_tokens"] > 0
+    assert spans["llm.first_token"].duration_ns <= spans["llm.completion"].duration_ns
+    assert root.start_ns <= spans["normalize"].start_ns and spans["llm.completion"].end_ns <= root.end_ns
+
+
+def test_cache_hit_skips_retrieval_and_generation():
+    engine, exporter = make_engine(cache_size=8)
+    first = engine.query("yellow fruit banana")
+    exporter.spans.clear()
+
+    second = engine.query("Yellow  fruit banana")
+
+    assert {s.name for s in exporter.spans} == {"rag.query", "normalize", "cache.lookup"}
+    assert exporter.by_name()["cache.lookup"].attributes["cache_hit"] is True
+    assert second.answer == first.answer and second.generation.cached
+
+
+def test_file_exporters_write_jsonl_and_otlp(tmp_path):
+    settings = get_settings()
+    assert create_tracer(settings.replace(trace_file="")) is NOOP_TRACER
+
+    for format in ("jsonl", "otlp"):
+        path = tmp_path / f"trace.{format}"
+        tracer = create_tracer(settings, path=str(path), format=format)
+        with pytest.raises(RuntimeError):
+            with tracer.span("rag.query", top_k=3):
+                with tracer.span("retrieval") as span:
+                    span.set(hits=2)
+                raise RuntimeError("boom")
+        tracer.close()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        if format == "jsonl":
+            assert [line["name"] for line in lines] == ["retrieval", "rag.query"]
+            assert lines[1]["status"] == "ERROR" and "boom" in lines[1]["error"]
+        else:
+            spans = lines[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+            assert [s["name"] for s in spans] == ["retrieval", "rag.query"]
+            assert spans[0]["attributes"] == [{"key": "hits", "value": {"intValue": "2"}}]
+            assert spans[0]["parentSpanId"] == spans[1]["spanId"] and spans[1]["status"]["code"] == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
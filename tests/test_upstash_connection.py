@@ -1,30 +1,19 @@
 #!/usr/bin/env python3
 """Test Upstash Vector connection and configuration."""
 
-import os
-from dotenv import load_dotenv
+import sys
+from pathlib import Path
 from upstash_vector import Index
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.config import get_settings
+
 def test_upstash_connection():
     """Test connection to Upstash Vector database."""
     try:
-        # Load environment variables from current directory
-        load_dotenv('.env')
-        
-        # Manual fallback - read .env file directly
-        if not os.getenv("UPSTASH_VECTOR_REST_URL"):
-            print("📝 Manually reading .env file...")
-            with open('.env', 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        if '=' in line:
-                            key, value = line.strip().split('=', 1)
-                            value = value.strip('"')  # Remove quotes
-                            os.environ[key] = value
-        
-        # Get credentials
-        url = os.getenv("UPSTASH_VECTOR_REST_URL")
-        token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+        settings = get_settings()
+        url = settings.upstash_url
+        token = settings.upstash_token
         
         # Debug: Print what we found
         print(f"🔍 Debug - URL: {url[:50] if url else 'None'}...")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Offline tests for streaming catalog validation and statistics."""
+
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ragfood.catalog as catalog
+from ragfood.config import get_settings
+from ragfood.validate import CatalogValidationError, main, scan_records, validate_catalog
+
+ROOT = Path(__file__).resolve().parent.parent
+ITEMS = json.loads((ROOT / "foods.json").read_text(encoding="utf-8"))
+
+
+def test_scanner_finds_records_across_blocks():
+    items = [dict(ITEMS[0], text='Braces { [ ] } and "quotes", a \\ and \\" inside'), dict(ITEMS[1], text="trailing \\")] + ITEMS[2:20]
+    for text in (json.dumps(items, indent=2), "\n".join(json.dumps(item) for item in items) + "\n"):
+        raw = text.encode()
+        for block_size in (1, 7, 4096):
+            spans, scanner, _ = scan_records(np.frombuffer(raw, dtype=np.uint8), block_size)
+            assert [json.loads(raw[start:end]) for start, end in spans] == items
+            assert scanner.complete and scanner.stray == 0
+
+    spans, scanner, kind = scan_records(np.frombuffer(b'[{"id": "1"}, "loose", {"id": "2"', dtype=np.uint8))
+    assert kind == "json" and spans.tolist() == [[1, 12]] and scanner.stray == 1 and not scanner.complete
+
+
+def test_bundled_catalogs_are_valid_with_matching_statistics():
+    report = validate_catalog(ROOT / "foods.json", top=None)
+    assert report["valid"] and report["records"] == len(ITEMS) and report["errors"]["total"] == 0
+    stats = report["statistics"]
+    assert dict(stats["regions"]["top"]) == Counter(item["region"] for item in ITEMS)
+    assert stats["dietary"]["distinct"] == len({tag for item in ITEMS for tag in item.get("dietary", [])})
+    assert stats["fields"]["allergens"] == sum("allergens" in item for item in ITEMS)
+    words = [len(item["text"].split()) for item in ITEMS]
+    assert stats["words"] == {"mean": round(sum(words) / len(words), 1), "min": min(words), "max": max(words)}
+    assert validate_catalog(ROOT / "data" / "food_data.json")["valid"]
+
+
+def test_invalid_records_are_reported_and_gate_loading(tmp_path, monkeypatch):
+    items = [dict(item, id=f"{item['id']}-{copy}") for copy in range(6) for item in ITEMS[:10]]
+    items[3] = {k: v for k, v in items[3].items() if k != "text"}
+    items[7] = dict(items[7], dietary="vegan", rating=4)
+    items[12] = dict(items[12], id=items[40]["id"])
+    path = tmp_path / "catalog.jsonl"
+    lines = [json.dumps(item) for item in items]
+    lines[20] = lines[20][:-1] + ', "region": }'
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    serial = validate_catalog(path, workers=1, chunk_size=7)
+    pooled = validate_catalog(path, workers=2, chunk_size=7, block_size=64)
+    assert pooled["timing"]["chunks"] == 9 and pooled["timing"]["workers"] == 2
+    for report in (serial, pooled):
+        assert not report["valid"] and report["format"] == "jsonl" and report["records"] == 60
+        assert report["errors"]["by_rule"] == {"text:missing": 1, "dietary:not_list": 1, "record:invalid_json": 1, "id:duplicate": 1}
+        assert report["errors"]["duplicate_ids"] == [{"id": items[40]["id"], "rows": [12, 40]}]
+        assert report["warnings"]["unknown_fields"] == {"rating": 1}
+    assert [e["row"] for e in pooled["errors"]["examples"]] == [3, 7, 20]
+
+    output = tmp_path / "report.json"
+    assert main([str(path), "--output", str(output), "--workers", "1"]) == 1
+    assert json.loads(output.read_text())["valid"] is False
+
+    monkeypatch.setattr(catalog, "get_settings", lambda: get_settings().replace(validate_catalog=True))
+    with pytest.raises(CatalogValidationError, match="id:duplicate"):
+        catalog.load_food_data(str(path))
+    assert len(catalog.load_food_data(str(ROOT / "foods.json"))) == len(ITEMS)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Offline tests for the VectorStore interface and the in-memory backend."""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ragfood.catalog import food_records, load_food_data
+from ragfood.embeddings import HashingEmbedder
+from ragfood.stores import VectorQuery, VectorRecord, create_vector_store
+from ragfood.stores.chroma import build_where, flatten_metadata, restore_metadata
+from ragfood.stores.memory import InMemoryVectorStore
+from ragfood.stores.upstash import build_filter
+
+
+def make_store():
+    store = create_vector_store("memory", batch_size=16)
+    store.upsert(food_records(load_food_data()))
+    return store
+
+
+def test_upsert_query_and_fetch_round_trip():
+    store = make_store()
+    food_data = load_food_data()
+
+    assert store.info().vector_count == len(food_data)
+    results = store.query(text="A banana is a yellow fruit that is soft and sweet.", top_k=3)
+    assert results[0].id == "1"
+    assert results[0].score >= results[1].score >= results[2].score
+    assert "banana" in results[0].text.lower()
+
+    fetched = store.fetch(["1", "missing"], include_vectors=True)
+    assert fetched[1] is None
+    assert len(fetched[0].vector) == store.dimension
+
+
+def test_query_many_matches_single_queries():
+    store = make_store()
+    questions = ["spicy Indian curry", "sweet dessert soaked in syrup", "Polish dumplings"]
+
+    batched = store.query_many([VectorQuery(text=q, top_k=5) for q in questions])
+    singles = [store.query(text=q, top_k=5) for q in questions]
+
+    assert [[r.id for r in rs] for rs in batched] == [[r.id for r in rs] for rs in singles]
+
+
+def test_filters_and_delete():
+    store = make_store()
+
+    vegan = store.query(text="healthy bowl", top_k=5, filter={"dietary": "vegan"})
+    assert vegan and all("vegan" in r.metadata["dietary"] for r in vegan)
+
+    assert store.delete(["1", "2", "nope"]) == 2
+    assert store.fetch(["1"])[0] is None
+    assert store.info().vector_count == len(load_food_data()) - 2
+
+
+def test_upsert_replaces_existing_ids_and_namespaces_are_isolated():
+    store = InMemoryVectorStore(dimension=4)
+    store.upsert([VectorRecord(id="a", vector=[1, 0, 0, 0], metadata={"v": 1})])
+    store.upsert([VectorRecord(id="a", vector=[0, 1, 0, 0], metadata={"v": 2})])
+    store.upsert([VectorRecord(id="b", vector=[1, 0, 0, 0])], namespace="other")
+
+    assert store.info().namespaces == {"": 1, "other": 1}
+    hit = store.query(vector=[0, 1, 0, 0], top_k=1)[0]
+    assert hit.id == "a" and hit.metadata == {"v": 2}
+    assert np.isclose(hit.score, 1.0)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dimension=64)
+    first = embedder.embed(["chickpea curry", "chickpea curry"])
+
+    assert np.allclose(first[0], first[1])
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+
+def test_backend_filter_translation():
+    assert build_filter({"region": "Italy", "dietary": "vegan"}) == "region = 'Italy' AND dietary CONTAINS 'vegan'"
+    assert build_where({"region": "Italy", "dietary": "vegan"}) == {"region": "Italy"}
+    flat = flatten_metadata({"dietary": ["vegan", "gluten-free"], "region": "Global"})
+    assert restore_metadata(flat)["dietary"] == ["vegan", "gluten-free"]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([os.path.abspath(__file__), "-q"]))